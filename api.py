@@ -3,17 +3,20 @@ Simple Flask API for CV generation
 Receives JSON with CV data, returns PDF file
 """
 
-from flask import Flask, request, send_file, jsonify
+from flask import Flask, Response, request, send_file, jsonify, stream_with_context
 from flask_cors import CORS
 import base64
 import io
+import json
+import os
 from pathlib import Path
 import sys
+import zipfile
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.render import render_pdf, render_html
+from src.render import render_cv_batch, render_pdf, render_html
 from src.validator import validate_cv
 from src.docx_photo import extract_first_photo_data_uri_from_docx_bytes
 from src.normalize import normalize_cv_data
@@ -30,6 +33,7 @@ def home():
         "endpoints": {
             "/health": "Health check",
             "/generate-cv": "POST - Generate CV PDF from JSON",
+            "/generate-cv-batch": "POST - Render many CVs, streamed as NDJSON or zip",
             "/preview-html": "POST - Preview CV as HTML"
         }
     })
@@ -213,6 +217,114 @@ def generate_cv_action():
         return jsonify({"error": "Failed to generate CV", "message": str(e)}), 500
 
 
+def _batch_max_items() -> int:
+    try:
+        return max(1, int(os.environ.get("CV_BATCH_MAX_ITEMS") or 500))
+    except ValueError:
+        return 500
+
+
+def _batch_item_json(item) -> dict:
+    out = {"index": item.index, "id": item.item_id, "ok": item.ok}
+    if item.ok:
+        out.update({
+            "filename": item.filename,
+            "pdf_base64": base64.b64encode(item.result.pdf).decode("ascii"),
+            "pages": item.result.page_count,
+            "cached": item.result.cached,
+            "timings_ms": item.result.timings_ms,
+        })
+    else:
+        out["error"] = item.error
+        if item.validation_errors:
+            out["validation_errors"] = item.validation_errors
+    return out
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands written bytes to the response generator (streamed zip)."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _stream_batch_ndjson(items):
+    total = failed = 0
+    for item in items:
+        total += 1
+        failed += 0 if item.ok else 1
+        yield json.dumps(_batch_item_json(item), default=str) + "\n"
+    yield json.dumps({"done": True, "total": total, "succeeded": total - failed, "failed": failed}) + "\n"
+
+
+def _stream_batch_zip(items):
+    sink = _ChunkSink()
+    summary = []
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for item in items:
+            entry = {k: v for k, v in _batch_item_json(item).items() if k != "pdf_base64"}
+            if item.ok:
+                entry["filename"] = f"{item.index:04d}_{item.filename}"
+                zf.writestr(entry["filename"], item.result.pdf)
+            summary.append(entry)
+            yield sink.drain()
+        summary.sort(key=lambda e: e["index"])
+        zf.writestr("manifest.json", json.dumps(summary, indent=2, default=str))
+    yield sink.drain()
+
+
+@app.route("/generate-cv-batch", methods=["POST"])
+def generate_cv_batch():
+    """
+    Render many CVs in one request (bulk regeneration jobs).
+
+    Request JSON:
+    - items: list of CVData payloads, or {"id": "...", "cv_data": {...}} wrappers
+    - format: "ndjson" (default) or "zip"
+
+    Items are rendered concurrently and streamed back as each one completes:
+    - ndjson: one line per item ({index, id, ok, pdf_base64 | error, ...}) plus a final summary line
+    - zip: one PDF per successful item and a manifest.json with every item's status
+
+    A failing item (missing fields, validation, render error) never fails the batch.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+        return jsonify({"error": "Expected JSON body with an 'items' list"}), 400
+
+    items = payload["items"]
+    if not items:
+        return jsonify({"error": "No items provided"}), 400
+    max_items = _batch_max_items()
+    if len(items) > max_items:
+        return jsonify({"error": "Too many items", "max_items": max_items}), 413
+
+    fmt = str(payload.get("format") or "ndjson").strip().lower()
+    if fmt not in ("ndjson", "zip"):
+        return jsonify({"error": "Unsupported format", "supported": ["ndjson", "zip"]}), 400
+
+    results = render_cv_batch(items)
+    if fmt == "zip":
+        return Response(
+            stream_with_context(_stream_batch_zip(results)),
+            mimetype="application/zip",
+            headers={"Content-Disposition": "attachment; filename=cv_batch.zip"},
+        )
+    return Response(stream_with_context(_stream_batch_ndjson(results)), mimetype="application/x-ndjson")
+
+
 @app.route("/preview-html", methods=["POST"])
 def preview_html():
     """
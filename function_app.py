@@ -52,7 +52,9 @@ from src.render import render_cover_letter_pdf, render_html
 from src.schema_validator import validate_canonical_schema
 from src.profile_store import get_profile_store
 from src.i18n import get_cover_letter_signoff
-from src.session_store import CVSessionStore
+from src.lazy_metadata import copy_metadata, loaded_metadata
+from src.session_cache import session_cache_scope
+from src.session_store import CVSessionStore, SessionConflictError, merge_conflicting_metadata
 from src.structured_response import parse_structured_response, format_user_message_for_ui
 from src.validator import validate_cv
 from src.cv_fsm import CVStage, SessionState, ValidationState, resolve_stage, detect_edit_intent
@@ -282,7 +284,8 @@ def _snapshot_session(session_id: str, cv_data: dict, snapshot_type: str = "cv")
         pointer = blob_store.upload_session_snapshot(
             session_id=session_id,
             cv_data=cv_data,
-            snapshot_type=snapshot_type
+            snapshot_type=snapshot_type,
+            refs=_get_session_store().blob_refs,
         )
         logging.info(f"Session snapshot saved: {snapshot_type} for session {session_id[:8]}")
         return pointer
@@ -539,7 +542,7 @@ def _find_cover_letter_e0_violations(*, paragraphs: list[str], e0_corpus: str) -
 
 def _reset_metadata_for_new_version(meta: dict) -> dict:
     """Reset job-scoped artifacts for a new version while keeping translation/cache state."""
-    out = dict(meta or {})
+    out = copy_metadata(meta)
     out["pdf_generated"] = False
     out.pop("pdf_refs", None)
     out.pop("pdf_refs_blob_ref", None)
@@ -1495,7 +1498,7 @@ def _apply_stable_profile_payload(*, cv_data: dict, meta: dict, payload: dict) -
     if it was saved in the profile.
     """
     cv2 = dict(cv_data or {})
-    meta2 = dict(meta or {})
+    meta2 = copy_metadata(meta)
 
     contact = payload.get("contact") if isinstance(payload.get("contact"), dict) else {}
     if isinstance(contact, dict):
@@ -1658,7 +1661,7 @@ def _extract_artifact_rows_from_meta(*, meta: dict, session_id: str) -> list[dic
 
 
 def _sync_artifact_history(*, session_id: str, cv_data: dict, meta: dict, max_items: int = 500) -> dict:
-    meta2 = dict(meta or {})
+    meta2 = copy_metadata(meta)
     user_id = _stable_profile_user_id(cv_data if isinstance(cv_data, dict) else {}, meta2)
     if not user_id:
         return meta2
@@ -1716,49 +1719,41 @@ def _job_data_row_signature(row: dict) -> str:
     return _sha256_text(json.dumps(payload, ensure_ascii=False, sort_keys=True))
 
 
+def _has_job_data(row: dict) -> bool:
+    return any(
+        str(row.get(k) or "").strip()
+        for k in ("position_name", "company_name", "company_address", "company_email", "company_phone")
+    )
+
+
 def _recover_job_data_rows_from_sessions(*, user_id: str, limit: int = 64) -> list[dict]:
+    """Job-data rows of the user's earlier sessions, from the per-user session index."""
     rows: list[dict] = []
     if not user_id:
         return rows
     try:
         store = _get_session_store()
-        entities = store.table_client.list_entities()
-        scanned = 0
-        for entity in entities:
-            if scanned >= 300:
-                break
-            scanned += 1
-            if str(entity.get("PartitionKey") or "") != "cv":
-                continue
-            sid = str(entity.get("RowKey") or "").strip()
-            if not sid:
-                continue
-            sess = store.get_session_with_blob_retrieval(sid)
-            if not sess:
-                continue
-            cv_s = sess.get("cv_data") if isinstance(sess.get("cv_data"), dict) else {}
-            meta_s = sess.get("metadata") if isinstance(sess.get("metadata"), dict) else {}
-            uid_s = _stable_profile_user_id(cv_s, meta_s)
-            if uid_s != user_id:
-                continue
-            row = _build_job_data_table_row(
-                cv_data=cv_s,
-                meta=meta_s,
-                session_id=sid,
-                updated_at=str(sess.get("updated_at") or sess.get("created_at") or _now_iso()),
-            )
-            if not any(str(row.get(k) or "").strip() for k in ("position_name", "company_name", "company_address", "company_email", "company_phone")):
+        for row in store.list_user_session_summaries(user_id, limit=limit):
+            if not _has_job_data(row):
                 continue
             rows.append(row)
-            if len(rows) >= limit:
-                break
     except Exception as exc:
         logging.warning("JOB_DATA_RECOVERY_FAILED user=%s err=%s", user_id[:16], str(exc)[:240])
     return rows
 
 
+def _index_job_data_row(*, user_id: str, session_id: str, row: dict) -> None:
+    """Keep the per-user session index current so recovery never has to scan sessions."""
+    if not session_id or not _has_job_data(row):
+        return
+    try:
+        _get_session_store().index_user_session(user_id, session_id, row)
+    except Exception as exc:
+        logging.warning("JOB_DATA_INDEX_FAILED user=%s err=%s", user_id[:16], str(exc)[:240])
+
+
 def _sync_job_data_table_history(*, session_id: str, cv_data: dict, meta: dict, max_items: int = 120) -> dict:
-    meta2 = dict(meta or {})
+    meta2 = copy_metadata(meta)
     user_id = _stable_profile_user_id(cv_data if isinstance(cv_data, dict) else {}, meta2)
     if not user_id:
         # No stable id yet -> show only current row best-effort.
@@ -1821,6 +1816,7 @@ def _sync_job_data_table_history(*, session_id: str, cv_data: dict, meta: dict,
     if not history_rows:
         recovered = _recover_job_data_rows_from_sessions(user_id=user_id, limit=64)
     current_row = _build_job_data_table_row(cv_data=cv_data, meta=meta2, session_id=session_id, updated_at=_now_iso())
+    _index_job_data_row(user_id=user_id, session_id=session_id, row=current_row)
 
     merged: list[dict] = []
     by_sig: dict[str, dict] = {}
@@ -1949,39 +1945,93 @@ def _update_section_hashes_in_metadata(session_id: str, cv_data: dict) -> None:
     metadata["section_hashes_updated_at"] = _now_iso()
     
     # Update metadata only (cv_data already updated by caller)
-    _safe_update_session(store, session_id, cv_data, metadata)
+    _safe_update_session(store, session_id, cv_data, metadata, etag=session.get("etag"))
     logging.debug(f"Updated section hashes for session {session_id}")
 
 
+def _write_session_merging_conflicts(
+    write: Any,
+    store: Any,
+    session_id: str,
+    cv_data: dict,
+    metadata: dict,
+    *,
+    etag: str | None = None,
+    retries: int = 2,
+) -> tuple[bool, dict]:
+    """Run a conditional session write; on conflict merge onto the winning version and retry.
+
+    `etag` is the one the caller loaded the session with; without it the store falls back to
+    its last read/write of the session. The caller's cv_data is the state it means to persist;
+    metadata is merged so a concurrent turn's events and PDF refs survive.
+    Returns (persisted, metadata written).
+    """
+    meta_out = metadata
+    for attempt in range(retries + 1):
+        try:
+            if etag:
+                return bool(write(session_id, cv_data, meta_out, etag=etag)), meta_out
+            return bool(write(session_id, cv_data, meta_out)), meta_out
+        except SessionConflictError:
+            if attempt >= retries:
+                raise
+            read_latest = getattr(store, "get_session_with_blob_retrieval", None) or store.get_session
+            latest = read_latest(session_id)
+            if not latest:
+                return False, meta_out
+            etag = latest.get("etag") or None
+            stored_meta = latest.get("metadata") if isinstance(latest.get("metadata"), dict) else {}
+            meta_out = merge_conflicting_metadata(
+                stored_meta,
+                metadata,
+                max_events=CVSessionStore.EVENT_LOG_MAX_ITEMS,
+            )
+            logging.info(
+                "SESSION_WRITE_CONFLICT session=%s attempt=%s version=%s",
+                session_id,
+                attempt + 1,
+                latest.get("version"),
+            )
+    return False, meta_out
+
+
 def _safe_update_session(
     store: Any,
     session_id: str,
     cv_data: dict,
     metadata: dict,
+    *,
+    etag: str | None = None,
 ) -> bool:
     """Persist session with blob-offload and shrink fallback.
 
     Some call paths still perform direct metadata/session writes outside the wizard
     `_persist` helper. This utility keeps those writes resilient to Azure Table
     Storage size limits by trying blob offload first and retrying once with
-    shrunk metadata on known entity/property size errors.
+    shrunk metadata on known entity/property size errors. Writes are conditional on
+    `etag` (the one the session was loaded with); writes that lose to a concurrent
+    update are merged onto the latest version and retried.
     """
 
     persisted = False
     persist_error: Exception | None = None
-    meta_out = dict(metadata or {}) if isinstance(metadata, dict) else {}
+    meta_out = copy_metadata(metadata) if isinstance(metadata, dict) else {}
     cv_out = dict(cv_data or {}) if isinstance(cv_data, dict) else {}
 
     update_with_offload = getattr(store, "update_session_with_blob_offload", None)
     if callable(update_with_offload):
         try:
-            persisted = bool(update_with_offload(session_id, cv_out, meta_out))
+            persisted, meta_out = _write_session_merging_conflicts(
+                update_with_offload, store, session_id, cv_out, meta_out, etag=etag
+            )
         except Exception as exc:
             persist_error = exc
 
     if not persisted:
         try:
-            persisted = bool(store.update_session(session_id, cv_out, meta_out))
+            persisted, meta_out = _write_session_merging_conflicts(
+                store.update_session, store, session_id, cv_out, meta_out, etag=etag
+            )
         except Exception as exc:
             persist_error = exc
 
@@ -2001,12 +2051,16 @@ def _safe_update_session(
         shrunk_meta = _shrink_metadata_for_table(meta_out)
         if callable(update_with_offload):
             try:
-                persisted = bool(update_with_offload(session_id, cv_out, shrunk_meta))
+                persisted, _ = _write_session_merging_conflicts(
+                    update_with_offload, store, session_id, cv_out, shrunk_meta, etag=etag
+                )
             except Exception as exc:
                 persist_error = exc
         if not persisted:
             try:
-                persisted = bool(store.update_session(session_id, cv_out, shrunk_meta))
+                persisted, _ = _write_session_merging_conflicts(
+                    store.update_session, store, session_id, cv_out, shrunk_meta, etag=etag
+                )
             except Exception as exc:
                 persist_error = exc
 
@@ -2216,7 +2270,7 @@ def _merge_docx_prefill_into_cv_data_if_needed(
         new_cv[k] = v
         applied += 1
 
-    new_meta = dict(meta)
+    new_meta = copy_metadata(meta)
     # Once we copied prefill into canonical cv_data, the unconfirmed snapshot is no longer needed.
     if applied > 0 and clear_prefill:
         new_meta["docx_prefill_unconfirmed"] = None
@@ -2274,13 +2328,13 @@ def _get_pending_confirmation(meta: dict) -> dict | None:
 
 
 def _set_pending_confirmation(meta: dict, *, kind: str) -> dict:
-    out = dict(meta or {})
+    out = copy_metadata(meta)
     out["pending_confirmation"] = {"kind": kind, "created_at": _now_iso()}
     return out
 
 
 def _clear_pending_confirmation(meta: dict) -> dict:
-    out = dict(meta or {})
+    out = copy_metadata(meta)
     out["pending_confirmation"] = None
     return out
 
@@ -2295,7 +2349,7 @@ def _get_turns_in_review(meta: dict) -> int:
 
 def _increment_turns_in_review(meta: dict) -> dict:
     """Increment turn counter when staying in REVIEW stage."""
-    out = dict(meta or {})
+    out = copy_metadata(meta)
     current = _get_turns_in_review(out)
     out["turns_in_review"] = current + 1
     return out
@@ -2303,7 +2357,7 @@ def _increment_turns_in_review(meta: dict) -> dict:
 
 def _reset_turns_in_review(meta: dict) -> dict:
     """Reset turn counter when leaving REVIEW stage."""
-    out = dict(meta or {})
+    out = copy_metadata(meta)
     out["turns_in_review"] = 0
     return out
 
@@ -2331,7 +2385,7 @@ def _get_stage_from_metadata(meta: dict) -> CVStage:
 
 
 def _set_stage_in_metadata(meta: dict, stage: CVStage) -> dict:
-    out = dict(meta or {})
+    out = copy_metadata(meta)
     out["stage"] = stage.value
     out["stage_updated_at"] = _now_iso()
     return out
@@ -2847,7 +2901,7 @@ def _run_bulk_translation(
         stage="bulk_translation",
     )
 
-    meta2 = dict(meta or {})
+    meta2 = copy_metadata(meta)
     # Prompt provenance (stateless auditability)
     prompt_trace = meta2.get("bulk_translation_prompt_trace") if isinstance(meta2.get("bulk_translation_prompt_trace"), list) else []
     prompt_trace.append(
@@ -3379,7 +3433,18 @@ def _build_ui_action(stage: str, cv_data: dict, meta: dict, readiness: dict) ->
 def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
     """
     Backend-owned orchestration entrypoint (thin UI client).
+
+    Runs the turn inside a session cache scope so the many session reads of one turn share a
+    single Table/blob fetch; cache counters are reported in `run_summary.session_cache`.
     """
+    with session_cache_scope() as cache_scope:
+        status, payload = _process_cv_orchestrated_turn(params)
+    if isinstance(payload, dict) and isinstance(payload.get("run_summary"), dict):
+        payload["run_summary"]["session_cache"] = cache_scope.summary()
+    return status, payload
+
+
+def _process_cv_orchestrated_turn(params: dict) -> tuple[int, dict]:
     trace_id = str(params.get("trace_id") or uuid.uuid4())
     message = str(params.get("message") or "").strip()
     docx_base64 = str(params.get("docx_base64") or "")
@@ -3435,12 +3500,16 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
 
     # Validate session exists
     store = _get_session_store()
+    # ETag of this turn's latest read of the session; its writes are conditional on it.
+    loaded_etag: str | None = None
 
     def _session_get(session_id_in: str) -> dict | None:
+        nonlocal loaded_etag
         getter = getattr(store, "get_session_with_blob_retrieval", None)
-        if callable(getter):
-            return getter(session_id_in)
-        return store.get_session(session_id_in)
+        sess_in = getter(session_id_in) if callable(getter) else store.get_session(session_id_in)
+        if sess_in and session_id_in == session_id:
+            loaded_etag = sess_in.get("etag") or None
+        return sess_in
 
     sess = _session_get(session_id)
     if not sess:
@@ -3453,14 +3522,14 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
 
     # Keep metadata language in sync only when the client explicitly sends a language preference.
     if isinstance(sess.get("metadata"), dict) and language:
-        meta = dict(sess.get("metadata") or {})
+        meta = copy_metadata(sess.get("metadata"))
         if meta.get("language") != language:
             meta["language"] = language
-            _safe_update_session(store, session_id, (sess.get("cv_data") or {}), meta)
+            _safe_update_session(store, session_id, (sess.get("cv_data") or {}), meta, etag=loaded_etag)
             sess = _session_get(session_id) or sess
 
     meta = sess.get("metadata") if isinstance(sess.get("metadata"), dict) else {}
-    meta = dict(meta) if isinstance(meta, dict) else {}
+    meta = copy_metadata(meta)
     cv_data = sess.get("cv_data") if isinstance(sess.get("cv_data"), dict) else {}
     cv_data = dict(cv_data) if isinstance(cv_data, dict) else {}
     
@@ -3488,7 +3557,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             logging.info(f"Clearing pending_confirmation due to edit intent")
             meta = _clear_pending_confirmation(meta)
             try:
-                _safe_update_session(store, session_id, cv_data, meta)
+                _safe_update_session(store, session_id, cv_data, meta, etag=loaded_etag)
             except Exception as e:
                 logging.warning(f"Failed to clear pending_confirmation: {e}")
         
@@ -3521,7 +3590,9 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
     if meta.get("flow_mode") == "wizard":
         def _state_sig(cv_obj: dict, meta_obj: dict) -> str:
             try:
-                payload = {"cv": cv_obj or {}, "meta": meta_obj or {}}
+                # Offloaded keys that were never read are represented by their `metadata_blob_refs`
+                # entry; serializing them would download every heavy blob.
+                payload = {"cv": cv_obj or {}, "meta": loaded_metadata(meta_obj)}
                 return _sha256_text(json.dumps(payload, ensure_ascii=False, sort_keys=True))
             except Exception:
                 return ""
@@ -3532,7 +3603,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             return str((m or {}).get("wizard_stage") or "contact").strip().lower() or "contact"
 
         def _wizard_set_stage(m: dict, st: str) -> dict:
-            out = dict(m or {})
+            out = copy_metadata(m)
             next_stage = str(st or "").strip().lower()
             prev_stage = str(out.get("wizard_stage") or "").strip().lower()
 
@@ -3575,6 +3646,9 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             ui_action = _build_ui_action(_wizard_get_stage(meta_out), cv_out, meta_out, readiness_now)
             pdf_base64 = base64.b64encode(pdf_bytes).decode("ascii") if pdf_bytes else ""
             filename = _latest_pdf_download_name(meta=meta_out, cv_data_fallback=cv_out) if pdf_bytes else ""
+            # Heavy keys no step of this turn read stay offloaded (listed in `metadata_blob_refs`);
+            # the UI keeps its own job text and only replaces it with a non-empty one.
+            meta_view = loaded_metadata(meta_out)
             return 200, {
                 "success": True,
                 "trace_id": trace_id,
@@ -3589,8 +3663,8 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
                 "turn_trace": None,
                 "ui_action": ui_action,
                 "job_posting_url": str(meta_out.get("job_posting_url") or ""),
-                "job_posting_text": str(meta_out.get("job_posting_text") or ""),
-                "metadata": meta_out,
+                "job_posting_text": str(meta_view.get("job_posting_text") or ""),
+                "metadata": meta_view,
                 "cv_data": cv_out,
                 "stage_updates": stage_updates or [],
             }
@@ -3614,24 +3688,28 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
                 meta_out if isinstance(meta_out, dict) else {},
             )
             if sig_now and sig_now == _last_persist_sig:
-                return dict(cv_out or {}), dict(meta_out or {})
+                return dict(cv_out or {}), copy_metadata(meta_out)
 
             persisted = False
-            persisted_meta = dict(meta_out or {})
+            persisted_meta = copy_metadata(meta_out)
             persist_error: Exception | None = None
 
             # Prefer blob-offload update path to survive large cv_data payloads.
             update_with_offload = getattr(store, "update_session_with_blob_offload", None)
             if callable(update_with_offload):
                 try:
-                    persisted = bool(update_with_offload(session_id, cv_out, persisted_meta))
+                    persisted, persisted_meta = _write_session_merging_conflicts(
+                        update_with_offload, store, session_id, cv_out, persisted_meta, etag=loaded_etag
+                    )
                 except Exception as exc:
                     persist_error = exc
 
             # Fallback to legacy direct update when offload path is unavailable/fails.
             if not persisted:
                 try:
-                    persisted = bool(store.update_session(session_id, cv_out, persisted_meta))
+                    persisted, persisted_meta = _write_session_merging_conflicts(
+                        store.update_session, store, session_id, cv_out, persisted_meta, etag=loaded_etag
+                    )
                 except Exception as exc:
                     persist_error = exc
 
@@ -3652,7 +3730,9 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             if should_shrink_retry:
                 try:
                     shrunk_meta = _shrink_metadata_for_table(persisted_meta)
-                    persisted = bool(update_with_offload(session_id, cv_out, shrunk_meta))
+                    persisted, shrunk_meta = _write_session_merging_conflicts(
+                        update_with_offload, store, session_id, cv_out, shrunk_meta, etag=loaded_etag
+                    )
                     if persisted:
                         persisted_meta = shrunk_meta
                 except Exception as exc:
@@ -3664,7 +3744,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
                     session_id,
                     str(persist_error)[:400] if persist_error else "unknown",
                 )
-                return dict(cv_out or {}), dict(persisted_meta or {})
+                return dict(cv_out or {}), copy_metadata(persisted_meta)
 
             s2 = _session_get(session_id) or {}
             m2 = s2.get("metadata") if isinstance(s2.get("metadata"), dict) else persisted_meta
@@ -3686,10 +3766,10 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             except Exception:
                 pass
             
-            return dict(c2 or {}), dict(m2 or {})
+            return dict(c2 or {}), copy_metadata(m2)
 
         # Sync job posting fields from client into session metadata (best-effort).
-        meta2 = dict(meta)
+        meta2 = copy_metadata(meta)
 
         # Persist client-side preferences on the session so later wizard actions (which don't send client_context)
         # can still see them.
@@ -3720,9 +3800,11 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
 
         # If job text changed, invalidate job-scoped artifacts and cached PDF usage.
         try:
-            jt = str(meta2.get("job_posting_text") or "")[:20000]
-            new_job_sig = _sha256_text(jt) if len(jt.strip()) >= 80 else ""
             prev_job_sig = str(meta2.get("current_job_sig") or "")
+            # A job text still offloaded to blob is unchanged since it was signed; don't download it.
+            job_text_offloaded = "job_posting_text" in getattr(meta2, "pending_keys", ())
+            jt = "" if (job_text_offloaded and prev_job_sig) else str(meta2.get("job_posting_text") or "")[:20000]
+            new_job_sig = _sha256_text(jt) if len(jt.strip()) >= 80 else ""
             if new_job_sig and new_job_sig != prev_job_sig:
                 meta2["current_job_sig"] = new_job_sig
                 meta2["job_changed_at"] = _now_iso()
@@ -3747,11 +3829,15 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
         # Skip if already fetched or in progress.
         try:
             url = str(meta2.get("job_posting_url") or "").strip()
-            has_text = bool(str(meta2.get("job_posting_text") or "").strip())
             fetch_status = str(meta2.get("job_fetch_status") or "")
             
             # Only fetch if no text, no previous successful fetch, and not currently pending
-            if url and not has_text and fetch_status not in ("success", "manual") and re.match(r"^https?://", url, re.IGNORECASE):
+            if (
+                url
+                and fetch_status not in ("success", "manual")
+                and re.match(r"^https?://", url, re.IGNORECASE)
+                and not str(meta2.get("job_posting_text") or "").strip()
+            ):
                 meta2["job_fetch_status"] = "fetching"
                 ok, fetched_text, err = _fetch_text_from_url(url)
                 if ok and fetched_text.strip():
@@ -3774,12 +3860,11 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
         import_gate_stages = {"language_selection", "import_gate_pending", "contact"}
 
         pc = _get_pending_confirmation(meta2)
-        dpu = meta2.get("docx_prefill_unconfirmed")
         if (
             stage_hint in import_gate_stages
-            and isinstance(dpu, dict)
             and (not cv_data.get("work_experience") and not cv_data.get("education"))
             and not pc
+            and isinstance(meta2.get("docx_prefill_unconfirmed"), dict)
         ):
             meta2 = _set_pending_confirmation(meta2, kind="import_prefill")
             cv_data, meta2 = _persist(cv_data, meta2)
@@ -4297,7 +4382,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             pending_confirmation = _get_pending_confirmation(meta)
             # Persist immediately; stage may not change on this turn, but the confirmation gate must.
             try:
-                _safe_update_session(store, session_id, cv_data, meta)
+                _safe_update_session(store, session_id, cv_data, meta, etag=sess.get("etag"))
                 sess = store.get_session(session_id) or sess
                 meta = sess.get("metadata") if isinstance(sess.get("metadata"), dict) else meta
 
@@ -4374,7 +4459,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
 
     # Wave 0.2: Clear pdf_generated when re-entering REVIEW after PDF generation
     if next_stage == CVStage.REVIEW and current_stage in (CVStage.EXECUTE, CVStage.DONE):
-        meta = dict(meta) if isinstance(meta, dict) else {}
+        meta = copy_metadata(meta)
         meta["pdf_generated"] = False
         meta.pop("pdf_failed", None)
         logging.info(f"Cleared pdf_generated flag (edit intent after {current_stage.value})")
@@ -4398,7 +4483,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
     # Persist stage transitions (backend-owned).
     if next_stage != current_stage:
         meta = _set_stage_in_metadata(meta, next_stage)
-        _safe_update_session(store, session_id, cv_data, meta)
+        _safe_update_session(store, session_id, cv_data, meta, etag=sess.get("etag"))
         sess = store.get_session(session_id) or sess
         meta = sess.get("metadata") if isinstance(sess.get("metadata"), dict) else meta
         cv_data = sess.get("cv_data") if isinstance(sess.get("cv_data"), dict) else cv_data
@@ -4406,7 +4491,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
         # Stage didn't change; persist turn counter if still in REVIEW
         if next_stage == CVStage.REVIEW:
             try:
-                _safe_update_session(store, session_id, cv_data, meta)
+                _safe_update_session(store, session_id, cv_data, meta, etag=sess.get("etag"))
             except Exception:
                 pass
 
@@ -4455,7 +4540,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             # Mark that this specific confirmation was handled (entering CONFIRM stage is the confirmation).
             meta_conf = _clear_pending_confirmation(meta_conf)
             logging.info(f"Cleared pending_confirmation (kind={pc.get('kind')}) on CONFIRM stage entry")
-            _safe_update_session(store, session_id, cv_conf, meta_conf)
+            _safe_update_session(store, session_id, cv_conf, meta_conf, etag=sess.get("etag"))
             sess = store.get_session(session_id) or sess
         except Exception as e:
             logging.error(f"Failed to clear pending_confirmation on CONFIRM entry: {e}")
@@ -4467,7 +4552,7 @@ def _tool_process_cv_orchestrated(params: dict) -> tuple[int, dict]:
             # Force back to REVIEW if user did not explicitly request generation.
             next_stage = CVStage.REVIEW
             meta = _set_stage_in_metadata(meta, next_stage)
-            _safe_update_session(store, session_id, cv_data, meta)
+            _safe_update_session(store, session_id, cv_data, meta, etag=sess.get("etag"))
             stage = "review_session"
 
     readiness = _compute_readiness(sess.get("cv_data") or {}, sess.get("metadata") or {})
@@ -4711,9 +4796,9 @@ def _tool_extract_and_store_cv(*, docx_base64: str, language: str, extract_photo
             return
         _CLEANUP_EXPIRED_RAN = True
         try:
-            deleted = store_obj.cleanup_expired()
-            if deleted:
-                logging.info("Expired sessions cleaned: %s", deleted)
+            report = store_obj.run_cleanup()
+            if report.sessions_deleted:
+                logging.info("Expired sessions cleaned: %s", report.as_dict())
         except Exception:
             pass
 
@@ -4770,6 +4855,7 @@ def _tool_generate_cv_from_session(*, session_id: str, language: str | None, cli
         compute_pdf_download_name=_compute_pdf_download_name,
         shrink_metadata_for_table=_shrink_metadata_for_table,
         now_iso=_now_iso,
+        write_session_merging_conflicts=_write_session_merging_conflicts,
     )
     result = tool_generate_cv_from_session(
         session_id=session_id,
@@ -4786,7 +4872,7 @@ def _tool_generate_cv_from_session(*, session_id: str, language: str | None, cli
             cv_latest = sess_latest.get("cv_data") if isinstance(sess_latest.get("cv_data"), dict) else {}
             meta_latest = sess_latest.get("metadata") if isinstance(sess_latest.get("metadata"), dict) else {}
             meta_synced = _sync_job_data_table_history(session_id=session_id, cv_data=cv_latest, meta=meta_latest)
-            store.update_session_with_blob_offload(session_id, cv_latest, meta_synced)
+            store.update_session_with_blob_offload(session_id, cv_latest, meta_synced, etag=sess_latest.get("etag"))
         except Exception as exc:
             logging.warning("POST_CV_GENERATION_HISTORY_SYNC_FAILED session=%s err=%s", session_id, str(exc)[:240])
     return result
@@ -4796,7 +4882,14 @@ def _upload_pdf_blob_for_session(*, session_id: str, pdf_ref: str, pdf_bytes: by
     blob_name = f"{session_id}/{pdf_ref}.pdf"
     try:
         blob_store = CVBlobStore(container=container)
-        pointer = blob_store.upload_bytes(blob_name=blob_name, data=pdf_bytes, content_type="application/pdf")
+        refs = _get_session_store().blob_refs
+        if refs is not None:
+            # Identical PDFs (re-renders of an unchanged CV) are stored once and shared.
+            pointer = blob_store.upload_content(
+                pdf_bytes, content_type="application/pdf", session_id=session_id, refs=refs, kind=f"pdf:{pdf_ref}"
+            )
+        else:
+            pointer = blob_store.upload_bytes(blob_name=blob_name, data=pdf_bytes, content_type="application/pdf")
         return {"container": pointer.container, "blob_name": pointer.blob_name}
     except Exception as exc:
         logging.warning("Failed to upload generated PDF blob session_id=%s error=%s", session_id, exc)
@@ -4859,7 +4952,7 @@ def _tool_generate_cover_letter_from_session(
             cv_latest = sess_latest.get("cv_data") if isinstance(sess_latest.get("cv_data"), dict) else {}
             meta_latest = sess_latest.get("metadata") if isinstance(sess_latest.get("metadata"), dict) else {}
             meta_synced = _sync_job_data_table_history(session_id=session_id, cv_data=cv_latest, meta=meta_latest)
-            store.update_session_with_blob_offload(session_id, cv_latest, meta_synced)
+            store.update_session_with_blob_offload(session_id, cv_latest, meta_synced, etag=sess_latest.get("etag"))
         except Exception as exc:
             logging.warning("POST_CL_GENERATION_HISTORY_SYNC_FAILED session=%s err=%s", session_id, str(exc)[:240])
     return result
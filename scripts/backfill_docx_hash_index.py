@@ -0,0 +1,51 @@
+"""Backfill the DOCX hash index for sessions written before the index existed.
+
+Usage:
+  python scripts/backfill_docx_hash_index.py [--dry-run]
+
+Reads STORAGE_CONNECTION_STRING / AzureWebJobsStorage like the app. Safe to re-run:
+index rows are upserted.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.session_store import CVSessionStore  # noqa: E402
+
+
+def backfill(store: CVSessionStore, *, dry_run: bool = False) -> dict:
+    stats = {"scanned": 0, "indexed": 0, "expired": 0, "no_hash": 0}
+    now_iso = datetime.utcnow().isoformat()
+    rows = store.iter_session_entities(select=["metadata_json", "source_docx_sha256", "created_at", "expires_at"])
+    for entity in rows:
+        stats["scanned"] += 1
+        expires_at = str(entity.get("expires_at") or "")
+        if expires_at and expires_at < now_iso:
+            stats["expired"] += 1
+            continue
+        if dry_run:
+            continue
+        if store.index_session_docx_hash(str(entity["RowKey"]), entity):
+            stats["indexed"] += 1
+        else:
+            stats["no_hash"] += 1
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Only count sessions, do not write index rows")
+    args = parser.parse_args()
+
+    stats = backfill(CVSessionStore(), dry_run=args.dry_run)
+    print(" ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Backfill the per-user session index for sessions synced before the index existed.
+
+Job-data recovery reads only the index, so without this earlier sessions stay invisible until
+their history is synced again.
+
+Usage:
+  python scripts/backfill_user_session_index.py [--dry-run]
+
+Reads STORAGE_CONNECTION_STRING / AzureWebJobsStorage like the app. Safe to re-run:
+index rows are upserted.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import function_app  # noqa: E402
+from src.session_store import CVSessionStore  # noqa: E402
+
+
+def backfill(store: CVSessionStore, *, dry_run: bool = False) -> dict:
+    stats = {"scanned": 0, "indexed": 0, "expired": 0, "no_user": 0, "no_job_data": 0}
+    now_iso = datetime.utcnow().isoformat()
+    for entity in store.iter_session_entities(select=["expires_at"]):
+        stats["scanned"] += 1
+        expires_at = str(entity.get("expires_at") or "")
+        if expires_at and expires_at < now_iso:
+            stats["expired"] += 1
+            continue
+        session_id = str(entity["RowKey"])
+        session = store.get_session_with_blob_retrieval(session_id)
+        if not session:
+            continue
+        cv_data = session.get("cv_data") if isinstance(session.get("cv_data"), dict) else {}
+        meta = session.get("metadata") if isinstance(session.get("metadata"), dict) else {}
+        user_id = function_app._stable_profile_user_id(cv_data, meta)
+        if not user_id:
+            stats["no_user"] += 1
+            continue
+        row = function_app._build_job_data_table_row(
+            cv_data=cv_data,
+            meta=meta,
+            session_id=session_id,
+            updated_at=str(session.get("updated_at") or session.get("created_at") or now_iso),
+        )
+        if not function_app._has_job_data(row):
+            stats["no_job_data"] += 1
+            continue
+        if dry_run:
+            continue
+        if store.index_user_session(user_id, session_id, row):
+            stats["indexed"] += 1
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Only count sessions, do not write index rows")
+    args = parser.parse_args()
+
+    stats = backfill(CVSessionStore(), dry_run=args.dry_run)
+    print(" ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark WeasyPrint CSS handling: inlined CSS (re-parsed per render) vs pre-parsed stylesheets.
+
+Renders every CV in samples/*.json in both modes and prints median/min timings per sample.
+Render cache is bypassed; the template bundle and font config are warmed before timing.
+
+Usage:
+  python scripts/benchmark_css_modes.py [--runs 5]
+"""
+from pathlib import Path
+import argparse
+import json
+import statistics
+import sys
+import time
+
+REPO = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO))
+
+from src import render  # noqa: E402
+
+
+def _load_samples() -> list[tuple[str, dict]]:
+    samples = []
+    for path in sorted((REPO / "samples").glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        # Some samples wrap the CV in a request payload.
+        if isinstance(data, dict) and isinstance(data.get("cv_data"), dict):
+            data = data["cv_data"]
+        if isinstance(data, dict) and data.get("full_name"):
+            samples.append((path.name, data))
+    return samples
+
+
+def _render_once(cv: dict, mode: str) -> tuple[float, int, int]:
+    t0 = time.perf_counter()
+    if mode == "stylesheet":
+        html = render.render_html(cv, external_css=True)
+        css_spec = ("cv", render._normalize_language(cv.get("language")))
+        pdf = render._render_weasyprint(html, cv_data=cv, css_spec=css_spec).pdf
+    else:
+        html = render.render_html(cv, inline_css=True)
+        pdf = render._render_weasyprint(html, cv_data=cv).pdf
+    return (time.perf_counter() - t0) * 1000, len(html), len(pdf)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="timed renders per sample and mode")
+    args = parser.parse_args()
+
+    samples = _load_samples()
+    if not samples:
+        print("No CV samples found in samples/*.json")
+        return 1
+
+    print(f"{'sample':<28} {'mode':<11} {'median_ms':>10} {'min_ms':>8} {'html_kb':>8} {'pdf_kb':>8}")
+    totals = {"inline": [], "stylesheet": []}
+    for name, cv in samples:
+        for mode in ("inline", "stylesheet"):
+            # Warm-up: template bundle, font config, parsed stylesheets.
+            _render_once(cv, mode)
+            timings = []
+            html_len = pdf_len = 0
+            for _ in range(max(1, args.runs)):
+                ms, html_len, pdf_len = _render_once(cv, mode)
+                timings.append(ms)
+            totals[mode].extend(timings)
+            print(
+                f"{name:<28} {mode:<11} {statistics.median(timings):>10.1f} {min(timings):>8.1f} "
+                f"{html_len / 1024:>8.1f} {pdf_len / 1024:>8.1f}"
+            )
+
+    inline_ms = statistics.median(totals["inline"])
+    sheet_ms = statistics.median(totals["stylesheet"])
+    print(f"\nOverall median: inline={inline_ms:.1f}ms stylesheet={sheet_ms:.1f}ms "
+          f"({(inline_ms - sheet_ms) / inline_ms * 100:+.1f}% saved)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
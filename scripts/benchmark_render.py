@@ -0,0 +1,356 @@
+"""
+Render-path benchmark over a generated corpus of CV shapes.
+
+Every case runs the in-process render path stage by stage, with the render cache bypassed:
+  CV:           normalize -> validate -> render_html -> weasyprint -> page_count
+  cover letter: render_html -> weasyprint -> page_count
+
+For each stage it reports p50/p95/max latency and the stage's own peak memory, each figure above
+the stage's starting point (not the process high-water mark, which only ever grows):
+  - peak_rss_mb:   resident memory, including WeasyPrint's native cairo/pango/image allocations.
+                   On Linux the kernel's peak RSS (VmHWM) is reset before every stage; elsewhere
+                   the growth of getrusage's ru_maxrss is used, a lower bound.
+  - peak_alloc_mb: Python allocations only, from a tracemalloc pass with the peak reset per stage.
+Both are measured in extra passes after the timed runs, which are not traced. Results are written
+as JSON. With --compare, the run is checked against a stored baseline and the script exits with
+status 1 when a metric regresses beyond the tolerance.
+
+Usage:
+  python scripts/benchmark_render.py [--runs 7] [--cases few_roles,german]
+  python scripts/benchmark_render.py --write-baseline              # record benchmarks/render_baseline.json
+  python scripts/benchmark_render.py --compare [--tolerance 0.25]  # fail on >25% regressions
+
+Baselines are machine-specific, so none is checked in. To gate a change:
+  1. on the runner that will compare, check out the base revision and run --write-baseline
+     (or --output base.json and pass it later with --baseline base.json);
+  2. check out the change and run --compare with the same --runs/--cases;
+  3. a non-zero exit lists the case/stage/metric that regressed.
+"""
+from pathlib import Path
+import argparse
+import base64
+import json
+import math
+import platform
+import random
+import re
+import struct
+import sys
+import time
+import tracemalloc
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REPO = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO))
+
+from src import render  # noqa: E402
+from src.normalize import normalize_cv_data  # noqa: E402
+from src.validator import validate_cv  # noqa: E402
+
+DEFAULT_BASELINE = REPO / "benchmarks" / "render_baseline.json"
+DEFAULT_TOLERANCE = 0.25
+# Latency deltas below this are noise on any runner and never count as regressions.
+MIN_DELTA_MS = 5.0
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_rss_mb", "peak_alloc_mb")
+
+_WORDS = (
+    "delivered migrated automated reduced improved designed led coordinated platform pipeline "
+    "customers stakeholders releases quality compliance reporting infrastructure analytics "
+    "budget vendors onboarding monitoring security performance rollout process training"
+).split()
+
+
+def _sentence(rng: random.Random, min_chars: int) -> str:
+    words: List[str] = []
+    while len(" ".join(words)) < min_chars:
+        words.append(rng.choice(_WORDS))
+    text = " ".join(words)
+    return text[0].upper() + text[1:]
+
+
+def _png_data_uri(width: int = 300, height: int = 380) -> str:
+    """Solid-colour PNG as a data URI (photo-sized image without shipping a binary fixture)."""
+    raw = b"".join(b"\x00" + b"\x8a\x9b\xb0" * width for _ in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    png = b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+def _cv(rng: random.Random, *, roles: int, bullets: int, bullet_chars: int, language: str = "en") -> Dict[str, Any]:
+    return {
+        "full_name": "Alex Benchmark",
+        "email": "alex.benchmark@example.com",
+        "phone": "+41 44 000 00 00",
+        "address_lines": ["Bahnhofstrasse 1", "8001 Zürich"],
+        "birth_date": "1985-04-12",
+        "nationality": "Swiss",
+        "language": language,
+        "work_experience": [
+            {
+                "date_range": f"{2023 - 2 * i}-01 - {2024 - 2 * i}-12",
+                "employer": f"Company {i + 1} AG",
+                "location": "Zürich",
+                "title": "Senior Engineer" if i % 2 else "Team Lead",
+                "bullets": [_sentence(rng, bullet_chars) for _ in range(bullets)],
+            }
+            for i in range(roles)
+        ],
+        "education": [
+            {"date_range": "2004 - 2009", "institution": "ETH Zürich", "title": "MSc Computer Science",
+             "details": [_sentence(rng, 60)]},
+            {"date_range": "2001 - 2004", "institution": "Kantonsschule", "title": "Matura"},
+        ],
+        "languages": ["German (C2)", "English (C1)", "French (B1)"],
+        "it_ai_skills": [_sentence(rng, 30) for _ in range(6)],
+        "interests": _sentence(rng, 120),
+    }
+
+
+def build_corpus(seed: int = 7) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Deterministic case name -> (kind, payload) covering the CV shapes we render in production."""
+    rng = random.Random(seed)
+    corpus: Dict[str, Tuple[str, Dict[str, Any]]] = {
+        "few_roles": ("cv", _cv(rng, roles=2, bullets=3, bullet_chars=70)),
+        "many_roles": ("cv", _cv(rng, roles=6, bullets=4, bullet_chars=80)),
+        "long_bullets": ("cv", _cv(rng, roles=3, bullets=4, bullet_chars=190)),
+        "german": ("cv", _cv(rng, roles=4, bullets=4, bullet_chars=90, language="de")),
+    }
+    photo = _cv(rng, roles=3, bullets=4, bullet_chars=90)
+    photo["photo_url"] = _png_data_uri()
+    corpus["photo"] = ("cv", photo)
+    corpus["cover_letter"] = ("cover_letter", {
+        "sender_name": "Alex Benchmark",
+        "sender_email": "alex.benchmark@example.com",
+        "sender_phone": "+41 44 000 00 00",
+        "sender_address": "Bahnhofstrasse 1, 8001 Zürich",
+        "date": "2026-01-15",
+        "recipient_company": "Example AG",
+        "recipient_job_title": "Head of Engineering",
+        "opening_paragraph": _sentence(rng, 250),
+        "core_paragraphs": [_sentence(rng, 400) for _ in range(3)],
+        "closing_paragraph": _sentence(rng, 200),
+        "signoff": "Kind regards",
+    })
+    return corpus
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lo, hi = math.floor(rank), math.ceil(rank)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+def summarize(timings_ms: List[float], peak_alloc_mb: float, peak_rss_mb: Optional[float] = None) -> Dict[str, Any]:
+    return {
+        "runs": len(timings_ms),
+        "p50_ms": round(percentile(timings_ms, 50), 2),
+        "p95_ms": round(percentile(timings_ms, 95), 2),
+        "max_ms": round(max(timings_ms), 2) if timings_ms else 0.0,
+        "peak_rss_mb": round(peak_rss_mb, 2) if peak_rss_mb is not None else None,
+        "peak_alloc_mb": round(peak_alloc_mb, 2),
+    }
+
+
+def stage_peak_alloc_mb(stages: List[Tuple[str, Callable[[Any], Any]]]) -> Dict[str, float]:
+    """Run the stages once under tracemalloc; per stage, peak MB allocated above its start."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    peaks: Dict[str, float] = {}
+    try:
+        value: Any = None
+        for name, fn in stages:
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            value = fn(value)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks[name] = max(0, peak - start) / (1024 * 1024)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return peaks
+
+
+def _proc_status_kb(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            match = re.search(rf"^{field}:\s+(\d+) kB", fh.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS counter (VmHWM) for this process; Linux only."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _maxrss_kb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024 if sys.platform == "darwin" else float(maxrss)  # bytes on macOS, kB elsewhere
+
+
+def stage_peak_rss_mb(stages: List[Tuple[str, Callable[[Any], Any]]]) -> Dict[str, Optional[float]]:
+    """Run the stages once; per stage, peak resident MB above its start (None where unmeasurable)."""
+    peaks: Dict[str, Optional[float]] = {}
+    value: Any = None
+    for name, fn in stages:
+        if _reset_peak_rss():
+            start = _proc_status_kb("VmRSS")
+            value = fn(value)
+            peak = _proc_status_kb("VmHWM")
+        else:
+            start = _maxrss_kb()
+            value = fn(value)
+            peak = _maxrss_kb()
+        peaks[name] = max(0.0, peak - start) / 1024 if start is not None and peak is not None else None
+    return peaks
+
+
+def _stages(kind: str, payload: Dict[str, Any]) -> List[Tuple[str, Callable[[Any], Any]]]:
+    """Ordered (stage, fn) pairs; each fn takes the previous stage's output."""
+    weasy = ("weasyprint", lambda html: render._render_weasyprint(html, cv_data=payload if kind == "cv" else None))
+    pages = ("page_count", lambda result: render.count_pdf_pages(result.pdf))
+    if kind == "cover_letter":
+        return [("render_html", lambda _: render.render_cover_letter_html(payload)), weasy, pages]
+
+    return [
+        ("normalize", lambda _: normalize_cv_data(payload)),
+        ("validate", lambda cv: (validate_cv(cv), cv)[1]),
+        ("render_html", lambda cv: render.render_html(cv)),
+        weasy,
+        pages,
+    ]
+
+
+def run_case(kind: str, payload: Dict[str, Any], *, runs: int) -> Dict[str, Dict[str, float]]:
+    stages = _stages(kind, payload)
+    timings: Dict[str, List[float]] = {name: [] for name, _ in stages}
+    for run in range(runs + 1):  # run 0 warms templates, fonts and parsed CSS
+        value: Any = None
+        for name, fn in stages:
+            t0 = time.perf_counter()
+            value = fn(value)
+            elapsed = (time.perf_counter() - t0) * 1000
+            if run:
+                timings[name].append(elapsed)
+    # Separate passes: tracing would skew the timings, and tracemalloc's own bookkeeping the RSS.
+    rss = stage_peak_rss_mb(stages)
+    peaks = stage_peak_alloc_mb(stages)
+    return {name: summarize(timings[name], peaks[name], rss[name]) for name, _ in stages}
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], *, tolerance: float, min_delta_ms: float = MIN_DELTA_MS
+) -> List[str]:
+    """Human-readable regressions of `results` vs `baseline` (empty when within tolerance)."""
+    regressions: List[str] = []
+    for case, stages in (results.get("cases") or {}).items():
+        base_stages = (baseline.get("cases") or {}).get(case) or {}
+        for stage, stats in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            for metric in COMPARED_METRICS:
+                old, new = float(base.get(metric) or 0), float(stats.get(metric) or 0)
+                if old <= 0:
+                    continue
+                if metric.endswith("_ms") and new - old < min_delta_ms:
+                    continue
+                if new > old * (1 + tolerance):
+                    regressions.append(
+                        f"{case}/{stage} {metric}: {new:.1f} vs baseline {old:.1f} "
+                        f"(+{(new - old) / old * 100:.0f}%, tolerance {tolerance * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        import weasyprint
+
+        weasy_version = weasyprint.__version__
+    except Exception:
+        weasy_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "weasyprint": weasy_version,
+        "css_mode": render._css_mode(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="timed runs per case (after one warm-up)")
+    parser.add_argument("--cases", default="", help="comma-separated subset of cases (default: all)")
+    parser.add_argument("--output", type=Path, help="write this run's results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--write-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail when a metric regresses vs the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus()
+    selected = [c.strip() for c in args.cases.split(",") if c.strip()] or list(corpus)
+    unknown = [c for c in selected if c not in corpus]
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)} (available: {', '.join(corpus)})")
+        return 2
+
+    results: Dict[str, Any] = {"meta": {**_environment(), "runs": args.runs}, "cases": {}}
+    print(f"{'case':<14} {'stage':<12} {'p50_ms':>9} {'p95_ms':>9} {'max_ms':>9} {'rss_mb':>9} {'alloc_mb':>9}")
+    for case in selected:
+        kind, payload = corpus[case]
+        stages = run_case(kind, payload, runs=max(1, args.runs))
+        results["cases"][case] = stages
+        for stage, s in stages.items():
+            rss_mb = "n/a" if s["peak_rss_mb"] is None else f"{s['peak_rss_mb']:.2f}"
+            print(f"{case:<14} {stage:<12} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['max_ms']:>9.1f} "
+                  f"{rss_mb:>9} {s['peak_alloc_mb']:>9.2f}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.write_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nWrote baseline: {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"\nNo baseline at {args.baseline}; run with --write-baseline first.")
+            return 2
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance * 100:.0f}%).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""
+Benchmark JSON snapshot encodings: the legacy pretty-printed blobs vs `snapshot_codec`.
+
+Builds session-shaped payloads (a CV, and heavy metadata with job_data_table_history, proposal
+blocks and an event log) and prints, per payload and encoding, the stored size and the median
+encode/decode time. Blob transfer time scales with the stored size.
+
+Usage:
+  python scripts/benchmark_snapshot_codec.py [--runs 21] [--roles 40] [--history 300]
+"""
+from pathlib import Path
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable
+
+REPO = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO))
+
+from src import snapshot_codec  # noqa: E402
+
+
+def _payloads(roles: int, history: int) -> dict[str, Any]:
+    bullets = ["Delivered a monitoring rollout that reduced incident response time across teams"] * 5
+    cv = {
+        "full_name": "Jane Example",
+        "work_experience": [
+            {"title": "Engineer", "employer": f"Company {i}", "date_range": "2019-2023", "bullets": bullets}
+            for i in range(roles)
+        ],
+    }
+    metadata = {
+        "job_data_table_history": [
+            {"company": f"Company {i}", "position": "Platform Engineer", "status": "generated", "pdf_ref": f"ref-{i}"}
+            for i in range(history)
+        ],
+        "work_experience_proposal_block": {"roles": cv["work_experience"]},
+        "event_log": [{"type": "field_update", "field": f"work_experience[{i % roles}].bullets", "ts": "2026-01-01T00:00:00"} for i in range(history)],
+    }
+    return {"cv_data": cv, "metadata_heavy": metadata}
+
+
+def _encodings() -> dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    legacy = (
+        lambda d: json.dumps(d, indent=2, ensure_ascii=False).encode("utf-8"),
+        lambda b: json.loads(b.decode("utf-8")),
+    )
+    compact = (lambda d: json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), json.loads)
+    out = {
+        "legacy_pretty": legacy,
+        "compact_stdlib": compact,
+        "compact_stdlib+gzip": (lambda d: gzip.compress(compact[0](d), 6, mtime=0), lambda b: json.loads(gzip.decompress(b))),
+    }
+    for mode in ("gzip", "zstd"):
+        if mode == "zstd" and snapshot_codec.zstandard is None:
+            continue
+        out[f"codec_{mode}" + ("+orjson" if snapshot_codec.orjson is not None else "")] = (
+            lambda d, m=mode: _encode_with(m, d),
+            snapshot_codec.decode_snapshot,
+        )
+    return out
+
+
+def _encode_with(mode: str, data: Any) -> bytes:
+    previous = os.environ.get("CV_SNAPSHOT_COMPRESSION")
+    os.environ["CV_SNAPSHOT_COMPRESSION"] = mode
+    try:
+        return snapshot_codec.encode_snapshot(data).body
+    finally:
+        if previous is None:
+            os.environ.pop("CV_SNAPSHOT_COMPRESSION", None)
+        else:
+            os.environ["CV_SNAPSHOT_COMPRESSION"] = previous
+
+
+def _median_ms(fn: Callable[[], Any], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=21)
+    parser.add_argument("--roles", type=int, default=40)
+    parser.add_argument("--history", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'payload':<16} {'encoding':<24} {'bytes':>10} {'ratio':>7} {'encode_ms':>10} {'decode_ms':>10}")
+    for name, data in _payloads(args.roles, args.history).items():
+        baseline = None
+        for label, (encode, decode) in _encodings().items():
+            body = encode(data)
+            assert decode(body) == data
+            baseline = baseline or len(body)
+            enc_ms = _median_ms(lambda: encode(data), args.runs)
+            dec_ms = _median_ms(lambda: decode(body), args.runs)
+            print(f"{name:<16} {label:<24} {len(body):>10} {len(body) / baseline:>7.3f} {enc_ms:>10.3f} {dec_ms:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""Move legacy sessions out of the single "cv" partition into the sharded layout.
+
+Usage:
+  python scripts/migrate_session_partitions.py [--dry-run]
+
+Each row is copied to the partition `session_partitions.partition_for()` routes its id to, then
+the legacy row is deleted only if its ETag is unchanged. Reads try the new partition first, so
+once a copy exists it is the live row:
+
+  - a copy left by an earlier, interrupted run is kept as is and only the legacy row is dropped;
+  - if the legacy row changed during the copy, the copy is deleted (only if it is still unchanged
+    itself) and the row is picked up by the next run. If the copy was written as well, it is kept
+    and the conflict is logged.
+
+Safe to re-run.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from azure.core import MatchConditions  # noqa: E402
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError  # noqa: E402
+
+from src.session_partitions import LEGACY_PARTITION, partition_for  # noqa: E402
+from src.session_store import CVSessionStore  # noqa: E402
+
+
+def _if_match(etag):
+    return {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+
+
+def migrate(store: CVSessionStore, *, dry_run: bool = False) -> dict:
+    stats = {"scanned": 0, "moved": 0, "already_copied": 0, "changed_during_copy": 0, "conflicts": 0}
+    table = store.table_client
+    for entity in table.query_entities(f"PartitionKey eq '{LEGACY_PARTITION}'"):
+        stats["scanned"] += 1
+        session_id = str(entity["RowKey"])
+        target = partition_for(session_id)
+        if dry_run:
+            continue
+
+        row = dict(entity)
+        row["PartitionKey"] = target
+        copy_etag = None
+        try:
+            copy_etag = (table.create_entity(row) or {}).get("etag")
+        except ResourceExistsError:
+            # Copied by an earlier run that stopped before deleting the legacy row. The copy has
+            # been the live row since then (reads try it first): keep it, only drop the legacy row.
+            stats["already_copied"] += 1
+
+        etag = (getattr(entity, "metadata", None) or {}).get("etag")
+        try:
+            table.delete_entity(partition_key=LEGACY_PARTITION, row_key=session_id, **_if_match(etag))
+        except ResourceModifiedError:
+            if copy_etag is None:
+                # An earlier run's copy is live; the legacy write went to a row nobody reads.
+                logging.warning("Legacy row of session %s changed after it was copied; keeping the copy", session_id)
+                stats["conflicts"] += 1
+                continue
+            try:
+                table.delete_entity(partition_key=target, row_key=session_id, **_if_match(copy_etag))
+            except ResourceModifiedError:
+                logging.warning("Session %s was written in both partitions during the copy; keeping the copy",
+                                session_id)
+                stats["conflicts"] += 1
+                continue
+            stats["changed_during_copy"] += 1
+            continue
+        stats["moved"] += 1
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Only count legacy sessions, do not move them")
+    args = parser.parse_args()
+
+    stats = migrate(CVSessionStore(), dry_run=args.dry_run)
+    print(" ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
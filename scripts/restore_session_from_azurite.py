@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """Restore a missing session row in Azure Table (Azurite) from existing artifact blobs.
 
+Offloaded cv_data and heavy metadata live in content-addressed blobs (`cas/<sha256>`), found
+through the session's reference rows in the blob-refs table (newest first). Sessions written
+before content addressing are found by scanning `<session_id>/` blob names instead.
+
 Usage:
   python scripts/restore_session_from_azurite.py --session-id <uuid>
   python scripts/restore_session_from_azurite.py --session-id <uuid> --expires-at 2099-12-31T23:59:59
@@ -11,11 +15,24 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
 from datetime import datetime
 
 from azure.data.tables import TableServiceClient
 from azure.storage.blob import BlobServiceClient
 
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.blob_cas import BlobRefIndex, cas_blob_name
+from src.lazy_metadata import BLOB_REFS_KEY
+from src.session_partitions import partition_for
+from src.session_store import CVSessionStore
+
+CV_DATA_KIND = "cv_data_offload"
+METADATA_KIND_PREFIX = "metadata_heavy:"
+
 
 def _conn_str() -> str:
     conn = os.environ.get("STORAGE_CONNECTION_STRING") or os.environ.get("AzureWebJobsStorage")
@@ -33,7 +50,24 @@ def _blob_api_version(conn: str) -> str | None:
     return None
 
 
-def _choose_latest_cv_blob(blob_service: BlobServiceClient, session_id: str) -> tuple[str, int]:
+def _session_refs_newest_first(table_service: TableServiceClient, session_id: str) -> list[dict]:
+    refs = BlobRefIndex(table_service.get_table_client(CVSessionStore.BLOB_REFS_TABLE_NAME))
+    try:
+        rows = refs.session_refs(session_id)
+    except Exception as exc:
+        print(f"WARN: blob refs unavailable ({exc}); falling back to blob name scan")
+        return []
+    return sorted(rows, key=lambda r: str(r.get("created_at") or ""), reverse=True)
+
+
+def _choose_latest_cv_blob(
+    blob_service: BlobServiceClient, session_id: str, refs: list[dict]
+) -> tuple[str, int]:
+    for row in refs:
+        if row.get("kind") == CV_DATA_KIND and row.get("container") and row.get("digest"):
+            return f"{row['container']}/{cas_blob_name(str(row['digest']))}", int(row.get("size_bytes") or 0)
+
+    # Legacy: timestamp-named blobs under the session prefix.
     container = "cv-artifacts"
     container_client = blob_service.get_container_client(container)
 
@@ -52,7 +86,22 @@ def _choose_latest_cv_blob(blob_service: BlobServiceClient, session_id: str) ->
     return f"{container}/{latest.name}", int(getattr(latest, "size", 0) or 0)
 
 
+def _choose_metadata_blob_refs(refs: list[dict]) -> dict[str, str]:
+    """{heavy key: "container/blob"} from the newest metadata offload of each key."""
+    chosen: dict[str, str] = {}
+    for row in refs:
+        kind = str(row.get("kind") or "")
+        if not kind.startswith(METADATA_KIND_PREFIX) or not row.get("container") or not row.get("digest"):
+            continue
+        ref = f"{row['container']}/{cas_blob_name(str(row['digest']))}"
+        for key in kind[len(METADATA_KIND_PREFIX):].split(","):
+            if key and key not in chosen:
+                chosen[key] = ref
+    return chosen
+
+
 def _choose_latest_metadata_blob(blob_service: BlobServiceClient, session_id: str) -> str | None:
+    """Legacy single heavy-metadata blob (timestamp-named, all heavy keys in one payload)."""
     container = "cv-artifacts"
     container_client = blob_service.get_container_client(container)
 
@@ -79,8 +128,11 @@ def restore_session(session_id: str, expires_at: str) -> None:
         if api_version
         else BlobServiceClient.from_connection_string(conn)
     )
-    cv_blob_ref, cv_size = _choose_latest_cv_blob(blob_service, session_id)
-    metadata_blob_ref = _choose_latest_metadata_blob(blob_service, session_id)
+    table_service = TableServiceClient.from_connection_string(conn)
+    refs = _session_refs_newest_first(table_service, session_id)
+    cv_blob_ref, cv_size = _choose_latest_cv_blob(blob_service, session_id, refs)
+    metadata_blob_refs = _choose_metadata_blob_refs(refs)
+    metadata_blob_ref = None if metadata_blob_refs else _choose_latest_metadata_blob(blob_service, session_id)
 
     metadata = {
         "cv_data_blob_ref": cv_blob_ref,
@@ -88,12 +140,15 @@ def restore_session(session_id: str, expires_at: str) -> None:
         "restored_from_blob": True,
         "restored_at": datetime.utcnow().isoformat(),
     }
-    if metadata_blob_ref:
+    if metadata_blob_refs:
+        metadata[BLOB_REFS_KEY] = metadata_blob_refs
+        metadata["metadata_blob_keys"] = sorted(metadata_blob_refs)
+    elif metadata_blob_ref:
         metadata["metadata_blob_ref"] = metadata_blob_ref
 
     now = datetime.utcnow().isoformat()
     entity = {
-        "PartitionKey": "cv",
+        "PartitionKey": partition_for(session_id),
         "RowKey": session_id,
         "cv_data_json": json.dumps(
             {
@@ -110,13 +165,14 @@ def restore_session(session_id: str, expires_at: str) -> None:
         "version": 1,
     }
 
-    table_service = TableServiceClient.from_connection_string(conn)
-    table_client = table_service.get_table_client("cvsessions")
+    table_client = table_service.get_table_client(CVSessionStore.TABLE_NAME)
     table_client.upsert_entity(entity=entity, mode="replace")
 
     print("RESTORE_OK")
     print(f"session_id={session_id}")
     print(f"cv_blob_ref={cv_blob_ref}")
+    for key, ref in sorted(metadata_blob_refs.items()):
+        print(f"metadata_blob_refs[{key}]={ref}")
     if metadata_blob_ref:
         print(f"metadata_blob_ref={metadata_blob_ref}")
     print(f"expires_at={expires_at}")
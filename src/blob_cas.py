@@ -0,0 +1,192 @@
+"""
+Content-addressed blob objects shared between sessions, with reference counting.
+
+Session payloads that are written repeatedly (cv_data / heavy metadata offloads, snapshots,
+generated PDFs, photos) are stored once per distinct content:
+
+  <container>/cas/<sha256[:2]>/<sha256>
+
+An upload whose object already exists is skipped, so persisting an unchanged session, or two
+sessions producing the same PDF/photo, costs no write bandwidth or extra storage.
+
+Every session pointing at an object has a reference record in the `cvblobrefs` table:
+
+  PartitionKey = o_<container>_<sha256>   RowKey = <session_id>            (who references the object)
+  PartitionKey = s_<session_id>           RowKey = <container>_<sha256>    (what the session references)
+
+The refcount of an object is the number of rows in its `o_` partition, and releasing a session
+(expiry cleanup) reads one `s_` partition. An object whose last reference is released is deleted
+unless it was touched after the collector saw it unreferenced: writers record the reference
+before checking that the object exists (which touches it), and the collector deletes with
+`if_unmodified_since`, so a concurrent writer either keeps the object alive or re-uploads it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+CAS_PREFIX = "cas/"
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# A process re-touches an object at most this often; must stay well below GC_GRACE.
+TOUCH_INTERVAL_SECONDS = 300.0
+GC_GRACE = timedelta(minutes=15)
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def cas_blob_name(digest: str) -> str:
+    return f"{CAS_PREFIX}{digest[:2]}/{digest}"
+
+
+def cas_digest(blob_name: str) -> Optional[str]:
+    """sha256 of a content-addressed blob name, or None for any other blob."""
+    if not blob_name.startswith(CAS_PREFIX):
+        return None
+    digest = blob_name.rsplit("/", 1)[-1]
+    return digest if _DIGEST_RE.match(digest) else None
+
+
+def _object_partition(container: str, digest: str) -> str:
+    return f"o_{container}_{digest}"
+
+
+def _session_partition(session_id: str) -> str:
+    return f"s_{session_id}"
+
+
+def _ref_rows(session_id: str, container: str, digest: str, *, size: int, kind: str) -> tuple[dict, dict]:
+    """(session row, object row) recording one reference."""
+    now = datetime.utcnow().isoformat()
+    session_row = {
+        "PartitionKey": _session_partition(session_id),
+        "RowKey": f"{container}_{digest}",
+        "container": container,
+        "digest": digest,
+        "size_bytes": int(size),
+        "kind": kind,
+        "created_at": now,
+    }
+    return session_row, {"PartitionKey": _object_partition(container, digest), "RowKey": session_id, "created_at": now}
+
+
+class BlobRefIndex:
+    """Reference records for content-addressed objects, on an Azure Table client."""
+
+    def __init__(self, table_client: Any) -> None:
+        self.table = table_client
+        self._recorded: set[tuple[str, str, str]] = set()
+
+    def add(self, session_id: str, container: str, digest: str, *, size: int, kind: str = "") -> None:
+        """Record that `session_id` references the object (idempotent)."""
+        key = (session_id, container, digest)
+        if key in self._recorded:
+            return
+        session_row, object_row = _ref_rows(session_id, container, digest, size=size, kind=kind)
+        # Session row first: a reference is only released through it, so it must never be missing.
+        self.table.upsert_entity(session_row)
+        self.table.upsert_entity(object_row)
+        self._recorded.add(key)
+
+    def refcount(self, container: str, digest: str) -> int:
+        query = f"PartitionKey eq '{_object_partition(container, digest)}'"
+        return sum(1 for _ in self.table.query_entities(query, select=["RowKey"]))
+
+    def session_refs(self, session_id: str) -> list[dict[str, Any]]:
+        """Reference rows of a session ({container, digest, size_bytes, kind, created_at})."""
+        query = f"PartitionKey eq '{_session_partition(session_id)}'"
+        return [dict(row) for row in self.table.query_entities(query)]
+
+    def release_session(self, session_id: str) -> list[tuple[str, str, int]]:
+        """Drop every reference held by the session.
+
+        Returns (container, blob_name, size_bytes) of the objects left without references.
+        """
+        orphans: list[tuple[str, str, int]] = []
+        rows = self.session_refs(session_id)
+        for row in rows:
+            container, digest = str(row.get("container") or ""), str(row.get("digest") or "")
+            self.table.delete_entity(partition_key=_object_partition(container, digest), row_key=session_id)
+            self._recorded.discard((session_id, container, digest))
+            if container and digest and self.refcount(container, digest) == 0:
+                orphans.append((container, cas_blob_name(digest), int(row.get("size_bytes") or 0)))
+        for row in rows:
+            self.table.delete_entity(partition_key=row["PartitionKey"], row_key=row["RowKey"])
+        return orphans
+
+
+# (account url, container, digest) -> monotonic time this process last confirmed the object exists.
+_TOUCHED: dict[tuple[str, str, str], float] = {}
+
+
+def touch_existing(client: Any, container: str, digest: str) -> bool:
+    """True if the object exists; refreshes its Last-Modified so a pending GC leaves it alone."""
+    key = (str(getattr(client, "url", "")), container, digest)
+    touched = _TOUCHED.get(key)
+    if touched is not None and time.monotonic() - touched < TOUCH_INTERVAL_SECONDS:
+        return True
+    blob = client.get_blob_client(container=container, blob=cas_blob_name(digest))
+    try:
+        blob.set_blob_metadata({"sha256": digest})
+    except ResourceNotFoundError:
+        _TOUCHED.pop(key, None)
+        return False
+    _TOUCHED[key] = time.monotonic()
+    return True
+
+
+class AsyncBlobRefIndex:
+    """`BlobRefIndex.add` on an `azure.data.tables.aio` client (same rows; release stays synchronous)."""
+
+    def __init__(self, table_client: Any) -> None:
+        self.table = table_client
+        self._recorded: set[tuple[str, str, str]] = set()
+
+    async def add(self, session_id: str, container: str, digest: str, *, size: int, kind: str = "") -> None:
+        key = (session_id, container, digest)
+        if key in self._recorded:
+            return
+        session_row, object_row = _ref_rows(session_id, container, digest, size=size, kind=kind)
+        await self.table.upsert_entity(session_row)
+        await self.table.upsert_entity(object_row)
+        self._recorded.add(key)
+
+
+async def touch_existing_async(client: Any, container: str, digest: str) -> bool:
+    """`touch_existing` for an aio blob service client."""
+    key = (str(getattr(client, "url", "")), container, digest)
+    touched = _TOUCHED.get(key)
+    if touched is not None and time.monotonic() - touched < TOUCH_INTERVAL_SECONDS:
+        return True
+    blob = client.get_blob_client(container=container, blob=cas_blob_name(digest))
+    try:
+        await blob.set_blob_metadata({"sha256": digest})
+    except ResourceNotFoundError:
+        _TOUCHED.pop(key, None)
+        return False
+    _TOUCHED[key] = time.monotonic()
+    return True
+
+
+def mark_uploaded(client: Any, container: str, digest: str) -> None:
+    _TOUCHED[(str(getattr(client, "url", "")), container, digest)] = time.monotonic()
+
+
+def gc_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Objects modified after this instant are never collected (see module docstring)."""
+    return (now or datetime.now(timezone.utc)) - GC_GRACE
+
+
+def orphans_by_container(orphans: Iterable[tuple[str, str, int]]) -> dict[str, dict[str, int]]:
+    grouped: dict[str, dict[str, int]] = {}
+    for container, blob_name, size in orphans:
+        grouped.setdefault(container, {})[blob_name] = size
+    return grouped
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-import json
 import os
+import threading
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 from azure.storage.blob import BlobServiceClient, ContentSettings
 
+from .blob_cas import BlobRefIndex, cas_blob_name, content_digest, mark_uploaded, touch_existing
+from .snapshot_codec import FORMAT_METADATA_KEY, decode_snapshot, encode_snapshot
+
 
 @dataclass(frozen=True)
 class BlobPointer:
@@ -17,6 +20,15 @@ class BlobPointer:
     content_type: str
 
 
+@dataclass(frozen=True)
+class BlobDownload:
+    """An opened download: size and content type are known, the body is read chunk by chunk."""
+
+    size: int
+    content_type: str
+    chunks: Iterator[bytes]
+
+
 def _get_storage_connection_string() -> str:
     conn_str = os.environ.get("STORAGE_CONNECTION_STRING") or os.environ.get("AzureWebJobsStorage")
     if not conn_str:
@@ -36,40 +48,181 @@ def _get_blob_api_version(conn_str: str) -> Optional[str]:
     return None
 
 
+_MIB = 1024 * 1024
+
+
+def _env_bytes(name: str, default: int) -> int:
+    try:
+        return max(_MIB // 4, int(str(os.environ.get(name) or "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _max_concurrency() -> int:
+    try:
+        return max(1, int(str(os.environ.get("STORAGE_BLOB_MAX_CONCURRENCY") or "").strip() or 4))
+    except ValueError:
+        return 4
+
+
+def _transfer_options() -> Dict[str, int]:
+    # Payloads above the single put/get size are split into blocks/ranges that are transferred
+    # `max_concurrency` at a time (the SDK defaults only split above 64 MiB / 32 MiB).
+    return {
+        "max_single_put_size": _env_bytes("STORAGE_BLOB_MAX_SINGLE_PUT_SIZE", 8 * _MIB),
+        "max_block_size": _env_bytes("STORAGE_BLOB_MAX_BLOCK_SIZE", 4 * _MIB),
+        "max_single_get_size": _env_bytes("STORAGE_BLOB_MAX_SINGLE_GET_SIZE", 8 * _MIB),
+        "max_chunk_get_size": _env_bytes("STORAGE_BLOB_MAX_CHUNK_GET_SIZE", 4 * _MIB),
+    }
+
+
+# Process-wide BlobServiceClient per (connection string, api version): each client owns an HTTP
+# connection pool, so stores built ad hoc reuse warm keep-alive connections. Containers already
+# created (or found to exist) are remembered so `create_container` is probed once per process.
+_BLOB_CLIENT_LOCK = threading.Lock()
+_BLOB_CLIENTS: dict[tuple[str, Optional[str]], BlobServiceClient] = {}
+_CONTAINERS_READY: set[tuple[str, Optional[str], str]] = set()
+
+
+def get_blob_service_client(connection_string: Optional[str] = None) -> BlobServiceClient:
+    """Shared BlobServiceClient for the connection string (default: STORAGE_CONNECTION_STRING)."""
+    conn_str = connection_string or _get_storage_connection_string()
+    api_version = _get_blob_api_version(conn_str)
+    key = (conn_str, api_version)
+    client = _BLOB_CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _BLOB_CLIENT_LOCK:
+        client = _BLOB_CLIENTS.get(key)
+        if client is None:
+            options: Dict[str, Any] = dict(_transfer_options())
+            if api_version:
+                options["api_version"] = api_version
+            client = BlobServiceClient.from_connection_string(conn_str, **options)
+            _BLOB_CLIENTS[key] = client
+    return client
+
+
+def ensure_container(client: BlobServiceClient, container: str, *, force: bool = False) -> None:
+    """Create the container unless this process already did (or saw it exist)."""
+    key = (str(getattr(client, "url", "")), getattr(client, "api_version", None), container)
+    if not force and key in _CONTAINERS_READY:
+        return
+    try:
+        client.create_container(container)
+    except ResourceExistsError:
+        pass
+    with _BLOB_CLIENT_LOCK:
+        _CONTAINERS_READY.add(key)
+
+
 class CVBlobStore:
     """Minimal Blob helper for session-attached assets (e.g., photos)."""
 
-    def __init__(self, connection_string: Optional[str] = None, *, container: Optional[str] = None):
-        conn_str = connection_string or _get_storage_connection_string()
+    def __init__(
+        self,
+        connection_string: Optional[str] = None,
+        *,
+        container: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ):
         self.container = (container or os.environ.get("STORAGE_CONTAINER_PHOTOS") or "cv-photos").strip()
-        api_version = _get_blob_api_version(conn_str)
-        self.client = BlobServiceClient.from_connection_string(conn_str, api_version=api_version) if api_version else BlobServiceClient.from_connection_string(conn_str)
+        self.client = get_blob_service_client(connection_string)
+        # Parallel block uploads / ranged downloads per transfer (STORAGE_BLOB_MAX_CONCURRENCY, default 4).
+        self.max_concurrency = max_concurrency or _max_concurrency()
         self._ensure_container()
 
-    def _ensure_container(self) -> None:
-        try:
-            self.client.create_container(self.container)
-        except ResourceExistsError:
-            return
+    def _ensure_container(self, *, force: bool = False) -> None:
+        ensure_container(self.client, self.container, force=force)
 
     def upload_bytes(self, *, blob_name: str, data: bytes, content_type: str) -> BlobPointer:
-        blob = self.client.get_blob_client(container=self.container, blob=blob_name)
-        blob.upload_blob(
-            data,
-            overwrite=True,
-            content_settings=ContentSettings(content_type=content_type),
+        return self._upload(
+            blob_name, data, content_settings=ContentSettings(content_type=content_type), content_type=content_type
         )
+
+    def _upload(self, blob_name: str, data: bytes, *, content_type: str, **kwargs: Any) -> BlobPointer:
+        blob = self.client.get_blob_client(container=self.container, blob=blob_name)
+        kwargs.setdefault("max_concurrency", self.max_concurrency)
+        try:
+            blob.upload_blob(data, overwrite=True, **kwargs)
+        except ResourceNotFoundError:
+            # The container was deleted after this process ensured it (e.g. purge/reset): recreate once.
+            self._ensure_container(force=True)
+            blob.upload_blob(data, overwrite=True, **kwargs)
+        return BlobPointer(container=self.container, blob_name=blob_name, content_type=content_type)
+
+    def upload_content(
+        self,
+        data: bytes,
+        *,
+        content_type: str,
+        session_id: Optional[str] = None,
+        refs: Optional[BlobRefIndex] = None,
+        kind: str = "",
+        content_encoding: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> BlobPointer:
+        """Store `data` as a content-addressed object (`cas/<sha256>`), skipping the upload if it exists.
+
+        With `refs` and `session_id`, the session's reference is recorded so expiry cleanup can
+        delete the object once no session uses it (see `blob_cas`).
+        """
+        digest = content_digest(data)
+        if refs is not None and session_id:
+            refs.add(session_id, self.container, digest, size=len(data), kind=kind)
+        blob_name = cas_blob_name(digest)
+        if not touch_existing(self.client, self.container, digest):
+            self._upload(
+                blob_name,
+                data,
+                content_type=content_type,
+                content_settings=ContentSettings(content_type=content_type, content_encoding=content_encoding),
+                metadata={**(metadata or {}), "sha256": digest},
+            )
+            mark_uploaded(self.client, self.container, digest)
         return BlobPointer(container=self.container, blob_name=blob_name, content_type=content_type)
 
-    def upload_photo_bytes(self, extracted_image) -> BlobPointer:
+    def upload_json_content(
+        self,
+        data: Dict[str, Any],
+        *,
+        session_id: Optional[str] = None,
+        refs: Optional[BlobRefIndex] = None,
+        kind: str = "",
+    ) -> BlobPointer:
+        """`upload_content` for a JSON document, encoded like `upload_json_snapshot`."""
+        snapshot = encode_snapshot(data)
+        return self.upload_content(
+            snapshot.body,
+            content_type="application/json",
+            session_id=session_id,
+            refs=refs,
+            kind=kind,
+            content_encoding=snapshot.content_encoding,
+            metadata={FORMAT_METADATA_KEY: snapshot.format},
+        )
+
+    def upload_photo_bytes(
+        self,
+        extracted_image,
+        *,
+        session_id: Optional[str] = None,
+        refs: Optional[BlobRefIndex] = None,
+    ) -> BlobPointer:
         """Upload an ExtractedImage (from docx_photo) to blob storage.
 
         Args:
             extracted_image: ExtractedImage with .mime and .data attributes
+            session_id, refs: when given, the photo is stored content-addressed and shared
+                between sessions uploading the same image
 
         Returns:
             BlobPointer to the uploaded photo
         """
+        if refs is not None and session_id:
+            return self.upload_content(
+                extracted_image.data, content_type=extracted_image.mime, session_id=session_id, refs=refs, kind="photo"
+            )
         import uuid
         blob_name = f"photos/{uuid.uuid4()}.{extracted_image.mime.split('/')[-1]}"
         return self.upload_bytes(
@@ -78,10 +231,45 @@ class CVBlobStore:
             content_type=extracted_image.mime,
         )
 
-    def download_bytes(self, pointer: BlobPointer) -> bytes:
+    def download_bytes(self, pointer: BlobPointer, **kwargs: Any) -> bytes:
         blob = self.client.get_blob_client(container=pointer.container, blob=pointer.blob_name)
+        kwargs.setdefault("max_concurrency", self.max_concurrency)
         try:
-            return blob.download_blob().readall()
+            return blob.download_blob(**kwargs).readall()
+        except ResourceNotFoundError as exc:
+            raise FileNotFoundError(f"Blob not found: {pointer.container}/{pointer.blob_name}") from exc
+
+    def open_download(self, pointer: BlobPointer) -> BlobDownload:
+        """Start a download and return its size plus a chunk iterator (to stream into a response).
+
+        Only the first chunk is fetched here, so a caller can check the size and the first bytes
+        and stop without pulling the rest of the body.
+        """
+        blob = self.client.get_blob_client(container=pointer.container, blob=pointer.blob_name)
+        try:
+            downloader = blob.download_blob()
+        except ResourceNotFoundError as exc:
+            raise FileNotFoundError(f"Blob not found: {pointer.container}/{pointer.blob_name}") from exc
+        content_settings = getattr(downloader.properties, "content_settings", None)
+        return BlobDownload(
+            size=int(downloader.size or 0),
+            content_type=str(getattr(content_settings, "content_type", None) or pointer.content_type),
+            chunks=iter(downloader.chunks()),
+        )
+
+    def read_range(self, pointer: BlobPointer, *, offset: int, length: int) -> bytes:
+        """`length` bytes at `offset` (fewer at the end of the blob), in one ranged GET."""
+        blob = self.client.get_blob_client(container=pointer.container, blob=pointer.blob_name)
+        try:
+            return blob.download_blob(offset=offset, length=length).readall()
+        except ResourceNotFoundError as exc:
+            raise FileNotFoundError(f"Blob not found: {pointer.container}/{pointer.blob_name}") from exc
+
+    def blob_size(self, pointer: BlobPointer) -> int:
+        """Size in bytes from the blob properties (no body transfer)."""
+        blob = self.client.get_blob_client(container=pointer.container, blob=pointer.blob_name)
+        try:
+            return int(blob.get_blob_properties().size or 0)
         except ResourceNotFoundError as exc:
             raise FileNotFoundError(f"Blob not found: {pointer.container}/{pointer.blob_name}") from exc
 
@@ -116,6 +304,8 @@ class CVBlobStore:
     ) -> BlobPointer:
         """
         Upload JSON data as a blob snapshot (for session artifacts, CV snapshots, etc.).
+
+        Written as compact JSON, gzip/zstd-compressed when large (see `snapshot_codec`).
         
         Args:
             blob_name: Path/name for the blob (e.g., 'cv-artifacts/session_id/cv_snapshot.json')
@@ -125,17 +315,16 @@ class CVBlobStore:
         Returns:
             BlobPointer to the uploaded JSON blob
         """
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
-        json_bytes = json_str.encode('utf-8')
-        
-        blob = self.client.get_blob_client(container=self.container, blob=blob_name)
-        blob.upload_blob(
-            json_bytes,
-            overwrite=True,
-            content_settings=ContentSettings(content_type='application/json'),
-            metadata=metadata
+        snapshot = encode_snapshot(data)
+        return self._upload(
+            blob_name,
+            snapshot.body,
+            content_type='application/json',
+            content_settings=ContentSettings(
+                content_type='application/json', content_encoding=snapshot.content_encoding
+            ),
+            metadata={**(metadata or {}), FORMAT_METADATA_KEY: snapshot.format},
         )
-        return BlobPointer(container=self.container, blob_name=blob_name, content_type='application/json')
 
     def download_json_snapshot(self, pointer: BlobPointer) -> Dict[str, Any]:
         """
@@ -151,15 +340,17 @@ class CVBlobStore:
             FileNotFoundError: If blob not found
             json.JSONDecodeError: If blob content is not valid JSON
         """
-        json_bytes = self.download_bytes(pointer)
-        json_str = json_bytes.decode('utf-8')
-        return json.loads(json_str)
+        # Decoded here (by magic bytes) rather than by the transport, so legacy plain blobs and
+        # compressed ones take the same path.
+        return decode_snapshot(self.download_bytes(pointer, decompress=False))
 
     def upload_session_snapshot(
         self,
         session_id: str,
         cv_data: Dict[str, Any],
-        snapshot_type: str = "cv"
+        snapshot_type: str = "cv",
+        *,
+        refs: Optional[BlobRefIndex] = None,
     ) -> BlobPointer:
         """
         Upload a timestamped session snapshot to cv-artifacts container.
@@ -168,10 +359,14 @@ class CVBlobStore:
             session_id: Session ID
             cv_data: CV data or skills proposal data
             snapshot_type: Type of snapshot ('cv', 'skills_proposal', etc.)
+            refs: when given, the snapshot is stored content-addressed (an unchanged CV is not
+                uploaded again) and the snapshot is recorded as a reference of the session
         
         Returns:
             BlobPointer to the uploaded snapshot
         """
+        if refs is not None:
+            return self.upload_json_content(cv_data, session_id=session_id, refs=refs, kind=f"snapshot:{snapshot_type}")
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         blob_name = f"{session_id}/{snapshot_type}_{timestamp}.json"
         
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import ContentSettings
+from azure.storage.blob.aio import BlobServiceClient
+
+from .blob_cas import AsyncBlobRefIndex, cas_blob_name, content_digest, mark_uploaded, touch_existing_async
+from .blob_store import (
+    BlobPointer,
+    _get_blob_api_version,
+    _get_storage_connection_string,
+    _max_concurrency,
+    _transfer_options,
+)
+from .snapshot_codec import FORMAT_METADATA_KEY, decode_snapshot, encode_snapshot
+
+
+class AsyncCVBlobStore:
+    """`CVBlobStore` on the aio SDK: same methods, awaitable, so independent uploads/downloads can be gathered.
+
+    The client is bound to the running event loop; use `async with AsyncCVBlobStore(...)` (or
+    `await close()`). The container is created on first use instead of in the constructor.
+    """
+
+    def __init__(self, connection_string: Optional[str] = None, *, container: Optional[str] = None, client: Any = None):
+        self.container = (container or os.environ.get("STORAGE_CONTAINER_PHOTOS") or "cv-photos").strip()
+        if client is None:
+            conn_str = connection_string or _get_storage_connection_string()
+            api_version = _get_blob_api_version(conn_str)
+            options: Dict[str, Any] = dict(_transfer_options())
+            if api_version:
+                options["api_version"] = api_version
+            client = BlobServiceClient.from_connection_string(conn_str, **options)
+        self.client = client
+        self.max_concurrency = _max_concurrency()
+        self._container_ready: set[str] = set()
+        self._container_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncCVBlobStore":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def _ensure_container(self, container: str) -> None:
+        if container in self._container_ready:
+            return
+        async with self._container_lock:
+            if container in self._container_ready:
+                return
+            try:
+                await self.client.create_container(container)
+            except ResourceExistsError:
+                pass
+            self._container_ready.add(container)
+
+    async def upload_bytes(
+        self,
+        *,
+        blob_name: str,
+        data: bytes,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None,
+        container: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> BlobPointer:
+        container = container or self.container
+        await self._ensure_container(container)
+        blob = self.client.get_blob_client(container=container, blob=blob_name)
+        await blob.upload_blob(
+            data,
+            overwrite=True,
+            max_concurrency=self.max_concurrency,
+            content_settings=ContentSettings(content_type=content_type, content_encoding=content_encoding),
+            metadata=metadata,
+        )
+        return BlobPointer(container=container, blob_name=blob_name, content_type=content_type)
+
+    async def upload_content(
+        self,
+        data: bytes,
+        *,
+        content_type: str,
+        session_id: Optional[str] = None,
+        refs: Optional[AsyncBlobRefIndex] = None,
+        kind: str = "",
+        content_encoding: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> BlobPointer:
+        """Content-addressed upload (see `CVBlobStore.upload_content`); skipped if the object exists."""
+        digest = content_digest(data)
+        if refs is not None and session_id:
+            await refs.add(session_id, self.container, digest, size=len(data), kind=kind)
+        blob_name = cas_blob_name(digest)
+        await self._ensure_container(self.container)
+        if not await touch_existing_async(self.client, self.container, digest):
+            await self.upload_bytes(
+                blob_name=blob_name,
+                data=data,
+                content_type=content_type,
+                metadata={**(metadata or {}), "sha256": digest},
+                content_encoding=content_encoding,
+            )
+            mark_uploaded(self.client, self.container, digest)
+        return BlobPointer(container=self.container, blob_name=blob_name, content_type=content_type)
+
+    async def upload_json_content(
+        self,
+        data: Dict[str, Any],
+        *,
+        session_id: Optional[str] = None,
+        refs: Optional[AsyncBlobRefIndex] = None,
+        kind: str = "",
+    ) -> BlobPointer:
+        """`upload_content` for a JSON document, encoded like `upload_json_snapshot`."""
+        snapshot = encode_snapshot(data)
+        return await self.upload_content(
+            snapshot.body,
+            content_type="application/json",
+            session_id=session_id,
+            refs=refs,
+            kind=kind,
+            content_encoding=snapshot.content_encoding,
+            metadata={FORMAT_METADATA_KEY: snapshot.format},
+        )
+
+    async def upload_photo_bytes(
+        self,
+        extracted_image,
+        *,
+        session_id: Optional[str] = None,
+        refs: Optional[AsyncBlobRefIndex] = None,
+    ) -> BlobPointer:
+        """Upload an ExtractedImage (from docx_photo); content-addressed when `session_id`/`refs` are given."""
+        if refs is not None and session_id:
+            return await self.upload_content(
+                extracted_image.data, content_type=extracted_image.mime, session_id=session_id, refs=refs, kind="photo"
+            )
+        blob_name = f"photos/{uuid.uuid4()}.{extracted_image.mime.split('/')[-1]}"
+        return await self.upload_bytes(
+            blob_name=blob_name,
+            data=extracted_image.data,
+            content_type=extracted_image.mime,
+        )
+
+    async def download_bytes(self, pointer: BlobPointer, **kwargs: Any) -> bytes:
+        blob = self.client.get_blob_client(container=pointer.container, blob=pointer.blob_name)
+        kwargs.setdefault("max_concurrency", self.max_concurrency)
+        try:
+            downloader = await blob.download_blob(**kwargs)
+            return await downloader.readall()
+        except ResourceNotFoundError as exc:
+            raise FileNotFoundError(f"Blob not found: {pointer.container}/{pointer.blob_name}") from exc
+
+    async def delete_prefix(self, prefix: str) -> int:
+        """
+        Delete all blobs under a given prefix. Returns count deleted.
+        """
+        container_client = self.client.get_container_client(self.container)
+        names = [blob.name async for blob in container_client.list_blobs(name_starts_with=prefix)]
+        await asyncio.gather(*(container_client.delete_blob(name) for name in names))
+        return len(names)
+
+    async def purge_all(self) -> int:
+        """
+        Delete all blobs in the container. Returns count deleted.
+        """
+        return await self.delete_prefix("")
+
+    async def upload_json_snapshot(
+        self,
+        *,
+        blob_name: str,
+        data: Dict[str, Any],
+        metadata: Optional[Dict[str, str]] = None,
+        container: Optional[str] = None,
+    ) -> BlobPointer:
+        """Upload JSON data as a blob snapshot (see `CVBlobStore.upload_json_snapshot`)."""
+        snapshot = encode_snapshot(data)
+        return await self.upload_bytes(
+            blob_name=blob_name,
+            data=snapshot.body,
+            content_type="application/json",
+            metadata={**(metadata or {}), FORMAT_METADATA_KEY: snapshot.format},
+            container=container,
+            content_encoding=snapshot.content_encoding,
+        )
+
+    async def download_json_snapshot(self, pointer: BlobPointer) -> Dict[str, Any]:
+        """Download and parse a JSON blob snapshot (FileNotFoundError if missing)."""
+        return decode_snapshot(await self.download_bytes(pointer, decompress=False))
+
+    async def upload_session_snapshot(
+        self,
+        session_id: str,
+        cv_data: Dict[str, Any],
+        snapshot_type: str = "cv"
+    ) -> BlobPointer:
+        """Upload a timestamped session snapshot (`<session_id>/<snapshot_type>_<ts>.json`)."""
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        return await self.upload_json_snapshot(
+            blob_name=f"{session_id}/{snapshot_type}_{timestamp}.json",
+            data=cv_data,
+            metadata={
+                'session_id': session_id,
+                'snapshot_type': snapshot_type,
+                'timestamp': timestamp
+            },
+        )
@@ -0,0 +1,68 @@
+"""
+Encoding of JSON-valued Table Storage properties.
+
+Sessions whose properties outgrow `max_table_size` are pushed to blob storage, which costs one or
+two extra downloads on every later read. CV JSON compresses several times over, so larger
+properties are written as binary properties: one header byte naming the codec, then the payload.
+
+  - str value: plain JSON (everything written before compression, and small values)
+  - bytes value: header byte + payload
+      0x01: zlib-compressed UTF-8 JSON
+
+Environment vars (optional overrides):
+  CV_TABLE_COMPRESSION=off|zlib       (default: zlib)
+  CV_TABLE_COMPRESS_MIN_BYTES=<int>   (default: 1024; smaller JSON stays plain text)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from typing import Any, Union
+
+CODEC_ZLIB = 0x01
+
+EncodedProperty = Union[str, bytes]
+
+
+def _compression_mode() -> str:
+    mode = str(os.environ.get("CV_TABLE_COMPRESSION") or "").strip().lower()
+    return mode if mode in {"off", "zlib"} else "zlib"
+
+
+def _compress_min_bytes() -> int:
+    try:
+        return max(0, int(str(os.environ.get("CV_TABLE_COMPRESS_MIN_BYTES") or "").strip() or 1024))
+    except ValueError:
+        return 1024
+
+
+def encode_json_text(text: str) -> EncodedProperty:
+    """Compress serialized JSON when that makes it smaller; otherwise return it unchanged."""
+    raw = text.encode("utf-8")
+    if _compression_mode() == "off" or len(raw) < _compress_min_bytes():
+        return text
+    packed = bytes([CODEC_ZLIB]) + zlib.compress(raw, 6)
+    return packed if len(packed) < len(raw) else text
+
+
+def encode_json_property(value: Any) -> EncodedProperty:
+    return encode_json_text(json.dumps(value, ensure_ascii=False))
+
+
+def decode_json_property(raw: EncodedProperty) -> Any:
+    """Decode a property written by `encode_json_property` (or plain JSON text)."""
+    if isinstance(raw, (bytes, bytearray)):
+        if not raw:
+            raise ValueError("Empty binary table property")
+        codec = raw[0]
+        if codec == CODEC_ZLIB:
+            return json.loads(zlib.decompress(bytes(raw[1:])).decode("utf-8"))
+        raise ValueError(f"Unknown table property codec 0x{codec:02x}")
+    return json.loads(raw)
+
+
+def property_size(raw: EncodedProperty) -> int:
+    """Stored size in bytes (what counts against the Table property limits)."""
+    return len(raw) if isinstance(raw, (bytes, bytearray)) else len(str(raw).encode("utf-8"))
@@ -0,0 +1,343 @@
+"""
+Render-free page-layout estimate for the 2-page CV template.
+
+Mirrors the box geometry of `templates/html/cv_template_2pages_2025.css` (column widths, font
+sizes, line heights, margins) and measures wrapped text with `src.text_metrics`, then paginates
+the sections the way WeasyPrint does for this template: natural flow, sections avoid breaking
+inside when they fit on a fresh page, section titles and entry headers stay with the next line,
+and margins adjoining a page break are truncated.
+
+Used by `CVValidator` (page-count prediction) and by `src.render` (soft page-break hints), so both
+agree with the renderer far better than character-count heuristics.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from src.text_metrics import PT_TO_MM, get_font_metrics
+except Exception:
+    from text_metrics import PT_TO_MM, get_font_metrics  # type: ignore
+
+# --- Geometry mirrored from cv_template_2pages_2025.css (checked against the CSS by
+# tests/test_layout_estimate.py::test_geometry_constants_match_template_css) ---
+BODY_FONT_PT = 10.5  # body/.section/.entry/.bullets li font-size (!important)
+BODY_LINE_HEIGHT = 1.43  # body/.section/.entry/.bullets li line-height (!important)
+LIST_LINE_HEIGHT = 1.25  # .simple-list li, p.small
+CONTACT_FONT_PT = 10.0  # .contact
+DATE_COL_MM = 42.5  # .entry-date / .two-col-row first column
+COL_GAP_MM = 3.0  # margin-right of the date column (entry body offset 45.5mm)
+BULLET_TOP_MM = 0.8  # .bullets margin-top
+BULLET_GAP_MM = 0.3  # .bullets li margin-bottom
+ENTRY_GAP_MM = 2.0  # .entry margin-bottom
+ENTRY_BODY_TOP_MM = 0.8  # .entry-body margin-top
+ENTRY_LINE_GAP_MM = 0.6  # .entry-line margin-bottom
+LIST_ITEM_GAP_MM = 0.7  # .simple-list li margin-bottom
+TWO_COL_ROW_GAP_MM = 0.6  # .two-col-list > * margin-bottom
+TITLE_GAP_MM = 2.0  # .section-title margin-bottom
+SECTION_BOTTOM_MM = 14 * PT_TO_MM  # .section margin-bottom
+PARAGRAPH_MARGIN_MM = BODY_FONT_PT * PT_TO_MM  # UA stylesheet p { margin: 1em 0 }
+HEADER_TOP_MM = 10.0  # .header margin-top
+HEADER_BOTTOM_MM = 4.0  # .header padding-bottom
+NAME_GAP_MM = 2.0  # .name margin-bottom
+CONTACT_BLOCK_GAP_MM = 2.0  # .contact > * margin-bottom
+CONTACT_LINE_GAP_MM = 1.0  # .contact-block > * margin-bottom
+PHOTO_WIDTH_MM = 45.0
+PHOTO_HEIGHT_MM = 55.0
+PHOTO_EMPTY_HEIGHT_MM = 35.0  # .photo-box--empty
+PHOTO_GAP_MM = 6.0  # .header-left margin-right
+
+SECTION_ORDER = (
+    "work_experience",
+    "it_ai_skills",
+    "technical_operational_skills",
+    "education",
+    "languages",
+    "interests",
+    "references",
+)
+
+DEFAULT_REFERENCES = "Will be announced on request."
+
+
+@dataclass(frozen=True)
+class TemplateGeometry:
+    page_width_mm: float = 210.0
+    page_height_mm: float = 297.0
+    margin_top_mm: float = 20.0
+    margin_right_mm: float = 22.4
+    margin_bottom_mm: float = 20.0
+    margin_left_mm: float = 25.0
+    name_font_size_pt: float = 16.0
+    title_font_size_pt: float = 11.0
+    section_gap_mm: float = 6.0
+
+    @classmethod
+    def from_styles(cls, styles: Optional[Dict[str, Any]]) -> "TemplateGeometry":
+        """Build from a style-extractor dict (same keys as `src.render._DEFAULT_CV_STYLES`)."""
+        kwargs: Dict[str, float] = {}
+        for name in cls.__dataclass_fields__:
+            value = (styles or {}).get(name)
+            if isinstance(value, (int, float)) and value > 0:
+                kwargs[name] = float(value)
+        return cls(**kwargs)
+
+    @property
+    def content_width_mm(self) -> float:
+        return self.page_width_mm - self.margin_left_mm - self.margin_right_mm
+
+    @property
+    def content_height_mm(self) -> float:
+        return self.page_height_mm - self.margin_top_mm - self.margin_bottom_mm
+
+    @property
+    def body_column_mm(self) -> float:
+        return self.content_width_mm - DATE_COL_MM - COL_GAP_MM
+
+
+@dataclass
+class LayoutEstimate:
+    content_height_mm: float
+    page_used_mm: List[float]
+    section_heights_mm: Dict[str, float] = field(default_factory=dict)
+    section_start_page: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_used_mm)
+
+    @property
+    def estimated_pages(self) -> float:
+        """Full pages before the last one plus the fill ratio of the last page (2.0 = exactly full)."""
+        if not self.page_used_mm:
+            return 0.0
+        return (len(self.page_used_mm) - 1) + (self.page_used_mm[-1] / self.content_height_mm)
+
+
+def _line_mm(size_pt: float, line_height: float) -> float:
+    return size_pt * line_height * PT_TO_MM
+
+
+def _clean_bullet(value: Any) -> str:
+    text = str(value or "").replace(" ", " ").strip()
+    return text.lstrip("-•").strip()
+
+
+def _as_list(value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _header_height(cv: Dict[str, Any], geo: TemplateGeometry) -> float:
+    regular = get_font_metrics()
+    bold = get_font_metrics(bold=True)
+    left_width = geo.content_width_mm - PHOTO_WIDTH_MM - PHOTO_GAP_MM
+    name_lines = max(1, bold.count_lines(str(cv.get("full_name") or ""), width_mm=left_width,
+                                          size_pt=geo.name_font_size_pt))
+    left = name_lines * _line_mm(geo.name_font_size_pt, BODY_LINE_HEIGHT) + NAME_GAP_MM
+
+    contact_line = _line_mm(CONTACT_FONT_PT, BODY_LINE_HEIGHT)
+    address = ", ".join(str(x) for x in _as_list(cv.get("address_lines")) if str(x).strip())
+    nationality = str(cv.get("nationality") or "").strip()
+    blocks = [
+        [address, str(cv.get("phone") or ""), str(cv.get("email") or "")],
+        [str(cv.get("birth_date") or ""), f"Nationality: {nationality}" if nationality else ""],
+    ]
+    block_heights = []
+    for block in blocks:
+        items = [t for t in block if t.strip()]
+        if not items:
+            continue
+        lines = regular.count_lines_many(items, width_mm=left_width, size_pt=CONTACT_FONT_PT)
+        block_heights.append(sum(lines) * contact_line + CONTACT_LINE_GAP_MM * (len(items) - 1))
+    left += sum(block_heights) + CONTACT_BLOCK_GAP_MM * max(0, len(block_heights) - 1)
+
+    photo = PHOTO_HEIGHT_MM if cv.get("photo_url") else PHOTO_EMPTY_HEIGHT_MM
+    return HEADER_TOP_MM + max(left, photo) + HEADER_BOTTOM_MM
+
+
+def _title_mm(geo: TemplateGeometry) -> float:
+    return _line_mm(geo.title_font_size_pt, BODY_LINE_HEIGHT) + TITLE_GAP_MM
+
+
+def _work_rows(cv: Dict[str, Any], geo: TemplateGeometry) -> List[float]:
+    regular = get_font_metrics()
+    bold = get_font_metrics(bold=True)
+    line = _line_mm(BODY_FONT_PT, BODY_LINE_HEIGHT)
+    roles = [r for r in _as_list(cv.get("work_experience")) if isinstance(r, dict)]
+
+    # Measure every bullet of every role in one batch.
+    bullets_per_role = [[_clean_bullet(b) for b in _as_list(r.get("bullets"))] for r in roles]
+    flat = [b for bullets in bullets_per_role for b in bullets]
+    flat_lines = regular.count_lines_many(flat, width_mm=geo.body_column_mm, size_pt=BODY_FONT_PT)
+
+    rows: List[float] = []
+    offset = 0
+    for role, bullets in zip(roles, bullets_per_role):
+        head_text = ", ".join(
+            p for p in (
+                str(role.get("title") or "").strip(),
+                str(role.get("employer") or role.get("company") or "").strip(),
+                str(role.get("location") or "").strip(),
+            ) if p
+        )
+        date_lines = regular.count_lines(str(role.get("date_range") or ""), width_mm=DATE_COL_MM, size_pt=BODY_FONT_PT)
+        head_lines = bold.count_lines(head_text, width_mm=geo.body_column_mm, size_pt=BODY_FONT_PT)
+        head = max(1, date_lines, head_lines) * line
+
+        bullet_rows = [max(1, n) * line + BULLET_GAP_MM for n in flat_lines[offset:offset + len(bullets)]]
+        offset += len(bullets)
+        if bullet_rows:
+            # Entry header stays with the first bullet (break-after: avoid).
+            rows.append(head + BULLET_TOP_MM + bullet_rows[0])
+            rows.extend(bullet_rows[1:])
+        else:
+            rows.append(head)
+        rows[-1] += ENTRY_GAP_MM
+    return rows
+
+
+def _simple_list_rows(items: Iterable[Any], geo: TemplateGeometry) -> List[float]:
+    texts = [str(x) for x in items if str(x).strip()]
+    lines = get_font_metrics().count_lines_many(texts, width_mm=geo.content_width_mm, size_pt=BODY_FONT_PT)
+    line = _line_mm(BODY_FONT_PT, LIST_LINE_HEIGHT)
+    return [max(1, n) * line + LIST_ITEM_GAP_MM for n in lines]
+
+
+def _education_rows(cv: Dict[str, Any], geo: TemplateGeometry) -> List[float]:
+    regular = get_font_metrics()
+    bold = get_font_metrics(bold=True)
+    line = _line_mm(BODY_FONT_PT, BODY_LINE_HEIGHT)
+    width = geo.body_column_mm
+    rows: List[float] = []
+    for edu in _as_list(cv.get("education")):
+        if not isinstance(edu, dict):
+            continue
+        inst = str(edu.get("institution") or "").strip()
+        if inst and not inst.endswith(","):
+            inst += ","
+        title_lines = bold.count_lines(inst, width_mm=width, size_pt=BODY_FONT_PT)
+        title_lines += bold.count_lines(str(edu.get("title") or ""), width_mm=width, size_pt=BODY_FONT_PT)
+        spec = str(edu.get("specialization") or "").strip()
+        if spec:
+            title_lines += regular.count_lines(f"specialization: {spec}", width_mm=width, size_pt=BODY_FONT_PT)
+        date_lines = regular.count_lines(str(edu.get("date_range") or ""), width_mm=DATE_COL_MM, size_pt=BODY_FONT_PT)
+        height = max(1, title_lines, date_lines) * line
+
+        details = [str(d) for d in _as_list(edu.get("details"))]
+        if details:
+            detail_lines = regular.count_lines_many(details, width_mm=width, size_pt=BODY_FONT_PT)
+            height += ENTRY_BODY_TOP_MM + sum(max(1, n) * line + ENTRY_LINE_GAP_MM for n in detail_lines)
+        rows.append(height + ENTRY_GAP_MM)
+    return rows
+
+
+def _language_rows(cv: Dict[str, Any], geo: TemplateGeometry) -> List[float]:
+    regular = get_font_metrics()
+    line = _line_mm(BODY_FONT_PT, BODY_LINE_HEIGHT)
+    rows: List[float] = []
+    for lang in _as_list(cv.get("languages")):
+        if isinstance(lang, dict):
+            name, level = str(lang.get("name") or ""), str(lang.get("level") or "")
+        else:
+            parts = str(lang).split("(", 1)
+            name, level = parts[0].strip(), (f"({parts[1].strip()}" if len(parts) > 1 else "")
+        lines = max(
+            1,
+            regular.count_lines(name, width_mm=DATE_COL_MM, size_pt=BODY_FONT_PT),
+            regular.count_lines(level, width_mm=geo.body_column_mm, size_pt=BODY_FONT_PT),
+        )
+        rows.append(lines * line + TWO_COL_ROW_GAP_MM)
+    return rows
+
+
+def _paragraph_rows(text: str, geo: TemplateGeometry) -> List[float]:
+    lines = get_font_metrics().count_lines(text, width_mm=geo.content_width_mm, size_pt=BODY_FONT_PT)
+    # p margins collapse with the title gap above and the section margin below.
+    top = max(0.0, PARAGRAPH_MARGIN_MM - TITLE_GAP_MM)
+    return [top + max(1, lines) * _line_mm(BODY_FONT_PT, LIST_LINE_HEIGHT)]
+
+
+def _section_rows(key: str, cv: Dict[str, Any], geo: TemplateGeometry) -> List[float]:
+    if key == "work_experience":
+        rows = _work_rows(cv, geo)
+    elif key in ("it_ai_skills", "technical_operational_skills"):
+        rows = _simple_list_rows(_as_list(cv.get(key)), geo)
+    elif key == "education":
+        rows = _education_rows(cv, geo)
+    elif key == "languages":
+        rows = _language_rows(cv, geo)
+    elif key == "interests":
+        rows = _paragraph_rows(str(cv.get("interests") or ""), geo)
+    elif key == "references":
+        rows = _paragraph_rows(str(cv.get("references") or DEFAULT_REFERENCES), geo)
+    else:
+        rows = []
+    # The title is kept with the first row (break-after: avoid).
+    title = _title_mm(geo)
+    if rows:
+        rows[0] += title
+        return rows
+    return [title]
+
+
+def estimate_cv_layout(
+    cv: Dict[str, Any],
+    *,
+    styles: Optional[Dict[str, Any]] = None,
+    break_before: Optional[Dict[str, bool]] = None,
+) -> LayoutEstimate:
+    """Predict page usage for `cv` without rendering.
+
+    `break_before` takes the template's soft page-break hints (`_soft_break_before`), which force
+    the named sections onto a new page.
+    """
+    geo = TemplateGeometry.from_styles(styles)
+    content_h = geo.content_height_mm
+    between = max(geo.section_gap_mm, SECTION_BOTTOM_MM)  # collapsed sibling margins
+
+    header = _header_height(cv, geo)
+    est = LayoutEstimate(content_height_mm=content_h, page_used_mm=[min(header, content_h)])
+    est.section_heights_mm["header"] = header
+    est.section_start_page["header"] = 0
+    used = header
+    first_gap = geo.section_gap_mm  # header -> first section: only the section's margin-top
+
+    for idx, key in enumerate(SECTION_ORDER):
+        rows = _section_rows(key, cv, geo)
+        total = sum(rows)
+        gap = first_gap if idx == 0 else between
+        est.section_heights_mm[key] = gap + total
+
+        forced = bool((break_before or {}).get(key))
+        # break-inside: avoid-page - move the whole section when it would fit on a fresh page.
+        if used > 0 and (forced or (used + gap + total > content_h and total <= content_h)):
+            est.page_used_mm[-1] = used
+            est.page_used_mm.append(0.0)
+            used = 0.0
+        if used > 0:
+            used += gap  # margins adjoining a page break are truncated
+        est.section_start_page[key] = len(est.page_used_mm) - 1
+
+        for row in rows:
+            if used > 0 and used + row > content_h:
+                est.page_used_mm[-1] = used
+                est.page_used_mm.append(0.0)
+                used = 0.0
+            used += row
+        est.page_used_mm[-1] = used
+
+    return est
+
+
+def load_template_styles() -> Optional[Dict[str, Any]]:
+    """DOCX-derived style tokens from the render template bundle, or None (geometry defaults)."""
+    try:
+        try:
+            from src.render import get_template_bundle  # type: ignore
+        except Exception:
+            from render import get_template_bundle  # type: ignore
+        return dict(get_template_bundle().cv_styles)
+    except Exception:
+        return None
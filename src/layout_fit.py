@@ -0,0 +1,258 @@
+"""
+Layout-driven shrink-to-fit planning for the 2-page CV.
+
+Instead of re-rendering the PDF after every dropped work bullet, the work-experience bullet
+boxes are measured from the WeasyPrint layout tree of the render that overflowed
+(`RenderResult.layout`, via `PageCountError`), and the planner picks the bottom-up drops (same
+order as `_drop_one_work_bullet_bottom_up`) that free enough vertical space. The caller then
+confirms the plan with a single render.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict
+
+# WeasyPrint layout units are CSS px (96 per inch).
+PX_TO_MM = 25.4 / 96.0
+
+# Never plan for less than roughly one rendered bullet line; smaller overflows are layout noise.
+MIN_REQUIRED_MM = 4.0
+
+_DROP_CHANGE_RE = re.compile(r"work_drop_bullet\[(\d+)\]")
+
+DropOneFn = Callable[..., tuple[dict, str | None]]
+
+
+@dataclass(frozen=True)
+class BulletMeasure:
+    role_index: int
+    bullet_index: int
+    height_mm: float
+
+
+@dataclass(frozen=True)
+class SectionMeasure:
+    """One page fragment of a top-level `<section>`; offsets are from the page content top."""
+
+    index: int
+    title: str
+    page_index: int
+    top_mm: float
+    bottom_mm: float
+
+
+@dataclass(frozen=True)
+class CvLayoutMeasure:
+    page_count: int
+    page_content_height_mm: float
+    page_used_mm: tuple[float, ...]
+    bullets: tuple[BulletMeasure, ...]
+    sections: tuple[SectionMeasure, ...] = ()
+
+    def overflow_mm(self, target_pages: int = 2) -> float:
+        """Vertical space that must be freed so the content fits into `target_pages`.
+
+        Content spilling past the target page can flow back into the free space left at the
+        bottom of the last target page, so that slack is subtracted from the spill.
+        """
+        if self.page_count <= target_pages or not self.page_used_mm:
+            return 0.0
+        spill = sum(self.page_used_mm[target_pages:])
+        last_used = self.page_used_mm[target_pages - 1] if len(self.page_used_mm) >= target_pages else 0.0
+        slack = max(0.0, self.page_content_height_mm - last_used)
+        return max(MIN_REQUIRED_MM, spill - slack)
+
+    def bullet_heights(self) -> Dict[tuple[int, int], float]:
+        return {(b.role_index, b.bullet_index): b.height_mm for b in self.bullets}
+
+
+@dataclass
+class FitPlan:
+    cv: dict
+    changes: list[str] = field(default_factory=list)
+    required_mm: float = 0.0
+    freed_mm: float = 0.0
+    feasible: bool = True
+
+    def to_summary(self) -> dict:
+        return {
+            "drops": len(self.changes),
+            "required_mm": round(self.required_mm, 1),
+            "freed_mm": round(self.freed_mm, 1),
+            "feasible": bool(self.feasible),
+        }
+
+
+def _box_classes(box: Any) -> set[str]:
+    element = getattr(box, "element", None)
+    if element is None:
+        return set()
+    try:
+        return set(str(element.get("class") or "").split())
+    except Exception:
+        return set()
+
+
+def _box_bottom_px(box: Any) -> float:
+    try:
+        return float(box.position_y) + float(box.margin_height())
+    except Exception:
+        return 0.0
+
+
+def _section_title(element: Any) -> str:
+    try:
+        for child in element.iter():
+            if "section-title" in str(child.get("class") or "").split():
+                return " ".join("".join(child.itertext()).split())
+    except Exception:
+        pass
+    return ""
+
+
+def measure_document(document: Any) -> CvLayoutMeasure:
+    """Measure page usage, section positions and work bullet heights from a rendered WeasyPrint Document.
+
+    Work experience is the first `<section>` of the CV template; entries and bullets are
+    identified by element identity, so fragments split across pages are summed.
+    """
+    pages = list(getattr(document, "pages", None) or [])
+    page_used: list[float] = []
+    content_height_px = 0.0
+
+    work_section: Any = None
+    entry_order: dict[int, int] = {}
+    bullet_order: dict[int, tuple[int, int]] = {}
+    bullet_px: dict[tuple[int, int], float] = {}
+    bullets_per_entry: dict[int, int] = {}
+    section_order: dict[int, tuple[int, str]] = {}
+    # (section index, page index) -> [top px, bottom px]
+    section_px: dict[tuple[int, int], list[float]] = {}
+
+    for page_index, page in enumerate(pages):
+        page_box = getattr(page, "_page_box", None)
+        if page_box is None:
+            page_used.append(0.0)
+            continue
+        content_top = float(page_box.content_box_y())
+        content_height_px = max(content_height_px, float(page_box.height))
+
+        max_bottom = content_top
+        current_section: Any = None
+        current_entry: int | None = None
+        for root in page_box.children:
+            if type(root).__name__ == "MarginBox":
+                continue
+            for box in root.descendants():
+                tag = getattr(box, "element_tag", None)
+                element = getattr(box, "element", None)
+                if not getattr(box, "children", None) or type(box).__name__ == "LineBox":
+                    max_bottom = max(max_bottom, _box_bottom_px(box))
+
+                if tag == "section" and element is not None:
+                    current_section = element
+                    current_entry = None
+                    if work_section is None:
+                        work_section = element
+                    if id(element) not in section_order:
+                        section_order[id(element)] = (len(section_order), _section_title(element))
+                    span = section_px.setdefault((section_order[id(element)][0], page_index), [float("inf"), 0.0])
+                    span[0] = min(span[0], float(box.position_y) - content_top)
+                    span[1] = max(span[1], _box_bottom_px(box) - content_top)
+                    continue
+                if current_section is None or current_section is not work_section or element is None:
+                    continue
+                if tag == "div" and "entry" in _box_classes(box):
+                    key = id(element)
+                    if key not in entry_order:
+                        entry_order[key] = len(entry_order)
+                    current_entry = entry_order[key]
+                elif tag == "li" and current_entry is not None:
+                    key = id(element)
+                    if key not in bullet_order:
+                        idx = bullets_per_entry.get(current_entry, 0)
+                        bullets_per_entry[current_entry] = idx + 1
+                        bullet_order[key] = (current_entry, idx)
+                    pos = bullet_order[key]
+                    bullet_px[pos] = bullet_px.get(pos, 0.0) + float(box.margin_height())
+
+        page_used.append(max(0.0, max_bottom - content_top) * PX_TO_MM)
+
+    bullets = tuple(
+        BulletMeasure(role_index=r, bullet_index=b, height_mm=h * PX_TO_MM)
+        for (r, b), h in sorted(bullet_px.items())
+    )
+    titles = {idx: title for idx, title in section_order.values()}
+    sections = tuple(
+        SectionMeasure(
+            index=idx,
+            title=titles.get(idx, ""),
+            page_index=page_index,
+            top_mm=max(0.0, top) * PX_TO_MM,
+            bottom_mm=max(0.0, bottom) * PX_TO_MM,
+        )
+        for (idx, page_index), (top, bottom) in sorted(section_px.items())
+    )
+    return CvLayoutMeasure(
+        page_count=len(pages),
+        page_content_height_mm=content_height_px * PX_TO_MM,
+        page_used_mm=tuple(page_used),
+        bullets=bullets,
+        sections=sections,
+    )
+
+
+def _role_bullet_count(cv: dict, role_index: int) -> int:
+    work = cv.get("work_experience") if isinstance(cv.get("work_experience"), list) else []
+    if role_index < 0 or role_index >= len(work) or not isinstance(work[role_index], dict):
+        return 0
+    role = work[role_index]
+    bullets = role.get("bullets")
+    if not isinstance(bullets, list):
+        bullets = role.get("responsibilities") if isinstance(role.get("responsibilities"), list) else []
+    return len(bullets or [])
+
+
+def plan_bullet_drops(
+    *,
+    cv: dict,
+    measure: CvLayoutMeasure,
+    drop_one: DropOneFn,
+    target_pages: int = 2,
+    max_drops: int = 40,
+) -> FitPlan:
+    """Pick the minimal bottom-up run of bullet drops whose measured height covers the overflow.
+
+    Drop order is delegated to `drop_one` (keep >=3 bullets/role, then >=2), exactly like the
+    iterative render loop, so the result matches what trial renders would converge to.
+    """
+    required = measure.overflow_mm(target_pages)
+    plan = FitPlan(cv=cv, required_mm=required)
+    if required <= 0:
+        return plan
+
+    heights = measure.bullet_heights()
+    fallback_h = (sum(heights.values()) / len(heights)) if heights else 0.0
+
+    cv_try = cv
+    while plan.freed_mm < required and len(plan.changes) < max_drops:
+        cv_next, change = drop_one(cv_in=cv_try, min_bullets_per_role=3)
+        if not change:
+            cv_next, change = drop_one(cv_in=cv_try, min_bullets_per_role=2)
+        if not change:
+            break
+        m = _DROP_CHANGE_RE.search(change)
+        height = fallback_h
+        if m:
+            role_index = int(m.group(1))
+            bullet_index = _role_bullet_count(cv_try, role_index) - 1
+            height = heights.get((role_index, bullet_index), fallback_h)
+        plan.freed_mm += height
+        plan.changes.append(change)
+        cv_try = cv_next
+
+    plan.cv = cv_try
+    plan.feasible = plan.freed_mm >= required
+    return plan
@@ -0,0 +1,193 @@
+"""
+Session metadata with heavy keys hydrated from blob storage on first access.
+
+When session metadata outgrows the table, heavy keys (event_log, job_posting_text, pdf_refs, ...)
+are offloaded one blob per key and the table keeps `metadata_blob_refs = {key: "container/blob"}`.
+`LazyMetadata` is the table metadata as a dict that downloads a key's blob only when that key's
+value is read, so a caller that needs `wizard_stage` or `language` never touches blob storage and
+reading `pdf_refs` does not pull `job_posting_text`.
+
+Offloaded keys are still visible to `in`, `len()` and iteration. Anything that reads every value
+(`items()`, `values()`, `dict(meta)`, `json.dumps`, pickling) hydrates all pending keys, so the
+mapping behaves exactly like the fully hydrated dict it replaces. Use `copy_metadata()` instead of
+`dict(meta)` to copy without hydrating.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import KeysView
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping
+
+BLOB_REFS_KEY = "metadata_blob_refs"
+_MISSING = object()
+
+
+class LazyMetadata(dict):
+    """dict whose offloaded heavy keys are fetched through `load(blob_ref)` when accessed.
+
+    `load` returns the blob payload as a dict ({key: value}); a legacy single blob holding
+    several keys is downloaded once and fills all of them.
+    """
+
+    def __init__(self, data: Mapping[str, Any], *, refs: Mapping[str, str], load: Callable[[str], Dict[str, Any]]):
+        super().__init__(data)
+        self._pending: Dict[str, str] = {k: ref for k, ref in refs.items() if k not in data and ref}
+        self._load = load
+
+    @property
+    def pending_keys(self) -> list[str]:
+        return sorted(self._pending)
+
+    def _take(self, ref: str) -> list[str]:
+        keys = [k for k, r in self._pending.items() if r == ref]
+        for k in keys:
+            del self._pending[k]
+        return keys
+
+    def _fill(self, ref: str, keys: list[str]) -> None:
+        try:
+            payload = self._load(ref)
+        except Exception as exc:
+            logging.warning("Failed to hydrate metadata keys %s from blob %s: %s", keys, ref, exc)
+            return
+        if isinstance(payload, dict):
+            for k in keys:
+                if k in payload:
+                    dict.__setitem__(self, k, payload[k])
+
+    def _hydrate(self, key: Any) -> None:
+        ref = self._pending.get(key)
+        if ref is not None:
+            self._fill(ref, self._take(ref))
+
+    def materialize(self) -> "LazyMetadata":
+        """Download every pending key; distinct blobs are fetched concurrently."""
+        jobs = [(ref, self._take(ref)) for ref in sorted(set(self._pending.values()))]
+        if len(jobs) == 1:
+            self._fill(*jobs[0])
+        elif jobs:
+            with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as pool:
+                list(pool.map(lambda job: self._fill(*job), jobs))
+        return self
+
+    # Lookups: hydrate only the requested key.
+    def __missing__(self, key: Any) -> Any:
+        if key in self._pending:
+            self._hydrate(key)
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._hydrate(key)
+        return dict.get(self, key, default)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._hydrate(key)
+        return dict.setdefault(self, key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self._pending
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from dict.__iter__(self)
+        yield from [k for k in self._pending if not dict.__contains__(self, k)]
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._pending)
+
+    def keys(self) -> KeysView:  # type: ignore[override]
+        return KeysView(self)
+
+    # Whole-mapping reads: hydrate everything.
+    def items(self):  # type: ignore[override]
+        return dict.items(self.materialize())
+
+    def values(self):  # type: ignore[override]
+        return dict.values(self.materialize())
+
+    def __eq__(self, other: object) -> bool:
+        return dict.__eq__(self.materialize(), other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> Any:
+        return (dict, (self.materialize()._loaded(),))
+
+    # Writes: an explicit value replaces the offloaded one.
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._pending.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pop(self, key: Any, default: Any = _MISSING) -> Any:
+        self._hydrate(key)
+        self._forget_ref(key)
+        if default is _MISSING:
+            return dict.pop(self, key)
+        return dict.pop(self, key, default)
+
+    def __delitem__(self, key: Any) -> None:
+        pending = self._pending.pop(key, None)
+        self._forget_ref(key)
+        if pending is not None and not dict.__contains__(self, key):
+            return
+        dict.__delitem__(self, key)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        dict.clear(self)
+
+    def _forget_ref(self, key: Any) -> None:
+        # A removed heavy key must not come back from its blob on the next read.
+        refs = dict.get(self, BLOB_REFS_KEY)
+        if isinstance(refs, dict) and key in refs:
+            dict.__setitem__(self, BLOB_REFS_KEY, {k: v for k, v in refs.items() if k != key})
+        legacy_keys = dict.get(self, "metadata_blob_keys")
+        if isinstance(legacy_keys, list) and key in legacy_keys:
+            dict.__setitem__(self, "metadata_blob_keys", [k for k in legacy_keys if k != key])
+
+    def _loaded(self) -> Dict[str, Any]:
+        # dict.copy() would go through keys()/__getitem__ and hydrate; read the storage directly.
+        return {k: v for k, v in dict.items(self)}
+
+    def copy(self) -> "LazyMetadata":
+        clone = LazyMetadata(self._loaded(), refs={}, load=self._load)
+        clone._pending = dict(self._pending)
+        return clone
+
+
+def copy_metadata(meta: Any) -> Dict[str, Any]:
+    """Shallow copy of session metadata that keeps offloaded keys lazy (`dict(meta or {})` otherwise)."""
+    if isinstance(meta, dict):
+        return meta.copy()
+    return dict(meta or {})
+
+
+def loaded_metadata(meta: Any) -> Dict[str, Any]:
+    """Plain dict of the keys held in memory, without hydrating (what is written back to the table).
+
+    Keys still pending stay reachable through `metadata_blob_refs`.
+    """
+    if isinstance(meta, LazyMetadata):
+        return meta._loaded()
+    return dict(meta or {})
+
+
+def heavy_blob_refs(metadata: Mapping[str, Any], *, legacy_keys: Iterable[str]) -> Dict[str, str]:
+    """{key: blob_ref} for offloaded heavy keys, including the legacy single `metadata_blob_ref`."""
+    refs: Dict[str, str] = {}
+    legacy_ref = metadata.get("metadata_blob_ref")
+    if isinstance(legacy_ref, str) and legacy_ref:
+        listed = metadata.get("metadata_blob_keys")
+        keys = listed if isinstance(listed, list) and listed else list(legacy_keys)
+        refs.update({str(k): legacy_ref for k in keys})
+    per_key = metadata.get(BLOB_REFS_KEY)
+    if isinstance(per_key, dict):
+        refs.update({str(k): str(v) for k, v in per_key.items() if isinstance(v, str) and v})
+    return refs
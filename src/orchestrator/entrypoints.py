@@ -85,8 +85,11 @@ def handle_cv_tool_call(req: func.HttpRequest, *, deps: EntryPointDeps) -> func.
     if tool_name == "cleanup_expired_sessions":
         try:
             store = _get_session_store()
-            deleted = store.cleanup_expired()
-            return _json_response({"success": True, "tool_name": tool_name, "deleted_count": deleted}, status_code=200)
+            report = store.run_cleanup()
+            return _json_response(
+                {"success": True, "tool_name": tool_name, "deleted_count": report.sessions_deleted, "cleanup": report.as_dict()},
+                status_code=200,
+            )
         except Exception as e:
             return _json_response({"error": "Cleanup failed", "details": str(e)}, status_code=500)
 
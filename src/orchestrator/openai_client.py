@@ -8,10 +8,9 @@ import time
 from dataclasses import dataclass
 from typing import Callable
 
-from openai import OpenAI
-
 from src import product_config
 from src.json_repair import extract_first_json_value, sanitize_json_text, strip_markdown_code_fences
+from src.orchestrator.openai_pool import get_openai_client
 
 
 @dataclass(frozen=True)
@@ -253,7 +252,7 @@ def openai_json_schema_call(
                     preflight_payload.get("issues"),
                 )
 
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), timeout=60.0)
+        client = get_openai_client(stage or "json_schema_call")
         prompt_id = deps.get_openai_prompt_id(stage)
         model_override = (os.environ.get("OPENAI_MODEL") or "").strip() or None
         experiment_model = str(product_config.EXPERIMENT_MODEL or "").strip() or None
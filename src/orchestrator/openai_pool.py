@@ -0,0 +1,174 @@
+"""
+Process-wide OpenAI client on a pooled httpx transport.
+
+Building `OpenAI(...)` per call (JSON-schema stages) or per turn (tool loop) also builds a new
+httpx client, so every call paid DNS + TCP + TLS setup. One client per (API key, base URL) is
+shared by both paths; its connection pool keeps connections alive between calls and uses HTTP/2
+when the `h2` package is installed. Per-stage read timeouts come from `product_config`
+(`openai_stage_timeout_sec`) and are applied with `client.with_options(timeout=...)`, which
+shares the pool.
+
+Pool metrics (`openai_pool_stats()`): requests, connections opened, requests served on a reused
+connection, and time spent waiting for a free connection (queued behind `max_connections`).
+
+Environment vars (optional overrides):
+  OPENAI_HTTP_MAX_CONNECTIONS=<int>        (default: 20)
+  OPENAI_HTTP_MAX_KEEPALIVE=<int>          (default: 10)
+  OPENAI_HTTP_KEEPALIVE_EXPIRY_SEC=<float> (default: 60)
+  OPENAI_HTTP2=0|1                         (default: 1; needs `h2`)
+
+Without `httpx` importable the client keeps the SDK's default transport (still shared, still
+with per-stage timeouts) and the pool metrics stay at zero.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional
+
+from openai import OpenAI
+
+try:
+    import httpx  # type: ignore
+except Exception:  # pragma: no cover - optional: tuned transport and pool metrics
+    httpx = None  # type: ignore
+
+from src import product_config
+
+
+@dataclass
+class OpenAIPoolStats:
+    requests: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    pool_wait_ms: float = 0.0
+    max_pool_wait_ms: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, *, opened: bool, wait_ms: float) -> None:
+        with self._lock:
+            self.requests += 1
+            if opened:
+                self.connections_opened += 1
+            else:
+                self.connections_reused += 1
+            self.pool_wait_ms += wait_ms
+            self.max_pool_wait_ms = max(self.max_pool_wait_ms, wait_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+        out["pool_wait_ms"] = round(self.pool_wait_ms, 1)
+        out["max_pool_wait_ms"] = round(self.max_pool_wait_ms, 1)
+        return out
+
+
+_TransportBase: Any = httpx.HTTPTransport if httpx is not None else object
+
+
+class _TracingTransport(_TransportBase):
+    """HTTPTransport that feeds httpcore trace events into `OpenAIPoolStats`."""
+
+    def __init__(self, stats: OpenAIPoolStats, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    def handle_request(self, request: Any) -> Any:
+        started = time.perf_counter()
+        state = {"opened": False, "connect_s": 0.0, "connect_started": 0.0, "wait_ms": None}
+        previous_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: dict) -> None:
+            now = time.perf_counter()
+            if event_name in ("connection.connect_tcp.started", "connection.connect_unix_socket.started"):
+                state["opened"] = True
+                state["connect_started"] = now
+            elif event_name in ("connection.start_tls.started",):
+                state["connect_started"] = now
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                state["connect_s"] += now - state["connect_started"]
+            elif event_name.endswith("send_request_headers.started") and state["wait_ms"] is None:
+                # Time to get a connection, minus the time spent opening one.
+                state["wait_ms"] = max(0.0, (now - started - state["connect_s"]) * 1000)
+            if previous_trace is not None:
+                previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        try:
+            return super().handle_request(request)
+        finally:
+            self.stats.record(opened=bool(state["opened"]), wait_ms=float(state["wait_ms"] or 0.0))
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(str(os.environ.get(name) or "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(str(os.environ.get(name) or "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _http2_enabled() -> bool:
+    wanted = str(os.environ.get("OPENAI_HTTP2") or "1").strip().lower() not in {"0", "false", "no", "off"}
+    return wanted and importlib.util.find_spec("h2") is not None
+
+
+_LOCK = threading.Lock()
+_CLIENTS: dict[tuple[Optional[str], Optional[str]], OpenAI] = {}
+_STATS = OpenAIPoolStats()
+
+
+def _timeout(read_sec: float) -> Any:
+    if httpx is None:
+        return read_sec
+    return httpx.Timeout(read_sec, connect=product_config.OPENAI_CONNECT_TIMEOUT_SEC)
+
+
+def _build_client(api_key: Optional[str], base_url: Optional[str]) -> OpenAI:
+    timeout = _timeout(product_config.OPENAI_RESPONSE_TIMEOUT_SEC)
+    if httpx is None:
+        return OpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
+    limits = httpx.Limits(
+        max_connections=_env_int("OPENAI_HTTP_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("OPENAI_HTTP_MAX_KEEPALIVE", 10),
+        keepalive_expiry=_env_float("OPENAI_HTTP_KEEPALIVE_EXPIRY_SEC", 60.0),
+    )
+    http_client = httpx.Client(
+        transport=_TracingTransport(_STATS, http2=_http2_enabled(), limits=limits),
+        timeout=timeout,
+        follow_redirects=True,
+    )
+    return OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, http_client=http_client)
+
+
+def get_openai_client(stage: Optional[str] = None, *, default_timeout: Optional[float] = None) -> OpenAI:
+    """Shared OpenAI client; with `stage`, a view of it using that stage's timeout (same pool).
+
+    `default_timeout` replaces OPENAI_RESPONSE_TIMEOUT_SEC for stages without their own entry.
+    """
+    api_key = os.environ.get("OPENAI_API_KEY")
+    base_url = (os.environ.get("OPENAI_BASE_URL") or "").strip() or None
+    key = (api_key, base_url)
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = _build_client(api_key, base_url)
+                _CLIENTS[key] = client
+    if stage is None:
+        return client
+    return client.with_options(timeout=_timeout(product_config.openai_stage_timeout_sec(stage, default_timeout)))
+
+
+def openai_pool_stats() -> Dict[str, Any]:
+    return _STATS.as_dict()
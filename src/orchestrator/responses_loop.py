@@ -10,6 +10,9 @@ from typing import Any, Callable
 
 from openai import OpenAI
 
+from src import product_config
+from src.orchestrator.openai_pool import get_openai_client, openai_pool_stats
+
 
 @dataclass(frozen=True)
 class SchemaRepairDeps:
@@ -223,7 +226,7 @@ def run_responses_tool_loop_v2(
     _tool_generate_cover_letter_from_session = deps.tool_generate_cover_letter_from_session
     _tool_get_pdf_by_ref = deps.tool_get_pdf_by_ref
     _looks_truncated = deps.looks_truncated
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    client = get_openai_client(stage, default_timeout=product_config.OPENAI_TOOL_LOOP_TIMEOUT_SEC)
     prompt_id = _get_openai_prompt_id(stage)
     model_override = (os.environ.get("OPENAI_MODEL") or "").strip() or None
     # Tool-loop requires persisted response items for follow-up calls; default ON.
@@ -341,6 +344,8 @@ def run_responses_tool_loop_v2(
     def _responses_create_with_trace(*, req_obj: dict, call_seq: int) -> Any:
         started_at = time.time()
         resp_obj = client.responses.create(**req_obj)
+        # Process-wide connection pool counters, as of this call (see openai_pool).
+        run_summary["openai_pool"] = openai_pool_stats()
 
         response_id = getattr(resp_obj, "id", None)
         out_text_local = getattr(resp_obj, "output_text", "") or ""
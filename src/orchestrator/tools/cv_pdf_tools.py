@@ -4,15 +4,15 @@ import base64
 import hashlib
 import json
 import logging
-import time
 import uuid
 from dataclasses import dataclass
 from typing import Any, Callable
 
 from src.blob_store import BlobPointer, CVBlobStore
+from src.layout_fit import plan_bullet_drops
 from src.normalize import normalize_cv_data
 from src.orchestrator.wizard.execution_strategy import resolve_execution_strategy
-from src.render import count_pdf_pages, render_pdf
+from src.render import PageCountError, RenderResult, render_cv
 from src.schema_validator import validate_canonical_schema
 from src.validator import validate_cv
 
@@ -55,6 +55,7 @@ class CvPdfToolDeps:
     compute_pdf_download_name: Callable[..., str]
     shrink_metadata_for_table: Callable[[dict], dict]
     now_iso: Callable[[], str]
+    write_session_merging_conflicts: Callable[..., tuple[bool, dict]]
 
 
 def tool_generate_cv_from_session(
@@ -77,6 +78,7 @@ def tool_generate_cv_from_session(
     _compute_pdf_download_name = deps.compute_pdf_download_name
     _shrink_metadata_for_table = deps.shrink_metadata_for_table
     _now_iso = deps.now_iso
+    _write_session_merging_conflicts = deps.write_session_merging_conflicts
     def _shrink_cv_for_pdf(*, cv_in: dict, level: int) -> tuple[dict, dict]:
         """
         Deterministic shrink-to-fit for PDF generation only.
@@ -292,9 +294,18 @@ def tool_generate_cv_from_session(
                         blob_name = latest_info.get("blob_name") if isinstance(latest_info, dict) else None
                         if container and blob_name:
                             blob_store = CVBlobStore(container=container)
-                            pdf_bytes_cached = blob_store.download_bytes(
-                                BlobPointer(container=container, blob_name=blob_name, content_type="application/pdf")
-                            )
+                            pointer = BlobPointer(container=container, blob_name=blob_name, content_type="application/pdf")
+                            # Validate before the full transfer: a truncated or foreign blob costs a
+                            # properties call and a 5-byte ranged GET instead of the whole download.
+                            expected_size = latest_info.get("size_bytes") if isinstance(latest_info, dict) else None
+                            blob_size = blob_store.blob_size(pointer)
+                            if blob_size <= 0 or (isinstance(expected_size, int) and expected_size > 0 and blob_size != expected_size):
+                                download_error = "cached_pdf_size_mismatch"
+                            elif blob_store.read_range(pointer, offset=0, length=5) != b"%PDF-":
+                                download_error = "cached_pdf_invalid_header"
+                            else:
+                                # Large PDFs come down as parallel ranged GETs (STORAGE_BLOB_MAX_CONCURRENCY).
+                                pdf_bytes_cached = blob_store.download_bytes(pointer)
                         else:
                             download_error = "missing_blob_pointer"
                     except Exception as exc:
@@ -483,17 +494,25 @@ def tool_generate_cv_from_session(
     if not is_valid:
         return 400, {"error": "CV data validation failed", "validation_errors": errors, "run_summary": run_summary}, "application/json"
 
-    # Iterative shrink-to-fit: prefer keeping content; drop exactly 1 bullet at a time (bottom-up).
+    # Shrink-to-fit: prefer keeping content; drop work bullets bottom-up.
     # Important: validate_cv's layout height estimate can be conservative; if errors are layout-only,
     # try rendering anyway and stop at the first snapshot that renders as exactly 2 pages.
+    # When a render overflows, the layout-driven fit solver plans from that render's own layout
+    # (bullet boxes measured while rendering) and applies all drops needed to fit in one go, so we
+    # confirm with a single render instead of one per bullet.
     layout_fields = {"_total_pages", "_page1_overflow", "_page2_overflow"}
     max_steps = 40
+    max_solver_rounds = 3
     last_validation = None
     shrink_changes: list[str] = []
     pdf_bytes: bytes | None = None
+    render_result: RenderResult | None = None
     cv_try = cv_data
+    step = 0
+    disable_soft_breaks = False
+    fit_solver: dict = {"rounds": 0}
 
-    for step in range(0, max_steps + 1):
+    for _attempt in range(0, max_steps + 1):
         validation_result = validate_cv(cv_try)
         last_validation = validation_result
 
@@ -516,14 +535,55 @@ def tool_generate_cv_from_session(
             try:
                 logging.info("=== PDF GENERATION START === session_id=%s shrink_step=%s", session_id, step)
                 cv_render = dict(cv_try or {})
-                if step > 0:
+                if step > 0 or disable_soft_breaks:
                     cv_render["_disable_soft_break_before"] = True
-                pdf_bytes = render_pdf(cv_render, enforce_two_pages=True)
+                render_result = render_cv(cv_render, enforce_two_pages=True)
+                pdf_bytes = render_result.pdf
                 cv_data = cv_render  # render snapshot used for download name + metadata
                 break
+            except PageCountError as e:
+                # Renderer still violates DoD (pages != 2): shrink and retry.
+                run_summary["render_error"] = str(e)[:200]
+                failed_render = e.result
             except Exception as e:
-                # If renderer still violates DoD (pages != 2), shrink once and retry.
                 run_summary["render_error"] = str(e)[:200]
+                failed_render = None
+
+            if (
+                failed_render is not None
+                and fit_solver.get("enabled", True)
+                and fit_solver["rounds"] < max_solver_rounds
+                and step < max_steps
+            ):
+                if not disable_soft_breaks and step == 0:
+                    # Soft page-break hints may alone cause the overflow, and this layout includes
+                    # them: re-render without them first, then plan from that render if it overflows.
+                    disable_soft_breaks = True
+                    run_summary["fit_solver"] = dict(fit_solver)
+                    continue
+                measure = failed_render.layout
+                if measure is None and not failed_render.cached:
+                    # No layout tree (e.g. Playwright fallback): keep the one-bullet-per-render loop.
+                    fit_solver["enabled"] = False
+                    fit_solver["error"] = "render carried no layout"
+                if measure is not None:
+                    fit_solver["rounds"] += 1
+                    fit_solver["pages_measured"] = measure.page_count
+                    if measure.page_count > 2:
+                        plan = plan_bullet_drops(
+                            cv=cv_try,
+                            measure=measure,
+                            drop_one=_drop_one_work_bullet_bottom_up,
+                            max_drops=max_steps - step,
+                        )
+                        fit_solver["last_plan"] = plan.to_summary()
+                        run_summary["fit_solver"] = dict(fit_solver)
+                        if plan.changes:
+                            shrink_changes.extend(plan.changes)
+                            step += len(plan.changes)
+                            cv_try = plan.cv
+                            continue
+            run_summary["fit_solver"] = dict(fit_solver)
 
         # Shrink step: keep >=3 bullets/role if possible, else allow dropping to 2.
         cv_next, change = _drop_one_work_bullet_bottom_up(cv_in=cv_try, min_bullets_per_role=3)
@@ -537,6 +597,9 @@ def tool_generate_cv_from_session(
         if change:
             shrink_changes.append(change)
         cv_try = cv_next
+        step += 1
+        if step > max_steps:
+            break
 
     if not pdf_bytes:
         if last_validation is None:
@@ -545,11 +608,12 @@ def tool_generate_cv_from_session(
         return 400, payload, "application/json"
 
     pdf_ref = f"{session_id}-{uuid.uuid4().hex}"
-    render_start = time.time()
     try:
-        render_ms = max(1, int((time.time() - render_start) * 1000))
+        # Timings and page count come from the render itself (no PDF re-parse).
+        render_ms = max(1, int(render_result.timings_ms.get("total_ms") or 0))
+        run_summary["render_timings_ms"] = dict(render_result.timings_ms)
         pdf_sha256 = hashlib.sha256(pdf_bytes).hexdigest()
-        pages = count_pdf_pages(pdf_bytes)
+        pages = render_result.page_count
         blob_info = _upload_pdf_blob_for_session(session_id=session_id, pdf_ref=pdf_ref, pdf_bytes=pdf_bytes)
         metadata = session.get("metadata") if isinstance(session.get("metadata"), dict) else {}
         metadata = dict(metadata)
@@ -576,16 +640,23 @@ def tool_generate_cv_from_session(
         metadata.pop("pdf_failed", None)  # Clear any previous failure
         persisted = False
         persist_error = None
+        # Conditional on the version `session` was loaded with; writes made since (this tool's own
+        # event append, bulk translation) are merged in instead of being overwritten.
+        loaded_etag = session.get("etag") or None
         try:
             # Use blob offload method to handle large cv_data automatically
-            persisted = bool(store.update_session_with_blob_offload(session_id, cv_data, metadata))
+            persisted, metadata = _write_session_merging_conflicts(
+                store.update_session_with_blob_offload, store, session_id, cv_data, metadata, etag=loaded_etag
+            )
         except Exception as exc:
             persist_error = str(exc)
             logging.warning("Failed to persist pdf metadata for session %s (will retry shrink): %s", session_id, exc)
         if not persisted:
             try:
                 metadata2 = _shrink_metadata_for_table(metadata)
-                persisted = bool(store.update_session_with_blob_offload(session_id, cv_data, metadata2))
+                persisted, metadata2 = _write_session_merging_conflicts(
+                    store.update_session_with_blob_offload, store, session_id, cv_data, metadata2, etag=loaded_etag
+                )
                 metadata = metadata2
             except Exception as exc:
                 persist_error = str(exc)
@@ -643,7 +714,7 @@ def tool_generate_cv_from_session(
                 meta_err = dict(meta_err) if isinstance(meta_err, dict) else {}
                 meta_err["pdf_failed"] = True
                 meta_err["pdf_generated"] = False
-                store.update_session(session_id, sess_err.get("cv_data") or {}, meta_err)
+                store.update_session(session_id, sess_err.get("cv_data") or {}, meta_err, etag=sess_err.get("etag"))
                 logging.info(f"Set pdf_failed=True for session {session_id}")
         except Exception as set_flag_exc:
             logging.warning(f"Failed to set pdf_failed flag for {session_id}: {set_flag_exc}")
@@ -127,8 +127,12 @@ def tool_get_pdf_by_ref(*, session_id: str, pdf_ref: str, session: dict) -> tupl
         return 404, {"error": "pdf_blob_pointer_missing"}, "application/json"
     try:
         store = CVBlobStore(container=container)
-        data = store.download_bytes(BlobPointer(container=container, blob_name=blob_name, content_type="application/pdf"))
-        return 200, data, "application/pdf"
+        download = store.open_download(BlobPointer(container=container, blob_name=blob_name, content_type="application/pdf"))
+        # The header arrives with the first chunk: a non-PDF blob is rejected without reading the rest.
+        first = next(download.chunks, b"")
+        if not first.startswith(b"%PDF-"):
+            return 500, {"error": "pdf_blob_invalid", "size_bytes": download.size}, "application/json"
+        return 200, first + b"".join(download.chunks), "application/pdf"
     except FileNotFoundError:
         return 404, {"error": "pdf_blob_missing"}, "application/json"
     except Exception as exc:
@@ -199,7 +199,7 @@ def tool_extract_and_store_cv(
     if photo_extracted and extracted_photo:
         try:
             blob_store = deps.blob_store_factory()
-            ptr = blob_store.upload_photo_bytes(extracted_photo)
+            ptr = blob_store.upload_photo_bytes(extracted_photo, session_id=session_id, refs=getattr(store, "blob_refs", None))
             try:
                 session = store.get_session(session_id)
                 if session:
@@ -25,6 +25,9 @@ Environment vars (optional overrides):
   CV_PDF_ALWAYS_REGENERATE=0/1
   STORAGE_CONTAINER_PDFS=<str>
   STORAGE_CONTAINER_ARTIFACTS=<str>
+  OPENAI_RESPONSE_TIMEOUT_SEC=<float>
+  OPENAI_CONNECT_TIMEOUT_SEC=<float>
+  OPENAI_TIMEOUT_SEC_<STAGE>=<float>
 
 Lab / Debug vars (development only):
   CV_OPENAI_TRACE=0/1
@@ -41,6 +44,7 @@ Lab / Debug vars (development only):
 """
 
 import os
+import re
 
 
 # ============================================================================
@@ -92,6 +96,20 @@ def _get_int_config(env_key: str, default: int, min_val: int = None) -> int:
         return default
 
 
+def _get_float_config(env_key: str, default: float, min_val: float = None) -> float:
+    """Fetch a float config from env var; enforce minimum if set."""
+    val = str(os.environ.get(env_key) or "").strip()
+    if not val:
+        return default
+    try:
+        result = float(val)
+        if min_val is not None:
+            result = max(result, min_val)
+        return result
+    except ValueError:
+        return default
+
+
 def _get_str_config(env_key: str, default: str) -> str:
     """Fetch a string config from env var."""
     val = str(os.environ.get(env_key) or "").strip()
@@ -191,4 +209,27 @@ OPENAI_PROMPT_ID: str = _get_str_config("OPENAI_PROMPT_ID", "")
 # TIMEOUTS (global defaults, can be adjusted per function)
 # ============================================================================
 
-OPENAI_RESPONSE_TIMEOUT_SEC: float = 60.0
+OPENAI_RESPONSE_TIMEOUT_SEC: float = _get_float_config("OPENAI_RESPONSE_TIMEOUT_SEC", 60.0, min_val=1.0)
+# Tool-loop turns (wizard stages) run long reasoning calls; they kept the SDK's 600s default before
+# the shared client, so their stages default to this instead of OPENAI_RESPONSE_TIMEOUT_SEC.
+OPENAI_TOOL_LOOP_TIMEOUT_SEC: float = _get_float_config("OPENAI_TOOL_LOOP_TIMEOUT_SEC", 600.0, min_val=1.0)
+OPENAI_CONNECT_TIMEOUT_SEC: float = _get_float_config("OPENAI_CONNECT_TIMEOUT_SEC", 10.0, min_val=0.5)
+
+# Read timeouts for stages whose responses are long; others use OPENAI_RESPONSE_TIMEOUT_SEC.
+OPENAI_STAGE_TIMEOUT_SEC: dict = {
+    "bulk_translation": 180.0,
+    "cv_cl_unified": 120.0,
+    "cv_combined": 120.0,
+}
+
+
+def openai_stage_timeout_sec(stage: str, default: float | None = None) -> float:
+    """Read timeout for an OpenAI call of `stage`; OPENAI_TIMEOUT_SEC_<STAGE> overrides.
+
+    Stages without an entry in OPENAI_STAGE_TIMEOUT_SEC use `default` (OPENAI_RESPONSE_TIMEOUT_SEC
+    when not given).
+    """
+    stage_key = re.sub(r"[^A-Z0-9]+", "_", str(stage or "").strip().upper()).strip("_")
+    fallback = OPENAI_RESPONSE_TIMEOUT_SEC if default is None else default
+    default = OPENAI_STAGE_TIMEOUT_SEC.get(str(stage or "").strip().lower(), fallback)
+    return _get_float_config(f"OPENAI_TIMEOUT_SEC_{stage_key}", default, min_val=1.0) if stage_key else default
@@ -6,8 +6,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
-from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
-from azure.storage.blob import BlobServiceClient, ContentSettings
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import ContentSettings
+
+from .blob_store import ensure_container, get_blob_service_client
 
 
 def _store_mode() -> str:
@@ -25,16 +27,6 @@ def _get_storage_connection_string() -> str:
     return conn_str
 
 
-def _get_blob_api_version(conn_str: str) -> Optional[str]:
-    # Keep aligned with src/blob_store.py to avoid Azurite x-ms-version issues.
-    api_version = (os.environ.get("STORAGE_BLOB_API_VERSION") or "").strip()
-    if api_version:
-        return api_version
-    if "UseDevelopmentStorage=true" in conn_str:
-        return "2023-11-03"
-    return None
-
-
 def _normalize_lang(lang: Optional[str]) -> str:
     l = str(lang or "").strip().lower()
     if not l:
@@ -100,19 +92,11 @@ class BlobProfileStore(CVProfileStore):
     def __init__(self, connection_string: Optional[str] = None, *, container: Optional[str] = None):
         conn_str = connection_string or _get_storage_connection_string()
         self.container = (container or os.environ.get("STORAGE_CONTAINER_PROFILES") or "cv-profiles").strip()
-        api_version = _get_blob_api_version(conn_str)
-        self.client = (
-            BlobServiceClient.from_connection_string(conn_str, api_version=api_version)
-            if api_version
-            else BlobServiceClient.from_connection_string(conn_str)
-        )
+        self.client = get_blob_service_client(conn_str)
         self._ensure_container()
 
     def _ensure_container(self) -> None:
-        try:
-            self.client.create_container(self.container)
-        except ResourceExistsError:
-            return
+        ensure_container(self.client, self.container)
 
     def _latest_blob_name(self, user_id: str, target_language: Optional[str]) -> str:
         lang = _normalize_lang(target_language)
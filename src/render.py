@@ -2,14 +2,40 @@ from __future__ import annotations
 
 import hashlib
 import json
+import multiprocessing
 import os
-from functools import lru_cache
 from pathlib import Path
+import re
 import subprocess
 import tempfile
-from typing import Any, Dict
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+try:
+    from src.render_cache import get_render_cache
+except Exception:
+    from render_cache import get_render_cache  # type: ignore
+
+try:
+    from src.render_pool import RenderPoolError, get_render_pool
+except Exception:
+    from render_pool import RenderPoolError, get_render_pool  # type: ignore
+
+try:
+    from src.layout_fit import CvLayoutMeasure, SectionMeasure, measure_document
+except Exception:
+    from layout_fit import CvLayoutMeasure, SectionMeasure, measure_document  # type: ignore
+
+try:
+    from src.layout_estimate import SECTION_ORDER, LayoutEstimate, estimate_cv_layout
+except Exception:
+    from layout_estimate import SECTION_ORDER, LayoutEstimate, estimate_cv_layout  # type: ignore
 
 
 TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "templates" / "html"
@@ -19,6 +45,9 @@ CSS_NAME = "cv_template_2pages_2025.css"
 CL_TEMPLATE_NAME = "cover_letter_template_2025.html"
 CL_TEMPLATE_NAME_DE = "cover_letter_template_2025_de.html"
 CL_CSS_NAME = "cover_letter_template_2025.css"
+# Jinja partials holding the DOCX-derived style overrides (shared by the inline and stylesheet modes).
+CV_DYNAMIC_CSS_NAME = "cv_dynamic_styles_2025.css.j2"
+CL_DYNAMIC_CSS_NAME = "cover_letter_dynamic_styles_2025.css.j2"
 
 CV_TEMPLATE_BY_LANGUAGE = {
     "de": TEMPLATE_NAME_DE,
@@ -28,11 +57,26 @@ CL_TEMPLATE_BY_LANGUAGE = {
     "de": CL_TEMPLATE_NAME_DE,
 }
 
+# Bump to invalidate every persisted render (e.g. after a WeasyPrint upgrade).
+RENDER_CACHE_VERSION = "1"
+
 
 class RenderError(Exception):
     pass
 
 
+class PageCountError(RenderError):
+    """The CV rendered to the wrong number of pages (2-page DoD).
+
+    Carries the failed render, whose `layout` (when known) lets callers plan the shrink from the
+    layout that was already computed instead of laying the CV out again.
+    """
+
+    def __init__(self, message: str, *, result: "RenderResult"):
+        super().__init__(message)
+        self.result = result
+
+
 def _count_pdf_pages(pdf_bytes: bytes) -> int:
     try:
         from PyPDF2 import PdfReader
@@ -62,39 +106,191 @@ def count_pdf_pages(pdf_bytes: bytes) -> int:
     return _count_pdf_pages(pdf_bytes)
 
 
-# Module-level singleton for template environment (optimization: pre-compile templates)
-_jinja_env = None
+@dataclass
+class RenderResult:
+    """A rendered PDF plus what the layout already knew about it.
 
-def _load_env() -> Environment:
-    """Load Jinja2 environment with template caching enabled"""
-    global _jinja_env
-    if _jinja_env is None:
-        _jinja_env = Environment(
-            loader=FileSystemLoader(str(TEMPLATES_DIR)),
-            autoescape=select_autoescape(["html", "xml"]),
-            trim_blocks=True,
-            lstrip_blocks=True,
-            cache_size=400,  # Enable bytecode caching
-        )
-        # Pre-compile CV templates on first load
-        _jinja_env.get_template(TEMPLATE_NAME)
-        for _tpl in CV_TEMPLATE_BY_LANGUAGE.values():
-            try:
-                _jinja_env.get_template(_tpl)
-            except Exception:
-                # Keep rendering resilient if optional localized templates are absent.
-                pass
+    `pages` and the layout metrics come straight from the WeasyPrint Document, so callers don't
+    need to re-parse the PDF. They are unknown for cache hits and the Playwright fallback; then
+    `page_count` falls back to counting pages in the PDF bytes (once). `layout` is the full
+    measurement (bullet boxes included) the shrink-to-fit solver plans from.
+    """
+
+    pdf: bytes
+    pages: Optional[int] = None
+    page_heights_mm: tuple[float, ...] = ()
+    sections: tuple[SectionMeasure, ...] = ()
+    timings_ms: Dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+    layout: Optional[CvLayoutMeasure] = None
+
+    @property
+    def page_count(self) -> int:
+        if self.pages is None:
+            self.pages = count_pdf_pages(self.pdf)
+        return self.pages
+
+
+def _elapsed_ms(t0: float) -> int:
+    return int((time.perf_counter() - t0) * 1000)
+
+
+DOCX_TEMPLATE_PATH = Path(__file__).resolve().parents[1] / "wzory" / "CV_template_2pages_2025.docx"
+
+# Used when the DOCX template is not available in the repo (tests/dev).
+# Values mirror the defaults in templates/html/cv_template_2pages_2025.css.
+_DEFAULT_CV_STYLES: Dict[str, Any] = {
+    "page_width_mm": 210.0,
+    "page_height_mm": 297.0,
+    "margin_top_mm": 20.0,
+    "margin_right_mm": 22.4,
+    "margin_bottom_mm": 20.0,
+    "margin_left_mm": 25.0,
+    "header_distance_mm": None,
+    "footer_distance_mm": None,
+    "font_family": "Arial",
+    "body_font_size_pt": 11.0,
+    "title_font_size_pt": 11.0,
+    "name_font_size_pt": 16.0,
+    "title_color_hex": "#0000ff",
+    "body_color_hex": "#000000",
+    "section_gap_mm": 6.0,
+    "bullet_hanging_mm": 5.0,
+    "page_break_after_section": "Work experience",
+}
+
+_DEFAULT_CL_STYLES: Dict[str, Any] = {
+    "page_width_mm": 210.0,
+    "page_height_mm": 297.0,
+    "margin_top_mm": 20.0,
+    "margin_right_mm": 22.4,
+    "margin_bottom_mm": 20.0,
+    "margin_left_mm": 25.0,
+    "font_family": "Arial",
+    "body_font_size_pt": 11.0,
+    "name_font_size_pt": 16.0,
+    "title_color_hex": "#0000ff",
+    "body_color_hex": "#000000",
+    "section_gap_mm": 6.0,
+}
+
+
+@dataclass(frozen=True)
+class TemplateBundle:
+    """Everything parsed from template sources, built once per template fingerprint.
+
+    Holds the DOCX-derived style tokens, the CV/cover-letter CSS text and the compiled Jinja
+    templates for every configured language, so renders never touch python-docx or the disk.
+    """
+
+    fingerprint: str
+    env: Environment
+    templates: Dict[str, Template]
+    cv_css: str
+    cl_css: str
+    cv_styles: Dict[str, Any]
+    cl_styles: Dict[str, Any]
+
+    def template(self, name: str) -> Template:
+        tpl = self.templates.get(name)
+        # Unknown names still go through the env so a missing template raises TemplateNotFound.
+        return tpl if tpl is not None else self.env.get_template(name)
+
+
+def _read_css(name: str) -> str:
+    css_path = TEMPLATES_DIR / name
+    return css_path.read_text(encoding="utf-8") if css_path.exists() else ""
+
+
+def _build_template_bundle(fingerprint: str) -> TemplateBundle:
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(["html", "xml"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        cache_size=400,  # Enable bytecode caching
+        # Source changes are detected via the bundle fingerprint; skip per-render mtime checks.
+        auto_reload=False,
+    )
+    templates: Dict[str, Template] = {}
+    # Pre-compile CV templates; the default EN CV template is mandatory.
+    templates[TEMPLATE_NAME] = env.get_template(TEMPLATE_NAME)
+    optional = [
+        *CV_TEMPLATE_BY_LANGUAGE.values(),
+        CL_TEMPLATE_NAME,
+        *CL_TEMPLATE_BY_LANGUAGE.values(),
+        CV_DYNAMIC_CSS_NAME,
+        CL_DYNAMIC_CSS_NAME,
+    ]
+    for _tpl in optional:
         try:
-            _jinja_env.get_template(CL_TEMPLATE_NAME)
+            templates[_tpl] = env.get_template(_tpl)
         except Exception:
-            # Keep CV rendering working in older checkouts where the CL template isn't present.
+            # Keep rendering resilient if optional localized / CL templates are absent.
             pass
-        for _tpl in CL_TEMPLATE_BY_LANGUAGE.values():
-            try:
-                _jinja_env.get_template(_tpl)
-            except Exception:
-                pass
-    return _jinja_env
+
+    if DOCX_TEMPLATE_PATH.exists():
+        # Import lazily so environments without `lxml` can still render using defaults.
+        # Support both `python src/render.py` and imports like `from src.render import ...`.
+        try:
+            from src.style_extractor import extract_styles_dict  # type: ignore
+        except Exception:
+            from style_extractor import extract_styles_dict  # type: ignore
+        cv_styles = extract_styles_dict(DOCX_TEMPLATE_PATH)
+        # Reuse style tokens from the CV extractor for visual consistency.
+        cl_styles = dict(cv_styles)
+    else:
+        cv_styles = dict(_DEFAULT_CV_STYLES)
+        cl_styles = dict(_DEFAULT_CL_STYLES)
+
+    return TemplateBundle(
+        fingerprint=fingerprint,
+        env=env,
+        templates=templates,
+        cv_css=_read_css(CSS_NAME),
+        cl_css=_read_css(CL_CSS_NAME),
+        cv_styles=cv_styles,
+        cl_styles=cl_styles,
+    )
+
+
+# Module-level singletons (optimization: compile templates / parse styles once per deployment)
+_template_bundle: TemplateBundle | None = None
+_jinja_env = None
+_BUNDLE_LOCK = threading.Lock()
+
+
+def get_template_bundle() -> TemplateBundle:
+    """Return the compiled template bundle, rebuilding it only when a template source changes."""
+    global _template_bundle, _jinja_env
+    fingerprint = _template_fingerprint()
+    bundle = _template_bundle
+    if bundle is not None and bundle.fingerprint == fingerprint:
+        return bundle
+    with _BUNDLE_LOCK:
+        if _template_bundle is None or _template_bundle.fingerprint != fingerprint:
+            _template_bundle = _build_template_bundle(fingerprint)
+            _jinja_env = _template_bundle.env
+        return _template_bundle
+
+
+def _load_env() -> Environment:
+    """Load Jinja2 environment with template caching enabled"""
+    return get_template_bundle().env
+
+
+def _css_mode() -> str:
+    """How CSS reaches WeasyPrint.
+
+    - inline (default): CSS text is inlined into every HTML document and re-parsed per render.
+    - stylesheet: CSS is parsed once into WeasyPrint `CSS` objects and passed as `stylesheets=`.
+    """
+    mode = str(os.environ.get("CV_RENDER_CSS_MODE") or "").strip().lower()
+    return mode if mode in {"inline", "stylesheet"} else "inline"
+
+
+def _normalize_language(language: Any) -> str:
+    return str(language or "en").strip().lower()
 
 
 def _resolve_cv_template_name(language: str | None) -> str:
@@ -107,84 +303,29 @@ def _resolve_cover_letter_template_name(language: str | None) -> str:
     return CL_TEMPLATE_BY_LANGUAGE.get(lang, CL_TEMPLATE_NAME)
 
 
+def _estimate_cv_layout(cv: Dict[str, Any], break_before: Optional[Dict[str, bool]] = None) -> LayoutEstimate:
+    return estimate_cv_layout(cv, styles=get_template_bundle().cv_styles, break_before=break_before)
+
+
 def _estimate_section_height_mm(section_key: str, cv: Dict[str, Any]) -> float:
-    section_title = 6.0
-    section_margin = 5.0
-
-    if section_key == "work_experience":
-        rows = cv.get("work_experience") if isinstance(cv.get("work_experience"), list) else []
-        total = section_title + section_margin
-        for role in (rows or [])[:12]:
-            if not isinstance(role, dict):
-                continue
-            bullets = role.get("bullets") if isinstance(role.get("bullets"), list) else []
-            bullet_count = max(1, min(6, len(bullets or [])))
-            total += 6.5 + (bullet_count * 4.2)
-        return total
-
-    if section_key in ("it_ai_skills", "technical_operational_skills"):
-        arr = cv.get(section_key) if isinstance(cv.get(section_key), list) else []
-        count = max(1, min(12, len(arr or [])))
-        return section_title + section_margin + (count * 4.2)
-
-    if section_key == "education":
-        rows = cv.get("education") if isinstance(cv.get("education"), list) else []
-        total = section_title + section_margin
-        for edu in (rows or [])[:8]:
-            if not isinstance(edu, dict):
-                continue
-            details = edu.get("details") if isinstance(edu.get("details"), list) else []
-            total += 6.0 + (min(3, len(details or [])) * 4.0)
-        return total
-
-    if section_key == "languages":
-        arr = cv.get("languages") if isinstance(cv.get("languages"), list) else []
-        count = max(1, min(8, len(arr or [])))
-        return section_title + section_margin + (count * 4.0)
-
-    if section_key == "interests":
-        txt = str(cv.get("interests") or "").strip()
-        lines = max(1, min(6, (len(txt) // 70) + 1)) if txt else 1
-        return section_title + section_margin + (lines * 4.5)
-
-    if section_key == "references":
-        txt = str(cv.get("references") or "").strip()
-        lines = max(1, min(3, (len(txt) // 80) + 1)) if txt else 1
-        return section_title + section_margin + (lines * 4.0)
-
-    return section_title + section_margin
+    """Measured height of one section (title, content and the gap above it), see `src.layout_estimate`."""
+    return _estimate_cv_layout(cv).section_heights_mm.get(section_key, 0.0)
 
 
 def _compute_soft_pagination_breaks(cv: Dict[str, Any]) -> Dict[str, bool]:
     if bool(cv.get("_disable_soft_break_before")):
         return {}
 
-    section_order = [
-        "work_experience",
-        "it_ai_skills",
-        "technical_operational_skills",
-        "education",
-        "languages",
-        "interests",
-        "references",
-    ]
-    page_content_mm = 257.0
+    natural = _estimate_cv_layout(cv)
+    page_content_mm = natural.content_height_mm
     threshold_mm = page_content_mm * 0.80
     short_section_mm = page_content_mm * 0.22
 
-    estimated = {key: _estimate_section_height_mm(key, cv) for key in section_order}
-    estimated_total = sum(estimated.values())
-
-    # Be conservative: on denser CVs prefer natural flow to avoid forcing extra pages.
-    if estimated_total > (page_content_mm * 1.55):
-        return {}
-
-    # Fallback to natural flow when 3rd-page risk is high.
-    if estimated_total > (page_content_mm * 2.0):
-        return {}
+    estimated = natural.section_heights_mm
+    section_order = list(SECTION_ORDER)
 
     hints: Dict[str, bool] = {}
-    running = 0.0
+    running = estimated.get("header", 0.0)
     for idx, key in enumerate(section_order):
         cur_h = estimated.get(key, 0.0)
         next_key = section_order[idx + 1] if idx + 1 < len(section_order) else None
@@ -195,10 +336,70 @@ def _compute_soft_pagination_breaks(cv: Dict[str, Any]) -> Dict[str, bool]:
             running = next_h
         if running > page_content_mm:
             running -= page_content_mm
+
+    # Only keep hints that don't push the CV onto an extra page; otherwise prefer natural flow.
+    if hints and _estimate_cv_layout(cv, break_before=hints).page_count > natural.page_count:
+        return {}
     return hints
 
 
-def render_html(cv: Dict[str, Any], inline_css: bool = True) -> str:
+# Rendered CV section fragments (Markup), keyed by template, fingerprint, language, section,
+# section hash and soft-break flag. Bounded LRU: wizard turns usually change one section at a time.
+_FRAGMENT_CACHE: "OrderedDict[tuple, Any]" = OrderedDict()
+_FRAGMENT_CACHE_MAX = 512
+_FRAGMENT_LOCK = threading.Lock()
+
+
+def _section_hashes(cv: Dict[str, Any]) -> Dict[str, str]:
+    try:
+        from src.context_pack import _compute_section_hash, compute_cv_section_hashes  # type: ignore
+    except Exception:
+        from context_pack import _compute_section_hash, compute_cv_section_hashes  # type: ignore
+
+    hashes = compute_cv_section_hashes(cv)
+    for key in SECTION_ORDER:
+        if key not in hashes:
+            hashes[key] = _compute_section_hash(cv.get(key))
+    return hashes
+
+
+def _render_section_fragments(
+    bundle: TemplateBundle, template_name: str, language: str, cv: Dict[str, Any], soft_breaks: Dict[str, bool]
+) -> Optional[Dict[str, Any]]:
+    """Render each CV section through its template macro, reusing cached fragments for unchanged sections.
+
+    Returns None when the template has no section macros or the data can't be hashed; the template
+    then renders the sections inline (same output).
+    """
+    module = bundle.template(template_name).module
+    macros = {key: getattr(module, f"{key}_section", None) for key in SECTION_ORDER}
+    if any(macro is None for macro in macros.values()):
+        return None
+    try:
+        hashes = _section_hashes(cv)
+    except Exception:
+        return None
+
+    fragments: Dict[str, Any] = {}
+    for key, macro in macros.items():
+        soft_break = bool(soft_breaks.get(key))
+        cache_key = (template_name, bundle.fingerprint, language, key, hashes[key], soft_break)
+        with _FRAGMENT_LOCK:
+            html = _FRAGMENT_CACHE.get(cache_key)
+            if html is not None:
+                _FRAGMENT_CACHE.move_to_end(cache_key)
+        if html is None:
+            html = macro(cv.get(key), soft_break)
+            with _FRAGMENT_LOCK:
+                _FRAGMENT_CACHE[cache_key] = html
+                while len(_FRAGMENT_CACHE) > _FRAGMENT_CACHE_MAX:
+                    _FRAGMENT_CACHE.popitem(last=False)
+        fragments[key] = html
+    return fragments
+
+
+def render_html(cv: Dict[str, Any], inline_css: bool = True, *, external_css: bool = False) -> str:
+    """Render CV HTML. With `external_css`, no <style> blocks are emitted (see `_css_mode`)."""
     # Normalize GPT/backend payload differences (e.g. interests list -> string)
     try:
         from src.normalize import normalize_cv_data  # type: ignore
@@ -217,121 +418,53 @@ def render_html(cv: Dict[str, Any], inline_css: bool = True) -> str:
     cv.setdefault('languages', [])
     cv.setdefault('interests', '')
     cv.setdefault('further_experience', [])
-    env = _load_env()
-    language = str(cv.get("language") or "en").strip().lower()
-    template = env.get_template(_resolve_cv_template_name(language))
-    css = ""
-    if inline_css:
-        css_path = TEMPLATES_DIR / CSS_NAME
-        css = css_path.read_text(encoding="utf-8") if css_path.exists() else ""
-
-    docx_path = Path(__file__).resolve().parents[1] / "wzory" / "CV_template_2pages_2025.docx"
-    if docx_path.exists():
-        # Extract styles from the DOCX template.
-        # Import lazily so environments without `lxml` can still render using defaults.
-        # Support both `python src/render.py` and imports like `from src.render import ...`.
-        try:
-            from src.style_extractor import extract_styles_dict  # type: ignore
-        except Exception:
-            from style_extractor import extract_styles_dict  # type: ignore
-        styles = extract_styles_dict(docx_path)
-    else:
-        # Keep tests/dev working even if the DOCX is not available in the repo.
-        # Values mirror the defaults in templates/html/cv_template_2pages_2025.css.
-        styles = {
-            "page_width_mm": 210.0,
-            "page_height_mm": 297.0,
-            "margin_top_mm": 20.0,
-            "margin_right_mm": 22.4,
-            "margin_bottom_mm": 20.0,
-            "margin_left_mm": 25.0,
-            "header_distance_mm": None,
-            "footer_distance_mm": None,
-            "font_family": "Arial",
-            "body_font_size_pt": 11.0,
-            "title_font_size_pt": 11.0,
-            "name_font_size_pt": 16.0,
-            "title_color_hex": "#0000ff",
-            "body_color_hex": "#000000",
-            "section_gap_mm": 6.0,
-            "bullet_hanging_mm": 5.0,
-            "page_break_after_section": "Work experience",
-        }
+    bundle = get_template_bundle()
+    language = _normalize_language(cv.get("language"))
+    template_name = _resolve_cv_template_name(language)
+    template = bundle.template(template_name)
 
     context = dict(cv)
     context["_soft_break_before"] = _compute_soft_pagination_breaks(cv)
-    if inline_css:
-        context["_inline_css"] = css
-    context["_styles"] = styles
+    fragments = _render_section_fragments(bundle, template_name, language, cv, context["_soft_break_before"])
+    if fragments:
+        context["_fragments"] = fragments
+    if inline_css and not external_css:
+        context["_inline_css"] = bundle.cv_css
+    context["_external_css"] = external_css
+    context["_page_language"] = language
+    context["_styles"] = dict(bundle.cv_styles)
     return template.render(**context)
 
 
-def render_cover_letter_html(payload: Dict[str, Any], inline_css: bool = True) -> str:
+def render_cover_letter_html(payload: Dict[str, Any], inline_css: bool = True, *, external_css: bool = False) -> str:
     """Render cover letter HTML from a backend-derived payload."""
-    env = _load_env()
-    language = str((payload or {}).get("language") or "en").strip().lower()
-    template = env.get_template(_resolve_cover_letter_template_name(language))
-    css = ""
-    if inline_css:
-        css_path = TEMPLATES_DIR / CL_CSS_NAME
-        css = css_path.read_text(encoding="utf-8") if css_path.exists() else ""
-
-    # Reuse style tokens from the CV extractor for visual consistency.
-    docx_path = Path(__file__).resolve().parents[1] / "wzory" / "CV_template_2pages_2025.docx"
-    if docx_path.exists():
-        try:
-            from src.style_extractor import extract_styles_dict  # type: ignore
-        except Exception:
-            from style_extractor import extract_styles_dict  # type: ignore
-        styles = extract_styles_dict(docx_path)
-    else:
-        styles = {
-            "page_width_mm": 210.0,
-            "page_height_mm": 297.0,
-            "margin_top_mm": 20.0,
-            "margin_right_mm": 22.4,
-            "margin_bottom_mm": 20.0,
-            "margin_left_mm": 25.0,
-            "font_family": "Arial",
-            "body_font_size_pt": 11.0,
-            "name_font_size_pt": 16.0,
-            "title_color_hex": "#0000ff",
-            "body_color_hex": "#000000",
-            "section_gap_mm": 6.0,
-        }
+    bundle = get_template_bundle()
+    language = _normalize_language((payload or {}).get("language"))
+    template = bundle.template(_resolve_cover_letter_template_name(language))
 
     context = dict(payload or {})
-    if inline_css:
-        context["_inline_css"] = css
-    context["_styles"] = styles
+    if inline_css and not external_css:
+        context["_inline_css"] = bundle.cl_css
+    context["_styles"] = dict(bundle.cl_styles)
     return template.render(**context)
 
 
-def render_cover_letter_pdf(
+def render_cover_letter(
     payload: Dict[str, Any], *, enforce_one_page: bool = True, use_cache: bool = True
-) -> bytes:
-    if use_cache:
-        cache_key = _cv_cache_key({"cover_letter": payload})
-        cl_json = json.dumps(payload, sort_keys=True)
-        pdf = _render_cover_letter_pdf_cached(cache_key, cl_json)
-    else:
-        html = render_cover_letter_html(payload, inline_css=True)
-        pdf = _render_pdf_weasyprint(html, cv_data=None)
-
+) -> RenderResult:
+    """Render the cover letter and return the PDF with page count, layout metrics and timings."""
+    result = _render_with_cache("cover_letter", payload or {}, use_cache=use_cache)
     if enforce_one_page:
-        pages = count_pdf_pages(pdf)
+        pages = result.page_count
         if pages != 1:
             raise RenderError(f"DoD violation: pages != 1 (got {pages}).")
-    return pdf
+    return result
 
 
-@lru_cache(maxsize=16)
-def _render_cover_letter_pdf_cached(cache_key: str, payload_json: str) -> bytes:
-    """Cached CL rendering (same cache infra as CV, but distinct renderer)."""
-    _ = cache_key  # stable key; payload_json is used for correctness
-    data = json.loads(payload_json)
-    html = render_cover_letter_html(data, inline_css=True)
-    return _render_pdf_weasyprint(html, cv_data=None)
+def render_cover_letter_pdf(
+    payload: Dict[str, Any], *, enforce_one_page: bool = True, use_cache: bool = True
+) -> bytes:
+    return render_cover_letter(payload, enforce_one_page=enforce_one_page, use_cache=use_cache).pdf
 
 
 # Module-level singleton for WeasyPrint font configuration (optimization: cache fonts)
@@ -349,24 +482,71 @@ def _get_font_config():
             _font_config = None
     return _font_config
 
-def _render_pdf_weasyprint(html: str, cv_data: Dict[str, Any] = None) -> bytes:
+def _stylesheet_sources(kind: str, language: str) -> list[str]:
+    """CSS texts for `kind`, in the same cascade order the templates use when inlining them."""
+    bundle = get_template_bundle()
+    if kind == "cover_letter":
+        overrides = bundle.template(CL_DYNAMIC_CSS_NAME).render(_styles=bundle.cl_styles)
+        return [overrides + "\n" + bundle.cl_css]
+    overrides = bundle.template(CV_DYNAMIC_CSS_NAME).render(_styles=bundle.cv_styles, _page_language=language)
+    return [bundle.cv_css, overrides]
+
+
+_STYLESHEET_CACHE: dict[tuple, list] = {}
+
+
+def _get_weasyprint_stylesheets(kind: str, language: str) -> list:
+    """Pre-parsed WeasyPrint `CSS` objects bound to the cached font config, reused until the bundle changes."""
+    from weasyprint import CSS
+
+    fingerprint = get_template_bundle().fingerprint
+    key = (fingerprint, kind, language)
+    sheets = _STYLESHEET_CACHE.get(key)
+    if sheets is None:
+        font_config = _get_font_config()
+        kwargs = {"font_config": font_config} if font_config else {}
+        sheets = [CSS(string=src, **kwargs) for src in _stylesheet_sources(kind, language)]
+        for stale in [k for k in _STYLESHEET_CACHE if k[0] != fingerprint]:
+            _STYLESHEET_CACHE.pop(stale, None)
+        _STYLESHEET_CACHE[key] = sheets
+    return sheets
+
+
+def _inline_stylesheet_sources(html: str, kind: str, language: str) -> str:
+    """Put external stylesheets back into the HTML (renderers that can't take parsed CSS)."""
+    styles = "".join(f"<style>{src}</style>" for src in _stylesheet_sources(kind, language))
+    return html.replace("</head>", styles + "</head>", 1)
+
+
+def _layout_weasyprint(html: str, stylesheets: list | None = None):
+    """Lay out HTML with WeasyPrint and return the rendered Document (no PDF write)."""
+    from weasyprint import HTML
+
+    kwargs: Dict[str, Any] = {}
+    if stylesheets:
+        kwargs["stylesheets"] = stylesheets
+    # Use cached font configuration for faster rendering
+    font_config = _get_font_config()
+    if font_config:
+        kwargs["font_config"] = font_config
+    return HTML(string=html).render(**kwargs)
+
+
+def _render_weasyprint(
+    html: str, cv_data: Dict[str, Any] = None, *, css_spec: tuple[str, str] | None = None
+) -> RenderResult:
     """Render PDF using WeasyPrint (pure Python, no browser needed)
 
     Args:
         html: HTML string to render
         cv_data: Optional CV data for metadata (Author, Title)
+        css_spec: Optional (kind, language) of pre-parsed stylesheets when the HTML carries no CSS
     """
     try:
-        from weasyprint import HTML
-
-        # Use cached font configuration for faster rendering
-        font_config = _get_font_config()
-
-        # Render HTML to document
-        if font_config:
-            doc = HTML(string=html).render(font_config=font_config)
-        else:
-            doc = HTML(string=html).render()
+        t0 = time.perf_counter()
+        stylesheets = _get_weasyprint_stylesheets(*css_spec) if css_spec else None
+        doc = _layout_weasyprint(html, stylesheets)
+        layout_ms = _elapsed_ms(t0)
 
         # Build PDF metadata
         metadata = {}
@@ -382,12 +562,14 @@ def _render_pdf_weasyprint(html: str, cv_data: Dict[str, Any] = None) -> bytes:
         metadata['producer'] = 'WeasyPrint'
 
         # Write PDF with metadata
-        return doc.write_pdf(
+        t1 = time.perf_counter()
+        pdf = doc.write_pdf(
             pdf_version='1.7',  # Widest compatibility
             pdf_forms=False,    # Not needed for CVs
             uncompressed_pdf=False,  # Keep compressed for smaller file size
             custom_metadata=metadata if metadata else None
         )
+        write_ms = _elapsed_ms(t1)
     except Exception as exc:
         # WeasyPrint on Windows often requires external native deps (GTK/Pango).
         # IMPORTANT: Do NOT silently switch renderers in production.
@@ -399,11 +581,79 @@ def _render_pdf_weasyprint(html: str, cv_data: Dict[str, Any] = None) -> bytes:
             "yes",
         }
         if os.name == "nt" and (allow_playwright or not renderer):
-            return _render_pdf_playwright(html)
+            t0 = time.perf_counter()
+            pdf = _render_pdf_playwright(_inline_stylesheet_sources(html, *css_spec) if css_spec else html)
+            return RenderResult(pdf=pdf, timings_ms={"layout_ms": 0, "write_ms": _elapsed_ms(t0)})
         raise RenderError(
             "WeasyPrint failed to render PDF. Install WeasyPrint native dependencies, or set CV_PDF_RENDERER=playwright for local Windows testing."
         ) from exc
 
+    result = RenderResult(pdf=pdf, pages=len(doc.pages), timings_ms={"layout_ms": layout_ms, "write_ms": write_ms})
+    try:
+        measure = measure_document(doc)
+        result.page_heights_mm = measure.page_used_mm
+        result.sections = measure.sections
+        result.layout = measure
+    except Exception:
+        # Metrics are best-effort; the PDF itself is fine.
+        pass
+    return result
+
+
+def _render_document(
+    kind: str, html: str, cv_data: Dict[str, Any] | None = None, *, css_language: str | None = None
+) -> RenderResult:
+    """HTML -> PDF on the pre-warmed worker pool when enabled, otherwise on the calling thread.
+
+    `css_language` is set when `html` was rendered with `external_css=True`; the matching
+    pre-parsed stylesheets are then applied by whichever process does the layout.
+    """
+    css_spec = (kind, css_language) if css_language is not None else None
+    pool = get_render_pool()
+    if pool is None:
+        return _render_weasyprint(html, cv_data=cv_data, css_spec=css_spec)
+    # Workers only need the PDF metadata fields; keep the pickled payload small.
+    meta = {"full_name": str((cv_data or {}).get("full_name") or "")} if cv_data else {}
+    if css_language is not None:
+        meta["_css_language"] = css_language
+    try:
+        result = pool.render(kind, html, meta)
+    except RenderPoolError as exc:
+        raise RenderError(f"Render worker failed: {exc}") from exc
+    return result if isinstance(result, RenderResult) else RenderResult(pdf=result)
+
+
+def _render_with_cache(
+    kind: str,
+    data: Dict[str, Any],
+    *,
+    use_cache: bool,
+    cache_if: Optional[Callable[[RenderResult], bool]] = None,
+) -> RenderResult:
+    """Render `kind` or return the cached PDF. Fresh renders are stored only if `cache_if` accepts them."""
+    t0 = time.perf_counter()
+    cache = get_render_cache() if use_cache else None
+    cache_key = _render_cache_key(kind, data) if cache is not None else ""
+    pdf = cache.get(cache_key) if cache is not None else None
+    if pdf is not None:
+        return RenderResult(pdf=pdf, cached=True, timings_ms={"total_ms": _elapsed_ms(t0)})
+
+    external = _css_mode() == "stylesheet"
+    t_html = time.perf_counter()
+    if kind == "cover_letter":
+        html = render_cover_letter_html(data, external_css=external)
+        cv_data = None
+    else:
+        html = render_html(data, external_css=external)
+        cv_data = data
+    html_ms = _elapsed_ms(t_html)
+    css_language = _normalize_language(data.get("language")) if external else None
+    result = _render_document(kind, html, cv_data=cv_data, css_language=css_language)
+    if cache is not None and (cache_if is None or cache_if(result)):
+        cache.put(cache_key, result.pdf)
+    result.timings_ms = {"html_ms": html_ms, **result.timings_ms, "total_ms": _elapsed_ms(t0)}
+    return result
+
 
 def _render_pdf_playwright(html: str) -> bytes:
     script_path = Path(__file__).resolve().parents[1] / "scripts" / "print_pdf_playwright.mjs"
@@ -467,60 +717,91 @@ def _cv_cache_key(cv: Dict[str, Any]) -> str:
     return hashlib.sha256(normalized.encode()).hexdigest()
 
 
-@lru_cache(maxsize=32)
-def _render_pdf_cached(cache_key: str, cv_json: str, enforce_two_pages: bool) -> bytes:
-    """
-    Cached PDF rendering using LRU cache.
+_FINGERPRINT_CACHE: dict[tuple, str] = {}
+# (monotonic time of the last source check, fingerprint); see `_template_fingerprint`.
+_FINGERPRINT_CHECKED: tuple[float, str] | None = None
 
-    Args:
-        cache_key: SHA256 hash of CV data (for cache invalidation)
-        cv_json: JSON-serialized CV data
-        enforce_two_pages: Whether to enforce 2-page constraint
 
-    Returns:
-        Rendered PDF bytes
+def _fingerprint_check_interval() -> float:
+    try:
+        return max(0.0, float(str(os.environ.get("CV_TEMPLATE_CHECK_INTERVAL_SEC") or "").strip() or 5.0))
+    except ValueError:
+        return 5.0
 
-    Note: This is a separate function to enable @lru_cache decorator.
-    """
-    cv_data = json.loads(cv_json)
-    html = render_html(cv_data, inline_css=True)
-    return _render_pdf_weasyprint(html, cv_data=cv_data)
 
+def reload_templates() -> None:
+    """Forget the template fingerprint so the next render re-checks sources (and rebuilds if changed)."""
+    global _FINGERPRINT_CHECKED
+    _FINGERPRINT_CHECKED = None
+    _FINGERPRINT_CACHE.clear()
 
-def render_pdf(cv: Dict[str, Any], *, enforce_two_pages: bool = True, use_cache: bool = True) -> bytes:
+
+def _template_fingerprint() -> str:
+    """Hash of every input that shapes the PDF besides the data: HTML templates, CSS, DOCX styles.
+
+    Sources are listed and stat'ed at most once per CV_TEMPLATE_CHECK_INTERVAL_SEC (default 5s;
+    `reload_templates()` forces a check), and hashed only when a file's mtime/size changed, so
+    template deploys still invalidate the persistent render cache automatically.
     """
-    Generate PDF from CV data using WeasyPrint.
+    global _FINGERPRINT_CHECKED
+    checked = _FINGERPRINT_CHECKED
+    if checked is not None and time.monotonic() - checked[0] < _fingerprint_check_interval():
+        return checked[1]
+    fingerprint = _stat_template_fingerprint()
+    _FINGERPRINT_CHECKED = (time.monotonic(), fingerprint)
+    return fingerprint
+
+
+def _stat_template_fingerprint() -> str:
+    sources = sorted(p for p in TEMPLATES_DIR.glob("*") if p.suffix in {".html", ".css", ".j2"})
+    if DOCX_TEMPLATE_PATH.exists():
+        sources.append(DOCX_TEMPLATE_PATH)
+    stamp = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in sources)
+    cached = _FINGERPRINT_CACHE.get(stamp)
+    if cached is not None:
+        return cached
+    h = hashlib.sha256(RENDER_CACHE_VERSION.encode("utf-8"))
+    for p in sources:
+        h.update(p.name.encode("utf-8"))
+        h.update(p.read_bytes())
+    fingerprint = h.hexdigest()
+    _FINGERPRINT_CACHE.clear()
+    _FINGERPRINT_CACHE[stamp] = fingerprint
+    return fingerprint
+
+
+def _render_cache_key(kind: str, data: Dict[str, Any]) -> str:
+    """Content address for a rendered PDF: document kind + data hash + template fingerprint."""
+    raw = f"{kind}:{_cv_cache_key(data)}:{_template_fingerprint()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def render_cv(cv: Dict[str, Any], *, enforce_two_pages: bool = True, use_cache: bool = True) -> RenderResult:
+    """
+    Generate the CV PDF and return it with page count, layout metrics and render timings.
 
     Args:
         cv: CV data dictionary
         enforce_two_pages: Whether to enforce 2-page DoD constraint
         use_cache: Whether to use render caching (default: True)
 
-    Returns:
-        PDF bytes
-
-    Note: Caching provides ~40-60% speedup for repeated renders with same CV data.
-    Particularly useful for validate → generate workflows in session-based processing.
+    Note: Renders are cached by content (CV data + template fingerprint) in the shared
+    render cache (memory → disk, plus blob when CV_RENDER_CACHE_MODE=blob), so repeated
+    generate/download flows skip WeasyPrint across workers on the same host. Only two-page
+    renders are cached: a cache hit carries no layout, and the fit loop needs the layout of
+    every render that fails the page check.
     """
-    if use_cache:
-        # Use cached rendering
-        cache_key = _cv_cache_key(cv)
-        cv_json = json.dumps(cv, sort_keys=True)
-        pdf = _render_pdf_cached(cache_key, cv_json, enforce_two_pages)
-    else:
-        # Direct rendering (no cache)
-        html = render_html(cv, inline_css=True)
-        pdf = _render_pdf_weasyprint(html, cv_data=cv)
+    result = _render_with_cache("cv", cv, use_cache=use_cache, cache_if=lambda r: r.page_count == 2)
 
     if enforce_two_pages:
         # DoD: PDF must have exactly 2 pages
-        pages = count_pdf_pages(pdf)
+        pages = result.page_count
         if pages != 2:
-            raise RenderError(f"DoD violation: pages != 2 (got {pages}).")
+            raise PageCountError(f"DoD violation: pages != 2 (got {pages}).", result=result)
 
     # Sanity check: PDF should have meaningful content
     # Minimum expected size: ~40KB for empty template, ~100KB+ for filled template
-    pdf_size = len(pdf)
+    pdf_size = len(result.pdf)
     work_exp_count = len(cv.get('work_experience', []))
     education_count = len(cv.get('education', []))
     full_name = cv.get('full_name', '').strip()
@@ -535,7 +816,163 @@ def render_pdf(cv: Dict[str, Any], *, enforce_two_pages: bool = True, use_cache:
                 f"This may indicate incomplete cv_data input."
             )
 
-    return pdf
+    return result
+
+
+def render_pdf(cv: Dict[str, Any], *, enforce_two_pages: bool = True, use_cache: bool = True) -> bytes:
+    """
+    Generate PDF from CV data using WeasyPrint.
+
+    Args:
+        cv: CV data dictionary
+        enforce_two_pages: Whether to enforce 2-page DoD constraint
+        use_cache: Whether to use render caching (default: True)
+
+    Returns:
+        PDF bytes
+
+    Note: Thin wrapper over `render_cv` for callers that only need the bytes.
+    """
+    return render_cv(cv, enforce_two_pages=enforce_two_pages, use_cache=use_cache).pdf
+
+
+@dataclass
+class BatchRenderItem:
+    """Outcome of one payload in `render_cv_batch`; exactly one of `result` / `error` is set."""
+
+    index: int
+    item_id: Optional[str] = None
+    filename: str = "CV.pdf"
+    result: Optional[RenderResult] = None
+    error: Optional[str] = None
+    validation_errors: list[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+
+
+_BATCH_FILENAME_MAX_CHARS = 80
+
+
+def _batch_filename(full_name: Any) -> str:
+    """Zip-safe PDF name from the candidate's name: no path separators, bounded length."""
+    stem = re.sub(r"[^\w.-]+", "_", str(full_name or "CV")).strip("._")[:_BATCH_FILENAME_MAX_CHARS]
+    return f"{stem or 'CV'}.pdf"
+
+
+def _batch_workers() -> int:
+    try:
+        workers = int(str(os.environ.get("CV_RENDER_BATCH_WORKERS") or "").strip() or 0)
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else max(1, min(4, os.cpu_count() or 1))
+
+
+def _render_batch_job(cv: Dict[str, Any], enforce_two_pages: bool, use_cache: bool) -> RenderResult:
+    # Module-level so process-pool workers can unpickle it by reference.
+    return render_cv(cv, enforce_two_pages=enforce_two_pages, use_cache=use_cache)
+
+
+def _prepare_batch_item(index: int, payload: Any, *, validate: bool) -> tuple[BatchRenderItem, Optional[Dict[str, Any]]]:
+    """Normalize/validate one batch payload (`{...CVData}` or `{"id": ..., "cv_data": {...}}`)."""
+    try:
+        from src.normalize import normalize_cv_data  # type: ignore
+        from src.validator import validate_cv  # type: ignore
+    except Exception:
+        from normalize import normalize_cv_data  # type: ignore
+        from validator import validate_cv  # type: ignore
+
+    item = BatchRenderItem(index=index)
+    cv = payload.get("cv_data") if isinstance(payload, dict) and "cv_data" in payload else payload
+    if isinstance(payload, dict) and payload.get("id") is not None:
+        item.item_id = str(payload.get("id"))
+    if not isinstance(cv, dict) or not cv:
+        item.error = "Invalid cv_data"
+        return item, None
+
+    missing = [f for f in ("full_name", "email") if f not in cv]
+    if missing:
+        item.error = f"Missing required fields: {', '.join(missing)}"
+        return item, None
+
+    cv = normalize_cv_data(cv)
+    item.filename = _batch_filename(cv.get("full_name"))
+    if validate:
+        validation = validate_cv(cv)
+        if not validation.is_valid:
+            item.error = "CV validation failed - exceeds 2-page limit"
+            item.validation_errors = [
+                {
+                    "field": err.field,
+                    "current": err.current_value,
+                    "limit": err.limit,
+                    "excess": err.excess,
+                    "message": err.message,
+                    "suggestion": err.suggestion,
+                }
+                for err in validation.errors
+            ]
+            return item, None
+    return item, cv
+
+
+def render_cv_batch(
+    payloads: Iterable[Any],
+    *,
+    max_workers: Optional[int] = None,
+    enforce_two_pages: bool = True,
+    use_cache: bool = True,
+    validate: bool = True,
+    executor: Optional[Executor] = None,
+) -> Iterator[BatchRenderItem]:
+    """
+    Render many CVs concurrently, yielding each item as soon as it is done (completion order).
+
+    Payloads are normalized and validated up front; invalid ones are yielded immediately with
+    their errors and never reach a worker. A failing render only fails its own item.
+
+    Rendering runs on a spawned process pool (`CV_RENDER_BATCH_WORKERS`, default min(4, CPUs)).
+    When the render worker pool is enabled (`CV_RENDER_POOL_SIZE`), threads are enough: each
+    render already hands WeasyPrint off to a pooled process. Pass `executor` to supply your own.
+    """
+    prepared: list[tuple[BatchRenderItem, Dict[str, Any]]] = []
+    for index, payload in enumerate(payloads):
+        try:
+            item, cv = _prepare_batch_item(index, payload, validate=validate)
+        except Exception as exc:
+            item, cv = BatchRenderItem(index=index, error=f"{type(exc).__name__}: {exc}"), None
+        if cv is None:
+            yield item
+        else:
+            prepared.append((item, cv))
+    if not prepared:
+        return
+
+    own_executor = executor is None
+    if executor is None:
+        workers = min(max_workers or _batch_workers(), len(prepared))
+        if get_render_pool() is not None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cv-batch")
+        else:
+            # Spawn (not fork), same reasoning as the render pool: the hosts keep threads alive.
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    try:
+        futures = {
+            executor.submit(_render_batch_job, cv, enforce_two_pages, use_cache): item for item, cv in prepared
+        }
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                item.result = future.result()
+            except Exception as exc:
+                item.error = f"{type(exc).__name__}: {exc}"
+            yield item
+    finally:
+        if own_executor:
+            # Don't block on queued renders if the consumer went away (client disconnect).
+            executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     import json
@@ -0,0 +1,336 @@
+"""
+Content-addressed PDF render cache shared across workers.
+
+Tiers (checked in order, hits are promoted to the faster tiers):
+  - memory: per-process LRU bounded by total bytes
+  - disk:   per-instance directory (survives worker recycling on the same host); the directory is
+            scanned once at startup, then its size is tracked per put/get and pruned only when
+            over budget
+  - blob:   shared container, so every Functions instance reuses renders after a cold start.
+            Opt-in (CV_RENDER_CACHE_MODE=blob): a blob hit costs a storage round trip plus a
+            write on every miss, which only pays off with many instances rendering the same CVs.
+
+Keys are opaque hex digests built by `src.render` from the CV cache key plus the template/CSS/style
+fingerprint, so a template deploy naturally invalidates every entry.
+
+Environment vars (optional overrides):
+  CV_RENDER_CACHE_MODE=off|memory|local|blob   (default: local; blob falls back to local)
+  CV_RENDER_CACHE_MEMORY_MB=<int>              (default: 64)
+  CV_RENDER_CACHE_DISK_MB=<int>                (default: 512)
+  CV_RENDER_CACHE_DIR=<path>                   (default: <system temp>/cv_render_cache)
+  STORAGE_CONTAINER_RENDER_CACHE=<str>         (default: cv-render-cache)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class CacheTierStats:
+    hits: int = 0
+    misses: int = 0
+    puts: int = 0
+    evictions: int = 0
+    errors: int = 0
+    bytes: int = 0
+
+
+class RenderCacheTier:
+    """Byte store keyed by content digest. Implementations must never raise on get/put."""
+
+    name = "tier"
+
+    def __init__(self) -> None:
+        self.stats = CacheTierStats()
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def put(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryRenderCache(RenderCacheTier):
+    name = "memory"
+
+    def __init__(self, *, max_bytes: int) -> None:
+        super().__init__()
+        self.max_bytes = max(0, int(max_bytes))
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.stats.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        size = len(data or b"")
+        if not data or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.stats.bytes -= len(old)
+            self._items[key] = data
+            self.stats.bytes += size
+            self.stats.puts += 1
+            while self.stats.bytes > self.max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self.stats.bytes -= len(evicted)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.stats.bytes = 0
+
+
+class DiskRenderCache(RenderCacheTier):
+    name = "disk"
+
+    def __init__(self, *, root_dir: str, max_bytes: int) -> None:
+        super().__init__()
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max(0, int(max_bytes))
+        # path -> size, least recently used first; seeded by one scan, then kept in step with puts.
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pdf"
+
+    def _scan(self) -> None:
+        try:
+            found = []
+            for f in self.root.glob("*/*.pdf"):
+                st = f.stat()
+                found.append((st.st_mtime, st.st_size, f))
+        except Exception:
+            return
+        with self._lock:
+            for _, size, f in sorted(found, key=lambda e: e[0]):
+                self._entries[f] = size
+            self.stats.bytes = sum(self._entries.values())
+        self._prune()
+
+    def _track(self, p: Path, size: int) -> None:
+        with self._lock:
+            old = self._entries.pop(p, None)
+            self._entries[p] = size
+            self.stats.bytes += size - (old or 0)
+
+    def get(self, key: str) -> Optional[bytes]:
+        p = self._path(key)
+        try:
+            data = p.read_bytes()
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except Exception:
+            self.stats.errors += 1
+            return None
+        try:
+            # Touch so a restart's scan keeps recently used entries.
+            os.utime(p, None)
+        except Exception:
+            pass
+        # Also picks up entries another worker on this host wrote after the scan.
+        self._track(p, len(data))
+        self.stats.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        p = self._path(key)
+        try:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            # Atomic publish: concurrent workers may race on the same key.
+            fd, tmp_name = tempfile.mkstemp(dir=str(p.parent), suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_name, p)
+            self.stats.puts += 1
+        except Exception as exc:
+            self.stats.errors += 1
+            logging.debug("Render cache disk put failed key=%s err=%s", key[:12], exc)
+            return
+        self._track(p, len(data))
+        if self.stats.bytes > self.max_bytes:
+            self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            while self.stats.bytes > self.max_bytes and self._entries:
+                f, size = self._entries.popitem(last=False)
+                self.stats.bytes -= size
+                try:
+                    f.unlink()
+                except FileNotFoundError:
+                    continue  # already pruned by another worker
+                except Exception:
+                    continue
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        for f in self.root.glob("*/*.pdf"):
+            try:
+                f.unlink()
+            except Exception:
+                pass
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = 0
+
+
+class BlobRenderCache(RenderCacheTier):
+    name = "blob"
+
+    def __init__(self, *, container: str) -> None:
+        super().__init__()
+        from src.blob_store import CVBlobStore
+
+        self.store = CVBlobStore(container=container)
+
+    def _blob_name(self, key: str) -> str:
+        return f"pdf/{key[:2]}/{key}.pdf"
+
+    def get(self, key: str) -> Optional[bytes]:
+        from src.blob_store import BlobPointer
+
+        pointer = BlobPointer(
+            container=self.store.container, blob_name=self._blob_name(key), content_type="application/pdf"
+        )
+        try:
+            data = self.store.download_bytes(pointer)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        except Exception as exc:
+            # Treat any storage error as a cache miss; rendering must continue.
+            self.stats.errors += 1
+            logging.debug("Render cache blob get failed key=%s err=%s", key[:12], exc)
+            return None
+        self.stats.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data:
+            return
+        try:
+            self.store.upload_bytes(blob_name=self._blob_name(key), data=data, content_type="application/pdf")
+            self.stats.puts += 1
+        except Exception as exc:
+            self.stats.errors += 1
+            logging.debug("Render cache blob put failed key=%s err=%s", key[:12], exc)
+
+    def clear(self) -> None:
+        try:
+            self.store.delete_prefix("pdf/")
+        except Exception:
+            self.stats.errors += 1
+
+
+class RenderCache:
+    """Read-through over ordered tiers; a hit in a slower tier is copied into the faster ones."""
+
+    def __init__(self, tiers: list[RenderCacheTier]):
+        self.tiers = list(tiers)
+
+    def get(self, key: str) -> Optional[bytes]:
+        for idx, tier in enumerate(self.tiers):
+            data = tier.get(key)
+            if data is not None:
+                for faster in self.tiers[:idx]:
+                    faster.put(key, data)
+                return data
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        for tier in self.tiers:
+            tier.put(key, data)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> dict:
+        return {tier.name: asdict(tier.stats) for tier in self.tiers}
+
+
+def _cache_mode() -> str:
+    mode = str(os.environ.get("CV_RENDER_CACHE_MODE") or "").strip().lower()
+    return mode if mode in {"off", "memory", "local", "blob"} else "local"
+
+
+def _env_mb(env_key: str, default: int) -> int:
+    try:
+        return max(0, int(str(os.environ.get(env_key) or "").strip() or default)) * 1024 * 1024
+    except ValueError:
+        return default * 1024 * 1024
+
+
+def build_render_cache(mode: Optional[str] = None) -> RenderCache:
+    mode = mode or _cache_mode()
+    if mode == "off":
+        return RenderCache([])
+
+    tiers: list[RenderCacheTier] = [MemoryRenderCache(max_bytes=_env_mb("CV_RENDER_CACHE_MEMORY_MB", 64))]
+    if mode == "memory":
+        return RenderCache(tiers)
+
+    try:
+        # System temp rather than the app dir: Functions run-from-package mounts wwwroot read-only.
+        root = os.environ.get("CV_RENDER_CACHE_DIR") or str(Path(tempfile.gettempdir()) / "cv_render_cache")
+        tiers.append(DiskRenderCache(root_dir=root, max_bytes=_env_mb("CV_RENDER_CACHE_DISK_MB", 512)))
+    except Exception as exc:
+        logging.warning("Render cache disk tier unavailable: %s", exc)
+
+    if mode == "blob":
+        try:
+            container = (os.environ.get("STORAGE_CONTAINER_RENDER_CACHE") or "cv-render-cache").strip()
+            tiers.append(BlobRenderCache(container=container))
+        except Exception:
+            # Fallback to local tiers if blob isn't configured/reachable (tests/offline dev).
+            pass
+    return RenderCache(tiers)
+
+
+_RENDER_CACHE: RenderCache | None = None
+_RENDER_CACHE_LOCK = threading.Lock()
+
+
+def get_render_cache() -> RenderCache:
+    global _RENDER_CACHE
+    if _RENDER_CACHE is not None:
+        return _RENDER_CACHE
+    with _RENDER_CACHE_LOCK:
+        if _RENDER_CACHE is None:
+            _RENDER_CACHE = build_render_cache()
+    return _RENDER_CACHE
+
+
+def set_render_cache(cache: RenderCache | None) -> None:
+    """Swap the process-wide cache (tests, or reconfiguration after env changes)."""
+    global _RENDER_CACHE
+    with _RENDER_CACHE_LOCK:
+        _RENDER_CACHE = cache
@@ -0,0 +1,282 @@
+"""
+Pre-warmed WeasyPrint render worker pool.
+
+WeasyPrint layout is CPU-bound and holds the GIL for seconds, so rendering on the request thread
+stalls every other request served by the same worker. When enabled, `src.render` hands the final
+HTML -> PDF step to a small pool of worker processes that have already imported WeasyPrint,
+loaded the Jinja env and built the font configuration.
+
+Each worker owns a pipe; the pool hands out idle workers from a queue, so concurrency is capped by
+the pool size and extra renders wait in line. A job that exceeds its timeout, or a worker that
+crashes (segfault in native deps, OOM kill), only loses that job: the worker is terminated and
+replaced, and the caller gets a RenderError.
+
+Environment vars (optional overrides):
+  CV_RENDER_POOL_SIZE=<int>              (default: 0 = render in-process)
+  CV_RENDER_POOL_TIMEOUT_S=<float>       (default: 60, per render job)
+  CV_RENDER_POOL_QUEUE_TIMEOUT_S=<float> (default: 30, wait for a free worker)
+  CV_RENDER_POOL_MAX_JOBS=<int>          (default: 200, recycle a worker after N jobs)
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Job handler signature: (kind, html, meta) -> picklable render output (RenderResult or PDF bytes).
+# Must be a module-level function (workers are spawned, so the handler is pickled by reference).
+JobHandler = Callable[[str, str, Dict[str, Any]], Any]
+
+
+class RenderPoolError(Exception):
+    pass
+
+
+def _warm_renderer() -> None:
+    """Pay import/config costs once per worker instead of on the first render."""
+    try:
+        from src import render  # type: ignore
+    except Exception:
+        import render  # type: ignore
+
+    render._load_env()
+    try:
+        import weasyprint  # noqa: F401
+    except Exception:
+        # Surface the real error on the first job (same message as in-process rendering).
+        return
+    render._get_font_config()
+
+
+def _render_job(kind: str, html: str, meta: Dict[str, Any]) -> Any:
+    try:
+        from src import render  # type: ignore
+    except Exception:
+        import render  # type: ignore
+
+    meta = dict(meta or {})
+    css_language = meta.pop("_css_language", None)
+    if css_language is not None:
+        # Stylesheets are parsed once per worker and reused for every job.
+        return render._render_weasyprint(html, cv_data=meta or None, css_spec=(kind, css_language))
+    return render._render_weasyprint(html, cv_data=meta or None)
+
+
+def _worker_main(conn: Any, handler: JobHandler, warm: Optional[Callable[[], None]]) -> None:
+    if warm is not None:
+        try:
+            warm()
+        except Exception as exc:
+            logging.warning("Render worker warm-up failed: %s", exc)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        kind, html, meta = job
+        try:
+            conn.send(("ok", handler(kind, html, meta)))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}"))
+
+
+class _Worker:
+    def __init__(self, ctx: Any, handler: JobHandler, warm: Optional[Callable[[], None]]):
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, handler, warm), name="cv-render-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self, *, kill: bool = False) -> None:
+        if not kill:
+            try:
+                self.conn.send(None)
+            except Exception:
+                kill = True
+        if kill and self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class RenderPool:
+    """Fixed-size pool of pre-warmed render processes with per-job timeouts and crash isolation."""
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        job_timeout_s: float = 60.0,
+        queue_timeout_s: float = 30.0,
+        max_jobs_per_worker: int = 200,
+        handler: JobHandler = _render_job,
+        warm: Optional[Callable[[], None]] = _warm_renderer,
+    ) -> None:
+        if size < 1:
+            raise ValueError("RenderPool size must be >= 1")
+        self.size = int(size)
+        self.job_timeout_s = float(job_timeout_s)
+        self.queue_timeout_s = float(queue_timeout_s)
+        self.max_jobs_per_worker = max(0, int(max_jobs_per_worker))
+        self._handler = handler
+        self._warm = warm
+        # Spawn (not fork): the Functions host and Flask keep threads alive, and forking a
+        # threaded process can deadlock the child on inherited locks.
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self.stats = {"jobs": 0, "errors": 0, "timeouts": 0, "crashes": 0, "recycled": 0, "queue_wait_ms": 0}
+        # Start every worker up front so they warm up in parallel before the first job arrives.
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self._handler, self._warm)
+
+    def _count(self, **deltas: int) -> None:
+        # Renders run on many request threads; `+=` on a shared dict is not atomic.
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+
+    def _release(self, worker: _Worker, *, replace: bool, kill: bool = False) -> None:
+        if replace:
+            worker.stop(kill=kill)
+            if self._closed:
+                return
+            # Starting a process takes a while: do it outside the lock, only the hand-off is locked.
+            worker = self._spawn()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._idle.put(worker)
+        if closed:
+            worker.stop()
+
+    def render(
+        self, kind: str, html: str, meta: Optional[Dict[str, Any]] = None, *, timeout_s: Optional[float] = None
+    ) -> Any:
+        """Render one job on a pooled worker. Raises RenderPoolError on timeout/crash/render failure."""
+        if self._closed:
+            raise RenderPoolError("Render pool is closed.")
+        t0 = time.monotonic()
+        try:
+            worker = self._idle.get(timeout=self.queue_timeout_s)
+        except queue.Empty as exc:
+            raise RenderPoolError(
+                f"No render worker became free within {self.queue_timeout_s:.0f}s (pool size={self.size})."
+            ) from exc
+        self._count(jobs=1, queue_wait_ms=int((time.monotonic() - t0) * 1000))
+
+        if not worker.alive():
+            # Died while idle (e.g. OOM kill); swap in a fresh one for this job.
+            self._count(crashes=1)
+            worker.stop(kill=True)
+            worker = self._spawn()
+
+        limit = self.job_timeout_s if timeout_s is None else float(timeout_s)
+        try:
+            worker.conn.send((kind, html, dict(meta or {})))
+            if not worker.conn.poll(limit):
+                self._count(timeouts=1)
+                self._release(worker, replace=True, kill=True)
+                raise RenderPoolError(f"Render job timed out after {limit:.0f}s.")
+            status, payload = worker.conn.recv()
+        except RenderPoolError:
+            raise
+        except (EOFError, OSError) as exc:
+            self._count(crashes=1)
+            self._release(worker, replace=True, kill=True)
+            raise RenderPoolError("Render worker crashed while rendering.") from exc
+
+        worker.jobs += 1
+        # Recycle long-lived workers: WeasyPrint/Pango caches only grow.
+        recycle = bool(self.max_jobs_per_worker) and worker.jobs >= self.max_jobs_per_worker
+        if recycle:
+            self._count(recycled=1)
+        self._release(worker, replace=recycle)
+
+        if status != "ok":
+            self._count(errors=1)
+            raise RenderPoolError(str(payload))
+        return payload
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+def _env_float(env_key: str, default: float) -> float:
+    try:
+        return float(str(os.environ.get(env_key) or "").strip() or default)
+    except ValueError:
+        return default
+
+
+def _pool_size() -> int:
+    try:
+        return max(0, int(str(os.environ.get("CV_RENDER_POOL_SIZE") or "").strip() or 0))
+    except ValueError:
+        return 0
+
+
+_RENDER_POOL: RenderPool | None = None
+_RENDER_POOL_LOCK = threading.Lock()
+
+
+def get_render_pool() -> Optional[RenderPool]:
+    """Process-wide pool, or None when pooling is disabled (CV_RENDER_POOL_SIZE unset/0)."""
+    global _RENDER_POOL
+    if _RENDER_POOL is not None:
+        return _RENDER_POOL
+    size = _pool_size()
+    if size <= 0:
+        return None
+    with _RENDER_POOL_LOCK:
+        if _RENDER_POOL is None:
+            _RENDER_POOL = RenderPool(
+                size=size,
+                job_timeout_s=_env_float("CV_RENDER_POOL_TIMEOUT_S", 60.0),
+                queue_timeout_s=_env_float("CV_RENDER_POOL_QUEUE_TIMEOUT_S", 30.0),
+                max_jobs_per_worker=int(_env_float("CV_RENDER_POOL_MAX_JOBS", 200)),
+            )
+            atexit.register(_RENDER_POOL.close)
+    return _RENDER_POOL
+
+
+def set_render_pool(pool: RenderPool | None) -> None:
+    """Swap the process-wide pool (tests, or reconfiguration after env changes)."""
+    global _RENDER_POOL
+    with _RENDER_POOL_LOCK:
+        old, _RENDER_POOL = _RENDER_POOL, pool
+    if old is not None and old is not pool:
+        old.close()
@@ -0,0 +1,203 @@
+"""
+Read-through cache for CV session entities.
+
+One orchestrated turn reads the same session many times (orchestrator entry, tool loop, PDF
+generation, event appends, metadata verification). Each read is a Table round trip, a full JSON
+decode and possibly blob downloads. `CVSessionStore` consults this cache first:
+
+  - request scope (`session_cache_scope()`): a unit of work bound to the current context. Repeated
+    reads inside the scope are served from memory. Writes made through the store refresh the entry,
+    so the scope always sees its own writes.
+  - process LRU (optional): shared across requests in the worker. A hit is served only after a
+    projected `get_entity(select=version)` confirms that the ETag/version still match, so writes
+    from other instances are never masked.
+
+Entries hold the raw table properties (JSON strings), so every read decodes a fresh copy and
+callers can keep mutating what they get back.
+
+Independently of the mode, the store remembers the non-payload properties (partition, timestamps,
+version, index keys) of recently read/written entities keyed by (session id, ETag). An ETag names
+one immutable entity version, so a caller that threads the ETag it loaded a session with gets a
+conditional full write without the entity being read again.
+
+Environment vars (optional overrides):
+  CV_SESSION_CACHE_MODE=off|request|process  (default: request)
+  CV_SESSION_CACHE_MAX_ENTRIES=<int>         (default: 256, process LRU size)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class SessionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0  # process-LRU hits confirmed by an ETag/version probe
+    hydrated_hits: int = 0  # blob-hydrated sessions served without re-downloading
+    invalidations: int = 0
+
+
+@dataclass
+class CachedSession:
+    etag: Optional[str]
+    version: Any
+    entity: Dict[str, Any]
+    # Session with offloaded cv_data restored from blob (JSON text), if computed.
+    hydrated_json: Optional[str] = None
+    # Heavy-metadata blob payloads downloaded for this version (blob ref -> JSON text).
+    blob_json: Dict[str, str] = field(default_factory=dict)
+
+    def matches(self, etag: Optional[str], version: Any) -> bool:
+        if self.etag and etag:
+            return self.etag == etag
+        return self.version == version
+
+
+class SessionCacheScope:
+    """Sessions read or written during one request (unit of work)."""
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, CachedSession] = {}
+        self.stats = SessionCacheStats()
+
+    def get(self, session_id: str) -> Optional[CachedSession]:
+        return self.entries.get(session_id)
+
+    def put(self, session_id: str, entry: CachedSession) -> None:
+        self.entries[session_id] = entry
+
+    def invalidate(self, session_id: str) -> None:
+        if self.entries.pop(session_id, None) is not None:
+            self.stats.invalidations += 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {**asdict(self.stats), "sessions": len(self.entries)}
+
+
+class SessionLRU:
+    """Bounded process-level cache; entries must be revalidated before use."""
+
+    def __init__(self, *, max_entries: int) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._items: OrderedDict[str, CachedSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = SessionCacheStats()
+
+    def get(self, session_id: str) -> Optional[CachedSession]:
+        with self._lock:
+            entry = self._items.get(session_id)
+            if entry is not None:
+                self._items.move_to_end(session_id)
+            return entry
+
+    def put(self, session_id: str, entry: CachedSession) -> None:
+        with self._lock:
+            self._items[session_id] = entry
+            self._items.move_to_end(session_id)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            if self._items.pop(session_id, None) is not None:
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class EntityHeaders:
+    """Bounded map (session id, ETag) -> non-payload entity properties of that version."""
+
+    def __init__(self, *, max_entries: int = 1024) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self._items: OrderedDict[tuple[str, str], Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, etag: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            header = self._items.get((session_id, etag))
+            return dict(header) if header is not None else None
+
+    def put(self, session_id: str, etag: Optional[str], header: Dict[str, Any]) -> None:
+        if not etag:
+            return
+        with self._lock:
+            self._items[(session_id, etag)] = dict(header)
+            self._items.move_to_end((session_id, etag))
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+ENTITY_HEADERS = EntityHeaders()
+
+
+def _cache_mode() -> str:
+    mode = str(os.environ.get("CV_SESSION_CACHE_MODE") or "").strip().lower()
+    return mode if mode in {"off", "request", "process"} else "request"
+
+
+_SCOPE: ContextVar[Optional[SessionCacheScope]] = ContextVar("cv_session_cache_scope", default=None)
+
+
+def current_session_scope() -> Optional[SessionCacheScope]:
+    return _SCOPE.get()
+
+
+@contextmanager
+def session_cache_scope() -> Iterator[SessionCacheScope]:
+    """Serve repeated session reads from memory for the duration of the block.
+
+    Nested scopes share the outer unit of work. With CV_SESSION_CACHE_MODE=off the scope is
+    returned (so callers can still report stats) but not activated.
+    """
+    outer = _SCOPE.get()
+    if outer is not None:
+        yield outer
+        return
+    scope = SessionCacheScope()
+    if _cache_mode() == "off":
+        yield scope
+        return
+    token = _SCOPE.set(scope)
+    try:
+        yield scope
+    finally:
+        _SCOPE.reset(token)
+
+
+_PROCESS_CACHE: SessionLRU | None = None
+_PROCESS_CACHE_LOCK = threading.Lock()
+
+
+def get_process_session_cache() -> Optional[SessionLRU]:
+    """Process-wide LRU, or None unless CV_SESSION_CACHE_MODE=process."""
+    global _PROCESS_CACHE
+    if _cache_mode() != "process":
+        return None
+    if _PROCESS_CACHE is not None:
+        return _PROCESS_CACHE
+    with _PROCESS_CACHE_LOCK:
+        if _PROCESS_CACHE is None:
+            try:
+                max_entries = int(str(os.environ.get("CV_SESSION_CACHE_MAX_ENTRIES") or "").strip() or 256)
+            except ValueError:
+                max_entries = 256
+            _PROCESS_CACHE = SessionLRU(max_entries=max_entries)
+    return _PROCESS_CACHE
+
+
+def set_process_session_cache(cache: SessionLRU | None) -> None:
+    """Swap the process-wide LRU (tests, or reconfiguration after env changes)."""
+    global _PROCESS_CACHE
+    with _PROCESS_CACHE_LOCK:
+        _PROCESS_CACHE = cache
@@ -0,0 +1,291 @@
+"""
+Expiry cleanup for CV sessions: table rows and the blobs they leave behind.
+
+Expired rows are deleted in entity-group transactions (up to 100 rows of one partition per
+request) with partitions processed concurrently; every partition is filtered on expires_at (see
+`session_partitions`). Day partitions are not enumerated by date: one PartitionKey range query
+(projected to PartitionKey) finds every day partition that holds an expired row, however old.
+Expired rows of the per-user session index are swept the same way. For every deleted session the
+blobs it owns are removed with batch blob deletes:
+
+  - <artifacts container>/<session_id>/...  offloaded cv_data / metadata, snapshots, JSON exports
+  - <pdfs container>/<session_id>/...       generated PDFs
+  - the photo referenced by metadata.photo_blob
+  - content-addressed objects (`blob_cas`) whose last reference was this session
+
+Content-addressed objects are deleted only if not modified within `blob_cas.GC_GRACE`, so an
+object another session has just started to reference survives.
+
+Environment vars (optional overrides):
+  CV_SESSION_CLEANUP_WORKERS=<int>   (default: 8, partitions cleaned concurrently)
+  CV_SESSION_CLEANUP_BLOBS=0|1       (default: 1)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import TableTransactionError
+
+from .blob_cas import gc_cutoff, orphans_by_container
+from .json_codec import decode_json_property
+from .session_partitions import LEGACY_PARTITION, day_partition_range, hashed_partitions
+
+TABLE_BATCH_SIZE = 100  # Azure Table entity-group transaction limit
+BLOB_BATCH_SIZE = 256  # Azure Blob batch request limit
+
+
+@dataclass
+class CleanupReport:
+    sessions_deleted: int = 0
+    index_rows_deleted: int = 0
+    partitions_scanned: int = 0
+    table_batches: int = 0
+    blobs_deleted: int = 0
+    bytes_reclaimed: int = 0
+    errors: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(str(os.environ.get(name) or "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _blob_cleanup_enabled() -> bool:
+    return str(os.environ.get("CV_SESSION_CLEANUP_BLOBS") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _default_blob_service() -> Any:
+    from .blob_store import get_blob_service_client
+
+    return get_blob_service_client()
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class SessionCleanupEngine:
+    """Deletes expired sessions of a `CVSessionStore` and garbage-collects their blobs."""
+
+    def __init__(
+        self,
+        store: Any,
+        *,
+        blob_service_factory: Optional[Callable[[], Any]] = None,
+        max_workers: Optional[int] = None,
+        collect_blobs: Optional[bool] = None,
+    ) -> None:
+        self.store = store
+        self.table = store.table_client
+        self.max_workers = max_workers or _env_int("CV_SESSION_CLEANUP_WORKERS", 8)
+        self.collect_blobs = _blob_cleanup_enabled() if collect_blobs is None else collect_blobs
+        self._blob_service_factory = blob_service_factory or _default_blob_service
+        self._blob_service: Any = None
+        self._blob_lock = threading.Lock()
+        self.artifacts_container = os.environ.get("STORAGE_CONTAINER_ARTIFACTS", "cv-artifacts")
+        self.pdfs_container = os.environ.get("STORAGE_CONTAINER_PDFS", "cv-pdfs")
+        self.photos_container = (os.environ.get("STORAGE_CONTAINER_PHOTOS") or "cv-photos").strip()
+
+    def plan(self, now: datetime, report: CleanupReport) -> list[tuple[str, Optional[str]]]:
+        """(partition, row filter) pairs; a None filter empties the whole partition."""
+        # expires_at is stored as an ISO string, so compare it as one.
+        expired_filter = f"expires_at lt '{now.isoformat()}'"
+        jobs: list[tuple[str, Optional[str]]] = [(LEGACY_PARTITION, expired_filter)]
+        jobs += [(partition_key, expired_filter) for partition_key in hashed_partitions()]
+        day_partitions = self._day_partitions_to_clean(expired_filter, report)
+        jobs += [(partition_key, expired_filter) for partition_key in day_partitions]
+        return jobs
+
+    def _day_partitions_to_clean(self, expired_filter: str, report: CleanupReport) -> list[str]:
+        """Day partitions holding at least one expired row, whatever their date."""
+        low, high = day_partition_range()
+        query = f"PartitionKey ge '{low}' and PartitionKey lt '{high}' and {expired_filter}"
+        try:
+            rows = self.table.query_entities(query, select=["PartitionKey"])
+            return sorted({str(entity["PartitionKey"]) for entity in rows})
+        except Exception as exc:
+            logging.warning("Session cleanup: day partition scan failed err=%s", exc)
+            report.add(errors=1)
+            return []
+
+    def run(self, *, now: Optional[datetime] = None) -> CleanupReport:
+        report = CleanupReport()
+        now = now or datetime.utcnow()
+        jobs = self.plan(now, report)
+        # Worker threads run in copies of this context so cache invalidation reaches the caller's scope.
+        contexts = [copy_context() for _ in jobs]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            list(pool.map(lambda ctx, job: ctx.run(self._clean_partition, *job, report), contexts, jobs))
+        self._clean_user_index(now, report)
+        if report.sessions_deleted or report.index_rows_deleted:
+            logging.info("Session cleanup: %s", report.as_dict())
+        return report
+
+    def _clean_partition(self, partition_key: str, row_filter: Optional[str], report: CleanupReport) -> None:
+        query = f"PartitionKey eq '{partition_key}'"
+        if row_filter:
+            query += f" and {row_filter}"
+        select = ["RowKey", "source_docx_sha256"] + (["metadata_json"] if self.collect_blobs else [])
+        try:
+            rows = list(self.table.query_entities(query, select=select))
+        except Exception as exc:
+            logging.warning("Session cleanup: query failed partition=%s err=%s", partition_key, exc)
+            report.add(partitions_scanned=1, errors=1)
+            return
+        report.add(partitions_scanned=1)
+
+        for chunk in _chunks(rows, TABLE_BATCH_SIZE):
+            deleted = self._delete_rows(partition_key, chunk, report)
+            for entity in deleted:
+                session_id = str(entity["RowKey"])
+                self.store._cache_forget(session_id)
+                self.store._unindex_docx_hash(entity.get("source_docx_sha256"), session_id)
+                if self.collect_blobs:
+                    self._collect_session_blobs(session_id, entity, report)
+            report.add(sessions_deleted=len(deleted))
+
+    def _clean_user_index(self, now: datetime, report: CleanupReport) -> None:
+        """Delete user-index rows of expired sessions (one filtered scan; the index holds one small row per session)."""
+        index_client = getattr(self.store, "user_index_client", None)
+        if index_client is None:
+            return
+        query = f"expires_at lt '{now.isoformat()}'"
+        by_partition: dict[str, list] = {}
+        try:
+            for row in index_client.query_entities(query, select=["PartitionKey", "RowKey"]):
+                by_partition.setdefault(str(row["PartitionKey"]), []).append(row)
+        except Exception as exc:
+            logging.warning("Session cleanup: user index scan failed err=%s", exc)
+            report.add(errors=1)
+            return
+        for partition_key, rows in by_partition.items():
+            for chunk in _chunks(rows, TABLE_BATCH_SIZE):
+                deleted = self._delete_rows(partition_key, chunk, report, table=index_client)
+                report.add(index_rows_deleted=len(deleted))
+
+    def _delete_rows(self, partition_key: str, rows: list, report: CleanupReport, *, table: Any = None) -> list:
+        table = table or self.table
+        operations = [("delete", {"PartitionKey": partition_key, "RowKey": row["RowKey"]}) for row in rows]
+        try:
+            table.submit_transaction(operations)
+            report.add(table_batches=1)
+            return rows
+        except TableTransactionError as exc:
+            # One failing row (e.g. deleted concurrently) rejects the whole group: retry one by one.
+            logging.info("Session cleanup: batch rejected partition=%s err=%s", partition_key, exc)
+        deleted = []
+        for row in rows:
+            try:
+                table.delete_entity(partition_key=partition_key, row_key=row["RowKey"])
+                deleted.append(row)  # delete_entity treats an already-deleted row as success
+            except Exception as exc:
+                logging.warning("Session cleanup: delete failed session=%s err=%s", row["RowKey"], exc)
+                report.add(errors=1)
+        return deleted
+
+    def _blobs(self) -> Any:
+        """Blob service shared by all workers, or None when blob storage is not configured."""
+        with self._blob_lock:
+            if self._blob_service is None and self.collect_blobs:
+                try:
+                    self._blob_service = self._blob_service_factory()
+                except ValueError as exc:
+                    logging.warning("Session cleanup: blob GC disabled (%s)", exc)
+                    self.collect_blobs = False
+            return self._blob_service
+
+    def _collect_session_blobs(self, session_id: str, entity: Dict[str, Any], report: CleanupReport) -> None:
+        service = self._blobs()
+        if service is None:
+            return
+        try:
+            targets: dict[str, dict[str, int]] = {}
+            for container in (self.artifacts_container, self.pdfs_container):
+                container_client = service.get_container_client(container)
+                try:
+                    for blob in container_client.list_blobs(name_starts_with=f"{session_id}/"):
+                        targets.setdefault(container, {})[blob.name] = int(getattr(blob, "size", 0) or 0)
+                except ResourceNotFoundError:
+                    continue
+
+            photo = self._photo_ref(entity)
+            if photo is not None:
+                targets.setdefault(photo[0], {}).setdefault(photo[1], 0)
+
+            for container, blobs in targets.items():
+                self._delete_blobs(service.get_container_client(container), blobs, report)
+
+            refs = getattr(self.store, "blob_refs", None)
+            if refs is not None:
+                cutoff = gc_cutoff()
+                for container, blobs in orphans_by_container(refs.release_session(session_id)).items():
+                    self._delete_blobs(
+                        service.get_container_client(container), blobs, report, if_unmodified_since=cutoff
+                    )
+        except Exception as exc:
+            logging.warning("Session cleanup: blob GC failed session=%s err=%s", session_id, exc)
+            report.add(errors=1)
+
+    def _photo_ref(self, entity: Dict[str, Any]) -> Optional[tuple[str, str]]:
+        raw = entity.get("metadata_json")
+        if not raw:
+            return None
+        try:
+            photo = decode_json_property(raw).get("photo_blob")
+        except Exception:
+            return None
+        if not isinstance(photo, dict):
+            return None
+        container = str(photo.get("container") or "")
+        blob_name = str(photo.get("blob_name") or "")
+        # Only per-upload photo blobs; never anything outside the photos prefix.
+        if container == self.photos_container and blob_name.startswith("photos/"):
+            return container, blob_name
+        return None
+
+    def _delete_blobs(
+        self, container_client: Any, blobs: dict[str, int], report: CleanupReport, **conditions: Any
+    ) -> None:
+        names = list(blobs)
+        for chunk in _chunks(names, BLOB_BATCH_SIZE):
+            try:
+                responses = list(container_client.delete_blobs(*chunk, raise_on_any_failure=False, **conditions))
+                ok = [
+                    name for name, resp in zip(chunk, responses) if getattr(resp, "status_code", 202) in (200, 202, 404)
+                ]
+            except Exception:
+                # Storage emulators without batch support: fall back to single deletes.
+                ok = []
+                for name in chunk:
+                    try:
+                        container_client.delete_blob(name, **conditions)
+                        ok.append(name)
+                    except ResourceNotFoundError:
+                        ok.append(name)
+                    except ResourceModifiedError:
+                        continue  # touched by a new reference within the grace period
+                    except Exception as exc:
+                        logging.warning("Session cleanup: blob delete failed blob=%s err=%s", name, exc)
+                        report.add(errors=1)
+            report.add(blobs_deleted=len(ok), bytes_reclaimed=sum(blobs[name] for name in ok))
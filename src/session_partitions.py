@@ -0,0 +1,99 @@
+"""
+Partition routing for the CV sessions table.
+
+All sessions used to live in PartitionKey "cv", so every request hit one partition (one
+partition's throughput ceiling) and expiry cleanup had to filter that partition serially.
+
+New session ids are UUIDv7: plain UUID strings whose first 48 bits are the creation time in
+milliseconds. The creation day can therefore be read back from the id alone, and rows are routed to
+
+  - cv-<YYYYMMDD>-<shard>  UUIDv7 ids (creation day + CRC32 shard of the id)
+  - cv-h<shard>            any other id (legacy UUIDv4 sessions moved by the migration script)
+  - cv                     legacy rows not migrated yet (read fallback only)
+
+A row's expiry is not bounded by its partition day: restored sessions (see
+scripts/restore_session_from_azurite.py) keep their creation-day partition with a far-future
+expires_at. Cleanup therefore always filters on expires_at, also in old day partitions.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import uuid
+import zlib
+from datetime import date, datetime
+from typing import Optional
+
+LEGACY_PARTITION = "cv"
+# Changing the shard count re-routes existing rows: it requires a migration.
+SESSION_SHARDS = 8
+
+_MS_MASK = (1 << 48) - 1
+
+
+def new_session_id() -> str:
+    """UUIDv7 (RFC 9562): 48-bit unix ms timestamp, version 7, 74 random bits."""
+    ms = int(time.time() * 1000) & _MS_MASK
+    rand = int.from_bytes(os.urandom(10), "big")
+    rand_a = (rand >> 68) & 0xFFF
+    rand_b = rand & ((1 << 62) - 1)
+    value = (ms << 80) | (0x7 << 76) | (rand_a << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
+
+
+def session_created_day(session_id: str) -> Optional[date]:
+    """Creation day (UTC) encoded in a UUIDv7 session id, or None for other ids."""
+    try:
+        parsed = uuid.UUID(str(session_id))
+    except (ValueError, AttributeError, TypeError):
+        return None
+    if parsed.version != 7:
+        return None
+    return datetime.utcfromtimestamp((parsed.int >> 80) / 1000).date()
+
+
+def shard_of(session_id: str) -> int:
+    return zlib.crc32(str(session_id).encode("utf-8")) % SESSION_SHARDS
+
+
+def day_partition(day: date, shard: int) -> str:
+    return f"{LEGACY_PARTITION}-{day.strftime('%Y%m%d')}-{shard}"
+
+
+def hashed_partition(shard: int) -> str:
+    return f"{LEGACY_PARTITION}-h{shard}"
+
+
+def partition_for(session_id: str) -> str:
+    """Partition new writes of this session go to."""
+    day = session_created_day(session_id)
+    if day is not None:
+        return day_partition(day, shard_of(session_id))
+    return hashed_partition(shard_of(session_id))
+
+
+def read_partitions(session_id: str) -> tuple[str, ...]:
+    """Partitions to try, in order, when reading a session by id."""
+    primary = partition_for(session_id)
+    if session_created_day(session_id) is not None:
+        return (primary,)
+    return (primary, LEGACY_PARTITION)
+
+
+def is_session_partition(partition_key: str) -> bool:
+    pk = str(partition_key or "")
+    return pk == LEGACY_PARTITION or pk.startswith(LEGACY_PARTITION + "-")
+
+
+def day_partitions(day: date) -> list[str]:
+    return [day_partition(day, shard) for shard in range(SESSION_SHARDS)]
+
+
+def day_partition_range() -> tuple[str, str]:
+    """[low, high) PartitionKey bounds holding every day partition and no hashed or legacy one."""
+    return f"{LEGACY_PARTITION}-0", f"{LEGACY_PARTITION}-:"  # ":" sorts right after "9", before "h"
+
+
+def hashed_partitions() -> list[str]:
+    return [hashed_partition(shard) for shard in range(SESSION_SHARDS)]
@@ -5,26 +5,438 @@ Enables stateful CV processing across conversation turns
 
 import logging
 import json
-import uuid
+import re
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 from azure.data.tables import TableServiceClient
-from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
 import os
 import threading
 
+from .blob_cas import BlobRefIndex
+from .json_codec import EncodedProperty, decode_json_property, encode_json_property, property_size
+from .lazy_metadata import BLOB_REFS_KEY, LazyMetadata, heavy_blob_refs, loaded_metadata
+from .session_cache import ENTITY_HEADERS, CachedSession, current_session_scope, get_process_session_cache
+from .session_cleanup import CleanupReport, SessionCleanupEngine
+from .session_partitions import (
+    is_session_partition,
+    new_session_id,
+    partition_for,
+    read_partitions,
+)
+
 
 _CLIENT_CACHE_LOCK = threading.Lock()
-_CLIENT_CACHE: dict[str, tuple[TableServiceClient, Any]] = {}
+_CLIENT_CACHE: dict[str, tuple[TableServiceClient, dict[str, Any]]] = {}
 _TABLE_READY: set[str] = set()
 
 
+# Section layout: each top-level CV key lives in its own property (cvs_<key>) and hot metadata
+# keys in meta_<key>, so small edits rewrite only what changed. `cv_data_json` keeps the section
+# order plus any keys that are not valid property names. Values go through `json_codec`, so large
+# ones are stored zlib-compressed and far fewer sessions need blob offload.
+CV_LAYOUT_SECTIONS = "sections"
+_CV_SECTION_PREFIX = "cvs_"
+_METADATA_HOT_PREFIX = "meta_"
+_SECTION_ORDER_KEY = "__sections__"
+_PROPERTY_KEY_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_]{0,127}$")
+_HEX_KEY_RE = re.compile(r"^[0-9a-f]{16,128}$")
+
+
+def _normalize_hex_key(value: Any) -> str:
+    """Lower-case hex digest (DOCX hash, profile user id) usable as an index PartitionKey, or "" if not one."""
+    digest = str(value or "").strip().lower()
+    return digest if _HEX_KEY_RE.match(digest) else ""
+
+
+def _field_path_parts(field_path: str) -> list[str]:
+    return field_path.replace("[", ".").replace("]", "").split(".")
+
+
+def _apply_field_path(target: Dict[str, Any], field_path: str, value: Any) -> None:
+    """Set `value` at a dot/bracket path (e.g. "work_experience[0].employer"), creating containers."""
+    parts = _field_path_parts(field_path)
+    current: Any = target
+
+    for i, part in enumerate(parts[:-1]):
+        if part.isdigit():
+            idx = int(part)
+            if not isinstance(current, list):
+                raise TypeError(
+                    f"Invalid path '{field_path}': expected list at '{'.'.join(parts[:i])}', got {type(current).__name__}"
+                )
+            # Auto-expand lists for start-from-0 sessions (common for work_experience[0] style updates)
+            if idx >= len(current):
+                current.extend({} for _ in range(idx - len(current) + 1))
+            current = current[idx]
+        else:
+            if part not in current:
+                # If the next segment is a numeric index, this key should be a list.
+                next_part = parts[i + 1]
+                current[part] = [] if next_part.isdigit() else {}
+            current = current[part]
+
+    last_key = parts[-1]
+    if last_key.isdigit():
+        idx = int(last_key)
+        if not isinstance(current, list):
+            raise TypeError(
+                f"Invalid path '{field_path}': expected list at '{'.'.join(parts[:-1])}', got {type(current).__name__}"
+            )
+        if idx >= len(current):
+            current.extend(None for _ in range(idx - len(current) + 1))
+        current[idx] = value
+    else:
+        current[last_key] = value
+
+
+def _encode_cv_sections(cv_data: Dict[str, Any]) -> tuple[Dict[str, EncodedProperty], int]:
+    """Entity properties for cv_data in the section layout, plus their encoded size in bytes."""
+    props: Dict[str, EncodedProperty] = {}
+    order: list[str] = []
+    residual: Dict[str, Any] = {}
+    for key, value in cv_data.items():
+        if _PROPERTY_KEY_RE.match(str(key)):
+            props[_CV_SECTION_PREFIX + key] = encode_json_property(value)
+            order.append(key)
+        else:
+            residual[key] = value
+    residual[_SECTION_ORDER_KEY] = order
+    props["cv_data_json"] = encode_json_property(residual)
+    size = sum(len(k) + property_size(v) for k, v in props.items())
+    return props, size
+
+
+def _entity_header(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Properties a full write keeps from the loaded entity (everything but cv_data and metadata)."""
+    return {
+        k: v
+        for k, v in entity.items()
+        if k not in ("cv_data_json", "metadata_json")
+        and not k.startswith(_CV_SECTION_PREFIX)
+        and not k.startswith(_METADATA_HOT_PREFIX)
+    }
+
+
+def _drop_properties(entity: Dict[str, Any], prefix: str) -> None:
+    for key in [k for k in entity if k.startswith(prefix)]:
+        del entity[key]
+
+
+def _apply_cv_sections(entity: Dict[str, Any], props: Dict[str, EncodedProperty]) -> None:
+    _drop_properties(entity, _CV_SECTION_PREFIX)
+    entity.update(props)
+    entity["cv_layout"] = CV_LAYOUT_SECTIONS
+
+
+def _encode_metadata(metadata: Dict[str, Any], hot_keys: tuple[str, ...]) -> tuple[Dict[str, EncodedProperty], int]:
+    """Entity properties for metadata (hot keys split out), plus their encoded size in bytes."""
+    rest = loaded_metadata(metadata)
+    props = {
+        _METADATA_HOT_PREFIX + key: encode_json_property(rest.pop(key)) for key in hot_keys if key in rest
+    }
+    props["metadata_json"] = encode_json_property(rest)
+    size = sum(property_size(v) for v in props.values())
+    return props, size
+
+
+def _apply_metadata(entity: Dict[str, Any], props: Dict[str, EncodedProperty]) -> None:
+    _drop_properties(entity, _METADATA_HOT_PREFIX)
+    entity.update(props)
+
+
+def _read_cv_data(entity: Dict[str, Any]) -> Dict[str, Any]:
+    data = decode_json_property(entity["cv_data_json"])
+    if entity.get("cv_layout") != CV_LAYOUT_SECTIONS or not isinstance(data, dict):
+        return data
+    cv_data: Dict[str, Any] = {}
+    for key in data.pop(_SECTION_ORDER_KEY, None) or []:
+        raw = entity.get(_CV_SECTION_PREFIX + key)
+        if raw is not None:
+            cv_data[key] = decode_json_property(raw)
+    cv_data.update(data)
+    return cv_data
+
+
+def _read_metadata(entity: Dict[str, Any], hot_keys: tuple[str, ...]) -> Dict[str, Any]:
+    metadata = decode_json_property(entity.get("metadata_json") or "{}")
+    if isinstance(metadata, dict):
+        for key in hot_keys:
+            raw = entity.get(_METADATA_HOT_PREFIX + key)
+            if raw is not None:
+                metadata[key] = decode_json_property(raw)
+    return metadata
+
+
+def _field_update_event(field_path: str, value: Any, client_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bounded event-log entry describing an `update_field` call (no field values)."""
+    # Keep logs minimal (avoid dumping personal data).
+    value_preview = "(empty)"
+    if isinstance(value, str):
+        value_preview = f"<str:{len(value)}>"
+    elif isinstance(value, list):
+        value_preview = f"<list:{len(value)}>"
+    elif isinstance(value, dict):
+        value_preview = f"<dict:{len(value)}>"
+    else:
+        value_preview = f"<{type(value).__name__}>"
+    logging.debug(f"update_field: path={field_path}, value={value_preview}")
+
+    # Append a bounded event log entry (helps stateless agent keep continuity across turns).
+    preview = value_preview
+    if isinstance(value, list):
+        preview = f"[{len(value)} items]"
+    elif isinstance(value, dict):
+        preview = f"{{dict with {len(value)} keys}}"
+
+    evt: Dict[str, Any] = {
+        "ts": datetime.utcnow().isoformat(),
+        "type": "update_cv_field",
+        "field_path": field_path,
+        "value_type": type(value).__name__,
+        "preview": preview,
+    }
+    if isinstance(client_context, dict) and client_context:
+        # Keep only a bounded, non-sensitive context summary.
+        evt["client_context_keys"] = list(client_context.keys())[:20]
+    return evt
+
+
+def _plan_patch(
+    entity: Dict[str, Any],
+    patches: Dict[str, Any],
+    events: Optional[list[Dict[str, Any]]],
+    *,
+    max_events: int,
+    max_table_size: int,
+) -> tuple[Optional[Dict[str, EncodedProperty]], list]:
+    """Properties a merge write of `patches`/`events` must send, plus the new event log.
+
+    Properties are None when the patch needs a full write instead (legacy layout, offloaded
+    cv_data, invalid section name, or a patched property above `max_table_size`).
+    """
+    section_keys = list(dict.fromkeys(_field_path_parts(path)[0] for path in patches))
+    props: Optional[Dict[str, EncodedProperty]] = {}
+
+    if patches:
+        if entity.get("cv_layout") == CV_LAYOUT_SECTIONS and all(_PROPERTY_KEY_RE.match(k) for k in section_keys):
+            sections: Dict[str, Any] = {}
+            for key in section_keys:
+                raw = entity.get(_CV_SECTION_PREFIX + key)
+                if raw is not None:
+                    sections[key] = decode_json_property(raw)
+            for path, value in patches.items():
+                _apply_field_path(sections, path, value)
+            for key in section_keys:
+                props[_CV_SECTION_PREFIX + key] = encode_json_property(sections[key])
+
+            residual = decode_json_property(entity["cv_data_json"])
+            order = list(residual.get(_SECTION_ORDER_KEY) or [])
+            new_keys = [k for k in section_keys if k not in order]
+            if new_keys:
+                residual[_SECTION_ORDER_KEY] = order + new_keys
+                props["cv_data_json"] = encode_json_property(residual)
+        else:
+            props = None
+
+    event_log: list = []
+    if events:
+        raw_log = entity.get(_METADATA_HOT_PREFIX + "event_log")
+        if raw_log is not None:
+            event_log = decode_json_property(raw_log)
+        else:
+            # Not split out yet: the log (if any) is still inside metadata_json.
+            event_log = _read_metadata(entity, ()).get("event_log")
+        if not isinstance(event_log, list):
+            event_log = []
+        event_log = (event_log + list(events))[-max_events:]
+        if props is not None:
+            props[_METADATA_HOT_PREFIX + "event_log"] = encode_json_property(event_log)
+
+    if props is not None and any(property_size(v) > max_table_size for v in props.values()):
+        props = None
+    return props, event_log
+
+
+def _patched_payloads(
+    entity: Dict[str, Any], patches: Dict[str, Any], event_log: Optional[list], hot_keys: tuple[str, ...]
+) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """cv_data (and metadata, when the event log changed) for the full-write fallback of a patch."""
+    cv_data = _read_cv_data(entity)
+    for path, value in patches.items():
+        _apply_field_path(cv_data, path, value)
+    metadata = None
+    if event_log is not None:
+        metadata = _read_metadata(entity, hot_keys)
+        metadata["event_log"] = event_log
+    return cv_data, metadata
+
+
+def _session_view(session_id: str, entity: Dict[str, Any], etag: Optional[str], hot_keys: tuple[str, ...]) -> Dict[str, Any]:
+    """Session dict returned by `get_session` for a stored entity."""
+    return {
+        "session_id": session_id,
+        "cv_data": _read_cv_data(entity),
+        "metadata": _read_metadata(entity, hot_keys),
+        "created_at": entity.get("created_at"),
+        "updated_at": entity.get("updated_at"),
+        "expires_at": entity.get("expires_at"),
+        "version": entity.get("version", 1),
+        "etag": etag,
+    }
+
+
+def _new_session_entity(
+    session_id: str,
+    cv_data: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]],
+    *,
+    ttl_hours: int,
+    hot_keys: tuple[str, ...],
+) -> tuple[Dict[str, Any], str]:
+    """Entity for a new session, plus its normalized source DOCX hash ("" if none)."""
+    now = datetime.utcnow()
+    entity = {
+        "PartitionKey": partition_for(session_id),
+        "RowKey": session_id,
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+        "expires_at": (now + timedelta(hours=ttl_hours)).isoformat(),
+        "version": 1
+    }
+    _apply_cv_sections(entity, _encode_cv_sections(cv_data or {})[0])
+    _apply_metadata(entity, _encode_metadata(metadata or {}, hot_keys)[0])
+
+    docx_hash = _normalize_hex_key((metadata or {}).get("source_docx_sha256"))
+    if docx_hash:
+        entity["source_docx_sha256"] = docx_hash
+    return entity, docx_hash
+
+
+def _docx_index_entity(docx_hash: str, session_id: str, entity: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "PartitionKey": docx_hash,
+        "RowKey": session_id,
+        "created_at": entity.get("created_at"),
+        "updated_at": entity.get("updated_at") or entity.get("created_at"),
+        "expires_at": entity.get("expires_at"),
+    }
+
+
+def _split_heavy_metadata(
+    metadata: Dict[str, Any], heavy_keys: tuple[str, ...]
+) -> tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """(metadata without heavy keys, {heavy key: value}, table-safe summaries of the heavy values)."""
+    meta_out = dict(metadata or {})
+    heavy_payload: Dict[str, Any] = {}
+    summaries: Dict[str, Any] = {}
+
+    for key in heavy_keys:
+        if key not in meta_out:
+            continue
+        value = meta_out.pop(key)
+        heavy_payload[key] = value
+
+        if key == "pdf_refs" and isinstance(value, dict):
+            summaries["pdf_refs_count"] = len([v for v in value.values() if isinstance(v, dict)])
+        elif key == "event_log" and isinstance(value, list):
+            summaries["event_log_count"] = len(value)
+        elif key == "job_data_table_history" and isinstance(value, list):
+            summaries["job_data_table_history_count"] = len(value)
+        elif key == "job_posting_text" and isinstance(value, str):
+            summaries["job_posting_text_snippet"] = value[:200]
+            summaries["job_posting_text_length"] = len(value)
+    return meta_out, heavy_payload, summaries
+
+
+def _attach_heavy_refs(
+    meta_out: Dict[str, Any], summaries: Dict[str, Any], new_refs: Dict[str, str], heavy_keys: tuple[str, ...]
+) -> Dict[str, Any]:
+    """Record freshly offloaded heavy keys; refs of keys offloaded earlier are carried over."""
+    refs = heavy_blob_refs(meta_out, legacy_keys=heavy_keys)
+    meta_out.pop("metadata_blob_ref", None)
+    refs.update(new_refs)
+    meta_out.update(summaries)
+    meta_out[BLOB_REFS_KEY] = refs
+    meta_out["metadata_blob_offloaded_at"] = datetime.utcnow().isoformat()
+    meta_out["metadata_blob_keys"] = sorted(refs)
+    return meta_out
+
+
+def _compact_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Last-chance table compaction when metadata is still too large."""
+    meta_out = dict(metadata or {})
+
+    for key in ("work_experience_proposal_block", "skills_proposal_block", "docx_prefill_unconfirmed", "event_log"):
+        meta_out.pop(key, None)
+
+    jpt = meta_out.get("job_posting_text_snippet")
+    if isinstance(jpt, str) and len(jpt) > 120:
+        meta_out["job_posting_text_snippet"] = jpt[:120]
+
+    pdf_refs = meta_out.get("pdf_refs")
+    if isinstance(pdf_refs, dict) and len(pdf_refs) > 1:
+        first_key = next(iter(pdf_refs.keys()))
+        meta_out["pdf_refs"] = {first_key: pdf_refs[first_key]}
+
+    return meta_out
+
+
+class SessionConflictError(Exception):
+    """A conditional session write lost to a concurrent update (ETag no longer matches)."""
+
+    def __init__(self, session_id: str, expected_etag: Optional[str] = None):
+        super().__init__(f"Session {session_id} was modified concurrently")
+        self.session_id = session_id
+        self.expected_etag = expected_etag
+
+
+def merge_conflicting_metadata(stored: Dict[str, Any], pending: Dict[str, Any], *, max_events: int = 20) -> Dict[str, Any]:
+    """Merge metadata a writer intended to persist onto the version that won a write conflict.
+
+    Keys from `pending` win; append-only collections keep entries from both sides so
+    concurrent turns do not drop each other's events or generated PDFs.
+    """
+    merged = {**(stored if isinstance(stored, dict) else {}), **(pending if isinstance(pending, dict) else {})}
+
+    stored_log = stored.get("event_log") if isinstance(stored, dict) else None
+    pending_log = pending.get("event_log") if isinstance(pending, dict) else None
+    if isinstance(stored_log, list) and isinstance(pending_log, list):
+        events: list = []
+        seen: set[str] = set()
+        for evt in stored_log + pending_log:
+            key = json.dumps(evt, sort_keys=True, default=str)
+            if key not in seen:
+                seen.add(key)
+                events.append(evt)
+        events.sort(key=lambda e: str(e.get("ts") or "") if isinstance(e, dict) else "")
+        merged["event_log"] = events[-max_events:]
+
+    stored_refs = stored.get("pdf_refs") if isinstance(stored, dict) else None
+    pending_refs = pending.get("pdf_refs") if isinstance(pending, dict) else None
+    if isinstance(stored_refs, dict) and isinstance(pending_refs, dict):
+        merged["pdf_refs"] = {**stored_refs, **pending_refs}
+
+    return merged
+
+
 class CVSessionStore:
     """Manages CV session data in Azure Table Storage"""
     
     TABLE_NAME = "cvsessions"
+    # source_docx_sha256 -> sessions (PartitionKey=hash, RowKey=session_id) for upload idempotency.
+    DOCX_INDEX_TABLE_NAME = "cvsessiondocxindex"
+    # profile user id -> sessions with a compact job-data row each (PartitionKey=user_id, RowKey=session_id).
+    USER_INDEX_TABLE_NAME = "cvsessionuserindex"
+    # Reference records of content-addressed blobs (see blob_cas); None disables reference counting.
+    BLOB_REFS_TABLE_NAME = "cvblobrefs"
+    blob_refs: Optional[BlobRefIndex] = None
     DEFAULT_TTL_HOURS = 24
     EVENT_LOG_MAX_ITEMS = 20
+    CONFLICT_RETRIES = 2
+    # Metadata keys written often enough to get their own entity property.
+    METADATA_HOT_KEYS = ("event_log",)
     METADATA_HEAVY_KEYS = (
         "event_log",
         "docx_prefill_unconfirmed",
@@ -46,22 +458,31 @@ class CVSessionStore:
             cached = _CLIENT_CACHE.get(conn_str)
             if cached is None:
                 service_client = TableServiceClient.from_connection_string(conn_str)
-                table_client = service_client.get_table_client(self.TABLE_NAME)
-                cached = (service_client, table_client)
+                clients = {name: service_client.get_table_client(name) for name in self._table_names()}
+                cached = (service_client, clients)
                 _CLIENT_CACHE[conn_str] = cached
 
-        self.service_client, self.table_client = cached
+        self.service_client, clients = cached
+        self.table_client = clients[self.TABLE_NAME]
+        self.docx_index_client = clients[self.DOCX_INDEX_TABLE_NAME]
+        self.user_index_client = clients[self.USER_INDEX_TABLE_NAME]
+        self.blob_refs = BlobRefIndex(clients[self.BLOB_REFS_TABLE_NAME])
         self._ensure_table_exists_once(conn_str)
+
+    @classmethod
+    def _table_names(cls) -> tuple[str, ...]:
+        return (cls.TABLE_NAME, cls.DOCX_INDEX_TABLE_NAME, cls.USER_INDEX_TABLE_NAME, cls.BLOB_REFS_TABLE_NAME)
     
     def _ensure_table_exists_once(self, conn_str: str):
-        """Create table if it doesn't exist (once per process + connection string)."""
+        """Create tables if they don't exist (once per process + connection string)."""
         if conn_str in _TABLE_READY:
             return
-        try:
-            self.service_client.create_table(self.TABLE_NAME)
-            logging.info(f"Created table: {self.TABLE_NAME}")
-        except ResourceExistsError:
-            logging.debug(f"Table {self.TABLE_NAME} already exists")
+        for table_name in self._table_names():
+            try:
+                self.service_client.create_table(table_name)
+                logging.info(f"Created table: {table_name}")
+            except ResourceExistsError:
+                logging.debug(f"Table {table_name} already exists")
         with _CLIENT_CACHE_LOCK:
             _TABLE_READY.add(conn_str)
     
@@ -76,24 +497,17 @@ class CVSessionStore:
         Returns:
             session_id: Unique session identifier
         """
-        session_id = str(uuid.uuid4())
-        now = datetime.utcnow()
-        expires_at = now + timedelta(hours=self.DEFAULT_TTL_HOURS)
-        
-        entity = {
-            "PartitionKey": "cv",
-            "RowKey": session_id,
-            "cv_data_json": json.dumps(cv_data),
-            "metadata_json": json.dumps(metadata or {}),
-            "created_at": now.isoformat(),
-            "updated_at": now.isoformat(),
-            "expires_at": expires_at.isoformat(),
-            "version": 1
-        }
+        session_id = new_session_id()
+        entity, docx_hash = _new_session_entity(
+            session_id, cv_data, metadata, ttl_hours=self.DEFAULT_TTL_HOURS, hot_keys=self.METADATA_HOT_KEYS
+        )
 
-        self.table_client.create_entity(entity)
+        result = self.table_client.create_entity(entity)
+        self._cache_remember(session_id, entity, result)
+        if docx_hash:
+            self._index_docx_hash(docx_hash, session_id, entity)
         
-        logging.info(f"Created session {session_id}, expires at {expires_at.isoformat()}")
+        logging.info(f"Created session {session_id}, expires at {entity['expires_at']}")
         return session_id
     
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -106,23 +520,21 @@ class CVSessionStore:
         Returns:
             Dictionary with cv_data and metadata, or None if not found
         """
-        try:
-            entity = self.table_client.get_entity(partition_key="cv", row_key=session_id)
-        except ResourceNotFoundError:
+        entry = self._load_entry(session_id)
+        if entry is None:
             logging.warning(f"Session {session_id} not found")
             return None
 
-        return {
-            "session_id": session_id,
-            "cv_data": json.loads(entity["cv_data_json"]),
-            "metadata": json.loads(entity.get("metadata_json", "{}")),
-            "created_at": entity.get("created_at"),
-            "updated_at": entity.get("updated_at"),
-            "expires_at": entity.get("expires_at"),
-            "version": entity.get("version", 1)
-        }
+        return _session_view(session_id, entry.entity, entry.etag, self.METADATA_HOT_KEYS)
     
-    def update_session(self, session_id: str, cv_data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> bool:
+    def update_session(
+        self,
+        session_id: str,
+        cv_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        etag: Optional[str] = None,
+    ) -> bool:
         """
         Update existing session with new CV data
         
@@ -130,14 +542,19 @@ class CVSessionStore:
             session_id: Session identifier
             cv_data: Updated CV data
             metadata: Optional updated metadata
+            etag: ETag the session was loaded with (defaults to the last read/write via this store)
         
         Returns:
             True if updated, False if session not found
+
+        Raises:
+            SessionConflictError: the session was modified since it was loaded
         """
         return self.update_session_with_blob_offload(
             session_id=session_id,
             cv_data=cv_data,
             metadata=metadata,
+            etag=etag,
         )
     
     def update_field(
@@ -150,6 +567,8 @@ class CVSessionStore:
         """
         Update specific field in CV data (supports nested paths)
 
+        Only the CV section holding the path and the event log are rewritten (see `patch_session`).
+
         Args:
             session_id: Session identifier
             field_path: Dot-notation path (e.g., "full_name", "work_experience[0].employer")
@@ -158,130 +577,87 @@ class CVSessionStore:
         Returns:
             True if updated, False if session not found
         """
-        session = self.get_session(session_id)
-        if not session:
-            return False
-
-        cv_data = session["cv_data"]
-        metadata = session.get("metadata") if isinstance(session.get("metadata"), dict) else {}
-        if not isinstance(metadata, dict):
-            metadata = {}
-
-        # Keep logs minimal (avoid dumping personal data).
-        value_preview = "(empty)"
-        if isinstance(value, str):
-            value_preview = f"<str:{len(value)}>"
-        elif isinstance(value, list):
-            value_preview = f"<list:{len(value)}>"
-        elif isinstance(value, dict):
-            value_preview = f"<dict:{len(value)}>"
-        else:
-            value_preview = f"<{type(value).__name__}>"
-        logging.debug(f"update_field: path={field_path}, value={value_preview}")
-
-        # Parse field path and update
-        parts = field_path.replace("[", ".").replace("]", "").split(".")
-        current = cv_data
-
-        for i, part in enumerate(parts[:-1]):
-            if part.isdigit():
-                idx = int(part)
-                if not isinstance(current, list):
-                    raise TypeError(
-                        f"Invalid path '{field_path}': expected list at '{'.'.join(parts[:i])}', got {type(current).__name__}"
-                    )
-                # Auto-expand lists for start-from-0 sessions (common for work_experience[0] style updates)
-                if idx >= len(current):
-                    current.extend({} for _ in range(idx - len(current) + 1))
-                current = current[idx]
-            else:
-                if part not in current:
-                    # If the next segment is a numeric index, this key should be a list.
-                    next_part = parts[i + 1]
-                    current[part] = [] if next_part.isdigit() else {}
-                current = current[part]
-
-        # Set final value
-        last_key = parts[-1]
-        if last_key.isdigit():
-            idx = int(last_key)
-            if not isinstance(current, list):
-                raise TypeError(
-                    f"Invalid path '{field_path}': expected list at '{'.'.join(parts[:-1])}', got {type(current).__name__}"
-                )
-            if idx >= len(current):
-                current.extend(None for _ in range(idx - len(current) + 1))
-            current[idx] = value
-        else:
-            current[last_key] = value
+        evt = _field_update_event(field_path, value, client_context)
+        return self._retry_on_conflict(
+            session_id,
+            lambda: self.patch_session(session_id, {field_path: value}, events=[evt]),
+        )
 
-        # Log the updated cv_data signature (debug-only).
+    def append_event(self, session_id: str, event: Dict[str, Any]) -> bool:
+        """Append a small event record to session metadata (bounded) without changing CV data."""
         try:
-            work_exp_count = len(cv_data.get("work_experience", []))
-            edu_count = len(cv_data.get("education", []))
-            profile_len = len(str(cv_data.get("profile", "")))
-            logging.debug(
-                f"update_field: after update - work_exp_count={work_exp_count}, edu_count={edu_count}, profile_len={profile_len}"
-            )
-        except Exception:
-            pass
+            out = dict(event or {})
+        except (TypeError, ValueError) as e:
+            logging.warning(f"append_event: failed to append event_log for session {session_id}: {e}")
+            return False
+        out.setdefault("ts", datetime.utcnow().isoformat())
+        return self._retry_on_conflict(session_id, lambda: self.patch_session(session_id, events=[out]))
 
-        # Append a bounded event log entry (helps stateless agent keep continuity across turns).
-        try:
-            event_log = metadata.get("event_log")
-            if not isinstance(event_log, list):
-                event_log = []
-
-            preview = value_preview
-            if isinstance(value, list):
-                preview = f"[{len(value)} items]"
-            elif isinstance(value, dict):
-                preview = f"{{dict with {len(value)} keys}}"
-
-            evt: Dict[str, Any] = {
-                "ts": datetime.utcnow().isoformat(),
-                "type": "update_cv_field",
-                "field_path": field_path,
-                "value_type": type(value).__name__,
-                "preview": preview,
-            }
-            if isinstance(client_context, dict) and client_context:
-                # Keep only a bounded, non-sensitive context summary.
-                evt["client_context_keys"] = list(client_context.keys())[:20]
-            event_log.append(evt)
+    def patch_session(
+        self,
+        session_id: str,
+        field_patches: Optional[Dict[str, Any]] = None,
+        *,
+        events: Optional[list[Dict[str, Any]]] = None,
+        max_table_size: int = 50000,
+    ) -> bool:
+        """
+        Apply field-path patches to cv_data and append events, rewriting only what changed.
 
-            # Keep only last N events to cap Table Storage size.
-            metadata["event_log"] = event_log[-self.EVENT_LOG_MAX_ITEMS :]
-        except Exception as e:
-            logging.warning(f"update_field: failed to append event_log for session {session_id}: {e}")
+        In the section layout each touched CV section (and the event log) is decoded, patched,
+        re-encoded and sent on its own with a conditional `merge`. Sessions in the legacy layout,
+        with cv_data offloaded to blob, or whose patched property outgrows `max_table_size` get a
+        full write instead, which also moves them to the section layout.
+
+        Args:
+            session_id: Session identifier
+            field_patches: {field_path: value}; paths as in `update_field`
+            events: Event records appended to the bounded event log
+            max_table_size: Maximum property size in bytes before falling back to a full write
 
-        return self.update_session(session_id, cv_data, metadata)
+        Returns:
+            True if updated, False if session not found
 
-    def append_event(self, session_id: str, event: Dict[str, Any]) -> bool:
-        """Append a small event record to session metadata (bounded) without changing CV data."""
-        session = self.get_session(session_id)
-        if not session:
+        Raises:
+            SessionConflictError: the session was modified since it was loaded
+        """
+        entry = self._load_entry(session_id)
+        if entry is None:
+            logging.warning(f"Session {session_id} not found for update")
             return False
 
-        cv_data = session["cv_data"]
-        metadata = session.get("metadata") if isinstance(session.get("metadata"), dict) else {}
-        if not isinstance(metadata, dict):
-            metadata = {}
+        entity = entry.entity
+        patches = dict(field_patches or {})
+        props, event_log = _plan_patch(
+            entity, patches, events, max_events=self.EVENT_LOG_MAX_ITEMS, max_table_size=max_table_size
+        )
 
-        try:
-            event_log = metadata.get("event_log")
-            if not isinstance(event_log, list):
-                event_log = []
+        if props is None:
+            cv_data, metadata = _patched_payloads(entity, patches, event_log if events else None, self.METADATA_HOT_KEYS)
+            return self._replace_session_entity(
+                session_id, dict(entity), entry.etag, cv_data, metadata, max_table_size=max_table_size
+            )
 
-            out = dict(event or {})
-            out.setdefault("ts", datetime.utcnow().isoformat())
-            event_log.append(out)
-            metadata["event_log"] = event_log[-self.EVENT_LOG_MAX_ITEMS :]
-        except Exception as e:
-            logging.warning(f"append_event: failed to append event_log for session {session_id}: {e}")
+        patch = {"PartitionKey": entity.get("PartitionKey") or partition_for(session_id), "RowKey": session_id, **props}
+        patch["updated_at"] = datetime.utcnow().isoformat()
+        patch["version"] = (entry.version or 1) + 1
+        result = self._write_entity(session_id, patch, entry.etag, mode="merge")
+        if result is None:
             return False
+        self._cache_remember(session_id, {**entity, **patch}, result)
+        logging.info(f"Patched session {session_id} ({', '.join(sorted(props))}), version {patch['version']}")
+        return True
 
-        return self.update_session(session_id, cv_data, metadata)
+    def _retry_on_conflict(self, session_id: str, write: Callable[[], bool]) -> bool:
+        """Run a read-modify-write, re-running it (on a fresh read) when a concurrent write wins."""
+        for attempt in range(self.CONFLICT_RETRIES + 1):
+            try:
+                return write()
+            except SessionConflictError:
+                if attempt >= self.CONFLICT_RETRIES:
+                    raise
+                logging.info(f"Session {session_id} changed concurrently; retrying write (attempt {attempt + 2})")
+        return False
     
     def delete_session(self, session_id: str) -> bool:
         """
@@ -293,35 +669,62 @@ class CVSessionStore:
         Returns:
             True if deleted, False if not found
         """
+        entry = self._cache_peek(session_id)
+        known_partition = entry.entity.get("PartitionKey") if entry is not None else None
+        partitions = (known_partition,) if known_partition else read_partitions(session_id)
+        deleted = False
         try:
-            self.table_client.delete_entity(partition_key="cv", row_key=session_id)
+            for partition_key in partitions:
+                try:
+                    self.table_client.delete_entity(partition_key=partition_key, row_key=session_id)
+                    deleted = True
+                except ResourceNotFoundError:
+                    continue
+        finally:
+            self._cache_forget(session_id)
+        self._unindex_user_session(session_id)
+        if deleted:
             logging.info(f"Deleted session {session_id}")
-            return True
-        except ResourceNotFoundError:
+        else:
             logging.warning(f"Session {session_id} not found for deletion")
-            return False
+        return deleted
     
     def cleanup_expired(self) -> int:
         """
-        Remove expired sessions
+        Remove expired sessions and the blobs they own (see run_cleanup).
         
         Returns:
             Number of sessions deleted
         """
-        now = datetime.utcnow()
-        deleted = 0
-        
-        query = f"PartitionKey eq 'cv' and expires_at lt datetime'{now.isoformat()}'"
-        entities = self.table_client.query_entities(query)
-        
-        for entity in entities:
-            self.table_client.delete_entity(partition_key=entity["PartitionKey"], row_key=entity["RowKey"])
-            deleted += 1
-        
-        if deleted > 0:
-            logging.info(f"Cleaned up {deleted} expired sessions")
-        
-        return deleted
+        return self.run_cleanup().sessions_deleted
+
+    def run_cleanup(self, *, blob_service_factory: Optional[Callable[[], Any]] = None) -> CleanupReport:
+        """
+        Remove expired sessions in batched table transactions, partitions in parallel, then
+        delete each removed session's artifacts, PDFs and photo blobs.
+
+        Returns:
+            CleanupReport with row, blob and byte counts
+        """
+        engine = SessionCleanupEngine(self, blob_service_factory=blob_service_factory)
+        return engine.run()
+
+    def iter_session_entities(self, *, select: Optional[list[str]] = None):
+        """All session rows across partitions (legacy "cv" and sharded); a full table scan."""
+        if select is not None:
+            select = list(dict.fromkeys(["PartitionKey", "RowKey", *select]))
+        for entity in self.table_client.list_entities(select=select):
+            if is_session_partition(entity.get("PartitionKey")):
+                yield entity
+
+    def _get_session_entity(self, session_id: str, *, select: Optional[list[str]] = None) -> Any:
+        """Point read across the partitions the session may live in (see session_partitions)."""
+        for partition_key in read_partitions(session_id):
+            try:
+                return self.table_client.get_entity(partition_key=partition_key, row_key=session_id, select=select)
+            except ResourceNotFoundError:
+                continue
+        raise ResourceNotFoundError(f"Session {session_id} not found")
 
     def delete_all_sessions(self) -> int:
         """
@@ -329,10 +732,16 @@ class CVSessionStore:
         Returns number of deleted sessions.
         """
         deleted = 0
-        for entity in self.table_client.list_entities():
-            if entity.get("PartitionKey") == "cv":
-                self.table_client.delete_entity(partition_key=entity["PartitionKey"], row_key=entity["RowKey"])
-                deleted += 1
+        for entity in self.iter_session_entities(select=["source_docx_sha256"]):
+            self.table_client.delete_entity(partition_key=entity["PartitionKey"], row_key=entity["RowKey"])
+            self._cache_forget(entity["RowKey"])
+            self._unindex_docx_hash(entity.get("source_docx_sha256"), entity["RowKey"])
+            deleted += 1
+        for index_client in (getattr(self, "docx_index_client", None), getattr(self, "user_index_client", None)):
+            if index_client is None:
+                continue
+            for row in index_client.list_entities():
+                index_client.delete_entity(partition_key=row["PartitionKey"], row_key=row["RowKey"])
         logging.info(f"Deleted {deleted} session(s) via delete_all_sessions()")
         return deleted
 
@@ -341,21 +750,56 @@ class CVSessionStore:
 
         This enables idempotent upload behavior: re-uploading the same DOCX can
         resume an existing session instead of creating a brand-new one.
+
+        Candidates come from the DOCX hash index (one partition per hash), ranked by the
+        `updated_at` the index row carries (refreshed on every full write). Only the chosen
+        session is confirmed with a projected point read; index rows for sessions that no
+        longer exist are dropped and the next candidate is tried. Stores without an index
+        client fall back to a scan.
         """
         if not source_docx_hash:
             return None
 
+        docx_hash = _normalize_hex_key(source_docx_hash)
+        index_client = getattr(self, "docx_index_client", None)
+        if index_client is None or not docx_hash:
+            return self._scan_latest_session_by_source_docx_hash(source_docx_hash)
+
+        now_iso = datetime.utcnow().isoformat()
+        candidates: list[tuple[str, str]] = []
+        for row in index_client.query_entities(f"PartitionKey eq '{docx_hash}'"):
+            session_id = str(row.get("RowKey") or "")
+            if not session_id:
+                continue
+            expires_at = str(row.get("expires_at") or "")
+            if expires_at and expires_at < now_iso:
+                continue
+            candidates.append((str(row.get("updated_at") or row.get("created_at") or ""), session_id))
+
+        for _, session_id in sorted(candidates, reverse=True):
+            try:
+                entity = self._get_session_entity(session_id, select=["expires_at"])
+            except ResourceNotFoundError:
+                self._unindex_docx_hash(docx_hash, session_id)
+                continue
+            expires_at = str(entity.get("expires_at") or "")
+            if expires_at and expires_at < now_iso:
+                continue
+            return session_id
+        return None
+
+    def _scan_latest_session_by_source_docx_hash(self, source_docx_hash: str) -> Optional[str]:
+        """Full-partition scan over session metadata (no index available)."""
         best_row_key: Optional[str] = None
         best_updated_at = ""
         now_iso = datetime.utcnow().isoformat()
 
-        query = "PartitionKey eq 'cv'"
-        for entity in self.table_client.query_entities(query):
+        for entity in self.iter_session_entities(select=["metadata_json", "expires_at", "updated_at"]):
             metadata_json = entity.get("metadata_json")
             if not metadata_json:
                 continue
             try:
-                meta = json.loads(metadata_json)
+                meta = decode_json_property(metadata_json)
             except Exception:
                 continue
             if not isinstance(meta, dict):
@@ -375,38 +819,175 @@ class CVSessionStore:
 
         return best_row_key or None
 
+    def index_session_docx_hash(self, session_id: str, entity: Dict[str, Any]) -> bool:
+        """Add a session entity to the DOCX hash index (used by writes and the backfill script)."""
+        docx_hash = _normalize_hex_key(entity.get("source_docx_sha256"))
+        if not docx_hash:
+            try:
+                meta = _read_metadata(entity, ())
+            except Exception:
+                return False
+            docx_hash = _normalize_hex_key(meta.get("source_docx_sha256") if isinstance(meta, dict) else None)
+        if not docx_hash:
+            return False
+        return self._index_docx_hash(docx_hash, session_id, entity)
+
+    def _index_docx_hash(self, docx_hash: str, session_id: str, entity: Dict[str, Any]) -> bool:
+        index_client = getattr(self, "docx_index_client", None)
+        if index_client is None:
+            return False
+        try:
+            index_client.upsert_entity(_docx_index_entity(docx_hash, session_id, entity))
+            return True
+        except Exception as exc:
+            # The index is an accelerator: a failed write must not fail the session write.
+            logging.warning(f"Failed to index DOCX hash for session {session_id}: {exc}")
+            return False
+
+    def index_user_session(self, user_id: str, session_id: str, summary: Dict[str, Any]) -> bool:
+        """Record a session's compact summary (e.g. its job-data row) under the profile user id.
+
+        The row carries the session's expires_at (from the cache, else a projected point read) so
+        listing skips it and cleanup removes it once the session expires.
+        """
+        index_client = getattr(self, "user_index_client", None)
+        user_key = _normalize_hex_key(user_id)
+        if index_client is None or not user_key or not session_id:
+            return False
+        entry = self._cache_peek(session_id)
+        if entry is not None:
+            expires_at = entry.entity.get("expires_at")
+        else:
+            try:
+                expires_at = self._get_session_entity(session_id, select=["expires_at"]).get("expires_at")
+            except ResourceNotFoundError:
+                return False
+        index_client.upsert_entity(
+            {
+                "PartitionKey": user_key,
+                "RowKey": session_id,
+                "summary_json": encode_json_property(summary),
+                "updated_at": str(summary.get("updated_at") or datetime.utcnow().isoformat()),
+                "expires_at": expires_at,
+            }
+        )
+        return True
+
+    def list_user_session_summaries(self, user_id: str, *, limit: int = 64) -> list[Dict[str, Any]]:
+        """Summaries indexed for a user's unexpired sessions, newest first (one partition query, no session reads)."""
+        index_client = getattr(self, "user_index_client", None)
+        user_key = _normalize_hex_key(user_id)
+        if index_client is None or not user_key:
+            return []
+        now_iso = datetime.utcnow().isoformat()
+        summaries: list[Dict[str, Any]] = []
+        for row in index_client.query_entities(
+            f"PartitionKey eq '{user_key}' and expires_at ge '{now_iso}'",
+            select=["RowKey", "summary_json", "updated_at"],
+        ):
+            try:
+                summary = decode_json_property(row["summary_json"])
+            except Exception:
+                continue
+            if isinstance(summary, dict):
+                summary.setdefault("session_id", row.get("RowKey"))
+                summaries.append(summary)
+        summaries.sort(key=lambda r: str(r.get("updated_at") or ""), reverse=True)
+        return summaries[: max(0, int(limit))]
+
+    def _unindex_user_session(self, session_id: str) -> None:
+        """Drop a deleted session's user-index rows (the index is keyed by user, so look them up by RowKey)."""
+        index_client = getattr(self, "user_index_client", None)
+        if index_client is None:
+            return
+        try:
+            for row in index_client.query_entities(f"RowKey eq '{session_id}'", select=["PartitionKey", "RowKey"]):
+                index_client.delete_entity(partition_key=row["PartitionKey"], row_key=session_id)
+        except Exception as exc:
+            logging.debug(f"Failed to drop user index rows for session {session_id}: {exc}")
+
+    def _unindex_docx_hash(self, docx_hash: Any, session_id: str) -> None:
+        index_client = getattr(self, "docx_index_client", None)
+        docx_hash = _normalize_hex_key(docx_hash)
+        if index_client is None or not docx_hash:
+            return
+        try:
+            index_client.delete_entity(partition_key=docx_hash, row_key=session_id)
+        except Exception as exc:
+            logging.debug(f"Failed to drop DOCX index row for session {session_id}: {exc}")
+
     def update_session_with_blob_offload(
         self,
         session_id: str,
         cv_data: Dict[str, Any],
         metadata: Optional[Dict[str, Any]] = None,
         *,
-        max_table_size: int = 50000  # Conservative limit (Azure Table limit is 64KB per property)
+        max_table_size: int = 50000,  # Conservative limit (Azure Table limit is 64KB per property)
+        etag: Optional[str] = None,
     ) -> bool:
         """
         Update session with automatic blob offloading for large cv_data.
         
         If cv_data exceeds max_table_size, it is stored in blob storage
         and replaced with a reference in the table entity.
+
+        The replace is conditional (If-Match) on the ETag the session was loaded with:
+        `etag` when given, otherwise the entity cached by the last read/write through this
+        store. With an `etag` and new metadata the entity is not read again (its non-payload
+        properties are remembered per ETag); it is only read first when neither is known.
         
         Args:
             session_id: Session identifier
             cv_data: Updated CV data (may be large)
             metadata: Optional updated metadata
             max_table_size: Maximum size in bytes before offloading to blob
+            etag: ETag the caller loaded the session with
         
         Returns:
             True if updated, False if session not found
+
+        Raises:
+            SessionConflictError: the session was modified since it was loaded
         """
-        try:
-            entity = self.table_client.get_entity(partition_key="cv", row_key=session_id)
-        except ResourceNotFoundError:
-            logging.warning(f"Session {session_id} not found for update")
-            return False
-        
-        # Estimate cv_data size
-        cv_data_json = json.dumps(cv_data, ensure_ascii=False)
-        cv_data_bytes = len(cv_data_json.encode('utf-8'))
+        entry = self._cache_peek(session_id)
+        header = ENTITY_HEADERS.get(session_id, etag) if etag and metadata is not None else None
+        if entry is not None and (etag is None or entry.etag == etag):
+            entity = dict(entry.entity)
+            if_match = entry.etag
+        elif header is not None:
+            # cv_data and metadata are rewritten in full: the loaded version's header is all we need.
+            entity = header
+            if_match = etag
+        else:
+            if etag is None:
+                logging.info(f"Session {session_id} written without the ETag it was loaded with; reading it first")
+            try:
+                current = self._get_session_entity(session_id)
+            except ResourceNotFoundError:
+                self._cache_forget(session_id)
+                logging.warning(f"Session {session_id} not found for update")
+                return False
+            entity = dict(current)
+            if_match = etag or self._entity_etag(current)
+
+        return self._replace_session_entity(
+            session_id, entity, if_match, cv_data, metadata, max_table_size=max_table_size
+        )
+
+    def _replace_session_entity(
+        self,
+        session_id: str,
+        entity: Dict[str, Any],
+        if_match: Optional[str],
+        cv_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]],
+        *,
+        max_table_size: int,
+    ) -> bool:
+        """Rewrite the whole entity (section layout), offloading oversized payloads to blob."""
+        reindex: Optional[str] = None
+        previous_hash = ""
+        cv_props, cv_data_bytes = _encode_cv_sections(cv_data)
         
         if cv_data_bytes > max_table_size:
             # Offload cv_data to blob storage
@@ -418,6 +999,8 @@ class CVSessionStore:
             blob_ref = self._offload_cv_data_to_blob(session_id, cv_data)
             
             # Store only a reference in table
+            entity.pop("cv_layout", None)
+            _drop_properties(entity, _CV_SECTION_PREFIX)
             entity["cv_data_json"] = json.dumps({
                 "__blob_ref__": blob_ref,
                 "__offloaded__": True,
@@ -426,38 +1009,159 @@ class CVSessionStore:
             
             # Also add blob reference to metadata for tracking
             if metadata is None:
-                metadata_str = entity.get("metadata_json", "{}")
-                metadata = json.loads(metadata_str) if metadata_str else {}
+                metadata = _read_metadata(entity, self.METADATA_HOT_KEYS)
             
             metadata["cv_data_blob_ref"] = blob_ref
             metadata["cv_data_offloaded_at"] = datetime.utcnow().isoformat()
         else:
             # Store directly in table (normal path)
-            entity["cv_data_json"] = cv_data_json
+            _apply_cv_sections(entity, cv_props)
         
         if metadata is not None:
-            metadata_out = dict(metadata) if isinstance(metadata, dict) else {}
-            metadata_json = json.dumps(metadata_out, ensure_ascii=False)
-            metadata_bytes = len(metadata_json.encode("utf-8"))
+            metadata_out = loaded_metadata(metadata) if isinstance(metadata, dict) else {}
+            meta_props, metadata_bytes = _encode_metadata(metadata_out, self.METADATA_HOT_KEYS)
 
             if metadata_bytes > max_table_size:
                 metadata_out = self._offload_heavy_metadata_to_blob(session_id, metadata_out)
-                metadata_json = json.dumps(metadata_out, ensure_ascii=False)
-                metadata_bytes = len(metadata_json.encode("utf-8"))
+                meta_props, metadata_bytes = _encode_metadata(metadata_out, self.METADATA_HOT_KEYS)
 
             if metadata_bytes > max_table_size:
                 metadata_out = self._compact_metadata_for_table(metadata_out)
-                metadata_json = json.dumps(metadata_out, ensure_ascii=False)
+                meta_props, _ = _encode_metadata(metadata_out, self.METADATA_HOT_KEYS)
+
+            _apply_metadata(entity, meta_props)
 
-            entity["metadata_json"] = metadata_json
+            docx_hash = _normalize_hex_key(metadata_out.get("source_docx_sha256"))
+            previous_hash = _normalize_hex_key(entity.get("source_docx_sha256"))
+            if docx_hash != previous_hash:
+                entity["source_docx_sha256"] = docx_hash
+                reindex = docx_hash
         
         entity["updated_at"] = datetime.utcnow().isoformat()
         entity["version"] = entity.get("version", 1) + 1
         
-        self.table_client.update_entity(entity, mode="replace")
+        result = self._write_entity(session_id, entity, if_match, mode="replace")
+        if result is None:
+            return False
+        self._cache_remember(session_id, entity, result)
+        if reindex is not None:
+            if previous_hash:
+                self._unindex_docx_hash(previous_hash, session_id)
+            if reindex:
+                self._index_docx_hash(reindex, session_id, entity)
+        elif entity.get("source_docx_sha256"):
+            # Keep the index row's updated_at current: lookups rank candidates by it.
+            self._index_docx_hash(entity["source_docx_sha256"], session_id, entity)
         logging.info(f"Updated session {session_id}, version {entity['version']}")
         return True
 
+    def _write_entity(self, session_id: str, entity: Dict[str, Any], if_match: Optional[str], *, mode: str) -> Any:
+        """Conditional update (If-Match when an ETag is known); None if the session no longer exists."""
+        write_kwargs: Dict[str, Any] = {}
+        if if_match:
+            write_kwargs = {"etag": if_match, "match_condition": MatchConditions.IfNotModified}
+        try:
+            return self.table_client.update_entity(entity, mode=mode, **write_kwargs)
+        except ResourceModifiedError as exc:
+            self._cache_forget(session_id)
+            logging.warning(f"Session {session_id} changed since version {entity['version'] - 1} was loaded")
+            raise SessionConflictError(session_id, expected_etag=if_match) from exc
+        except ResourceNotFoundError:
+            self._cache_forget(session_id)
+            logging.warning(f"Session {session_id} not found for update")
+            return None
+
+    @staticmethod
+    def _entity_etag(entity: Any, write_result: Any = None) -> Optional[str]:
+        if isinstance(write_result, dict) and write_result.get("etag"):
+            return str(write_result["etag"])
+        entity_meta = getattr(entity, "metadata", None)
+        return entity_meta.get("etag") if isinstance(entity_meta, dict) else None
+
+    def _load_entry(self, session_id: str) -> Optional[CachedSession]:
+        """Cached entity (see `_cache_lookup`) or a fresh read; None if the session does not exist."""
+        entry = self._cache_lookup(session_id)
+        if entry is not None:
+            return entry
+        try:
+            entity = self._get_session_entity(session_id)
+        except ResourceNotFoundError:
+            self._cache_forget(session_id)
+            return None
+        return self._cache_remember(session_id, entity)
+
+    def _cache_remember(self, session_id: str, entity: Dict[str, Any], write_result: Any = None) -> CachedSession:
+        """Record the entity as last read/written (request scope and, if enabled, process LRU)."""
+        entry = CachedSession(
+            etag=self._entity_etag(entity, write_result),
+            version=entity.get("version", 1),
+            entity=dict(entity),
+        )
+        ENTITY_HEADERS.put(session_id, entry.etag, _entity_header(entry.entity))
+        scope = current_session_scope()
+        if scope is not None:
+            scope.put(session_id, entry)
+        lru = get_process_session_cache()
+        if lru is not None:
+            lru.put(session_id, entry)
+        return entry
+
+    def _cache_forget(self, session_id: str) -> None:
+        scope = current_session_scope()
+        if scope is not None:
+            scope.invalidate(session_id)
+        lru = get_process_session_cache()
+        if lru is not None:
+            lru.invalidate(session_id)
+
+    def _cache_peek(self, session_id: str) -> Optional[CachedSession]:
+        scope = current_session_scope()
+        if scope is not None:
+            return scope.get(session_id)
+        lru = get_process_session_cache()
+        return lru.get(session_id) if lru is not None else None
+
+    def _cache_lookup(self, session_id: str) -> Optional[CachedSession]:
+        """Cached entity for a read; process-LRU entries are revalidated against the table first."""
+        scope = current_session_scope()
+        if scope is not None:
+            entry = scope.get(session_id)
+            if entry is not None:
+                scope.stats.hits += 1
+                return entry
+
+        lru = get_process_session_cache()
+        if lru is None:
+            if scope is not None:
+                scope.stats.misses += 1
+            return None
+
+        entry = lru.get(session_id)
+        if entry is not None:
+            try:
+                # Projected read: only the version property + ETag, no JSON payloads.
+                probe = self.table_client.get_entity(
+                    partition_key=entry.entity.get("PartitionKey") or partition_for(session_id),
+                    row_key=session_id,
+                    select=["version"],
+                )
+            except Exception:
+                probe = None
+            if probe is not None and entry.matches(self._entity_etag(probe), probe.get("version", 1)):
+                lru.stats.hits += 1
+                lru.stats.revalidated += 1
+                if scope is not None:
+                    scope.stats.hits += 1
+                    scope.stats.revalidated += 1
+                    scope.put(session_id, entry)
+                return entry
+            lru.invalidate(session_id)
+
+        lru.stats.misses += 1
+        if scope is not None:
+            scope.stats.misses += 1
+        return None
+
     def _offload_cv_data_to_blob(self, session_id: str, cv_data: Dict[str, Any]) -> str:
         """
         Upload cv_data to blob storage and return blob reference.
@@ -470,88 +1174,32 @@ class CVSessionStore:
             Blob reference string (format: 'container/blob_name')
         """
         from .blob_store import CVBlobStore
-        
-        # Use cv-artifacts container for session data snapshots
+
         container = os.environ.get("STORAGE_CONTAINER_ARTIFACTS", "cv-artifacts")
         blob_store = CVBlobStore(container=container)
-        
-        # Create blob name with timestamp
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        blob_name = f"{session_id}/cv_data_{timestamp}.json"
-        
-        # Upload cv_data as JSON blob
-        pointer = blob_store.upload_json_snapshot(
-            blob_name=blob_name,
-            data=cv_data,
-            metadata={
-                'session_id': session_id,
-                'snapshot_type': 'cv_data_offload',
-                'timestamp': timestamp
-            }
+        # Content-addressed: re-persisting an unchanged cv_data reuses the existing blob.
+        pointer = blob_store.upload_json_content(
+            cv_data, session_id=session_id, refs=self.blob_refs, kind="cv_data_offload"
         )
-        
         return f"{pointer.container}/{pointer.blob_name}"
 
     def _offload_heavy_metadata_to_blob(self, session_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Move heavy metadata fields to blob and keep only table-safe summaries."""
-        meta_out = dict(metadata or {})
-        heavy_payload: Dict[str, Any] = {}
-        summaries: Dict[str, Any] = {}
-
-        for key in self.METADATA_HEAVY_KEYS:
-            if key not in meta_out:
-                continue
-            value = meta_out.pop(key)
-            heavy_payload[key] = value
-
-            if key == "pdf_refs" and isinstance(value, dict):
-                entries = [(k, v) for k, v in value.items() if isinstance(v, dict)]
-                entries.sort(key=lambda x: str((x[1] or {}).get("created_at") or ""), reverse=True)
-                summaries["pdf_refs_count"] = len(entries)
-                summaries["pdf_refs"] = {
-                    str(k): {
-                        "created_at": v.get("created_at"),
-                        "size_bytes": v.get("size_bytes"),
-                        "target_language": v.get("target_language"),
-                        "download_name": v.get("download_name"),
-                    }
-                    for k, v in entries[:3]
-                }
-            elif key == "event_log" and isinstance(value, list):
-                summaries["event_log_count"] = len(value)
-            elif key == "job_data_table_history" and isinstance(value, list):
-                summaries["job_data_table_history_count"] = len(value)
-            elif key == "job_posting_text" and isinstance(value, str):
-                summaries["job_posting_text_snippet"] = value[:200]
-                summaries["job_posting_text_length"] = len(value)
+        """Move heavy metadata fields to one blob per key and keep only table-safe summaries.
 
+        Refs of keys offloaded earlier (and not loaded since) are carried over, so they stay
+        readable through `LazyMetadata`.
+        """
+        meta_out, heavy_payload, summaries = _split_heavy_metadata(metadata, self.METADATA_HEAVY_KEYS)
         if not heavy_payload:
             return meta_out
-
-        blob_ref = self._offload_metadata_payload_to_blob(session_id, heavy_payload)
-        meta_out.update(summaries)
-        meta_out["metadata_blob_ref"] = blob_ref
-        meta_out["metadata_blob_offloaded_at"] = datetime.utcnow().isoformat()
-        meta_out["metadata_blob_keys"] = sorted(list(heavy_payload.keys()))
-        return meta_out
+        new_refs = {
+            key: self._offload_metadata_payload_to_blob(session_id, {key: value}) for key, value in heavy_payload.items()
+        }
+        return _attach_heavy_refs(meta_out, summaries, new_refs, self.METADATA_HEAVY_KEYS)
 
     def _compact_metadata_for_table(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Last-chance table compaction when metadata is still too large."""
-        meta_out = dict(metadata or {})
-
-        for key in ("work_experience_proposal_block", "skills_proposal_block", "docx_prefill_unconfirmed", "event_log"):
-            meta_out.pop(key, None)
-
-        jpt = meta_out.get("job_posting_text_snippet")
-        if isinstance(jpt, str) and len(jpt) > 120:
-            meta_out["job_posting_text_snippet"] = jpt[:120]
-
-        pdf_refs = meta_out.get("pdf_refs")
-        if isinstance(pdf_refs, dict) and len(pdf_refs) > 1:
-            first_key = next(iter(pdf_refs.keys()))
-            meta_out["pdf_refs"] = {first_key: pdf_refs[first_key]}
-
-        return meta_out
+        return _compact_metadata(metadata)
 
     def _offload_metadata_payload_to_blob(self, session_id: str, payload: Dict[str, Any]) -> str:
         """Upload heavy metadata payload to blob and return blob reference."""
@@ -559,17 +1207,13 @@ class CVSessionStore:
 
         container = os.environ.get("STORAGE_CONTAINER_ARTIFACTS", "cv-artifacts")
         blob_store = CVBlobStore(container=container)
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        blob_name = f"{session_id}/metadata_heavy_{timestamp}.json"
-
-        pointer = blob_store.upload_json_snapshot(
-            blob_name=blob_name,
-            data=payload,
-            metadata={
-                "session_id": session_id,
-                "snapshot_type": "metadata_heavy_offload",
-                "timestamp": timestamp,
-            },
+        # One blob per heavy key, so reading one key never downloads the others; content-addressed,
+        # so a key whose value did not change since the last offload is not uploaded again.
+        pointer = blob_store.upload_json_content(
+            payload,
+            session_id=session_id,
+            refs=self.blob_refs,
+            kind="metadata_heavy:" + ",".join(sorted(payload)),
         )
         return f"{pointer.container}/{pointer.blob_name}"
 
@@ -589,6 +1233,9 @@ class CVSessionStore:
     def get_session_with_blob_retrieval(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Get session data, automatically retrieving cv_data from blob if offloaded.
+
+        Offloaded heavy metadata is not downloaded here: `metadata` is a `LazyMetadata` that
+        fetches a heavy key's blob the first time that key is read.
         
         Args:
             session_id: Session identifier
@@ -599,35 +1246,53 @@ class CVSessionStore:
         session = self.get_session(session_id)
         if not session:
             return None
-        
-        cv_data = session.get("cv_data")
-        
-        # Check if cv_data was offloaded to blob
-        if isinstance(cv_data, dict) and cv_data.get("__offloaded__"):
-            blob_ref = cv_data.get("__blob_ref__")
-            if blob_ref:
-                logging.info(f"Retrieving offloaded cv_data from blob for session {session_id}")
-                cv_data = self._retrieve_cv_data_from_blob(blob_ref)
-                session["cv_data"] = cv_data
+
+        # Blob payloads are immutable per entity version: reuse the hydrated copy when it matches.
+        entry = self._cache_peek(session_id)
+        if entry is not None and entry.version != session.get("version"):
+            entry = None
+        if entry is not None and entry.hydrated_json is not None:
+            scope = current_session_scope()
+            if scope is not None:
+                scope.stats.hydrated_hits += 1
+            session = json.loads(entry.hydrated_json)
+        else:
+            cv_data = session.get("cv_data")
+
+            # Check if cv_data was offloaded to blob
+            if isinstance(cv_data, dict) and cv_data.get("__offloaded__"):
+                blob_ref = cv_data.get("__blob_ref__")
+                if blob_ref:
+                    logging.info(f"Retrieving offloaded cv_data from blob for session {session_id}")
+                    session["cv_data"] = self._retrieve_cv_data_from_blob(blob_ref)
+                    if entry is not None:
+                        try:
+                            entry.hydrated_json = json.dumps(session, ensure_ascii=False)
+                        except (TypeError, ValueError):
+                            pass
 
         metadata = session.get("metadata")
         if isinstance(metadata, dict):
-            meta_blob_ref = metadata.get("metadata_blob_ref")
-            if isinstance(meta_blob_ref, str) and meta_blob_ref:
-                try:
-                    heavy_meta = self._retrieve_metadata_payload_from_blob(meta_blob_ref)
-                    if isinstance(heavy_meta, dict):
-                        for key, value in heavy_meta.items():
-                            metadata.setdefault(key, value)
-                except Exception as exc:
-                    logging.warning(
-                        "Failed to hydrate heavy metadata from blob for session %s: %s",
-                        session_id,
-                        str(exc),
-                    )
+            refs = heavy_blob_refs(metadata, legacy_keys=self.METADATA_HEAVY_KEYS)
+            if refs:
+                session["metadata"] = LazyMetadata(metadata, refs=refs, load=self._metadata_blob_loader(entry))
         
         return session
 
+    def _metadata_blob_loader(self, entry: Optional[CachedSession]) -> Callable[[str], Dict[str, Any]]:
+        """Heavy-metadata blob download, memoized on the cache entry of the session version read."""
+
+        def _load(blob_ref: str) -> Dict[str, Any]:
+            cached = entry.blob_json.get(blob_ref) if entry is not None else None
+            if cached is not None:
+                return json.loads(cached)
+            payload = self._retrieve_metadata_payload_from_blob(blob_ref)
+            if entry is not None and isinstance(payload, dict):
+                entry.blob_json[blob_ref] = json.dumps(payload, ensure_ascii=False)
+            return payload
+
+        return _load
+
     def _retrieve_cv_data_from_blob(self, blob_ref: str) -> Dict[str, Any]:
         """
         Retrieve cv_data from blob storage.
@@ -0,0 +1,442 @@
+"""
+Async CV session store on `azure.data.tables.aio` / `azure.storage.blob.aio`.
+
+Same storage layout, TTL, ETag rules and blob offload as `CVSessionStore` (the entity building
+is shared through the `session_store` helpers), but every call is awaitable so independent I/O
+runs concurrently instead of back to back:
+
+  - a full write reads the current entity while the cv_data blob and each heavy-metadata blob
+    are uploaded;
+  - `get_session_with_blob_retrieval` downloads the cv_data blob and the requested heavy
+    metadata blobs together;
+  - callers can gather their own I/O with it, e.g. a session read next to a photo download, or
+    a PDF upload, a snapshot upload and the session write.
+
+Clients are bound to the running event loop: use `async with AsyncCVSessionStore() as store:` (or
+`await store.close()`). The request/process session cache, cleanup, index queries and migrations
+stay on the synchronous store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables.aio import TableServiceClient
+
+from .blob_cas import AsyncBlobRefIndex
+from .blob_store import BlobPointer, _get_storage_connection_string
+from .blob_store_aio import AsyncCVBlobStore
+from .lazy_metadata import heavy_blob_refs, loaded_metadata
+from .session_partitions import new_session_id, partition_for, read_partitions
+from .session_store import (
+    _CLIENT_CACHE_LOCK,
+    _CV_SECTION_PREFIX,
+    _TABLE_READY,
+    CVSessionStore,
+    SessionConflictError,
+    _apply_cv_sections,
+    _apply_metadata,
+    _attach_heavy_refs,
+    _compact_metadata,
+    _docx_index_entity,
+    _drop_properties,
+    _encode_cv_sections,
+    _encode_metadata,
+    _field_update_event,
+    _new_session_entity,
+    _normalize_hex_key,
+    _patched_payloads,
+    _plan_patch,
+    _read_metadata,
+    _session_view,
+    _split_heavy_metadata,
+)
+
+
+class AsyncCVSessionStore:
+    """Async counterpart of `CVSessionStore` (session CRUD, patches and blob offload/hydration)."""
+
+    TABLE_NAME = CVSessionStore.TABLE_NAME
+    DOCX_INDEX_TABLE_NAME = CVSessionStore.DOCX_INDEX_TABLE_NAME
+    DEFAULT_TTL_HOURS = CVSessionStore.DEFAULT_TTL_HOURS
+    EVENT_LOG_MAX_ITEMS = CVSessionStore.EVENT_LOG_MAX_ITEMS
+    CONFLICT_RETRIES = CVSessionStore.CONFLICT_RETRIES
+    METADATA_HOT_KEYS = CVSessionStore.METADATA_HOT_KEYS
+    METADATA_HEAVY_KEYS = CVSessionStore.METADATA_HEAVY_KEYS
+
+    def __init__(self, connection_string: Optional[str] = None, *, blob_store: Optional[AsyncCVBlobStore] = None):
+        conn_str = connection_string or _get_storage_connection_string()
+        self._conn_str = conn_str
+        self.service_client = TableServiceClient.from_connection_string(conn_str)
+        self.table_client = self.service_client.get_table_client(self.TABLE_NAME)
+        self.docx_index_client = self.service_client.get_table_client(self.DOCX_INDEX_TABLE_NAME)
+        self.blob_refs = AsyncBlobRefIndex(self.service_client.get_table_client(CVSessionStore.BLOB_REFS_TABLE_NAME))
+        self.blob_store = blob_store or AsyncCVBlobStore(
+            conn_str, container=os.environ.get("STORAGE_CONTAINER_ARTIFACTS", "cv-artifacts")
+        )
+
+    async def __aenter__(self) -> "AsyncCVSessionStore":
+        await self._ensure_tables_once()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await asyncio.gather(self.service_client.close(), self.blob_store.close())
+
+    async def _ensure_tables_once(self) -> None:
+        """Create tables if they don't exist (once per process + connection string, shared with the sync store)."""
+        if self._conn_str in _TABLE_READY:
+            return
+        for table_name in CVSessionStore._table_names():
+            try:
+                await self.service_client.create_table(table_name)
+                logging.info(f"Created table: {table_name}")
+            except ResourceExistsError:
+                logging.debug(f"Table {table_name} already exists")
+        with _CLIENT_CACHE_LOCK:
+            _TABLE_READY.add(self._conn_str)
+
+    async def create_session(self, cv_data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Create a new CV session; returns its id."""
+        session_id = new_session_id()
+        entity, docx_hash = _new_session_entity(
+            session_id, cv_data, metadata, ttl_hours=self.DEFAULT_TTL_HOURS, hot_keys=self.METADATA_HOT_KEYS
+        )
+        await self.table_client.create_entity(entity)
+        if docx_hash:
+            await self._index_docx_hash(docx_hash, session_id, entity)
+        logging.info(f"Created session {session_id}, expires at {entity['expires_at']}")
+        return session_id
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session with cv_data and metadata as stored (offloaded payloads are not downloaded), or None."""
+        entity = await self._get_session_entity(session_id)
+        if entity is None:
+            logging.warning(f"Session {session_id} not found")
+            return None
+        return _session_view(session_id, entity, self._entity_etag(entity), self.METADATA_HOT_KEYS)
+
+    async def get_session_with_blob_retrieval(
+        self, session_id: str, *, metadata_keys: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get session data with offloaded cv_data and heavy metadata restored from blob.
+
+        All blobs are downloaded concurrently. `metadata_keys` limits which offloaded heavy
+        metadata keys are fetched (default: all); the others stay absent from `metadata`.
+        """
+        session = await self.get_session(session_id)
+        if not session:
+            return None
+
+        downloads: Dict[str, Awaitable[Dict[str, Any]]] = {}
+        cv_data = session.get("cv_data")
+        cv_ref = cv_data.get("__blob_ref__") if isinstance(cv_data, dict) and cv_data.get("__offloaded__") else None
+        if cv_ref:
+            downloads[cv_ref] = self._download_json(cv_ref)
+
+        metadata = session.get("metadata")
+        wanted: Dict[str, list[str]] = {}
+        if isinstance(metadata, dict):
+            allowed = set(metadata_keys) if metadata_keys is not None else None
+            for key, ref in heavy_blob_refs(metadata, legacy_keys=self.METADATA_HEAVY_KEYS).items():
+                if key not in metadata and (allowed is None or key in allowed):
+                    wanted.setdefault(ref, []).append(key)
+        for ref in wanted:
+            downloads.setdefault(ref, self._download_json(ref))
+
+        results = dict(zip(downloads, await asyncio.gather(*downloads.values(), return_exceptions=True)))
+        if cv_ref:
+            if isinstance(results[cv_ref], BaseException):
+                raise results[cv_ref]
+            logging.info(f"Retrieved offloaded cv_data from blob for session {session_id}")
+            session["cv_data"] = results[cv_ref]
+        for ref, keys in wanted.items():
+            payload = results[ref]
+            if isinstance(payload, BaseException):
+                logging.warning("Failed to hydrate heavy metadata from blob for session %s: %s", session_id, payload)
+                continue
+            if isinstance(payload, dict):
+                for key in keys:
+                    if key in payload:
+                        metadata[key] = payload[key]
+        return session
+
+    async def update_session(
+        self,
+        session_id: str,
+        cv_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        etag: Optional[str] = None,
+    ) -> bool:
+        """Replace cv_data (and metadata); see `update_session_with_blob_offload`."""
+        return await self.update_session_with_blob_offload(session_id, cv_data, metadata, etag=etag)
+
+    async def update_session_with_blob_offload(
+        self,
+        session_id: str,
+        cv_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        max_table_size: int = 50000,
+        etag: Optional[str] = None,
+    ) -> bool:
+        """
+        Replace the session, offloading oversized cv_data / heavy metadata to blob.
+
+        The entity read and the blob uploads run concurrently. The replace is conditional on
+        `etag` when given, otherwise on the ETag of that read.
+
+        Returns:
+            True if updated, False if session not found
+
+        Raises:
+            SessionConflictError: the session was modified since it was loaded
+        """
+        cv_props, cv_data_bytes = _encode_cv_sections(cv_data)
+        offload_cv = cv_data_bytes > max_table_size
+        meta_in = loaded_metadata(metadata) if isinstance(metadata, dict) else ({} if metadata is not None else None)
+
+        entity, cv_ref, prepared = await asyncio.gather(
+            self._get_session_entity(session_id),
+            self._offload_json(session_id, "cv_data_offload", cv_data) if offload_cv else _none(),
+            self._prepare_metadata(session_id, meta_in, max_table_size) if meta_in is not None else _none(),
+        )
+        if entity is None:
+            logging.warning(f"Session {session_id} not found for update")
+            return False
+        if_match = etag or self._entity_etag(entity)
+        entity = dict(entity)
+
+        if offload_cv:
+            logging.info(
+                f"CV data size ({cv_data_bytes} bytes) exceeds table limit ({max_table_size} bytes). "
+                f"Offloaded to blob storage for session {session_id}"
+            )
+            entity.pop("cv_layout", None)
+            _drop_properties(entity, _CV_SECTION_PREFIX)
+            entity["cv_data_json"] = json.dumps(
+                {"__blob_ref__": cv_ref, "__offloaded__": True, "size_bytes": cv_data_bytes}
+            )
+            # The blob reference is tracked in metadata as well.
+            metadata_out = prepared[0] if prepared is not None else _read_metadata(entity, self.METADATA_HOT_KEYS)
+            metadata_out["cv_data_blob_ref"] = cv_ref
+            metadata_out["cv_data_offloaded_at"] = datetime.utcnow().isoformat()
+            prepared = await self._prepare_metadata(session_id, metadata_out, max_table_size)
+        else:
+            _apply_cv_sections(entity, cv_props)
+
+        reindex: Optional[str] = None
+        previous_hash = ""
+        if prepared is not None:
+            metadata_out, meta_props = prepared
+            _apply_metadata(entity, meta_props)
+            docx_hash = _normalize_hex_key(metadata_out.get("source_docx_sha256"))
+            previous_hash = _normalize_hex_key(entity.get("source_docx_sha256"))
+            if docx_hash != previous_hash:
+                entity["source_docx_sha256"] = docx_hash
+                reindex = docx_hash
+
+        entity["updated_at"] = datetime.utcnow().isoformat()
+        entity["version"] = entity.get("version", 1) + 1
+        if await self._write_entity(session_id, entity, if_match, mode="replace") is None:
+            return False
+        if reindex is not None:
+            await asyncio.gather(
+                self._unindex_docx_hash(previous_hash, session_id),
+                self._index_docx_hash(reindex, session_id, entity) if reindex else _none(),
+            )
+        elif entity.get("source_docx_sha256"):
+            # Keep the index row's updated_at current: lookups rank candidates by it.
+            await self._index_docx_hash(entity["source_docx_sha256"], session_id, entity)
+        logging.info(f"Updated session {session_id}, version {entity['version']}")
+        return True
+
+    async def patch_session(
+        self,
+        session_id: str,
+        field_patches: Optional[Dict[str, Any]] = None,
+        *,
+        events: Optional[list[Dict[str, Any]]] = None,
+        max_table_size: int = 50000,
+    ) -> bool:
+        """Apply field-path patches and append events with a conditional merge (see `CVSessionStore.patch_session`)."""
+        entity = await self._get_session_entity(session_id)
+        if entity is None:
+            logging.warning(f"Session {session_id} not found for update")
+            return False
+        patches = dict(field_patches or {})
+        props, event_log = _plan_patch(
+            entity, patches, events, max_events=self.EVENT_LOG_MAX_ITEMS, max_table_size=max_table_size
+        )
+        if props is None:
+            cv_data, metadata = _patched_payloads(
+                entity, patches, event_log if events else None, self.METADATA_HOT_KEYS
+            )
+            return await self.update_session_with_blob_offload(
+                session_id, cv_data, metadata, max_table_size=max_table_size, etag=self._entity_etag(entity)
+            )
+
+        patch = {"PartitionKey": entity.get("PartitionKey") or partition_for(session_id), "RowKey": session_id, **props}
+        patch["updated_at"] = datetime.utcnow().isoformat()
+        patch["version"] = (entity.get("version") or 1) + 1
+        if await self._write_entity(session_id, patch, self._entity_etag(entity), mode="merge") is None:
+            return False
+        logging.info(f"Patched session {session_id} ({', '.join(sorted(props))}), version {patch['version']}")
+        return True
+
+    async def update_field(
+        self,
+        session_id: str,
+        field_path: str,
+        value: Any,
+        client_context: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Update one CV field by dot/bracket path, logging a bounded event (see `CVSessionStore.update_field`)."""
+        evt = _field_update_event(field_path, value, client_context)
+        return await self._retry_on_conflict(
+            session_id, lambda: self.patch_session(session_id, {field_path: value}, events=[evt])
+        )
+
+    async def append_event(self, session_id: str, event: Dict[str, Any]) -> bool:
+        """Append a small event record to session metadata (bounded) without changing CV data."""
+        try:
+            out = dict(event or {})
+        except (TypeError, ValueError) as e:
+            logging.warning(f"append_event: failed to append event_log for session {session_id}: {e}")
+            return False
+        out.setdefault("ts", datetime.utcnow().isoformat())
+        return await self._retry_on_conflict(session_id, lambda: self.patch_session(session_id, events=[out]))
+
+    async def delete_session(self, session_id: str) -> bool:
+        """Delete a session; True if a row was deleted."""
+        deleted = False
+        for partition_key in read_partitions(session_id):
+            try:
+                await self.table_client.delete_entity(partition_key=partition_key, row_key=session_id)
+                deleted = True
+            except ResourceNotFoundError:
+                continue
+        if deleted:
+            logging.info(f"Deleted session {session_id}")
+        else:
+            logging.warning(f"Session {session_id} not found for deletion")
+        return deleted
+
+    async def _retry_on_conflict(self, session_id: str, write: Callable[[], Awaitable[bool]]) -> bool:
+        """Run a read-modify-write, re-running it (on a fresh read) when a concurrent write wins."""
+        for attempt in range(self.CONFLICT_RETRIES + 1):
+            try:
+                return await write()
+            except SessionConflictError:
+                if attempt >= self.CONFLICT_RETRIES:
+                    raise
+                logging.info(f"Session {session_id} changed concurrently; retrying write (attempt {attempt + 2})")
+        return False
+
+    async def _get_session_entity(self, session_id: str) -> Any:
+        """Point read across the partitions the session may live in; None if it does not exist."""
+        for partition_key in read_partitions(session_id):
+            try:
+                return await self.table_client.get_entity(partition_key=partition_key, row_key=session_id)
+            except ResourceNotFoundError:
+                continue
+        return None
+
+    async def _write_entity(
+        self, session_id: str, entity: Dict[str, Any], if_match: Optional[str], *, mode: str
+    ) -> Any:
+        """Conditional update (If-Match when an ETag is known); None if the session no longer exists."""
+        write_kwargs: Dict[str, Any] = {}
+        if if_match:
+            write_kwargs = {"etag": if_match, "match_condition": MatchConditions.IfNotModified}
+        try:
+            return await self.table_client.update_entity(entity, mode=mode, **write_kwargs)
+        except ResourceModifiedError as exc:
+            logging.warning(f"Session {session_id} changed since version {entity['version'] - 1} was loaded")
+            raise SessionConflictError(session_id, expected_etag=if_match) from exc
+        except ResourceNotFoundError:
+            logging.warning(f"Session {session_id} not found for update")
+            return None
+
+    _entity_etag = staticmethod(CVSessionStore._entity_etag)
+
+    async def _prepare_metadata(
+        self, session_id: str, metadata: Dict[str, Any], max_table_size: int
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """(metadata as stored, its entity properties), offloading heavy keys concurrently when too large."""
+        meta_props, metadata_bytes = _encode_metadata(metadata, self.METADATA_HOT_KEYS)
+        if metadata_bytes > max_table_size:
+            meta_out, heavy_payload, summaries = _split_heavy_metadata(metadata, self.METADATA_HEAVY_KEYS)
+            if heavy_payload:
+                refs = await asyncio.gather(
+                    *(
+                        self._offload_json(session_id, f"metadata_heavy:{key}", {key: value})
+                        for key, value in heavy_payload.items()
+                    )
+                )
+                meta_out = _attach_heavy_refs(
+                    meta_out, summaries, dict(zip(heavy_payload, refs)), self.METADATA_HEAVY_KEYS
+                )
+            metadata = meta_out
+            meta_props, metadata_bytes = _encode_metadata(metadata, self.METADATA_HOT_KEYS)
+        if metadata_bytes > max_table_size:
+            metadata = _compact_metadata(metadata)
+            meta_props, _ = _encode_metadata(metadata, self.METADATA_HOT_KEYS)
+        return metadata, meta_props
+
+    async def _offload_json(self, session_id: str, kind: str, data: Dict[str, Any]) -> str:
+        """Upload a JSON payload to the artifacts container; returns 'container/blob_name'.
+
+        Content-addressed with a reference of `kind` (same kinds as the sync store), so unchanged
+        payloads are not uploaded again and expiry cleanup can release them.
+        """
+        pointer = await self.blob_store.upload_json_content(
+            data, session_id=session_id, refs=getattr(self, "blob_refs", None), kind=kind
+        )
+        return f"{pointer.container}/{pointer.blob_name}"
+
+    async def _download_json(self, blob_ref: str) -> Dict[str, Any]:
+        parts = blob_ref.split("/", 1)
+        if len(parts) != 2:
+            raise ValueError(f"Invalid blob reference format: {blob_ref}")
+        container, blob_name = parts
+        return await self.blob_store.download_json_snapshot(
+            BlobPointer(container=container, blob_name=blob_name, content_type="application/json")
+        )
+
+    async def _index_docx_hash(self, docx_hash: str, session_id: str, entity: Dict[str, Any]) -> bool:
+        index_client = getattr(self, "docx_index_client", None)
+        if index_client is None:
+            return False
+        try:
+            await index_client.upsert_entity(_docx_index_entity(docx_hash, session_id, entity))
+            return True
+        except Exception as exc:
+            # The index is an accelerator: a failed write must not fail the session write.
+            logging.warning(f"Failed to index DOCX hash for session {session_id}: {exc}")
+            return False
+
+    async def _unindex_docx_hash(self, docx_hash: Any, session_id: str) -> None:
+        index_client = getattr(self, "docx_index_client", None)
+        docx_hash = _normalize_hex_key(docx_hash)
+        if index_client is None or not docx_hash:
+            return
+        try:
+            await index_client.delete_entity(partition_key=docx_hash, row_key=session_id)
+        except Exception as exc:
+            logging.debug(f"Failed to drop DOCX index row for session {session_id}: {exc}")
+
+
+async def _none() -> None:
+    return None
@@ -0,0 +1,113 @@
+"""
+Encoding of JSON snapshots stored in blob storage (session snapshots, cv_data / metadata offloads).
+
+Snapshots used to be written as `json.dumps(data, indent=2)`; large metadata payloads
+(job_data_table_history, proposal blocks, event logs) are mostly whitespace and repeated keys.
+They are now written as compact JSON (orjson when installed), compressed when large enough:
+
+  - plain:  UTF-8 JSON text; every blob written before this codec (pretty-printed) and small ones
+  - gzip:   Content-Encoding: gzip, payload starts with 1f 8b
+  - zstd:   Content-Encoding: zstd (needs `zstandard`), payload starts with 28 b5 2f fd
+
+The codec is also recorded as blob metadata (`cv_snapshot_format`), but reads sniff the magic
+bytes, so they never need the blob properties and old pretty-printed blobs stay readable.
+Compression is deterministic (gzip mtime=0), so equal data still maps to one content-addressed object.
+
+Environment vars (optional overrides):
+  CV_SNAPSHOT_COMPRESSION=off|gzip|zstd   (default: gzip; zstd falls back to gzip without `zstandard`)
+  CV_SNAPSHOT_COMPRESS_MIN_BYTES=<int>    (default: 1024; smaller JSON is stored plain)
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except Exception:  # pragma: no cover - optional codec
+    zstandard = None  # type: ignore
+
+FORMAT_METADATA_KEY = "cv_snapshot_format"
+FORMAT_PLAIN = "json"
+FORMAT_GZIP = "json+gzip"
+FORMAT_ZSTD = "json+zstd"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+@dataclass(frozen=True)
+class EncodedSnapshot:
+    body: bytes
+    format: str
+    content_encoding: Optional[str]
+    raw_size: int
+
+
+def _compression_mode() -> str:
+    mode = str(os.environ.get("CV_SNAPSHOT_COMPRESSION") or "").strip().lower()
+    if mode == "zstd" and zstandard is None:
+        return "gzip"
+    return mode if mode in {"off", "gzip", "zstd"} else "gzip"
+
+
+def _compress_min_bytes() -> int:
+    try:
+        return max(0, int(str(os.environ.get("CV_SNAPSHOT_COMPRESS_MIN_BYTES") or "").strip() or 1024))
+    except ValueError:
+        return 1024
+
+
+def dumps_compact(data: Any) -> bytes:
+    """Compact UTF-8 JSON (no indentation, no spaces after separators)."""
+    if orjson is not None:
+        try:
+            # dict subclasses (e.g. LazyMetadata) go through the stdlib, which reads them via items().
+            return orjson.dumps(data, option=orjson.OPT_PASSTHROUGH_SUBCLASS)
+        except TypeError:
+            pass  # non-str keys, ints beyond 64 bits, subclasses: the stdlib handles them
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(raw: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except ValueError:
+            pass  # NaN/Infinity and other stdlib-only extensions
+    return json.loads(raw.decode("utf-8"))
+
+
+def encode_snapshot(data: Any) -> EncodedSnapshot:
+    raw = dumps_compact(data)
+    mode = _compression_mode()
+    if mode != "off" and len(raw) >= _compress_min_bytes():
+        if mode == "zstd":
+            packed = zstandard.ZstdCompressor(level=6).compress(raw)
+            fmt, encoding = FORMAT_ZSTD, "zstd"
+        else:
+            packed = gzip.compress(raw, compresslevel=6, mtime=0)
+            fmt, encoding = FORMAT_GZIP, "gzip"
+        if len(packed) < len(raw):
+            return EncodedSnapshot(body=packed, format=fmt, content_encoding=encoding, raw_size=len(raw))
+    return EncodedSnapshot(body=raw, format=FORMAT_PLAIN, content_encoding=None, raw_size=len(raw))
+
+
+def decode_snapshot(body: bytes) -> Any:
+    """Decode a snapshot written by `encode_snapshot` or any earlier (plain JSON) writer."""
+    if body[:2] == _GZIP_MAGIC:
+        return loads(gzip.decompress(body))
+    if body[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise ValueError("zstd-compressed snapshot but `zstandard` is not installed")
+        return loads(zstandard.ZstdDecompressor().decompress(body, max_output_size=256 * 1024 * 1024))
+    return loads(body)
@@ -0,0 +1,157 @@
+"""
+Render-free text measurement with the CV template's font metrics.
+
+The template renders in Arial (or the metric-compatible Liberation Sans on Linux hosts), whose
+advance widths are identical to the Helvetica AFM tables below (units per 1000 em). Wrapping follows
+the template CSS: collapsed whitespace, greedy line filling, breaks after hyphens, and
+`overflow-wrap: anywhere` for words longer than the line.
+
+Word widths are memoized per font, and `count_lines_many` measures a whole batch of texts (e.g.
+every bullet of every role) in one pass against the shared memo, so a full CV estimate costs
+microseconds per bullet instead of a WeasyPrint layout.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+PT_TO_MM = 25.4 / 72.0
+
+# Kerning and sub-pixel rounding make real lines slightly tighter than the AFM sum; keep a small
+# safety margin so estimates err towards one extra line rather than one too few.
+WRAP_SAFETY = 0.985
+
+_ASCII = "".join(chr(c) for c in range(32, 127))
+
+# Helvetica/Arial regular advance widths for ASCII 32..126.
+_REGULAR_ASCII = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+
+# Helvetica/Arial bold advance widths for ASCII 32..126.
+_BOLD_ASCII = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+
+# Common non-ASCII glyphs in CV text (typographic punctuation, German/Polish/French letters are
+# handled by decomposing to their base letter).
+_REGULAR_EXTRA = {
+    " ": 278, "–": 556, "—": 1000, "•": 350, "…": 1000,
+    "‘": 222, "’": 222, "‚": 222, "“": 333, "”": 333, "„": 333,
+    "ß": 611, "æ": 889, "Æ": 1000, "ø": 611, "Ø": 778,
+    "ł": 222, "Ł": 556, "€": 556, "·": 278, "°": 400,
+}
+_BOLD_EXTRA = {
+    " ": 278, "–": 556, "—": 1000, "•": 350, "…": 1000,
+    "‘": 278, "’": 278, "‚": 278, "“": 500, "”": 500, "„": 500,
+    "ß": 611, "æ": 889, "Æ": 1000, "ø": 611, "Ø": 778,
+    "ł": 278, "Ł": 611, "€": 556, "·": 278, "°": 400,
+}
+
+# Fallback for glyphs we have no metrics for (average lowercase width); CJK is full-width.
+_DEFAULT_WIDTH = 556
+_WIDE_WIDTH = 1000
+
+_WS_RE = re.compile(r"\s+")
+# Break opportunities inside a word: after hyphens/dashes and slashes (UAX #14 BA/SY classes).
+_BREAK_AFTER_RE = re.compile(r"(?<=[-‐–/])")
+
+
+class FontMetrics:
+    """Advance-width lookup and line wrapping for one font face (regular or bold)."""
+
+    def __init__(self, *, bold: bool = False) -> None:
+        table = dict(zip(_ASCII, _BOLD_ASCII if bold else _REGULAR_ASCII))
+        table.update(_BOLD_EXTRA if bold else _REGULAR_EXTRA)
+        self.bold = bold
+        self._table = table
+        self._space = table[" "]
+        self._word_cache: dict[str, int] = {}
+
+    def char_units(self, ch: str) -> int:
+        width = self._table.get(ch)
+        if width is not None:
+            return width
+        base = unicodedata.normalize("NFD", ch)[:1]
+        width = self._table.get(base)
+        if width is None:
+            width = _WIDE_WIDTH if unicodedata.east_asian_width(ch) in ("W", "F") else _DEFAULT_WIDTH
+        self._table[ch] = width
+        return width
+
+    def text_units(self, text: str) -> int:
+        """Advance width of `text` in 1/1000 em (no wrapping)."""
+        units = self._word_cache.get(text)
+        if units is None:
+            units = sum(self.char_units(ch) for ch in text)
+            if len(self._word_cache) < 50_000:
+                self._word_cache[text] = units
+        return units
+
+    def width_mm(self, text: str, size_pt: float) -> float:
+        return self.text_units(text) * size_pt * PT_TO_MM / 1000.0
+
+    def _fragments(self, word: str) -> list[str]:
+        if len(word) < 3:
+            return [word]
+        return [frag for frag in _BREAK_AFTER_RE.split(word) if frag]
+
+    def count_lines(self, text: str, *, width_mm: float, size_pt: float) -> int:
+        """Number of wrapped lines `text` occupies in a box `width_mm` wide (0 for blank text)."""
+        words = _WS_RE.split(str(text or "").strip())
+        if not words or words == [""]:
+            return 0
+        capacity = width_mm * WRAP_SAFETY * 1000.0 / (size_pt * PT_TO_MM)
+        if capacity <= 0:
+            return len(words)
+
+        lines = 1
+        used = 0.0
+        for word in words:
+            for i, frag in enumerate(self._fragments(word)):
+                w = self.text_units(frag)
+                # Only the first fragment of a word is preceded by a space.
+                gap = self._space if (used and i == 0) else 0
+                if used + gap + w <= capacity:
+                    used += gap + w
+                    continue
+                if used:
+                    lines += 1
+                    used = 0.0
+                if w <= capacity:
+                    used = w
+                    continue
+                # overflow-wrap: anywhere - break the over-long fragment character by character.
+                for ch in frag:
+                    cw = self.char_units(ch)
+                    if used + cw > capacity and used:
+                        lines += 1
+                        used = 0.0
+                    used += cw
+        return lines
+
+    def count_lines_many(self, texts: Iterable[str], *, width_mm: float, size_pt: float) -> list[int]:
+        """Batch `count_lines` for many texts of the same column (shares the word-width memo)."""
+        return [self.count_lines(t, width_mm=width_mm, size_pt=size_pt) for t in texts]
+
+
+_FONTS: dict[bool, FontMetrics] = {}
+
+
+def get_font_metrics(*, bold: bool = False) -> FontMetrics:
+    font = _FONTS.get(bold)
+    if font is None:
+        font = _FONTS[bold] = FontMetrics(bold=bold)
+    return font
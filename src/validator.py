@@ -5,10 +5,9 @@ This module validates CV content against strict character limits to ensure
 the rendered PDF fits exactly 2 A4 pages (210x297mm).
 
 Limits are based on:
-- Available space: ~440mm vertical (after margins, header)
-- Line height: ~4.5mm per line (11pt Arial, 1.3 line-height)
-- Section spacing: 6mm per section
-- Entry overhead: 5mm per entry header
+- Available space: 257mm per page (297mm minus 40mm page margins)
+- Page estimate: text measured with Arial metrics at the template's column widths,
+  paginated like the renderer (src.layout_estimate)
 
 Golden Rule: REJECT if estimated pages > 2.0
 """
@@ -18,6 +17,11 @@ from dataclasses import dataclass
 import math
 import re
 
+try:
+    from src.layout_estimate import estimate_cv_layout, load_template_styles
+except Exception:
+    from layout_estimate import estimate_cv_layout, load_template_styles  # type: ignore
+
 
 @dataclass
 class ValidationError:
@@ -627,101 +631,34 @@ class CVValidator:
     
     def _estimate_height(self, cv_data: Dict, details: Dict) -> float:
         """
-        Estimate total CV height in mm.
-        
-        Returns estimated height with breakdown in details dict.
+        Estimate total CV height in mm (estimated pages x page height).
+
+        Text is measured with the template's font metrics and column widths and paginated like the
+        renderer (see src.layout_estimate). Returns the height with a breakdown in the details dict.
         """
-        total = 0
-        
-        # Header
-        header_height = HEADER_HEIGHT_MM
-        total += header_height
-        details["header"] = header_height
-        
-        def _lines(s: str, chars_per_line: int) -> int:
-            s = s or ""
-            return int(math.ceil(len(s) / float(chars_per_line))) if s else 0
-
-        # Profile section
-        profile = cv_data.get("profile", "")
-        profile = profile.strip() if isinstance(profile, str) else ""
-        profile_lines = _lines(profile, 70)
-        profile_height = (SECTION_TITLE_HEIGHT_MM + (max(1, profile_lines) * 4.5)) if profile else 0
-        total += profile_height
-        details["profile"] = profile_height
-        
-        # Work experience
-        work_entries = cv_data.get("work_experience", [])
-        work_height = SECTION_TITLE_HEIGHT_MM
-        per_bullet_chars = self.limits["work_experience"]["per_entry"]["bullets"]["max_chars_per_bullet"]
-        for entry in work_entries:
-            work_height += 5  # Entry header
-            bullets = entry.get("bullets", [])
-            bullet_lines = sum(max(1, _lines(str(b), per_bullet_chars)) for b in bullets) if bullets else 0
-            work_height += bullet_lines * 4.5  # 4.5mm per rendered line
-            work_height += 3  # Entry margin
-        total += work_height
-        details["work_experience"] = work_height
-        
-        # Education
-        edu_entries = cv_data.get("education", [])
-        edu_height = SECTION_TITLE_HEIGHT_MM + (len(edu_entries) * 15)
-        total += edu_height
-        details["education"] = edu_height
-        
-        # Languages
-        lang_items = cv_data.get("languages", [])
-        lang_height = SECTION_TITLE_HEIGHT_MM + (len(lang_items) * 4.5)
-        total += lang_height
-        details["languages"] = lang_height
-        
-        # IT/AI Skills
-        skill_items = cv_data.get("it_ai_skills", [])
-        skill_height = SECTION_TITLE_HEIGHT_MM + (len(skill_items) * 5)
-        total += skill_height
-        details["it_ai_skills"] = skill_height
-        
-        # Further Experience
-        further_exp_items = cv_data.get("further_experience", [])
-        fe_bullet_chars = self.limits["further_experience"]["per_entry"]["bullets"]["max_chars_per_bullet"]
-        further_exp_height = SECTION_TITLE_HEIGHT_MM
-        for entry in further_exp_items:
-            further_exp_height += 6  # entry header (date + title)
-            bullets = entry.get("bullets", [])
-            bullet_lines = sum(max(1, _lines(str(b), fe_bullet_chars)) for b in bullets) if bullets else 0
-            further_exp_height += bullet_lines * 4.5
-            further_exp_height += 2  # entry margin
-        total += further_exp_height
-        details["further_experience"] = further_exp_height
-        
-        # Interests
-        interests = cv_data.get("interests", "")
-        interests_lines = max(1, _lines(str(interests), 70))
-        interests_height = SECTION_TITLE_HEIGHT_MM + (interests_lines * 4.5)
-        total += interests_height
-        details["interests"] = interests_height
-
-        # References (always rendered by the template; defaults to a short sentence)
-        references = cv_data.get("references") or "Will be announced on request."
-        references_lines = max(1, _lines(str(references), 70))
-        references_height = SECTION_TITLE_HEIGHT_MM + (references_lines * 4.5)
-        total += references_height
-        details["references"] = references_height
-        
-        # Add margins
-        total += MARGINS_HEIGHT_MM
-        details["margins"] = MARGINS_HEIGHT_MM
+        estimate = estimate_cv_layout(cv_data, styles=load_template_styles())
 
-        # Template page split: Page 1 = header + education + work; Page 2 = rest.
-        # Margins are page-level (not per-page), so compare content height against available space (297 - 40 = 257mm).
-        # The comparison in validate() checks if content fits within PAGE_HEIGHT_MM - MARGINS_HEIGHT_MM.
-        page1 = header_height + edu_height + work_height
-        page2 = further_exp_height + lang_height + skill_height + interests_height + references_height
+        for key, height in estimate.section_heights_mm.items():
+            details[key] = round(height, 1)
+        # Not rendered by the 2-page template; kept for callers that read the breakdown.
+        details["profile"] = 0.0
+        details["further_experience"] = 0.0
+        details["margins"] = MARGINS_HEIGHT_MM
+        details["estimated_page_count"] = estimate.page_count
+
+        # page1/page2 are CONTENT heights; anything that spills past page 2 is counted on page 2 so the
+        # overflow check in validate() flags it.
+        used = estimate.page_used_mm
+        page1 = used[0] if used else 0.0
+        if len(used) > 2:
+            page2 = estimate.content_height_mm + sum(used[2:])
+        else:
+            page2 = used[1] if len(used) > 1 else 0.0
         details["page1_estimated_height_mm"] = round(page1, 1)
         details["page2_estimated_height_mm"] = round(page2, 1)
-        
-        return total
-    
+
+        return estimate.estimated_pages * PAGE_HEIGHT_MM
+
     def get_limits_summary(self) -> Dict[str, Any]:
         """Return a summary of all character limits for documentation"""
         summary = {}
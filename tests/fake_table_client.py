@@ -0,0 +1,135 @@
+"""In-memory stand-in for azure.data.tables.TableClient used by session store tests."""
+
+from __future__ import annotations
+
+import operator
+import re
+import uuid
+
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceModifiedError, ResourceNotFoundError
+from azure.data.tables import TableTransactionError
+
+from src.session_store import CVSessionStore
+
+_CLAUSE = re.compile(r"(\w+) (eq|ge|lt) '([^']*)'")
+_OPERATORS = {"eq": operator.eq, "ge": operator.ge, "lt": operator.lt}
+
+
+class FakeEntity(dict):
+    def __init__(self, data: dict, etag: str):
+        super().__init__(data)
+        self.metadata = {"etag": etag}
+
+
+class FakeTableClient:
+    """Counts round trips per operation and honours ETag match conditions."""
+
+    def __init__(self) -> None:
+        self.rows: dict[tuple[str, str], tuple[dict, str]] = {}
+        self.calls: dict[str, int] = {}
+        self.last_update: tuple[str, list[str]] | None = None
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def create_entity(self, entity):
+        self._count("create_entity")
+        if (entity["PartitionKey"], entity["RowKey"]) in self.rows:
+            raise ResourceExistsError("exists")
+        etag = uuid.uuid4().hex
+        self.rows[(entity["PartitionKey"], entity["RowKey"])] = (dict(entity), etag)
+        return {"etag": etag}
+
+    def get_entity(self, partition_key, row_key, select=None):
+        self._count("get_entity_select" if select else "get_entity")
+        row = self.rows.get((partition_key, row_key))
+        if row is None:
+            raise ResourceNotFoundError("not found")
+        data, etag = row
+        if select:
+            data = {k: v for k, v in data.items() if k in select}
+        return FakeEntity(data, etag)
+
+    def update_entity(self, entity, mode=None, *, etag=None, match_condition=None):
+        self._count("update_entity")
+        key = (entity["PartitionKey"], entity["RowKey"])
+        row = self.rows.get(key)
+        if row is None:
+            raise ResourceNotFoundError("not found")
+        if match_condition == MatchConditions.IfNotModified and etag != row[1]:
+            raise ResourceModifiedError("precondition failed")
+        new_etag = uuid.uuid4().hex
+        data = dict(row[0], **entity) if str(mode).lower().endswith("merge") else dict(entity)
+        self.rows[key] = (data, new_etag)
+        self.last_update = (str(mode).lower(), sorted(entity))
+        return {"etag": new_etag}
+
+    def upsert_entity(self, entity, mode=None):
+        self._count("upsert_entity")
+        etag = uuid.uuid4().hex
+        self.rows[(entity["PartitionKey"], entity["RowKey"])] = (dict(entity), etag)
+        return {"etag": etag}
+
+    def query_entities(self, query_filter, select=None, **kwargs):
+        """Supports `and`-joined `<property> eq|ge|lt '<string>'` clauses, the filters the stores issue.
+
+        Like the service, a row missing a compared property never matches.
+        """
+        self._count("query_entities")
+        clauses = [_CLAUSE.fullmatch(part.strip()) for part in query_filter.strip().split(" and ")]
+        if not all(clauses):
+            raise NotImplementedError(query_filter)
+        for (pk, rk), (data, etag) in list(self.rows.items()):
+            row = dict(data, PartitionKey=pk, RowKey=rk)
+            if all(
+                row.get(name) is not None and _OPERATORS[op](str(row[name]), value)
+                for name, op, value in (clause.groups() for clause in clauses)
+            ):
+                yield self._project(row, etag, select)
+
+    def list_entities(self, select=None, **kwargs):
+        self._count("list_entities")
+        for data, etag in list(self.rows.values()):
+            yield self._project(data, etag, select)
+
+    @staticmethod
+    def _project(data: dict, etag: str, select) -> FakeEntity:
+        if select:
+            data = {k: v for k, v in data.items() if k in select or k in ("PartitionKey", "RowKey")}
+        return FakeEntity(data, etag)
+
+    def delete_entity(self, partition_key, row_key, *, etag=None, match_condition=None):
+        self._count("delete_entity")
+        row = self.rows.get((partition_key, row_key))
+        if row is not None and match_condition == MatchConditions.IfNotModified and etag != row[1]:
+            raise ResourceModifiedError("precondition failed")
+        self.rows.pop((partition_key, row_key), None)
+
+    def submit_transaction(self, operations):
+        """Delete-only entity-group transaction: all rows in one partition, all-or-nothing."""
+        self._count("submit_transaction")
+        keys = [(entity["PartitionKey"], entity["RowKey"]) for op, entity in operations]
+        assert all(op == "delete" for op, _ in operations) and len(operations) <= 100
+        assert len({pk for pk, _ in keys}) == 1
+        if any(key not in self.rows for key in keys):
+            raise TableTransactionError(message="0:ResourceNotFound")
+        for key in keys:
+            self.rows.pop(key)
+        return [{} for _ in keys]
+
+    def row(self, row_key: str) -> dict:
+        """Stored properties of the (single) row with this RowKey, whatever its partition."""
+        return next(data for (_, rk), (data, _) in self.rows.items() if rk == row_key)
+
+    def touch(self, row_key: str, **changes) -> None:
+        """Simulate a write by another instance: new properties and a new ETag."""
+        key = next(k for k in self.rows if k[1] == row_key)
+        data, _ = self.rows[key]
+        self.rows[key] = (dict(data, **changes), uuid.uuid4().hex)
+
+
+def make_session_store(table: FakeTableClient) -> CVSessionStore:
+    store = object.__new__(CVSessionStore)
+    store.table_client = table
+    return store
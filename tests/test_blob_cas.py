@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+from src import blob_cas, blob_store
+from src.blob_cas import AsyncBlobRefIndex, BlobRefIndex, cas_blob_name, content_digest
+from src.blob_store_aio import AsyncCVBlobStore
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+
+class FakeBlob:
+    def __init__(self, service: "FakeBlobService", container: str, name: str) -> None:
+        self.service, self.container, self.name = service, container, name
+
+    def upload_blob(self, data, overwrite=False, **kwargs):
+        self.service.uploads.append(self.name)
+        self.service.container(self.container)[self.name] = len(data)
+
+    def set_blob_metadata(self, metadata):
+        if self.name not in self.service.container(self.container):
+            raise ResourceNotFoundError("BlobNotFound")
+
+
+class FakeContainer:
+    def __init__(self, blobs: dict[str, int]) -> None:
+        self.blobs = blobs
+        self.conditions: list[dict] = []
+
+    def list_blobs(self, name_starts_with=""):
+        return [SimpleNamespace(name=n, size=s) for n, s in self.blobs.items() if n.startswith(name_starts_with)]
+
+    def delete_blobs(self, *names, raise_on_any_failure=True, **conditions):
+        self.conditions.append(conditions)
+        for name in names:
+            self.blobs.pop(name, None)
+        return [SimpleNamespace(status_code=202) for _ in names]
+
+
+class FakeBlobService:
+    url = "https://acct.blob"
+    api_version = None
+
+    def __init__(self) -> None:
+        self.containers: dict[str, FakeContainer] = {}
+        self.uploads: list[str] = []
+
+    def container(self, name: str) -> dict[str, int]:
+        return self.get_container_client(name).blobs
+
+    def create_container(self, name):
+        raise ResourceExistsError("exists")
+
+    def get_blob_client(self, container, blob):
+        return FakeBlob(self, container, blob)
+
+    def get_container_client(self, name):
+        return self.containers.setdefault(name, FakeContainer({}))
+
+
+def _blob_store(monkeypatch, service: FakeBlobService, container: str) -> blob_store.CVBlobStore:
+    monkeypatch.setattr(blob_store, "get_blob_service_client", lambda connection_string=None: service)
+    monkeypatch.setattr(blob_cas, "_TOUCHED", {})
+    return blob_store.CVBlobStore(container=container)
+
+
+def test_identical_content_is_uploaded_once_and_referenced_per_session(monkeypatch) -> None:
+    service = FakeBlobService()
+    refs = BlobRefIndex(FakeTableClient())
+    store = _blob_store(monkeypatch, service, "cv-pdfs")
+
+    first = store.upload_content(b"%PDF-1", content_type="application/pdf", session_id="s1", refs=refs)
+    second = store.upload_content(b"%PDF-1", content_type="application/pdf", session_id="s2", refs=refs)
+    store.upload_content(b"%PDF-1", content_type="application/pdf", session_id="s2", refs=refs)
+
+    digest = content_digest(b"%PDF-1")
+    assert first == second and first.blob_name == cas_blob_name(digest)
+    assert service.uploads == [first.blob_name]
+    assert refs.refcount("cv-pdfs", digest) == 2
+
+    # Another process (cold touch cache) finds the object and skips the upload too.
+    monkeypatch.setattr(blob_cas, "_TOUCHED", {})
+    store.upload_content(b"%PDF-1", content_type="application/pdf", session_id="s3", refs=refs)
+    assert len(service.uploads) == 1 and refs.refcount("cv-pdfs", digest) == 3
+
+
+class _Awaitable:
+    """aio-shaped view of a sync fake: every method returns a coroutine."""
+
+    def __init__(self, target) -> None:
+        self.target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if not callable(attr):
+            return attr
+        if name == "get_blob_client":  # sync in the aio SDK too
+            return lambda *args, **kwargs: _Awaitable(attr(*args, **kwargs))
+
+        async def _call(*args, **kwargs):
+            return attr(*args, **kwargs)
+
+        return _call
+
+
+def test_async_uploads_are_content_addressed_with_refs(monkeypatch) -> None:
+    monkeypatch.setattr(blob_cas, "_TOUCHED", {})
+    service = FakeBlobService()
+    table = FakeTableClient()
+    refs = AsyncBlobRefIndex(_Awaitable(table))
+    store = AsyncCVBlobStore(container="cv-photos", client=_Awaitable(service))
+    photo = SimpleNamespace(data=b"\x89PNG photo", mime="image/png")
+
+    async def _run():
+        first = await store.upload_photo_bytes(photo, session_id="s1", refs=refs)
+        second = await store.upload_photo_bytes(photo, session_id="s2", refs=refs)
+        return first, second
+
+    first, second = asyncio.run(_run())
+
+    digest = content_digest(photo.data)
+    assert first == second and first.blob_name == cas_blob_name(digest)
+    assert service.uploads == [first.blob_name]
+    assert BlobRefIndex(table).refcount("cv-photos", digest) == 2
+    assert BlobRefIndex(table).session_refs("s1")[0]["kind"] == "photo"
+
+
+def test_cleanup_deletes_objects_only_when_their_last_reference_expires(monkeypatch) -> None:
+    service = FakeBlobService()
+    table = FakeTableClient()
+    sessions = make_session_store(table)
+    sessions.blob_refs = BlobRefIndex(FakeTableClient())
+    store = _blob_store(monkeypatch, service, "cv-artifacts")
+
+    live = sessions.create_session({"full_name": "Jane"})
+    table.rows[("cv", "old")] = ({"RowKey": "old", "expires_at": "2000-01-01T00:00:00", "metadata_json": json.dumps({})}, "e")
+    shared = store.upload_json_content({"full_name": "Jane"}, session_id="old", refs=sessions.blob_refs)
+    store.upload_json_content({"full_name": "Jane"}, session_id=live, refs=sessions.blob_refs)
+    only_old = store.upload_json_content({"event_log": [1, 2]}, session_id="old", refs=sessions.blob_refs)
+
+    report = sessions.run_cleanup(blob_service_factory=lambda: service)
+
+    assert report.sessions_deleted == 1 and report.errors == 0
+    assert list(service.container("cv-artifacts")) == [shared.blob_name]
+    assert only_old.blob_name not in service.container("cv-artifacts")
+    assert "if_unmodified_since" in service.containers["cv-artifacts"].conditions[-1]
+    assert sessions.blob_refs.session_refs("old") == []
+    assert sessions.blob_refs.refcount("cv-artifacts", shared.blob_name.rsplit("/", 1)[-1]) == 1
+    assert [row["kind"] for row in sessions.blob_refs.session_refs(live)] == [""]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+from src import blob_store
+from src.blob_store import BlobPointer
+
+
+class FakeDownloader:
+    def __init__(self, data: bytes, size: int, chunk: int = 4) -> None:
+        self.data, self.size, self.chunk = data, size, chunk
+        self.properties = SimpleNamespace(content_settings=SimpleNamespace(content_type="application/pdf"))
+
+    def readall(self) -> bytes:
+        return self.data
+
+    def chunks(self):
+        return (self.data[i : i + self.chunk] for i in range(0, len(self.data), self.chunk))
+
+
+class FakeBlobClient:
+    def __init__(self, service: "FakeBlobService") -> None:
+        self.service = service
+
+    def upload_blob(self, data, overwrite=False, max_concurrency=1, **kwargs):
+        self.service.concurrency = max_concurrency
+        if self.service.missing_container:
+            self.service.missing_container = False
+            raise ResourceNotFoundError("ContainerNotFound")
+        self.service.uploads += 1
+
+    def download_blob(self, offset=None, length=None, **kwargs):
+        self.service.downloads.append((offset, length, kwargs.get("max_concurrency")))
+        body = self.service.body
+        if offset is not None:
+            return FakeDownloader(body[offset : offset + length], len(body))
+        return FakeDownloader(body, len(body))
+
+    def get_blob_properties(self):
+        return SimpleNamespace(size=len(self.service.body))
+
+
+class FakeBlobService:
+    built: list["FakeBlobService"] = []
+
+    def __init__(self, conn_str: str, api_version=None, **options) -> None:
+        self.url = f"https://{conn_str}.blob"
+        self.api_version = api_version
+        self.options = options
+        self.create_calls = 0
+        self.uploads = 0
+        self.missing_container = False
+        self.body = b""
+        self.downloads: list[tuple] = []
+
+    @classmethod
+    def from_connection_string(cls, conn_str, api_version=None, **options):
+        service = cls(conn_str, api_version, **options)
+        cls.built.append(service)
+        return service
+
+    def create_container(self, name):
+        self.create_calls += 1
+        if self.create_calls > 1:
+            raise ResourceExistsError("exists")
+
+    def get_blob_client(self, container, blob):
+        return FakeBlobClient(self)
+
+
+def test_blob_stores_share_one_client_and_probe_containers_once(monkeypatch) -> None:
+    monkeypatch.setattr(blob_store, "BlobServiceClient", FakeBlobService)
+    monkeypatch.setattr(blob_store, "_BLOB_CLIENTS", {})
+    monkeypatch.setattr(blob_store, "_CONTAINERS_READY", set())
+    monkeypatch.setattr(FakeBlobService, "built", [])
+    monkeypatch.setenv("STORAGE_CONNECTION_STRING", "acct")
+    monkeypatch.delenv("STORAGE_BLOB_API_VERSION", raising=False)
+
+    stores = [blob_store.CVBlobStore(container="cv-artifacts") for _ in range(3)]
+    stores.append(blob_store.CVBlobStore(container="cv-pdfs"))
+    assert len(FakeBlobService.built) == 1
+    service = FakeBlobService.built[0]
+    assert all(store.client is service for store in stores)
+    assert service.create_calls == 2  # one probe per container
+    assert service.options["max_block_size"] == 4 * 1024 * 1024
+
+    # A different API version is a different client.
+    monkeypatch.setenv("STORAGE_BLOB_API_VERSION", "2023-11-03")
+    assert blob_store.get_blob_service_client() is not service
+    assert len(FakeBlobService.built) == 2
+
+
+def test_upload_recreates_container_deleted_after_it_was_ensured(monkeypatch) -> None:
+    monkeypatch.setattr(blob_store, "BlobServiceClient", FakeBlobService)
+    monkeypatch.setattr(blob_store, "_BLOB_CLIENTS", {})
+    monkeypatch.setattr(blob_store, "_CONTAINERS_READY", set())
+    monkeypatch.setenv("STORAGE_CONNECTION_STRING", "acct")
+
+    store = blob_store.CVBlobStore(container="cv-artifacts")
+    store.client.missing_container = True
+    pointer = store.upload_json_snapshot(blob_name="sid/cv.json", data={"a": 1})
+
+    assert pointer.blob_name == "sid/cv.json"
+    assert store.client.uploads == 1
+    assert store.client.create_calls == 2
+    assert store.client.concurrency == 4
+
+
+def test_downloads_are_parallel_streamed_or_ranged(monkeypatch) -> None:
+    monkeypatch.setattr(blob_store, "BlobServiceClient", FakeBlobService)
+    monkeypatch.setattr(blob_store, "_BLOB_CLIENTS", {})
+    monkeypatch.setattr(blob_store, "_CONTAINERS_READY", set())
+    monkeypatch.setenv("STORAGE_CONNECTION_STRING", "acct")
+    monkeypatch.setenv("STORAGE_BLOB_MAX_CONCURRENCY", "6")
+
+    store = blob_store.CVBlobStore(container="cv-pdfs")
+    store.client.body = b"%PDF-1.7 body bytes"
+    pointer = BlobPointer(container="cv-pdfs", blob_name="x.pdf", content_type="application/pdf")
+
+    assert store.download_bytes(pointer) == store.client.body
+    assert store.client.downloads[-1] == (None, None, 6)
+
+    download = store.open_download(pointer)
+    assert download.size == len(store.client.body) and download.content_type == "application/pdf"
+    assert next(download.chunks) == b"%PDF"
+    assert b"%PDF" + b"".join(download.chunks) == store.client.body
+
+    assert store.read_range(pointer, offset=0, length=5) == b"%PDF-"
+    assert store.client.downloads[-1][:2] == (0, 5)
+    assert store.blob_size(pointer) == len(store.client.body)
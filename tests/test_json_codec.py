@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.json_codec import CODEC_ZLIB, decode_json_property, encode_json_property, property_size
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+
+def _large_cv(roles: int = 150) -> dict:
+    return {
+        "full_name": "Jane",
+        "work_experience": [
+            {
+                "title": "Engineer",
+                "employer": f"Company {i}",
+                "bullets": ["Delivered measurable improvements across the platform team"] * 6,
+            }
+            for i in range(roles)
+        ],
+    }
+
+
+def test_large_values_are_compressed_and_plain_json_still_decodes(monkeypatch) -> None:
+    value = _large_cv()
+    plain = json.dumps(value, ensure_ascii=False)
+
+    packed = encode_json_property(value)
+    assert isinstance(packed, bytes) and packed[0] == CODEC_ZLIB
+    assert property_size(packed) < len(plain) // 4
+    assert decode_json_property(packed) == value
+
+    # Entities written before compression hold plain JSON text.
+    assert decode_json_property(plain) == value
+    assert encode_json_property({"a": 1}) == '{"a": 1}'
+
+    monkeypatch.setenv("CV_TABLE_COMPRESSION", "off")
+    assert encode_json_property(value) == plain
+
+    with pytest.raises(ValueError):
+        decode_json_property(b"\x7fpayload")
+
+
+def test_compressed_session_stays_inline_in_the_table() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session({"full_name": "Jane"})
+    cv = _large_cv()
+    assert len(json.dumps(cv)) > 50000
+
+    def _no_offload(*_args, **_kwargs):
+        raise AssertionError("cv_data should not be offloaded to blob")
+
+    store._offload_cv_data_to_blob = _no_offload
+    assert store.update_session(sid, cv, {"event_log": [{"ts": "1", "type": "x"}] * 5})
+
+    row = table.row(sid)
+    assert isinstance(row["cvs_work_experience"], bytes)
+    sess = store.get_session(sid)
+    assert sess["cv_data"] == cv
+    assert len(sess["metadata"]["event_log"]) == 5
+
+    assert store.update_field(sid, "work_experience[1].employer", "Globex")
+    assert store.get_session(sid)["cv_data"]["work_experience"][1]["employer"] == "Globex"
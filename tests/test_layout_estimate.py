@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import re
+
+from src import layout_estimate as le
+from src.layout_estimate import TemplateGeometry, estimate_cv_layout
+from src.render import CSS_NAME, TEMPLATES_DIR
+from src.text_metrics import PT_TO_MM, get_font_metrics
+from src.validator import validate_cv
+
+
+def _cv(*, roles: int, bullets: int, bullet_text: str = "Delivered measurable improvements across the team") -> dict:
+    return {
+        "full_name": "Jane Example",
+        "email": "jane@example.com",
+        "phone": "+41 00 000 00 00",
+        "address_lines": ["Street 1", "8000 Zurich"],
+        "work_experience": [
+            {
+                "title": "Engineer",
+                "employer": f"Company {i}",
+                "date_range": "2020-01 - 2021-01",
+                "bullets": [bullet_text] * bullets,
+            }
+            for i in range(roles)
+        ],
+        "it_ai_skills": ["Python", "SQL"],
+        "education": [{"institution": "ETH Zurich", "title": "MSc", "date_range": "2015 - 2017"}],
+        "languages": ["English (C2)", "German (B2)"],
+        "interests": "Hiking",
+    }
+
+
+def test_font_metrics_wrap_by_advance_width() -> None:
+    font = get_font_metrics()
+    # "i" is narrow and "W" wide in Arial: the same character count wraps very differently.
+    narrow = "i" * 120
+    wide = "W" * 120
+    assert font.count_lines(narrow, width_mm=117.1, size_pt=10.5) == 1
+    assert font.count_lines(wide, width_mm=117.1, size_pt=10.5) >= 3
+    assert font.count_lines("", width_mm=117.1, size_pt=10.5) == 0
+
+    words = " ".join(["experience"] * 40)
+    lines = font.count_lines(words, width_mm=117.1, size_pt=10.5)
+    assert lines == font.count_lines_many([words, words], width_mm=117.1, size_pt=10.5)[1]
+    assert lines > font.count_lines(words, width_mm=162.6, size_pt=10.5)
+    assert get_font_metrics(bold=True).width_mm("Engineer", 10.5) > font.width_mm("Engineer", 10.5)
+
+
+def test_layout_estimate_paginates_sections() -> None:
+    geo = TemplateGeometry.from_styles({"margin_top_mm": 20.0, "margin_bottom_mm": 20.0, "font_family": "Arial"})
+    assert geo.content_height_mm == 257.0
+
+    small = estimate_cv_layout(_cv(roles=1, bullets=2))
+    assert small.page_count == 1
+    assert 0 < small.estimated_pages < 1
+
+    large = estimate_cv_layout(_cv(roles=6, bullets=6))
+    assert large.page_count == 2
+    assert all(used <= large.content_height_mm for used in large.page_used_mm)
+    assert large.section_heights_mm["work_experience"] > small.section_heights_mm["work_experience"]
+
+    # A forced break moves the section onto the next page.
+    forced = estimate_cv_layout(_cv(roles=1, bullets=2), break_before={"education": True})
+    assert forced.page_count == 2
+    assert forced.section_start_page["education"] == 1
+
+
+def test_validator_uses_measured_page_estimate() -> None:
+    fits = validate_cv(_cv(roles=3, bullets=4))
+    assert fits.estimated_pages <= 2.0
+    assert fits.details["estimated_page_count"] <= 2
+    assert not any(e.field.startswith("_page") or e.field == "_total_pages" for e in fits.errors)
+
+    long_bullet = "Led the migration of legacy services to a containerised platform, cutting release lead time"
+    overflow = validate_cv(_cv(roles=8, bullets=6, bullet_text=long_bullet))
+    assert overflow.details["estimated_page_count"] > 2
+    assert overflow.estimated_pages > 2.0
+    assert any(e.field == "_page2_overflow" for e in overflow.errors)
+
+
+def _css_rules(css: str) -> dict[str, dict[str, str]]:
+    """selector -> declarations of a flat stylesheet (later rules win unless the earlier one is !important)."""
+    rules: dict[str, dict[str, tuple[str, bool]]] = {}
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    for selectors, body in re.findall(r"([^{}@;]+)\{([^{}]*)\}", css):
+        for selector in selectors.split(","):
+            rule = rules.setdefault(" ".join(selector.split()), {})
+            for decl in body.split(";"):
+                if ":" not in decl:
+                    continue
+                prop, value = (part.strip() for part in decl.split(":", 1))
+                important = "!important" in value
+                if important or not rule.get(prop, ("", False))[1]:
+                    rule[prop] = (value.replace("!important", "").strip(), important)
+    return {selector: {prop: value for prop, (value, _) in rule.items()} for selector, rule in rules.items()}
+
+
+def _length_mm(value: str) -> float:
+    number, unit = re.fullmatch(r"([\d.]+)(mm|pt)?", value.strip()).groups()
+    return float(number) * (PT_TO_MM if unit == "pt" else 1.0)
+
+
+def _margin_mm(rule: dict[str, str], side: str) -> float:
+    """One side of `margin` from the longhand or the 1-4 value shorthand."""
+    if f"margin-{side}" in rule:
+        return _length_mm(rule[f"margin-{side}"])
+    parts = rule["margin"].split()
+    top = parts[0]
+    right = parts[1] if len(parts) > 1 else top
+    bottom = parts[2] if len(parts) > 2 else top
+    left = parts[3] if len(parts) > 3 else right
+    return _length_mm({"top": top, "right": right, "bottom": bottom, "left": left}[side])
+
+
+def test_geometry_constants_match_template_css() -> None:
+    css = _css_rules((TEMPLATES_DIR / CSS_NAME).read_text(encoding="utf-8"))
+
+    assert float(css[".bullets li"]["font-size"].removesuffix("pt")) == le.BODY_FONT_PT
+    assert float(css[".bullets li"]["line-height"]) == le.BODY_LINE_HEIGHT
+    assert float(css[".simple-list li"]["line-height"]) == le.LIST_LINE_HEIGHT
+    assert _length_mm(css[".contact"]["font-size"]) / PT_TO_MM == le.CONTACT_FONT_PT
+    for date_col in (".entry-head > .entry-date", ".two-col-row > div:first-child"):
+        assert _length_mm(css[date_col]["width"]) == le.DATE_COL_MM
+        assert _margin_mm(css[date_col], "right") == le.COL_GAP_MM
+    assert _margin_mm(css[".entry-body"], "left") == le.DATE_COL_MM + le.COL_GAP_MM
+    assert _margin_mm(css[".bullets"], "left") == le.DATE_COL_MM + le.COL_GAP_MM
+    assert _margin_mm(css[".bullets"], "top") == le.BULLET_TOP_MM
+    assert _margin_mm(css[".bullets li"], "bottom") == le.BULLET_GAP_MM
+    assert _margin_mm(css[".entry"], "bottom") == le.ENTRY_GAP_MM
+    assert _margin_mm(css[".entry-body"], "top") == le.ENTRY_BODY_TOP_MM
+    assert _margin_mm(css[".entry-line"], "bottom") == le.ENTRY_LINE_GAP_MM
+    assert _margin_mm(css[".simple-list li"], "bottom") == le.LIST_ITEM_GAP_MM
+    assert _margin_mm(css[".two-col-list > *"], "bottom") == le.TWO_COL_ROW_GAP_MM
+    assert _margin_mm(css[".section-title"], "bottom") == le.TITLE_GAP_MM
+    assert _margin_mm(css[".section"], "bottom") == le.SECTION_BOTTOM_MM
+    assert _margin_mm(css[".header"], "top") == le.HEADER_TOP_MM
+    assert _length_mm(css[".header"]["padding-bottom"]) == le.HEADER_BOTTOM_MM
+    assert _margin_mm(css[".name"], "bottom") == le.NAME_GAP_MM
+    assert _margin_mm(css[".contact > *"], "bottom") == le.CONTACT_BLOCK_GAP_MM
+    assert _margin_mm(css[".contact-block > *"], "bottom") == le.CONTACT_LINE_GAP_MM
+    assert _length_mm(css[".photo-box"]["width"]) == le.PHOTO_WIDTH_MM
+    assert _length_mm(css[".photo-box"]["height"]) == le.PHOTO_HEIGHT_MM
+    assert _length_mm(css[".photo-box--empty"]["height"]) == le.PHOTO_EMPTY_HEIGHT_MM
+    assert _margin_mm(css[".header-left"], "right") == le.PHOTO_GAP_MM
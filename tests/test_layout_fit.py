@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from src.layout_fit import BulletMeasure, CvLayoutMeasure, plan_bullet_drops
+from src.render import PageCountError, RenderResult
+
+
+def _role(n: int) -> dict:
+    return {
+        "employer": "X",
+        "title": "Y",
+        "date_range": "2020-01 - 2021-01",
+        "bullets": [f"b{i}" for i in range(n)],
+    }
+
+
+def _measure(
+    *, page_used: tuple[float, ...], bullet_h: float = 5.0, roles: tuple[int, ...] = (5, 5, 5)
+) -> CvLayoutMeasure:
+    bullets = tuple(
+        BulletMeasure(role_index=r, bullet_index=b, height_mm=bullet_h)
+        for r, n in enumerate(roles)
+        for b in range(n)
+    )
+    return CvLayoutMeasure(
+        page_count=len(page_used),
+        page_content_height_mm=250.0,
+        page_used_mm=page_used,
+        bullets=bullets,
+    )
+
+
+def test_overflow_subtracts_last_target_page_slack() -> None:
+    m = _measure(page_used=(250.0, 240.0, 22.0))
+    assert m.overflow_mm() == 12.0
+    assert _measure(page_used=(250.0, 240.0)).overflow_mm() == 0.0
+
+
+def test_plan_drops_bottom_up_until_overflow_is_covered() -> None:
+    import function_app as app
+
+    cv = {"work_experience": [_role(5), _role(5), _role(5)]}
+    plan = plan_bullet_drops(
+        cv=cv,
+        measure=_measure(page_used=(250.0, 250.0, 12.0)),
+        drop_one=app._drop_one_work_bullet_bottom_up,
+    )
+
+    assert plan.feasible is True
+    # Same order as the iterative loop: keep >=3 bullets/role, starting from the oldest role.
+    assert plan.changes == ["work_drop_bullet[2]", "work_drop_bullet[2]", "work_drop_bullet[1]"]
+    assert [len(r["bullets"]) for r in plan.cv["work_experience"]] == [5, 4, 3]
+    # Input snapshot is never mutated.
+    assert [len(r["bullets"]) for r in cv["work_experience"]] == [5, 5, 5]
+
+
+def test_plan_reports_infeasible_when_floor_is_reached() -> None:
+    import function_app as app
+
+    cv = {"work_experience": [_role(3)]}
+    plan = plan_bullet_drops(
+        cv=cv,
+        measure=_measure(page_used=(250.0, 250.0, 80.0), roles=(3,)),
+        drop_one=app._drop_one_work_bullet_bottom_up,
+    )
+
+    assert plan.changes == ["work_drop_bullet[0]"]
+    assert plan.feasible is False
+
+
+def test_generate_cv_applies_fit_plan_with_single_confirming_render() -> None:
+    from function_app import _tool_generate_cv_from_session
+
+    session = {
+        "session_id": "sid-fit",
+        "cv_data": {
+            "full_name": "Jane Smith",
+            "email": "jane@example.com",
+            "phone": "+41 00 000 00 00",
+            "work_experience": [_role(5), _role(5), _role(5)],
+            "education": [{"institution": "ETH", "title": "MSc", "date_range": "2010 - 2012"}],
+        },
+        "metadata": {"language": "en", "pdf_refs": {}},
+    }
+
+    render_calls: list[dict] = []
+    overflowing = _measure(page_used=(250.0, 250.0, 12.0))
+
+    def _fake_render(cv: dict, *, enforce_two_pages: bool = True) -> RenderResult:
+        render_calls.append(cv)
+        if len(render_calls) <= 2:
+            # With soft breaks, then without: both overflow and carry their own layout.
+            failed = RenderResult(pdf=b"%PDF-1.7 long", pages=3, layout=overflowing)
+            raise PageCountError("DoD violation: pages != 2 (got 3).", result=failed)
+        return RenderResult(pdf=b"%PDF-1.7 fitted", pages=2, timings_ms={"total_ms": 850})
+
+    valid = SimpleNamespace(is_valid=True, errors=[])
+    blob_info = {"container": "cv-pdfs", "blob_name": "x.pdf"}
+
+    with patch("src.orchestrator.tools.cv_pdf_tools.render_cv", side_effect=_fake_render), \
+         patch("src.orchestrator.tools.cv_pdf_tools.validate_canonical_schema", return_value=(True, [])), \
+         patch("src.orchestrator.tools.cv_pdf_tools.validate_cv", return_value=valid), \
+         patch("function_app._upload_pdf_blob_for_session", return_value=blob_info), \
+         patch("function_app._compute_readiness", return_value={"can_generate": True}), \
+         patch("function_app._get_session_store") as mock_store, \
+         patch.dict(os.environ, {"CV_EXECUTION_LATCH": "1"}):
+        store = Mock()
+        store.update_session_with_blob_offload.return_value = True
+        store.verify_pdf_metadata_persisted.return_value = (True, [])
+        mock_store.return_value = store
+
+        status, payload, content_type = _tool_generate_cv_from_session(
+            session_id="sid-fit",
+            language="en",
+            client_context=None,
+            session=session,
+        )
+
+    assert status == 200
+    assert content_type == "application/pdf"
+    # Overflow, overflow without soft breaks (planned from its own layout), then the confirming render.
+    assert len(render_calls) == 3
+    assert render_calls[1]["_disable_soft_break_before"] is True
+    assert [len(r["bullets"]) for r in render_calls[1]["work_experience"]] == [5, 5, 5]
+    # render_ms / pages come from the render result, not from a post-render stopwatch or PDF parse.
+    assert payload["pdf_metadata"]["render_ms"] == 850
+    assert payload["pdf_metadata"]["pages"] == 2
+    fitted = render_calls[-1]
+    assert fitted["_disable_soft_break_before"] is True
+    assert [len(r["bullets"]) for r in fitted["work_experience"]] == [5, 4, 3]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import product_config
+from src.orchestrator import openai_pool
+from src.orchestrator.openai_pool import OpenAIPoolStats, _TracingTransport, get_openai_client
+
+httpx = openai_pool.httpx
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.mark.skipif(httpx is None, reason="httpx not installed")
+def test_pooled_transport_reuses_keepalive_connections() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stats = OpenAIPoolStats()
+    try:
+        with httpx.Client(transport=_TracingTransport(stats)) as client:
+            for _ in range(3):
+                assert client.get(f"http://127.0.0.1:{server.server_port}/").status_code == 200
+    finally:
+        server.shutdown()
+
+    summary = stats.as_dict()
+    assert summary["requests"] == 3
+    assert summary["connections_opened"] == 1 and summary["connections_reused"] == 2
+    assert summary["pool_wait_ms"] >= 0.0
+
+
+def test_stages_share_one_client_and_pool(monkeypatch) -> None:
+    monkeypatch.setattr(openai_pool, "_CLIENTS", {})
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("OPENAI_TIMEOUT_SEC_BULK_TRANSLATION", raising=False)
+
+    base = get_openai_client()
+    assert get_openai_client() is base
+    translation = get_openai_client("bulk_translation")
+    if httpx is not None:
+        assert translation._client is base._client  # same httpx pool
+    read_timeout = translation.timeout if httpx is None else translation.timeout.read
+    assert read_timeout == 180.0
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-rotated")
+    assert get_openai_client() is not base
+
+
+def test_tool_loop_stages_keep_a_long_default_timeout(monkeypatch) -> None:
+    monkeypatch.setattr(openai_pool, "_CLIENTS", {})
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("OPENAI_TIMEOUT_SEC_REVIEW_FINAL", raising=False)
+
+    loop = get_openai_client("review_final", default_timeout=product_config.OPENAI_TOOL_LOOP_TIMEOUT_SEC)
+    plain = get_openai_client("review_final")
+    read = (lambda c: c.timeout) if httpx is None else (lambda c: c.timeout.read)
+    assert read(loop) == 600.0
+    assert read(plain) == product_config.OPENAI_RESPONSE_TIMEOUT_SEC
+
+    monkeypatch.setenv("OPENAI_TIMEOUT_SEC_REVIEW_FINAL", "90")
+    assert read(get_openai_client("review_final", default_timeout=600.0)) == 90.0
@@ -222,9 +222,10 @@ def test_template_caching_works():
 
 def test_render_caching_speedup(sample_cv_data):
     """Verify that render caching provides significant speedup"""
-    # Clear any existing cache
-    from src.render import _render_pdf_cached
-    _render_pdf_cached.cache_clear()
+    # Use an isolated in-memory render cache
+    from src.render_cache import build_render_cache, set_render_cache
+    cache = build_render_cache("memory")
+    set_render_cache(cache)
 
     # First render without cache (cold)
     start = time.time()
@@ -232,7 +233,7 @@ def test_render_caching_speedup(sample_cv_data):
     no_cache_time = time.time() - start
 
     # Clear cache again
-    _render_pdf_cached.cache_clear()
+    cache.clear()
 
     # First cached render (cache miss, same as no cache)
     start = time.time()
@@ -261,8 +262,9 @@ def test_render_caching_speedup(sample_cv_data):
     print(f"  Speedup from caching: {speedup:.1f}%")
 
     # Check cache stats
-    cache_info = _render_pdf_cached.cache_info()
-    print(f"  Cache stats: {cache_info.hits} hits, {cache_info.misses} misses, {cache_info.currsize}/{cache_info.maxsize} entries")
+    mem = cache.stats()["memory"]
+    print(f"  Cache stats: {mem['hits']} hits, {mem['misses']} misses, {mem['bytes']} bytes, {mem['evictions']} evictions")
+    set_render_cache(None)
 
 
 def test_cache_key_stability(sample_cv_data):
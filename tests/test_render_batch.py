@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import base64
+import io
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from src import render
+from src.render import RenderError, RenderResult
+
+
+def _cv(name: str) -> dict:
+    return {
+        "full_name": name,
+        "email": f"{name.lower().replace(' ', '.')}@example.com",
+        "work_experience": [{"title": "Engineer", "employer": "ACME", "date_range": "2020 - 2024", "bullets": ["Built it"]}],
+        "education": [{"institution": "ETH", "title": "MSc", "date_range": "2015 - 2017"}],
+    }
+
+
+def _fake_render_cv(cv, *, enforce_two_pages=True, use_cache=True) -> RenderResult:
+    if cv["full_name"] == "Broken":
+        raise RenderError("DoD violation: pages != 2 (got 3).")
+    return RenderResult(pdf=f"%PDF {cv['full_name']}".encode(), pages=2)
+
+
+def test_render_cv_batch_isolates_item_failures(monkeypatch) -> None:
+    monkeypatch.setattr(render, "render_cv", _fake_render_cv)
+    payloads = [
+        _cv("Jane Doe"),
+        {"id": "cand-2", "cv_data": _cv("Broken")},
+        {"full_name": "No Email"},
+        {"id": "cand-4", "cv_data": _cv("John Roe")},
+    ]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        items = sorted(render.render_cv_batch(payloads, executor=pool), key=lambda i: i.index)
+
+    assert [i.index for i in items] == [0, 1, 2, 3]
+    assert items[0].ok and items[0].result.pdf == b"%PDF Jane Doe" and items[0].filename == "Jane_Doe.pdf"
+    assert not items[1].ok and items[1].item_id == "cand-2" and "pages != 2" in items[1].error
+    assert not items[2].ok and "email" in items[2].error
+    assert items[3].ok and items[3].item_id == "cand-4"
+
+
+def test_batch_filenames_are_zip_safe(monkeypatch) -> None:
+    monkeypatch.setattr(render, "render_cv", _fake_render_cv)
+    payloads = [
+        {**_cv("x"), "full_name": "../../etc/passwd"},
+        {**_cv("x"), "full_name": None},
+        {**_cv("x"), "full_name": "Zoë " + "a" * 200},
+    ]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        items = sorted(render.render_cv_batch(payloads, executor=pool, validate=False), key=lambda i: i.index)
+
+    names = [i.filename for i in items]
+    assert names[0] == "etc_passwd.pdf"
+    assert names[1] == "CV.pdf"
+    assert names[2].startswith("Zoë_aaa") and len(names[2]) == 84
+    assert all("/" not in n and "\\" not in n for n in names)
+
+
+def test_generate_cv_batch_endpoint_streams_ndjson_and_zip(monkeypatch) -> None:
+    import api
+
+    monkeypatch.setattr(render, "render_cv", _fake_render_cv)
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(api, "render_cv_batch", partial(render.render_cv_batch, executor=pool))
+    client = api.app.test_client()
+    items = [_cv("Jane Doe"), _cv("Broken")]
+
+    try:
+        resp = client.post("/generate-cv-batch", json={"items": items})
+        assert resp.status_code == 200
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        by_index = {line["index"]: line for line in lines if "index" in line}
+        assert base64.b64decode(by_index[0]["pdf_base64"]) == b"%PDF Jane Doe"
+        assert by_index[1]["ok"] is False
+        assert lines[-1] == {"done": True, "total": 2, "succeeded": 1, "failed": 1}
+
+        resp = client.post("/generate-cv-batch", json={"items": items, "format": "zip"})
+        assert resp.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(resp.get_data())) as zf:
+            assert zf.read("0000_Jane_Doe.pdf") == b"%PDF Jane Doe"
+            manifest = json.loads(zf.read("manifest.json"))
+        assert [entry["ok"] for entry in manifest] == [True, False]
+
+        assert client.post("/generate-cv-batch", json={"items": []}).status_code == 400
+    finally:
+        pool.shutdown()
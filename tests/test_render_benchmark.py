@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import ctypes
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import benchmark_render  # noqa: E402
+from src import render  # noqa: E402
+from src.render import RenderResult  # noqa: E402
+
+
+def test_corpus_covers_render_shapes_and_validates() -> None:
+    corpus = benchmark_render.build_corpus()
+    assert set(corpus) >= {"few_roles", "many_roles", "long_bullets", "german", "photo", "cover_letter"}
+    assert corpus["german"][1]["language"] == "de"
+    assert corpus["photo"][1]["photo_url"].startswith("data:image/png;base64,")
+    assert benchmark_render.build_corpus() == corpus  # deterministic
+
+
+def test_run_case_reports_stage_percentiles(monkeypatch) -> None:
+    monkeypatch.setattr(
+        render, "_render_weasyprint", lambda html, cv_data=None, **kw: RenderResult(pdf=b"%PDF", pages=2)
+    )
+    monkeypatch.setattr(render, "count_pdf_pages", lambda pdf: 2)
+    kind, payload = benchmark_render.build_corpus()["few_roles"]
+    stats = benchmark_render.run_case(kind, payload, runs=3)
+
+    assert list(stats) == ["normalize", "validate", "render_html", "weasyprint", "page_count"]
+    for s in stats.values():
+        assert s["runs"] == 3
+        assert 0 <= s["p50_ms"] <= s["p95_ms"] <= s["max_ms"]
+    assert benchmark_render.percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+
+
+def test_peak_memory_is_measured_per_stage() -> None:
+    # A big allocation in an early stage must not show up as the peak of the stages after it.
+    stages = [
+        ("big", lambda _: len(bytearray(16 * 1024 * 1024))),
+        ("small", lambda n: n + 1),
+    ]
+    peaks = benchmark_render.stage_peak_alloc_mb(stages)
+
+    assert peaks["big"] >= 15
+    assert peaks["small"] < 1
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="VmHWM reset is Linux-only")
+def test_peak_rss_sees_native_allocations() -> None:
+    # Native memory (cairo/pango in the weasyprint stage) is invisible to tracemalloc.
+    libc = ctypes.CDLL(None)
+    libc.malloc.restype = ctypes.c_void_p
+    libc.malloc.argtypes = [ctypes.c_size_t]
+    libc.free.argtypes = [ctypes.c_void_p]
+    size = 64 * 1024 * 1024
+
+    def native(_):
+        ptr = libc.malloc(size)
+        ctypes.memset(ptr, 1, size)
+        libc.free(ptr)
+
+    stages = [("native", native), ("small", lambda _: None)]
+    rss = benchmark_render.stage_peak_rss_mb(stages)
+
+    assert rss["native"] >= 60
+    assert rss["small"] < 8
+    assert benchmark_render.stage_peak_alloc_mb(stages)["native"] < 1
+
+
+def test_compare_flags_regressions_beyond_tolerance() -> None:
+    baseline = {"cases": {"few_roles": {"weasyprint": {"p50_ms": 400.0, "p95_ms": 450.0, "peak_alloc_mb": 120.0}}}}
+    within = {"cases": {"few_roles": {"weasyprint": {"p50_ms": 440.0, "p95_ms": 500.0, "peak_alloc_mb": 125.0}}}}
+    slower = {"cases": {"few_roles": {"weasyprint": {"p50_ms": 600.0, "p95_ms": 700.0, "peak_alloc_mb": 125.0}}}}
+
+    assert benchmark_render.compare(within, baseline, tolerance=0.25) == []
+    regressions = benchmark_render.compare(slower, baseline, tolerance=0.25)
+    assert len(regressions) == 2 and regressions[0].startswith("few_roles/weasyprint p50_ms")
+    # Tiny absolute deltas are noise, whatever the ratio.
+    fast = {"cases": {"c": {"normalize": {"p50_ms": 0.4}}}}
+    assert benchmark_render.compare({"cases": {"c": {"normalize": {"p50_ms": 1.2}}}}, fast, tolerance=0.25) == []
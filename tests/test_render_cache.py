@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import pytest
+
+from src import render
+from src.render_cache import DiskRenderCache, MemoryRenderCache, RenderCache, set_render_cache
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes() -> None:
+    mem = MemoryRenderCache(max_bytes=10)
+    mem.put("a", b"aaaa")
+    mem.put("b", b"bbbb")
+    assert mem.get("a") == b"aaaa"  # a becomes most recent
+    mem.put("c", b"cccc")
+
+    assert mem.get("b") is None
+    assert mem.get("a") == b"aaaa"
+    assert mem.get("c") == b"cccc"
+    assert mem.stats.evictions == 1
+    assert mem.stats.bytes == 8
+
+
+def test_disk_hit_is_promoted_to_memory(tmp_path) -> None:
+    disk = DiskRenderCache(root_dir=str(tmp_path), max_bytes=1024)
+    disk.put("ab" * 32, b"%PDF-disk")
+
+    mem = MemoryRenderCache(max_bytes=1024)
+    cache = RenderCache([mem, disk])
+
+    assert cache.get("ab" * 32) == b"%PDF-disk"
+    assert mem.get("ab" * 32) == b"%PDF-disk"
+    stats = cache.stats()
+    assert stats["disk"]["hits"] == 1
+    assert stats["memory"]["misses"] == 1
+
+
+def test_disk_tier_prunes_oldest_entries(tmp_path) -> None:
+    disk = DiskRenderCache(root_dir=str(tmp_path), max_bytes=10)
+    disk.put("aa" * 32, b"123456")
+    disk.put("bb" * 32, b"123456")
+
+    assert disk.stats.evictions == 1
+    assert disk.stats.bytes <= 10
+
+
+def test_disk_tier_scans_once_and_prunes_only_over_budget(tmp_path, monkeypatch) -> None:
+    DiskRenderCache(root_dir=str(tmp_path), max_bytes=100).put("aa" * 32, b"123456")
+    disk = DiskRenderCache(root_dir=str(tmp_path), max_bytes=100)
+    assert disk.stats.bytes == 6  # existing entries are counted by the startup scan
+
+    def _no_glob(*_args, **_kwargs):
+        raise AssertionError("directory scanned after startup")
+
+    monkeypatch.setattr(type(disk.root), "glob", _no_glob)
+    disk.put("bb" * 32, b"123456")
+    disk.put("cc" * 32, b"x" * 90)
+
+    assert disk.stats.bytes == 96 and disk.stats.evictions == 1
+    assert disk.get("aa" * 32) is None
+    assert disk.get("bb" * 32) == b"123456"
+
+
+def test_cache_mode_defaults_to_local(monkeypatch) -> None:
+    from src import render_cache
+
+    monkeypatch.delenv("CV_RENDER_CACHE_MODE", raising=False)
+    assert render_cache._cache_mode() == "local"
+    monkeypatch.setenv("CV_RENDER_CACHE_MODE", "blob")
+    assert render_cache._cache_mode() == "blob"
+
+
+def test_render_pdf_reuses_cached_bytes(monkeypatch, tmp_path) -> None:
+    calls: list[str] = []
+
+    def _fake_weasyprint(html: str, cv_data=None, **_kwargs) -> render.RenderResult:
+        calls.append(html)
+        return render.RenderResult(pdf=b"%PDF-1.7 fake", pages=2)
+
+    monkeypatch.setattr(render, "_render_weasyprint", _fake_weasyprint)
+    set_render_cache(RenderCache([DiskRenderCache(root_dir=str(tmp_path), max_bytes=1 << 20)]))
+    try:
+        cv = {"full_name": "Jane Doe", "work_experience": [], "education": []}
+        assert render.render_pdf(cv, enforce_two_pages=False) == b"%PDF-1.7 fake"
+        assert render.render_pdf(dict(cv), enforce_two_pages=False) == b"%PDF-1.7 fake"
+        assert len(calls) == 1
+
+        hit = render.render_cv(cv, enforce_two_pages=False)
+        assert hit.cached is True
+        assert hit.pdf == b"%PDF-1.7 fake"
+        assert "total_ms" in hit.timings_ms
+
+        render.render_pdf(cv, enforce_two_pages=False, use_cache=False)
+        assert len(calls) == 2
+    finally:
+        set_render_cache(None)
+
+
+def test_renders_failing_the_page_check_are_not_cached(monkeypatch, tmp_path) -> None:
+    calls: list[str] = []
+
+    def _fake_weasyprint(html: str, cv_data=None, **_kwargs) -> render.RenderResult:
+        calls.append(html)
+        return render.RenderResult(pdf=b"%PDF-1.7 fake", pages=3, layout=object())
+
+    monkeypatch.setattr(render, "_render_weasyprint", _fake_weasyprint)
+    set_render_cache(RenderCache([DiskRenderCache(root_dir=str(tmp_path), max_bytes=1 << 20)]))
+    try:
+        cv = {"full_name": "Jane Doe", "work_experience": [], "education": []}
+        for _ in range(2):
+            with pytest.raises(render.PageCountError) as exc_info:
+                render.render_cv(cv)
+            # Every failed render carries its layout for the fit loop, never a layout-less cache hit.
+            assert exc_info.value.result.cached is False and exc_info.value.result.layout is not None
+        assert len(calls) == 2
+    finally:
+        set_render_cache(None)
+
+
+def test_render_cache_key_includes_template_fingerprint(monkeypatch) -> None:
+    cv = {"full_name": "Jane Doe"}
+    key_before = render._render_cache_key("cv", cv)
+    assert key_before != render._render_cache_key("cover_letter", cv)
+
+    monkeypatch.setattr(render, "RENDER_CACHE_VERSION", "test-bump")
+    render.reload_templates()
+    try:
+        assert render._render_cache_key("cv", cv) != key_before
+    finally:
+        render.reload_templates()
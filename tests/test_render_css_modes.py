@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import re
+
+from src import render
+from src.render_cache import RenderCache, set_render_cache
+
+
+def _cv(language: str = "de") -> dict:
+    return {"full_name": "Jane Doe", "language": language, "work_experience": [], "education": []}
+
+
+def _styles_in(html: str) -> list[str]:
+    return [re.sub(r"\s+", " ", s).strip() for s in re.findall(r"<style>(.*?)</style>", html, flags=re.S)]
+
+
+def test_stylesheet_sources_match_inlined_css_in_cascade_order() -> None:
+    for language in ("en", "de", "pl"):
+        inline_html = render.render_html(_cv(language))
+        external_html = render.render_html(_cv(language), external_css=True)
+
+        assert "<style>" not in external_html
+        sources = [re.sub(r"\s+", " ", s).strip() for s in render._stylesheet_sources("cv", language)]
+        assert sources == _styles_in(inline_html)
+
+    cl_inline = render.render_cover_letter_html({"language": "de"})
+    cl_external = render.render_cover_letter_html({"language": "de"}, external_css=True)
+    assert "<style>" not in cl_external
+    cl_sources = [re.sub(r"\s+", " ", s).strip() for s in render._stylesheet_sources("cover_letter", "de")]
+    assert cl_sources == _styles_in(cl_inline)
+
+
+def test_render_pdf_stylesheet_mode_passes_css_spec(monkeypatch) -> None:
+    calls: list[tuple[str, object]] = []
+
+    def _fake_weasyprint(html: str, cv_data=None, *, css_spec=None) -> render.RenderResult:
+        calls.append((html, css_spec))
+        return render.RenderResult(pdf=b"%PDF-1.7 fake", pages=1)
+
+    monkeypatch.setenv("CV_RENDER_CSS_MODE", "stylesheet")
+    monkeypatch.setattr(render, "_render_weasyprint", _fake_weasyprint)
+    set_render_cache(RenderCache([]))
+    try:
+        render.render_pdf(_cv("DE"), enforce_two_pages=False)
+        render.render_cover_letter_pdf({"language": "en"}, enforce_one_page=False)
+    finally:
+        set_render_cache(None)
+
+    assert [spec for _, spec in calls] == [("cv", "de"), ("cover_letter", "en")]
+    assert all("<style>" not in html for html, _ in calls)
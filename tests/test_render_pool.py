@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from src import render
+from src.render_pool import RenderPool, RenderPoolError, set_render_pool
+
+
+# Handlers run in spawned workers, so they must be module-level (pickled by reference).
+def _echo_handler(kind: str, html: str, meta: dict) -> bytes:
+    return f"%PDF {kind} {meta.get('full_name', '')} {len(html)}".encode("utf-8")
+
+
+def _misbehaving_handler(kind: str, html: str, meta: dict) -> bytes:
+    if html == "sleep":
+        time.sleep(30)
+    if html == "crash":
+        os._exit(3)
+    if html == "raise":
+        raise ValueError("bad template")
+    return f"%PDF pid={os.getpid()}".encode("utf-8")
+
+
+def test_pool_renders_on_worker_and_recycles_after_max_jobs() -> None:
+    pool = RenderPool(size=1, max_jobs_per_worker=2, handler=_echo_handler, warm=None)
+    spawned_under_lock: list[bool] = []
+    spawn = pool._spawn
+    pool._spawn = lambda: spawned_under_lock.append(pool._lock.locked()) or spawn()
+    try:
+        assert pool.render("cv", "<html/>", {"full_name": "Jane"}) == b"%PDF cv Jane 7"
+        assert pool.render("cover_letter", "x") == b"%PDF cover_letter  1"
+        assert pool.stats["recycled"] == 1
+        assert spawned_under_lock == [False]  # the replacement starts outside the pool lock
+        assert pool.render("cv", "y") == b"%PDF cv  1"
+        assert pool.stats["jobs"] == 3
+    finally:
+        pool.close()
+
+
+def test_pool_isolates_timeouts_crashes_and_errors() -> None:
+    pool = RenderPool(size=1, job_timeout_s=1.0, handler=_misbehaving_handler, warm=None)
+    try:
+        with pytest.raises(RenderPoolError, match="timed out"):
+            pool.render("cv", "sleep")
+        with pytest.raises(RenderPoolError, match="crashed"):
+            pool.render("cv", "crash")
+        with pytest.raises(RenderPoolError, match="ValueError: bad template"):
+            pool.render("cv", "raise")
+        # The pool keeps serving after every failure mode.
+        assert pool.render("cv", "ok").startswith(b"%PDF pid=")
+        assert pool.stats["timeouts"] == 1
+        assert pool.stats["crashes"] == 1
+        assert pool.stats["errors"] == 1
+    finally:
+        pool.close()
+
+
+def test_render_pdf_uses_pool_and_maps_failures_to_render_error() -> None:
+    pool = RenderPool(size=1, handler=_misbehaving_handler, warm=None)
+    set_render_pool(pool)
+    try:
+        cv = {"full_name": "Jane Doe", "work_experience": [], "education": []}
+        pdf = render.render_pdf(cv, enforce_two_pages=False, use_cache=False)
+        assert pdf.startswith(b"%PDF pid=")
+        assert pdf != f"%PDF pid={os.getpid()}".encode("utf-8")
+
+        with pytest.raises(render.RenderError, match="Render worker failed"):
+            render._render_document("cv", "crash")
+    finally:
+        set_render_pool(None)
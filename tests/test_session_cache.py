@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from types import MethodType
+
+from src.session_cache import SessionLRU, session_cache_scope, set_process_session_cache
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+
+def test_request_scope_serves_repeated_reads_and_sees_own_writes() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session({"full_name": "Jane"}, {"stage": "contact"})
+
+    with session_cache_scope() as scope:
+        first = store.get_session(sid)
+        first["cv_data"]["full_name"] = "mutated by caller"
+        second = store.get_session(sid)
+        assert second["cv_data"]["full_name"] == "Jane"  # callers get independent copies
+        assert table.calls["get_entity"] == 1
+
+        assert store.update_field(sid, "email", "jane@example.com")
+        after = store.get_session(sid)
+        assert after["cv_data"]["email"] == "jane@example.com"
+        assert after["version"] == 2
+
+        summary = scope.summary()
+    assert summary["hits"] >= 3 and summary["misses"] == 1
+    # Outside the scope every read goes to the table again.
+    store.get_session(sid)
+    assert table.calls["get_entity"] == 2  # first read + unscoped read; the update used the cached ETag
+
+
+def test_hydrated_session_reuses_blob_payloads_within_scope() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session(
+        {"__offloaded__": True, "__blob_ref__": "cv-artifacts/x/cv.json"},
+        {"metadata_blob_ref": "cv-artifacts/x/meta.json"},
+    )
+    downloads: list[str] = []
+
+    def _cv(self, ref):
+        downloads.append(ref)
+        return {"full_name": "Jane"}
+
+    def _meta(self, ref):
+        downloads.append(ref)
+        return {"event_log": [{"type": "x"}]}
+
+    store._retrieve_cv_data_from_blob = MethodType(_cv, store)
+    store._retrieve_metadata_payload_from_blob = MethodType(_meta, store)
+
+    with session_cache_scope() as scope:
+        for _ in range(3):
+            sess = store.get_session_with_blob_retrieval(sid)
+            assert sess["cv_data"]["full_name"] == "Jane"
+            assert sess["metadata"]["event_log"] == [{"type": "x"}]
+        assert len(downloads) == 2
+        assert scope.stats.hydrated_hits == 2
+
+
+def test_process_lru_revalidates_etag_before_serving(monkeypatch) -> None:
+    monkeypatch.setenv("CV_SESSION_CACHE_MODE", "process")
+    set_process_session_cache(SessionLRU(max_entries=8))
+    try:
+        table = FakeTableClient()
+        store = make_session_store(table)
+        sid = store.create_session({"full_name": "Jane"})
+
+        assert store.get_session(sid)["cv_data"]["full_name"] == "Jane"
+        assert table.calls.get("get_entity", 0) == 0
+        assert table.calls["get_entity_select"] == 1
+
+        # Another instance writes the session: the ETag changes and the entry is dropped.
+        table.touch(sid, cvs_full_name='"Other"', version=2)
+        assert store.get_session(sid)["cv_data"]["full_name"] == "Other"
+        assert table.calls["get_entity"] == 1
+
+        store.delete_session(sid)
+        assert store.get_session(sid) is None
+    finally:
+        set_process_session_cache(None)
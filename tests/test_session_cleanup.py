@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from src import session_partitions as sp
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+
+class FakeContainer:
+    def __init__(self, blobs: dict[str, int]) -> None:
+        self.blobs = blobs
+        self.batches: list[list[str]] = []
+
+    def list_blobs(self, name_starts_with=""):
+        return [SimpleNamespace(name=n, size=s) for n, s in self.blobs.items() if n.startswith(name_starts_with)]
+
+    def delete_blobs(self, *names, raise_on_any_failure=True):
+        self.batches.append(list(names))
+        for name in names:
+            self.blobs.pop(name, None)
+        return [SimpleNamespace(status_code=202) for _ in names]
+
+
+class FakeBlobService:
+    def __init__(self, containers: dict[str, FakeContainer]) -> None:
+        self.containers = containers
+
+    def get_container_client(self, name):
+        return self.containers.setdefault(name, FakeContainer({}))
+
+
+def _expired_row(session_id: str, metadata: dict | None = None) -> dict:
+    return {
+        "RowKey": session_id,
+        "expires_at": "2000-01-01T00:00:00",
+        "metadata_json": json.dumps(metadata or {}),
+    }
+
+
+def test_cleanup_batches_rows_and_collects_session_blobs() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    old_partition = sp.day_partition(datetime.utcnow().date() - timedelta(days=5), 1)
+    for i in range(150):
+        table.rows[(old_partition, f"s{i}")] = (_expired_row(f"s{i}"), "e")
+    photo = {"container": "cv-photos", "blob_name": "photos/p1.jpg"}
+    table.rows[("cv", "legacy")] = (_expired_row("legacy", {"photo_blob": photo}), "e")
+    live = store.create_session({"full_name": "Jane"})
+
+    artifacts = FakeContainer({"s0/cv.json": 100, "s0/snapshots/1.json": 50, "legacy/meta.json": 10, f"{live}/cv.json": 7})
+    pdfs = FakeContainer({"s1/a.pdf": 1000})
+    photos = FakeContainer({"photos/p1.jpg": 0, "photos/other.jpg": 0})
+    service = FakeBlobService({"cv-artifacts": artifacts, "cv-pdfs": pdfs, "cv-photos": photos})
+
+    report = store.run_cleanup(blob_service_factory=lambda: service)
+
+    assert report.sessions_deleted == 151
+    assert report.table_batches == 3  # 100 + 50 rows of the day partition, 1 legacy row
+    assert table.calls.get("delete_entity", 0) == 0
+    assert report.blobs_deleted == 5 and report.bytes_reclaimed == 1160
+    assert report.errors == 0
+    assert list(artifacts.blobs) == [f"{live}/cv.json"]
+    assert pdfs.blobs == {} and list(photos.blobs) == ["photos/other.jpg"]
+    assert {rk for (_, rk) in table.rows} == {live}
+
+
+def test_cleanup_falls_back_to_single_deletes_when_a_batch_is_rejected() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    partition = sp.hashed_partition(2)
+    for sid in ("a", "b", "c"):
+        table.rows[(partition, sid)] = (_expired_row(sid), "e")
+
+    real_submit = table.submit_transaction
+
+    def _racing_submit(operations):
+        table.rows.pop((partition, "b"))  # deleted by another instance mid-cleanup
+        return real_submit(operations)
+
+    table.submit_transaction = _racing_submit
+    report = store.run_cleanup(blob_service_factory=lambda: FakeBlobService({}))
+
+    assert report.sessions_deleted == 3
+    assert report.table_batches == 0 and table.calls["delete_entity"] == 3
+    assert not table.rows
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+import function_app
+from src.session_cache import session_cache_scope
+from src.session_store import SessionConflictError
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+
+def test_write_uses_loaded_etag_and_raises_typed_conflict() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session({"full_name": "Jane"}, {"stage": "contact"})
+
+    with session_cache_scope():
+        sess = store.get_session(sid)
+        assert sess["etag"]
+        assert store.update_session(sid, dict(sess["cv_data"], email="jane@example.com"), sess["metadata"])
+        assert table.calls["get_entity"] == 1  # no pre-read before the conditional write
+
+        # Another turn writes the session meanwhile: our next write must not overwrite it.
+        table.touch(sid, cvs_full_name=json.dumps("Jane Doe"), version=3)
+        with pytest.raises(SessionConflictError):
+            store.update_session(sid, {"full_name": "stale"}, {})
+
+        # update_field re-reads the winning version and reapplies the change.
+        assert store.update_field(sid, "phone", "+41 00")
+    cv = store.get_session(sid)["cv_data"]
+    assert cv == {"full_name": "Jane Doe", "email": "jane@example.com", "phone": "+41 00"}
+    assert table.row(sid)["version"] == 4
+
+    # A caller holding an outdated ETag is rejected even without a cached entry.
+    with pytest.raises(SessionConflictError):
+        store.update_session(sid, {"full_name": "x"}, {}, etag=sess["etag"])
+
+
+def test_safe_update_session_merges_metadata_after_conflict() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session({"full_name": "Jane"}, {"event_log": [{"ts": "1", "type": "a"}]})
+
+    with session_cache_scope():
+        sess = store.get_session(sid)
+        other_meta = {"event_log": [{"ts": "1", "type": "a"}, {"ts": "2", "type": "pdf"}], "pdf_refs": {"p1": {}}}
+        table.touch(sid, meta_event_log=json.dumps(other_meta.pop("event_log")), version=2)
+        table.touch(sid, metadata_json=json.dumps(other_meta))
+
+        meta = dict(sess["metadata"], wizard_stage="review")
+        meta["event_log"] = meta["event_log"] + [{"ts": "3", "type": "edit"}]
+        assert function_app._safe_update_session(store, sid, {"full_name": "Jane R"}, meta)
+
+    stored = store.get_session(sid)
+    assert [e["type"] for e in stored["metadata"]["event_log"]] == ["a", "pdf", "edit"]
+    assert stored["metadata"]["pdf_refs"] == {"p1": {}} and stored["metadata"]["wizard_stage"] == "review"
+    assert stored["cv_data"] == {"full_name": "Jane R"}
+    assert stored["version"] == 3
+
+
+def test_loaded_etag_is_honoured_without_a_cache_scope() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session({"full_name": "Jane"}, {"wizard_stage": "contact", "event_log": [{"ts": "1", "type": "a"}]})
+
+    sess = store.get_session(sid)  # no scope: nothing cached between the load and the write
+    reads = table.calls["get_entity"]
+    meta = dict(sess["metadata"], wizard_stage="education")
+    assert function_app._safe_update_session(store, sid, {"full_name": "Jane R"}, meta, etag=sess["etag"])
+    assert table.calls["get_entity"] == reads  # no pre-read before the conditional write
+
+    # Another turn writes after our load: the write conflicts and merges instead of overwriting.
+    sess = store.get_session(sid)
+    table.touch(sid, meta_event_log=json.dumps([{"ts": "1", "type": "a"}, {"ts": "2", "type": "pdf"}]), version=4)
+    meta = dict(sess["metadata"], wizard_stage="job_posting")
+    assert function_app._safe_update_session(store, sid, sess["cv_data"], meta, etag=sess["etag"])
+
+    stored = store.get_session(sid)
+    assert [e["type"] for e in stored["metadata"]["event_log"]] == ["a", "pdf"]
+    assert stored["metadata"]["wizard_stage"] == "job_posting" and stored["cv_data"] == {"full_name": "Jane R"}
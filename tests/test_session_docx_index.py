@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from backfill_docx_hash_index import backfill  # noqa: E402
+
+DOCX_HASH = hashlib.sha256(b"cv.docx").hexdigest()
+
+
+def _store():
+    table, index = FakeTableClient(), FakeTableClient()
+    store = make_session_store(table)
+    store.docx_index_client = index
+    return store, table, index
+
+
+def test_docx_hash_lookup_uses_index_point_reads() -> None:
+    store, table, index = _store()
+    older = store.create_session({"full_name": "Jane"}, {"source_docx_sha256": DOCX_HASH.upper()})
+    newer = store.create_session({"full_name": "Jane"}, {"source_docx_sha256": DOCX_HASH})
+    store.create_session({"full_name": "John"}, {"source_docx_sha256": "ab" * 32})
+    assert store.update_session(newer, {"full_name": "Jane D"}, {"source_docx_sha256": DOCX_HASH})
+    assert {rk for (pk, rk) in index.rows if pk == DOCX_HASH} == {older, newer}
+
+    session_row = next(entity for (_, rk), (entity, _) in table.rows.items() if rk == newer)
+    assert index.rows[(DOCX_HASH, newer)][0]["updated_at"] == session_row["updated_at"]
+
+    assert store.find_latest_session_by_source_docx_hash(DOCX_HASH) == newer
+    assert table.calls.get("query_entities", 0) == 0  # no scan of the sessions table
+    assert table.calls["get_entity_select"] == 1  # only the chosen session is confirmed
+
+    # A full write of the older session makes it the latest, without changing its hash.
+    assert store.update_session(older, {"full_name": "Jane E"}, {"source_docx_sha256": DOCX_HASH})
+    assert store.find_latest_session_by_source_docx_hash(DOCX_HASH) == older
+    assert store.update_session(newer, {"full_name": "Jane F"}, {"source_docx_sha256": DOCX_HASH})
+
+    # Deleted sessions drop out of the index on the next lookup.
+    store.delete_session(newer)
+    assert store.find_latest_session_by_source_docx_hash(DOCX_HASH) == older
+    assert (DOCX_HASH, newer) not in index.rows
+    assert store.find_latest_session_by_source_docx_hash("cd" * 32) is None
+
+
+def test_backfill_indexes_sessions_written_before_the_index() -> None:
+    store, table, index = _store()
+    table.rows[("cv", "legacy")] = (
+        {
+            "PartitionKey": "cv",
+            "RowKey": "legacy",
+            "cv_data_json": "{}",
+            "metadata_json": json.dumps({"source_docx_sha256": DOCX_HASH}),
+            "expires_at": "2999-01-01T00:00:00",
+        },
+        "etag",
+    )
+    assert store.find_latest_session_by_source_docx_hash(DOCX_HASH) is None
+
+    assert backfill(store) == {"scanned": 1, "indexed": 1, "expired": 0, "no_hash": 0}
+    assert store.find_latest_session_by_source_docx_hash(DOCX_HASH) == "legacy"
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src import session_partitions as sp
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from migrate_session_partitions import migrate  # noqa: E402
+
+
+def _legacy_row(session_id: str, expires_at: str) -> dict:
+    return {
+        "PartitionKey": "cv",
+        "RowKey": session_id,
+        "cv_data_json": '{"full_name": "Legacy"}',
+        "metadata_json": "{}",
+        "expires_at": expires_at,
+        "version": 1,
+    }
+
+
+def test_new_sessions_are_routed_to_day_shards() -> None:
+    sid = sp.new_session_id()
+    parsed = uuid.UUID(sid)
+    assert parsed.version == 7 and str(parsed) == sid
+    assert sp.session_created_day(sid) == datetime.utcnow().date()
+    assert sp.partition_for(sid) == f"cv-{datetime.utcnow():%Y%m%d}-{sp.shard_of(sid)}"
+    assert sp.read_partitions(sid) == (sp.partition_for(sid),)
+
+    legacy = str(uuid.uuid4())
+    assert sp.session_created_day(legacy) is None
+    assert sp.read_partitions(legacy) == (f"cv-h{sp.shard_of(legacy)}", "cv")
+    assert len({sp.shard_of(sp.new_session_id()) for _ in range(200)}) == sp.SESSION_SHARDS
+
+    table = FakeTableClient()
+    store = make_session_store(table)
+    created = store.create_session({"full_name": "Jane"})
+    assert (sp.partition_for(created), created) in table.rows
+    assert store.update_field(created, "email", "jane@example.com")
+
+    # Legacy rows stay readable (and writable) in "cv" until migrated.
+    table.rows[("cv", legacy)] = (_legacy_row(legacy, "2999-01-01T00:00:00"), "etag")
+    assert store.get_session(legacy)["cv_data"] == {"full_name": "Legacy"}
+    assert store.update_field(legacy, "email", "legacy@example.com")
+    assert ("cv", legacy) in table.rows
+
+
+def test_cleanup_filters_day_partitions_on_expiry(monkeypatch) -> None:
+    monkeypatch.setenv("CV_SESSION_CLEANUP_BLOBS", "0")
+    table = FakeTableClient()
+    store = make_session_store(table)
+    now = datetime.utcnow()
+    old_day = now.date() - timedelta(days=5)
+    table.rows[(sp.day_partition(now.date() - timedelta(days=400), 1), "ancient")] = (
+        {"RowKey": "ancient", "expires_at": "2000-01-01T00:00:00"},
+        "e",
+    )
+    table.rows[(sp.day_partition(old_day, 3), "old")] = ({"RowKey": "old", "expires_at": "2000-01-01T00:00:00"}, "e")
+    # Restored sessions keep their creation-day partition but never expire.
+    table.rows[(sp.day_partition(old_day, 5), "restored")] = ({"RowKey": "restored", "expires_at": "2099-12-31"}, "e")
+    live = store.create_session({"full_name": "Jane"})
+    table.rows[("cv", "legacy-expired")] = (_legacy_row("legacy-expired", "2000-01-01T00:00:00"), "e")
+    table.rows[("cv", "legacy-live")] = (_legacy_row("legacy-live", "2999-01-01T00:00:00"), "e")
+
+    report = store.run_cleanup()
+    assert report.sessions_deleted == 3
+    # Legacy, hashed and the two day partitions holding expired rows: no per-day enumeration.
+    assert report.partitions_scanned == 1 + sp.SESSION_SHARDS + 2
+    assert {rk for (_, rk) in table.rows} == {live, "legacy-live", "restored"}
+
+
+def test_migration_moves_legacy_rows_to_hashed_shards() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    legacy = str(uuid.uuid4())
+    table.rows[("cv", legacy)] = (_legacy_row(legacy, "2999-01-01T00:00:00"), "etag")
+
+    assert migrate(store, dry_run=True)["moved"] == 0
+    assert migrate(store) == {"scanned": 1, "moved": 1, "already_copied": 0, "changed_during_copy": 0, "conflicts": 0}
+    assert list(table.rows) == [(sp.hashed_partition(sp.shard_of(legacy)), legacy)]
+    assert store.get_session(legacy)["cv_data"] == {"full_name": "Legacy"}
+    assert table.calls["get_entity"] == 1  # the primary partition is tried first
+    assert migrate(store)["scanned"] == 0
+
+
+def test_migration_keeps_a_copy_left_by_an_interrupted_run() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    legacy = str(uuid.uuid4())
+    target = sp.hashed_partition(sp.shard_of(legacy))
+    table.rows[("cv", legacy)] = (_legacy_row(legacy, "2999-01-01T00:00:00"), "etag")
+    copy = dict(_legacy_row(legacy, "2999-01-01T00:00:00"), PartitionKey=target, cv_data_json='{"full_name": "Newer"}')
+    table.rows[(target, legacy)] = (copy, "copy-etag")
+
+    assert migrate(store)["already_copied"] == 1
+    assert list(table.rows) == [(target, legacy)]
+    assert store.get_session(legacy)["cv_data"] == {"full_name": "Newer"}
+
+
+class _WriteDuringCopy(FakeTableClient):
+    """Another instance writes the legacy row (and optionally the new copy) while it is being copied."""
+
+    def __init__(self, write_copy: bool) -> None:
+        super().__init__()
+        self.write_copy = write_copy
+
+    def create_entity(self, entity):
+        result = super().create_entity(entity)
+        key = ("cv", entity["RowKey"])
+        self.rows[key] = (dict(self.rows[key][0], cv_data_json='{"full_name": "Edited"}'), "legacy-edited")
+        if self.write_copy:
+            key = (entity["PartitionKey"], entity["RowKey"])
+            self.rows[key] = (dict(self.rows[key][0], cv_data_json='{"full_name": "Copy edited"}'), "copy-edited")
+        return result
+
+
+def test_migration_backs_out_a_copy_when_the_legacy_row_changed() -> None:
+    table = _WriteDuringCopy(write_copy=False)
+    store = make_session_store(table)
+    legacy = str(uuid.uuid4())
+    table.rows[("cv", legacy)] = (_legacy_row(legacy, "2999-01-01T00:00:00"), "etag")
+
+    assert migrate(store)["changed_during_copy"] == 1
+    assert list(table.rows) == [("cv", legacy)]
+    assert store.get_session(legacy)["cv_data"] == {"full_name": "Edited"}
+
+
+def test_migration_keeps_a_copy_that_was_written_during_the_copy() -> None:
+    table = _WriteDuringCopy(write_copy=True)
+    store = make_session_store(table)
+    legacy = str(uuid.uuid4())
+    table.rows[("cv", legacy)] = (_legacy_row(legacy, "2999-01-01T00:00:00"), "etag")
+
+    assert migrate(store)["conflicts"] == 1
+    assert (sp.hashed_partition(sp.shard_of(legacy)), legacy) in table.rows
+    assert store.get_session(legacy)["cv_data"] == {"full_name": "Copy edited"}
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+
+def _cv() -> dict:
+    return {
+        "full_name": "Jane",
+        "work_experience": [{"employer": "ACME", "bullets": ["Built it"]}],
+        "education": [{"institution": "ETH"}],
+    }
+
+
+def test_update_field_merges_only_the_touched_section() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    sid = store.create_session(_cv(), {"stage": "contact", "event_log": [{"ts": "0", "type": "created"}]})
+
+    assert store.update_field(sid, "work_experience[0].employer", "Globex")
+    mode, props = table.last_update
+    assert mode == "merge"
+    assert props == ["PartitionKey", "RowKey", "cvs_work_experience", "meta_event_log", "updated_at", "version"]
+
+    assert store.append_event(sid, {"type": "pdf_generated"})
+    assert table.last_update[1] == ["PartitionKey", "RowKey", "meta_event_log", "updated_at", "version"]
+
+    # A new top-level key also records its position in the section order.
+    assert store.update_field(sid, "languages[0]", "English")
+    assert "cv_data_json" in table.last_update[1]
+
+    sess = store.get_session(sid)
+    assert list(sess["cv_data"]) == ["full_name", "work_experience", "education", "languages"]
+    assert sess["cv_data"]["work_experience"][0] == {"employer": "Globex", "bullets": ["Built it"]}
+    assert sess["metadata"]["stage"] == "contact"
+    assert [e["type"] for e in sess["metadata"]["event_log"]] == [
+        "created", "update_cv_field", "pdf_generated", "update_cv_field"
+    ]
+    assert sess["version"] == 4
+
+
+def test_legacy_layout_is_migrated_by_a_full_write() -> None:
+    table = FakeTableClient()
+    store = make_session_store(table)
+    table.rows[("cv", "legacy")] = (
+        {
+            "PartitionKey": "cv",
+            "RowKey": "legacy",
+            "cv_data_json": json.dumps(_cv()),
+            "metadata_json": json.dumps({"event_log": [{"ts": "0", "type": "created"}]}),
+            "version": 1,
+        },
+        "etag-1",
+    )
+
+    assert store.update_field("legacy", "full_name", "Jane Doe")
+    assert table.last_update[0] == "replace"
+    row = table.rows[("cv", "legacy")][0]
+    assert row["cv_layout"] == "sections" and json.loads(row["cvs_full_name"]) == "Jane Doe"
+    assert len(json.loads(row["meta_event_log"])) == 2
+    assert "event_log" not in json.loads(row["metadata_json"])
+
+    assert store.update_field("legacy", "education[0].institution", "EPFL")
+    assert table.last_update[0] == "merge"
+    assert store.get_session("legacy")["cv_data"]["education"] == [{"institution": "EPFL"}]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from src.blob_cas import cas_blob_name, content_digest
+from src.blob_store import BlobPointer
+from src.session_store import CVSessionStore
+from src.session_store_aio import AsyncCVSessionStore
+from tests.fake_table_client import FakeTableClient
+
+
+class AsyncFakeTable:
+    """Awaitable view of FakeTableClient; every call yields to the loop and is tracked for overlap."""
+
+    def __init__(self, table: FakeTableClient, tracker: dict) -> None:
+        self.table = table
+        self.tracker = tracker
+
+    def __getattr__(self, name):
+        method = getattr(self.table, name)
+
+        async def _call(*args, **kwargs):
+            async with _in_flight(self.tracker):
+                return method(*args, **kwargs)
+
+        return _call
+
+
+class AsyncFakeBlobs:
+    def __init__(self, tracker: dict) -> None:
+        self.blobs: dict[str, dict] = {}
+        self.tracker = tracker
+
+    async def upload_json_content(self, data, *, session_id=None, refs=None, kind=""):
+        blob_name = cas_blob_name(content_digest(json.dumps(data, sort_keys=True).encode()))
+        async with _in_flight(self.tracker):
+            self.blobs[f"cv-artifacts/{blob_name}"] = data
+            self.tracker.setdefault("kinds", []).append(kind)
+        return BlobPointer(container="cv-artifacts", blob_name=blob_name, content_type="application/json")
+
+    async def download_json_snapshot(self, pointer):
+        async with _in_flight(self.tracker):
+            self.tracker.setdefault("downloads", []).append(pointer.blob_name)
+            return self.blobs[f"{pointer.container}/{pointer.blob_name}"]
+
+
+class _in_flight:
+    def __init__(self, tracker: dict) -> None:
+        self.tracker = tracker
+
+    async def __aenter__(self):
+        self.tracker["now"] = self.tracker.get("now", 0) + 1
+        self.tracker["peak"] = max(self.tracker.get("peak", 0), self.tracker["now"])
+        await asyncio.sleep(0.01)
+
+    async def __aexit__(self, *exc):
+        self.tracker["now"] -= 1
+
+
+def _store(table: FakeTableClient, tracker: dict) -> AsyncCVSessionStore:
+    store = object.__new__(AsyncCVSessionStore)
+    store.table_client = AsyncFakeTable(table, tracker)
+    store.docx_index_client = None
+    store.blob_store = AsyncFakeBlobs(tracker)
+    return store
+
+
+def test_offloading_write_overlaps_entity_read_and_blob_uploads() -> None:
+    tracker: dict = {}
+    table = FakeTableClient()
+    store = _store(table, tracker)
+    # Random text: the table codec compresses repetitive payloads below the offload limit.
+    cv_data = {"full_name": "Jane", "work_experience": [{"bullets": [os.urandom(200).hex() for _ in range(400)]}]}
+    posting = os.urandom(60000).hex()
+    metadata = {"wizard_stage": "review_final", "job_posting_text": posting, "pdf_refs": {"a": {"n": 1}}}
+
+    async def _run():
+        sid = await store.create_session({"full_name": "Jane"}, {"language": "de"})
+        tracker["peak"] = 0
+        assert await store.update_session_with_blob_offload(sid, cv_data, metadata)
+        assert tracker["peak"] == 4  # entity read + cv_data blob + two heavy-metadata blobs
+        # Content-addressed with the sync store's reference kinds.
+        assert sorted(tracker["kinds"]) == ["cv_data_offload", "metadata_heavy:job_posting_text", "metadata_heavy:pdf_refs"]
+        assert all(name.startswith("cv-artifacts/cas/") for name in store.blob_store.blobs)
+        assert table.row(sid)["version"] == 2
+
+        tracker["peak"], tracker["downloads"] = 0, []
+        only_refs = await store.get_session_with_blob_retrieval(sid, metadata_keys=["pdf_refs"])
+        assert only_refs["metadata"]["pdf_refs"] == {"a": {"n": 1}} and "job_posting_text" not in only_refs["metadata"]
+        assert len(tracker["downloads"]) == 2 and tracker["peak"] == 2  # cv_data + pdf_refs, together
+
+        full = await store.get_session_with_blob_retrieval(sid)
+        assert full["cv_data"] == cv_data
+        assert full["metadata"]["job_posting_text"] == posting
+        assert full["metadata"]["wizard_stage"] == "review_final"
+
+    asyncio.run(_run())
+
+
+def test_update_field_patches_section_and_event_log() -> None:
+    table = FakeTableClient()
+    store = _store(table, {})
+
+    async def _run():
+        sid = await store.create_session({"full_name": "Jane"})
+        assert await store.update_field(sid, "work_experience[0].employer", "Acme")
+        assert await store.append_event(sid, {"type": "note"})
+        session = await store.get_session(sid)
+        assert session["cv_data"]["work_experience"] == [{"employer": "Acme"}]
+        assert [e["type"] for e in session["metadata"]["event_log"]] == ["update_cv_field", "note"]
+        assert table.last_update[0] == "merge"
+        assert await store.delete_session(sid)
+        assert await store.get_session(sid) is None
+
+    asyncio.run(_run())
+
+
+@pytest.mark.skipif(os.environ.get("RUN_AZURITE_E2E") != "1", reason="Set RUN_AZURITE_E2E=1 with Azurite running")
+def test_async_store_round_trip_against_azurite() -> None:
+    conn_str = os.environ.get("STORAGE_CONNECTION_STRING") or "UseDevelopmentStorage=true"
+    cv_data = {"full_name": "Jane", "work_experience": [{"bullets": [os.urandom(200).hex() for _ in range(400)]}]}
+
+    async def _run():
+        async with AsyncCVSessionStore(conn_str) as store:
+            sid = await store.create_session({"full_name": "Jane"}, {"language": "en"})
+            assert await store.update_session_with_blob_offload(sid, cv_data, {"language": "en", "pdf_refs": {}})
+            assert (await store.get_session_with_blob_retrieval(sid))["cv_data"] == cv_data
+            return sid
+
+    sid = asyncio.run(_run())
+    sync_store = CVSessionStore(conn_str)
+    assert sync_store.get_session_with_blob_retrieval(sid)["cv_data"] == cv_data
+    assert sync_store.delete_session(sid)
@@ -2,17 +2,17 @@ from __future__ import annotations
 
 from types import MethodType
 
-from src.session_store import CVSessionStore
+from src.session_store import CVSessionStore, _encode_metadata
 
 
 def test_offload_heavy_metadata_to_blob_keeps_table_summaries() -> None:
     store = object.__new__(CVSessionStore)
+    uploads: list[list[str]] = []
 
     def _fake_offload(self: CVSessionStore, session_id: str, payload: dict) -> str:
         assert session_id == "sid-meta"
-        assert "event_log" in payload
-        assert "pdf_refs" in payload
-        return "cv-artifacts/sid-meta/metadata_heavy_1.json"
+        uploads.append(sorted(payload))
+        return f"cv-artifacts/sid-meta/metadata_heavy_{next(iter(payload))}_1.json"
 
     store._offload_metadata_payload_to_blob = MethodType(_fake_offload, store)
 
@@ -25,19 +25,22 @@ def test_offload_heavy_metadata_to_blob_keeps_table_summaries() -> None:
             "new": {"created_at": "2026-03-05T20:00:00Z", "size_bytes": 111, "target_language": "de", "download_name": "new.pdf"},
             "old": {"created_at": "2026-03-04T20:00:00Z", "size_bytes": 99, "target_language": "en", "download_name": "old.pdf"},
         },
+        "metadata_blob_refs": {"skills_proposal_block": "cv-artifacts/sid-meta/metadata_heavy_skills_proposal_block_0.json"},
     }
 
     out = store._offload_heavy_metadata_to_blob("sid-meta", metadata)
 
     assert out["wizard_stage"] == "review_final"
-    assert out["metadata_blob_ref"] == "cv-artifacts/sid-meta/metadata_heavy_1.json"
+    assert uploads == [["event_log"], ["job_data_table_history"], ["job_posting_text"], ["pdf_refs"]]
+    assert out["metadata_blob_refs"]["pdf_refs"] == "cv-artifacts/sid-meta/metadata_heavy_pdf_refs_1.json"
+    assert out["metadata_blob_refs"]["skills_proposal_block"].endswith("_0.json")  # earlier offload kept
     assert set(out["metadata_blob_keys"]) >= {"event_log", "job_data_table_history", "job_posting_text", "pdf_refs"}
     assert out["event_log_count"] == 1
     assert out["job_data_table_history_count"] == 5
     assert out["job_posting_text_length"] > 2000
     assert "job_posting_text" not in out
     assert out["pdf_refs_count"] == 2
-    assert len(out["pdf_refs"]) == 2
+    assert "pdf_refs" not in out
 
 
 def test_get_session_with_blob_retrieval_hydrates_metadata_and_cv_data() -> None:
@@ -70,3 +73,65 @@ def test_get_session_with_blob_retrieval_hydrates_metadata_and_cv_data() -> None
     assert session["metadata"]["wizard_stage"] == "contact"
     assert session["metadata"]["job_posting_text"] == "A long posting"
     assert isinstance(session["metadata"]["event_log"], list)
+
+
+def test_offloaded_metadata_keys_are_downloaded_only_when_read() -> None:
+    store = object.__new__(CVSessionStore)
+    refs = {key: f"cv-artifacts/sid-lazy/metadata_heavy_{key}_1.json" for key in ("pdf_refs", "job_posting_text")}
+    downloads: list[str] = []
+
+    def _fake_get_session(self: CVSessionStore, session_id: str):
+        return {
+            "session_id": session_id,
+            "cv_data": {"full_name": "Jane Doe"},
+            "metadata": {"wizard_stage": "review_final", "language": "de", "metadata_blob_refs": dict(refs)},
+        }
+
+    def _fake_retrieve_meta(self: CVSessionStore, blob_ref: str):
+        downloads.append(blob_ref)
+        key = next(k for k, ref in refs.items() if ref == blob_ref)
+        return {key: {"p1": {"download_name": "cv.pdf"}} if key == "pdf_refs" else "A long posting"}
+
+    store.get_session = MethodType(_fake_get_session, store)
+    store._retrieve_metadata_payload_from_blob = MethodType(_fake_retrieve_meta, store)
+
+    meta = store.get_session_with_blob_retrieval("sid-lazy")["metadata"]
+    assert meta["wizard_stage"] == "review_final" and meta.get("language") == "de"
+    assert "job_posting_text" in meta and downloads == []
+
+    assert meta.get("pdf_refs") == {"p1": {"download_name": "cv.pdf"}}
+    assert downloads == [refs["pdf_refs"]]
+
+    # Writing metadata back keeps the unread key offloaded; copying everything hydrates it.
+    assert "A long posting" not in _encode_metadata(meta, CVSessionStore.METADATA_HOT_KEYS)[0]["metadata_json"]
+    assert dict(meta)["job_posting_text"] == "A long posting"
+    assert downloads == [refs["pdf_refs"], refs["job_posting_text"]]
+
+
+def test_orchestrated_wizard_turn_does_not_download_offloaded_metadata(monkeypatch) -> None:
+    import function_app
+    from tests.fake_table_client import FakeTableClient, make_session_store
+
+    table = FakeTableClient()
+    store = make_session_store(table)
+    refs = {key: f"cv-artifacts/cas/00/{key}" for key in CVSessionStore.METADATA_HEAVY_KEYS}
+    sid = store.create_session(
+        {"full_name": "Jane Doe", "email": "jane@example.com", "phone": "+41 00", "work_experience": [{"employer": "Acme"}]},
+        {"flow_mode": "wizard", "wizard_stage": "contact", "language": "en", "current_job_sig": "sig", "metadata_blob_refs": refs},
+    )
+    downloads: list[str] = []
+
+    def _fake_retrieve_meta(self: CVSessionStore, blob_ref: str):
+        downloads.append(blob_ref)
+        return {blob_ref.rsplit("/", 1)[1]: {}}
+
+    store._retrieve_metadata_payload_from_blob = MethodType(_fake_retrieve_meta, store)
+    monkeypatch.setattr(function_app, "_get_session_store", lambda: store)
+
+    status, body = function_app._tool_process_cv_orchestrated({"session_id": sid, "user_action": {"id": "CONTACT_CONFIRM"}})
+
+    assert status == 200 and body["stage"] == "education"
+    assert downloads == []
+    stored = store.get_session(sid)["metadata"]
+    assert stored["wizard_stage"] == "education" and stored["metadata_blob_refs"] == refs
+    assert not set(refs) & set(stored)  # heavy values were not written back
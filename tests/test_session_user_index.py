@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import function_app
+from src.session_cache import session_cache_scope
+from tests.fake_table_client import FakeTableClient, make_session_store
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from backfill_user_session_index import backfill  # noqa: E402
+
+
+class _EmptyProfileStore:
+    def get_latest(self, **_kwargs):
+        return None
+
+    def put_latest(self, **_kwargs):
+        return None
+
+
+def _meta(role: str, company: str) -> dict:
+    return {"job_reference": {"role_title": role, "company": company}}
+
+
+def test_job_data_recovery_reads_the_user_index(monkeypatch) -> None:
+    table, user_index = FakeTableClient(), FakeTableClient()
+    store = make_session_store(table)
+    store.user_index_client = user_index
+    monkeypatch.setattr(function_app, "_get_session_store", lambda: store)
+    monkeypatch.setattr(function_app, "get_profile_store", lambda: _EmptyProfileStore())
+    cv = {"full_name": "Jane", "email": "jane@example.com"}
+
+    with session_cache_scope():
+        first = store.create_session(cv, _meta("Data Engineer", "ACME"))
+        function_app._sync_job_data_table_history(session_id=first, cv_data=cv, meta=_meta("Data Engineer", "ACME"))
+    user_id = function_app._stable_profile_user_id(cv, {})
+    (pk, rk), (row, _) = next(iter(user_index.rows.items()))
+    assert (pk, rk) == (user_id, first) and row["expires_at"]
+
+    second = store.create_session(cv, _meta("Platform Lead", "Globex"))
+    table.calls.clear()
+    meta = function_app._sync_job_data_table_history(
+        session_id=second, cv_data=cv, meta=_meta("Platform Lead", "Globex")
+    )
+
+    assert [r["position_name"] for r in meta["job_data_table_history"]] == ["Platform Lead", "Data Engineer"]
+    # Recovery never touched the sessions table; indexing the uncached session read its expires_at.
+    assert table.calls == {"get_entity_select": 1}
+    assert user_index.calls["query_entities"] == 2  # one partition query per sync
+    assert store.list_user_session_summaries("not-a-user-id") == []
+
+
+def test_user_index_rows_go_away_with_their_sessions(monkeypatch) -> None:
+    monkeypatch.setenv("CV_SESSION_CLEANUP_BLOBS", "0")
+    table, user_index = FakeTableClient(), FakeTableClient()
+    store = make_session_store(table)
+    store.user_index_client = user_index
+    user_id = "ab" * 32
+    kept, deleted, expired = (store.create_session({"full_name": "Jane"}) for _ in range(3))
+    for session_id in (kept, deleted, expired):
+        assert store.index_user_session(user_id, session_id, {"position_name": session_id})
+    table.rows[next(k for k in table.rows if k[1] == expired)][0]["expires_at"] = "2000-01-01T00:00:00"
+    user_index.rows[(user_id, expired)][0]["expires_at"] = "2000-01-01T00:00:00"
+
+    assert store.delete_session(deleted)
+    assert [r["session_id"] for r in store.list_user_session_summaries(user_id)] == [kept]
+    assert store.index_user_session(user_id, deleted, {"position_name": "gone"}) is False
+
+    report = store.run_cleanup()
+    assert (report.sessions_deleted, report.index_rows_deleted) == (1, 1)
+    assert list(user_index.rows) == [(user_id, kept)]
+
+
+def test_backfill_indexes_sessions_synced_before_the_index() -> None:
+    table, user_index = FakeTableClient(), FakeTableClient()
+    store = make_session_store(table)
+    store.user_index_client = user_index
+    cv = {"full_name": "Jane", "email": "jane@example.com"}
+    session_id = store.create_session(cv, _meta("Data Engineer", "ACME"))
+    store.create_session({"full_name": "Anonymous"})
+
+    assert backfill(store, dry_run=True)["indexed"] == 0 and not user_index.rows
+    assert backfill(store) == {"scanned": 2, "indexed": 1, "expired": 0, "no_user": 1, "no_job_data": 0}
+    user_id = function_app._stable_profile_user_id(cv, {})
+    [summary] = store.list_user_session_summaries(user_id)
+    assert (summary["session_id"], summary["position_name"]) == (session_id, "Data Engineer")
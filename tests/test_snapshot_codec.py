@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+from src import snapshot_codec
+from src.snapshot_codec import FORMAT_GZIP, FORMAT_PLAIN, decode_snapshot, encode_snapshot
+
+
+def _history(rows: int = 200) -> dict:
+    return {
+        "job_data_table_history": [
+            {"company": f"Company {i}", "position": "Platform Engineer", "status": "generated", "language": "en"}
+            for i in range(rows)
+        ],
+        "event_log": [{"type": "field_update", "field": "summary", "ts": f"2026-01-01T00:00:{i % 60:02d}"} for i in range(rows)],
+    }
+
+
+def test_large_snapshots_are_compact_gzipped_and_legacy_blobs_still_decode() -> None:
+    data = _history()
+    pretty = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    snapshot = encode_snapshot(data)
+    assert snapshot.format == FORMAT_GZIP and snapshot.content_encoding == "gzip"
+    assert snapshot.raw_size < len(pretty) and len(snapshot.body) < len(pretty) // 10
+    assert decode_snapshot(snapshot.body) == data
+    # Deterministic, so equal data keeps one content-addressed object.
+    assert encode_snapshot(data).body == snapshot.body
+
+    # Blobs written before the codec are pretty-printed plain JSON.
+    assert decode_snapshot(pretty) == data
+    assert decode_snapshot(gzip.compress(pretty)) == data
+
+
+def test_small_or_disabled_snapshots_stay_plain_json(monkeypatch) -> None:
+    small = encode_snapshot({"a": 1, "b": "x"})
+    assert small.format == FORMAT_PLAIN and small.content_encoding is None
+    assert json.loads(small.body) == {"a": 1, "b": "x"}
+    assert b" " not in small.body
+
+    monkeypatch.setenv("CV_SNAPSHOT_COMPRESSION", "off")
+    assert encode_snapshot(_history()).format == FORMAT_PLAIN
+
+    monkeypatch.setenv("CV_SNAPSHOT_COMPRESSION", "zstd")
+    monkeypatch.setattr(snapshot_codec, "zstandard", None)
+    assert encode_snapshot(_history()).format == FORMAT_GZIP
+    with pytest.raises(ValueError):
+        decode_snapshot(b"\x28\xb5\x2f\xfd payload")
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from src import render
+
+
+def _cv() -> dict:
+    return {"full_name": "Jane Doe", "work_experience": [], "education": []}
+
+
+def test_bundle_is_reused_across_renders() -> None:
+    render.render_html(_cv())
+    bundle = render.get_template_bundle()
+    render.render_html(_cv())
+    render.render_cover_letter_html({"language": "de"})
+
+    assert render.get_template_bundle() is bundle
+    assert render._load_env() is bundle.env
+    assert render.TEMPLATE_NAME in bundle.templates
+    assert render.TEMPLATE_NAME_DE in bundle.templates
+    assert bundle.cv_css and bundle.cv_css in render.render_html(_cv(), inline_css=True)
+
+
+def test_bundle_rebuilds_when_fingerprint_changes(monkeypatch, tmp_path) -> None:
+    import src.style_extractor as style_extractor
+
+    calls: list[str] = []
+
+    def _fake_extract(path) -> dict:
+        calls.append(str(path))
+        return dict(render._DEFAULT_CV_STYLES, name_font_size_pt=18.0)
+
+    docx = tmp_path / "template.docx"
+    docx.write_bytes(b"docx")
+    monkeypatch.setattr(render, "DOCX_TEMPLATE_PATH", docx)
+    monkeypatch.setattr(style_extractor, "extract_styles_dict", _fake_extract)
+    render.reload_templates()
+    try:
+        first = render.get_template_bundle()
+        render.render_html(_cv())
+        render.render_cover_letter_html({})
+        assert len(calls) == 1
+        assert first.cl_styles["name_font_size_pt"] == 18.0
+
+        # Any source change (here: the DOCX) produces a new fingerprint and a fresh bundle,
+        # picked up on the next source check (interval elapsed, or an explicit reload).
+        docx.write_bytes(b"docx v2")
+        assert render.get_template_bundle() is first
+        render.reload_templates()
+        second = render.get_template_bundle()
+        assert second is not first
+        assert second.fingerprint != first.fingerprint
+        assert len(calls) == 2
+    finally:
+        render.reload_templates()
+
+
+def test_fingerprint_skips_source_stat_within_check_interval(monkeypatch) -> None:
+    render.reload_templates()
+    render._template_fingerprint()
+    monkeypatch.setattr(render, "_stat_template_fingerprint", lambda: (_ for _ in ()).throw(AssertionError("stat")))
+    for _ in range(3):
+        render._template_fingerprint()
+
+    monkeypatch.setenv("CV_TEMPLATE_CHECK_INTERVAL_SEC", "0")
+    monkeypatch.setattr(render, "_stat_template_fingerprint", lambda: "rechecked")
+    assert render._template_fingerprint() == "rechecked"
+    render.reload_templates()
+
+
+def test_section_fragments_match_inline_render_and_are_reused(monkeypatch) -> None:
+    cv = {
+        "full_name": "Jane Doe",
+        "work_experience": [{"title": "Engineer", "employer": "ACME", "date_range": "2020 - 2024", "bullets": ["- Built it"]}],
+        "education": [{"institution": "ETH", "title": "MSc", "date_range": "2015 - 2017"}],
+        "languages": ["English (C2)", {"name": "German", "level": "B2"}],
+        "it_ai_skills": ["Python & SQL"],
+        "interests": "Chess",
+    }
+    render._FRAGMENT_CACHE.clear()
+    assembled = render.render_html(cv)
+    assert len(render._FRAGMENT_CACHE) == len(render.SECTION_ORDER)
+
+    # Without section fragments the template renders every section inline: output must be identical.
+    monkeypatch.setattr(render, "_render_section_fragments", lambda *args, **kwargs: None)
+    assert render.render_html(cv) == assembled
+    monkeypatch.undo()
+
+    # Only the changed section is rendered again.
+    changed = dict(cv, interests="Chess & <b>")
+    html = render.render_html(changed)
+    assert len(render._FRAGMENT_CACHE) == len(render.SECTION_ORDER) + 1
+    assert "Chess &amp; &lt;b&gt;" in html
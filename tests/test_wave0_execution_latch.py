@@ -12,6 +12,7 @@ from datetime import datetime
 import json
 
 from src.normalize import normalize_cv_data
+from src.render import RenderResult
 
 
 def _cv_sig(cv_data: dict) -> str:
@@ -119,16 +120,15 @@ def test_latch_allows_first_pdf_generation():
     from function_app import _tool_generate_cv_from_session
 
     # Mock the PDF rendering and blob upload
-    with patch("src.orchestrator.tools.cv_pdf_tools.render_pdf") as mock_render, \
+    with patch("src.orchestrator.tools.cv_pdf_tools.render_cv") as mock_render, \
          patch("function_app._upload_pdf_blob_for_session") as mock_upload, \
          patch("function_app._get_session_store") as mock_store, \
          patch("function_app._compute_readiness") as mock_ready, \
          patch("src.orchestrator.tools.cv_pdf_tools.validate_canonical_schema") as mock_schema, \
          patch("src.orchestrator.tools.cv_pdf_tools.validate_cv") as mock_validate, \
-         patch("src.orchestrator.tools.cv_pdf_tools.count_pdf_pages") as mock_count_pages, \
          patch.dict(os.environ, {"CV_EXECUTION_LATCH": "1", "CV_GENERATION_STRICT_TEMPLATE": "0"}):
 
-        mock_render.return_value = b"%PDF-1.4 fake pdf bytes"
+        mock_render.return_value = RenderResult(pdf=b"%PDF-1.4 fake pdf bytes", pages=2)
         mock_upload.return_value = {
             "container": "cv-pdfs",
             "blob_name": "test-session-456/new-pdf-ref.pdf",
@@ -149,7 +149,6 @@ def test_latch_allows_first_pdf_generation():
         }
         mock_schema.return_value = (True, [])
         mock_validate.return_value = SimpleNamespace(is_valid=True, errors=[])
-        mock_count_pages.return_value = 2
 
         mock_store_instance = Mock()
         mock_store_instance.update_session.return_value = True
@@ -341,16 +340,15 @@ def test_latch_disabled_allows_regeneration():
     from function_app import _tool_generate_cv_from_session
 
     # Mock the PDF rendering and blob upload
-    with patch("src.orchestrator.tools.cv_pdf_tools.render_pdf") as mock_render, \
+    with patch("src.orchestrator.tools.cv_pdf_tools.render_cv") as mock_render, \
          patch("function_app._upload_pdf_blob_for_session") as mock_upload, \
          patch("function_app._get_session_store") as mock_store, \
          patch("function_app._compute_readiness") as mock_ready, \
          patch("src.orchestrator.tools.cv_pdf_tools.validate_canonical_schema") as mock_schema, \
          patch("src.orchestrator.tools.cv_pdf_tools.validate_cv") as mock_validate, \
-         patch("src.orchestrator.tools.cv_pdf_tools.count_pdf_pages") as mock_count_pages, \
          patch.dict(os.environ, {"CV_EXECUTION_LATCH": "0", "CV_GENERATION_STRICT_TEMPLATE": "0"}):  # Latch DISABLED
 
-        mock_render.return_value = b"%PDF-1.4 new pdf bytes"
+        mock_render.return_value = RenderResult(pdf=b"%PDF-1.4 new pdf bytes", pages=2)
         mock_upload.return_value = {
             "container": "cv-pdfs",
             "blob_name": "test-session-789/new-pdf-ref-2.pdf",
@@ -371,7 +369,6 @@ def test_latch_disabled_allows_regeneration():
         }
         mock_schema.return_value = (True, [])
         mock_validate.return_value = SimpleNamespace(is_valid=True, errors=[])
-        mock_count_pages.return_value = 2
 
         mock_store_instance = Mock()
         mock_store_instance.update_session.return_value = True
@@ -460,3 +457,41 @@ def test_latch_returns_latest_pdf_when_multiple():
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_latch_validates_cached_pdf_before_full_download() -> None:
+    cv_data = {"full_name": "John Doe", "email": "john@example.com", "work_experience": [], "education": []}
+    ref = {
+        "container": "cv-pdfs",
+        "blob_name": "sid-probe/cv.pdf",
+        "created_at": "2026-01-27T10:00:00",
+        "cv_sig": _cv_sig(cv_data),
+        "target_language": "en",
+        "size_bytes": 145000,
+    }
+    session = {"session_id": "sid-probe", "cv_data": cv_data, "metadata": {"language": "en", "pdf_refs": {"cv": ref}}}
+
+    from function_app import _tool_generate_cv_from_session
+
+    def _run(size: int):
+        blob_store = Mock()
+        blob_store.blob_size.return_value = size
+        blob_store.read_range.return_value = b"%PDF-"
+        blob_store.download_bytes.return_value = b"%PDF-1.7 cached"
+        with patch("src.orchestrator.tools.cv_pdf_tools.CVBlobStore", return_value=blob_store), patch.dict(
+            os.environ, {"CV_EXECUTION_LATCH": "1"}
+        ):
+            result = _tool_generate_cv_from_session(
+                session_id="sid-probe", language="en", client_context={"pdf_action": "download_only"}, session=session
+            )
+        return result, blob_store
+
+    (status, payload, content_type), truncated = _run(1200)
+    assert content_type == "application/json"
+    assert payload["pdf_metadata"]["download_error"] == "cached_pdf_size_mismatch"
+    truncated.download_bytes.assert_not_called()
+
+    (status, payload, content_type), intact = _run(145000)
+    assert status == 200 and content_type == "application/pdf"
+    assert payload["pdf_bytes"] == b"%PDF-1.7 cached"
+    intact.read_range.assert_called_once()